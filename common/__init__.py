@@ -0,0 +1 @@
+"""Módulos compartidos entre proyectos pXX (importados desde cada src/run.py)."""
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Dict, NamedTuple, Optional
+
+# HTTP/1.1 mínimo sobre asyncio streams (stdlib) para los servicios locales
+# (p06 serve.py, p14 serve.py): keep-alive, Content-Length, sin chunked.
+
+MAX_BODY = 1 << 20
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    headers: Dict[str, str]
+    body: bytes
+
+
+class BadRequest(Exception):
+    def __init__(self, status: str, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+async def read_request(reader: asyncio.StreamReader, max_body: int = MAX_BODY) -> Optional[Request]:
+    # None si el cliente cerró la conexión
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        return None
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise BadRequest("400 Bad Request", "malformed request line")
+    headers = {k.strip().lower(): v.strip() for k, v in (ln.split(":", 1) for ln in lines[1:] if ":" in ln)}
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise BadRequest("400 Bad Request", "invalid Content-Length")
+    if length < 0:
+        raise BadRequest("400 Bad Request", "invalid Content-Length")
+    if length > max_body:
+        raise BadRequest("413 Payload Too Large", "body too large")
+    try:
+        body = await reader.readexactly(length) if length else b""
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None     # el cliente cerró antes de mandar todo el cuerpo
+    return Request(method, target.split("?", 1)[0], headers, body)
+
+
+def response(status: str, body: bytes, content_type: str = "application/json") -> bytes:
+    head = (f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n")
+    return head.encode() + body
+
+
+def json_response(status: str, payload) -> bytes:
+    return response(status, json.dumps(payload).encode())
+
+
+def wants_close(req: Request) -> bool:
+    return req.headers.get("connection", "").lower() == "close"
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Union
+
+import numpy as np
+import pandas as pd
+
+# Tabla declarativa banda -> (action, reason, priority), aplicada en una sola
+# pasada vectorizada (lookup por código categórico) en vez de iterrows + if/elif.
+#
+# Formato (JSON):
+# {
+#   "column": "segment",
+#   "rules": [
+#     {"band": "HIGH", "action": "CALL + REVIEW", "reason": "High risk_score", "priority": 1},
+#     ...
+#   ],
+#   "default": {"action": "NO ACTION", "reason": "Low risk_score", "priority": 3}
+# }
+#
+# `default` aplica a cualquier banda no listada (incluido NaN), igual que el
+# `else` de las versiones con if/elif.
+
+
+@dataclass(frozen=True)
+class RuleTable:
+    column: str
+    bands: List[str]
+    action: np.ndarray    # len(bands) + 1; la última posición es el default
+    reason: np.ndarray
+    priority: np.ndarray
+
+
+def load_rules(path: Union[str, Path]) -> RuleTable:
+    spec = json.loads(Path(path).read_text(encoding="utf-8"))
+    rules, default = spec["rules"], spec["default"]
+    bands = [str(r["band"]) for r in rules]
+    if len(set(bands)) != len(bands):
+        raise ValueError(f"{path}: duplicated band in rules")
+    entries = [*rules, default]
+    return RuleTable(
+        column=spec["column"],
+        bands=bands,
+        action=np.array([e["action"] for e in entries], dtype=object),
+        reason=np.array([e["reason"] for e in entries], dtype=object),
+        priority=np.array([int(e.get("priority", 0)) for e in entries], dtype=np.int64),
+    )
+
+
+def rule_index(bands: pd.Series, table: RuleTable) -> np.ndarray:
+    # posición de la regla para cada fila; -1 (sin match) -> default
+    if isinstance(bands.dtype, pd.CategoricalDtype):
+        # lookup por categoría (pocas) y luego gather por código (todas las filas)
+        per_cat = pd.Index(table.bands).get_indexer(bands.cat.categories.astype(str))
+        per_cat = np.append(per_cat, -1)  # código -1 (NaN) -> última posición -> -1
+        idx = per_cat[bands.cat.codes.to_numpy()]
+    else:
+        idx = pd.Index(table.bands).get_indexer(bands.astype(str))
+    return np.where(idx < 0, len(table.bands), idx)
+
+
+def apply_rules(df: pd.DataFrame, table: RuleTable) -> pd.DataFrame:
+    idx = rule_index(df[table.column], table)
+    return pd.DataFrame({
+        "action": table.action[idx],
+        "reason": table.reason[idx],
+        "priority": table.priority[idx],
+    }, index=df.index)
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Store binario de series (data/pXX_*_data.csv -> .pxts) leído con np.memmap:
+# columnas de ancho fijo (float64 / int64), una detrás de otra, tras un header
+# chico. Abrir no lee datos; cada columna es una vista NumPy sin copia y un
+# rango de `t` se resuelve con búsqueda binaria sobre la columna índice.
+#
+#   python -m common.series convert p01_event_early_warning/data/p01_event_early_warning_data.csv
+#   python -m common.series convert --all          # todos los p*/data/*_data.csv
+#
+# Layout (little-endian):
+#   0   magic b"PXTS" + versión uint32
+#   8   n_rows uint64
+#   16  n_cols uint32, reservado uint32
+#   24  n_cols x (nombre 32 bytes utf-8, dtype 8 bytes ascii: "<f8" | "<i8")
+#   ... datos desde un offset alineado a 64 bytes, columna por columna
+
+MAGIC = b"PXTS"
+VERSION = 1
+SUFFIX = ".pxts"
+ALIGN = 64
+DTYPES = (np.dtype("<f8"), np.dtype("<i8"))
+HEADER = np.dtype([("magic", "S4"), ("version", "<u4"), ("n_rows", "<u8"), ("n_cols", "<u4"), ("reserved", "<u4")])
+COLUMN = np.dtype([("name", "S32"), ("dtype", "S8")])
+
+
+def _data_offset(n_cols: int) -> int:
+    end = HEADER.itemsize + n_cols * COLUMN.itemsize
+    return -(-end // ALIGN) * ALIGN
+
+
+def _column_dtype(values: np.ndarray) -> np.dtype:
+    kind = np.asarray(values).dtype.kind
+    if kind in "iub":
+        return DTYPES[1]
+    if kind == "f":
+        return DTYPES[0]
+    raise TypeError(f"unsupported column dtype {values.dtype} (expected numeric)")
+
+
+def _write_header(f, n_rows: int, names: List[str], dtypes: List[np.dtype]) -> int:
+    head = np.zeros(1, dtype=HEADER)
+    head[0] = (MAGIC, VERSION, n_rows, len(names), 0)
+    cols = np.zeros(len(names), dtype=COLUMN)
+    for i, (name, dt) in enumerate(zip(names, dtypes)):
+        raw = name.encode()
+        if len(raw) > COLUMN["name"].itemsize:
+            raise ValueError(f"column name too long: {name!r}")
+        cols[i] = (raw, dt.str.encode())
+    offset = _data_offset(len(names))
+    f.write(head.tobytes() + cols.tobytes())
+    f.write(b"\0" * (offset - f.tell()))
+    return offset
+
+
+def _allocate(path: Path, n_rows: int, names: List[str], dtypes: List[np.dtype]) -> Dict[str, np.ndarray]:
+    # crea el archivo con el tamaño final y devuelve memmaps escribibles por columna
+    with open(path, "wb") as f:
+        offset = _write_header(f, n_rows, names, dtypes)
+        f.truncate(offset + sum(n_rows * dt.itemsize for dt in dtypes))
+    out, pos = {}, offset
+    for name, dt in zip(names, dtypes):
+        out[name] = np.memmap(path, dtype=dt, mode="r+", offset=pos, shape=(n_rows,)) if n_rows else np.empty(0, dt)
+        pos += n_rows * dt.itemsize
+    return out
+
+
+def _check_index(t: np.ndarray, index: str) -> None:
+    if len(t) > 1 and np.any(t[1:] < t[:-1]):
+        raise ValueError(f"index column {index!r} must be non-decreasing")
+
+
+def write_series(path: Union[str, Path], columns: Mapping[str, np.ndarray], index: str = "t") -> Path:
+    # columns: {nombre: array 1-D}, todas del mismo largo; `index` ordenado
+    path = Path(path)
+    names = list(columns)
+    if index not in columns:
+        raise ValueError(f"index column {index!r} missing from {names}")
+    names.remove(index)
+    names.insert(0, index)  # índice siempre primero
+    arrays = [np.asarray(columns[n]) for n in names]
+    n = len(arrays[0])
+    if any(a.ndim != 1 or len(a) != n for a in arrays):
+        raise ValueError("columns must be 1-D arrays of equal length")
+    _check_index(arrays[0], index)
+    views = _allocate(path, n, names, [_column_dtype(a) for a in arrays])
+    for name, a in zip(names, arrays):
+        views[name][:] = a
+        if isinstance(views[name], np.memmap):
+            views[name].flush()
+    return path
+
+
+def _count_rows(csv_path: Path, chunk: int = 1 << 24) -> int:
+    # filas de datos = saltos de línea - header (+1 si la última línea no termina en \n);
+    # cota por arriba: read_csv salta las líneas vacías (p. ej. al final del archivo)
+    lines, last = 0, b"\n"
+    with open(csv_path, "rb") as f:
+        while block := f.read(chunk):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    return lines - 1 + (last != b"\n")
+
+
+def convert_csv(csv_path: Union[str, Path], out_path: Optional[Union[str, Path]] = None,
+                index: str = "t", chunksize: int = 1_000_000) -> Path:
+    # CSV (t,value,...) -> .pxts por bloques: memoria acotada a `chunksize` filas.
+    # El archivo se reserva con la cuenta de saltos de línea y, si read_csv
+    # parseó menos filas (líneas vacías), se compacta al número real
+    csv_path = Path(csv_path)
+    out_path = Path(out_path) if out_path is not None else csv_path.with_suffix(SUFFIX)
+    n = _count_rows(csv_path)
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    views, pos, prev = None, 0, None
+    try:
+        for block in pd.read_csv(csv_path, chunksize=chunksize, float_precision="round_trip"):
+            if views is None:
+                if index not in block.columns:
+                    raise ValueError(f"{csv_path}: index column {index!r} missing")
+                names = [index] + [c for c in block.columns if c != index]
+                dtypes = [_column_dtype(block[c].to_numpy()) for c in names]
+                views = _allocate(tmp, n, names, dtypes)
+            m = len(block)
+            if pos + m > n:
+                raise ValueError(f"{csv_path}: more rows than counted ({n})")
+            for name, v in views.items():
+                col = block[name].to_numpy()
+                if v.dtype.kind == "i" and col.dtype.kind != "i":
+                    raise ValueError(f"{csv_path}: column {name!r} is not integer past row {pos}")
+                v[pos:pos + m] = col
+            t = block[index].to_numpy()
+            _check_index(t, index)
+            if prev is not None and m and t[0] < prev:
+                raise ValueError(f"index column {index!r} must be non-decreasing")
+            prev = t[-1] if m else prev
+            pos += m
+        if views is None:
+            raise ValueError(f"{csv_path}: empty CSV")
+        if pos < n:
+            fit = out_path.with_name(out_path.name + ".fit")
+            try:
+                small = _allocate(fit, pos, names, dtypes)
+                for name, v in small.items():
+                    v[:] = views[name][:pos]
+                    if isinstance(v, np.memmap):
+                        v.flush()
+                del small
+                os.replace(fit, tmp)
+            finally:
+                if fit.exists():
+                    fit.unlink()
+        else:
+            for v in views.values():
+                if isinstance(v, np.memmap):
+                    v.flush()
+        del views
+        os.replace(tmp, out_path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return out_path
+
+
+class SeriesStore:
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        head = np.fromfile(self.path, dtype=HEADER, count=1)
+        if len(head) != 1 or head["magic"][0] != MAGIC:
+            raise ValueError(f"{self.path}: not a {SUFFIX} series file")
+        if head["version"][0] != VERSION:
+            raise ValueError(f"{self.path}: unsupported version {head['version'][0]}")
+        self.n_rows = int(head["n_rows"][0])
+        n_cols = int(head["n_cols"][0])
+        cols = np.fromfile(self.path, dtype=COLUMN, count=n_cols, offset=HEADER.itemsize)
+        self.columns = [c.decode() for c in cols["name"]]
+        self.index = self.columns[0]
+
+        # una vista por columna, sin leer datos (el SO pagina on demand)
+        self._views: Dict[str, np.ndarray] = {}
+        pos = _data_offset(n_cols)
+        for name, dt in zip(self.columns, cols["dtype"]):
+            dt = np.dtype(dt.decode())
+            if dt not in DTYPES:
+                raise ValueError(f"{self.path}: unsupported dtype {dt} for column {name!r}")
+            self._views[name] = (np.memmap(self.path, dtype=dt, mode="r", offset=pos, shape=(self.n_rows,))
+                                 if self.n_rows else np.empty(0, dt))
+            pos += self.n_rows * dt.itemsize
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._views[name]
+
+    def bounds(self, t0=None, t1=None) -> slice:
+        # posiciones de las filas con t0 <= t < t1 (búsqueda binaria sobre el índice)
+        t = self._views[self.index]
+        a = 0 if t0 is None else int(np.searchsorted(t, t0, side="left"))
+        b = self.n_rows if t1 is None else int(np.searchsorted(t, t1, side="left"))
+        return slice(a, max(a, b))
+
+    def slice(self, t0=None, t1=None, columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        sl = self.bounds(t0, t1)
+        return {c: self._views[c][sl] for c in (columns or self.columns)}
+
+    def to_frame(self, t0=None, t1=None, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        # copia a memoria (pandas); para cálculo sin copia usar slice()
+        return pd.DataFrame({c: np.array(v) for c, v in self.slice(t0, t1, columns).items()})
+
+
+def open_series(path: Union[str, Path], convert: bool = True) -> SeriesStore:
+    # acepta el .pxts o el CSV original; con convert=True (re)genera el .pxts
+    # si no existe o es más viejo que el CSV
+    path = Path(path)
+    if path.suffix == SUFFIX:
+        return SeriesStore(path)
+    store = path.with_suffix(SUFFIX)
+    if not store.exists() or store.stat().st_mtime < path.stat().st_mtime:
+        if not convert:
+            raise FileNotFoundError(f"{store} missing or older than {path}; run convert_csv first")
+        convert_csv(path, store)
+    return SeriesStore(store)
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    root = Path(__file__).resolve().parent.parent
+    ap = argparse.ArgumentParser(prog="python -m common.series")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    conv = sub.add_parser("convert", help="CSV -> .pxts (junto al CSV)")
+    conv.add_argument("csv", nargs="*", type=Path)
+    conv.add_argument("--all", action="store_true", help="todos los p*/data/*_data.csv del repo")
+    conv.add_argument("--index", default="t")
+    args = ap.parse_args(argv)
+
+    paths = list(args.csv) + (sorted(root.glob("p*/data/*_data.csv")) if args.all else [])
+    if not paths:
+        ap.error("no CSV given (pass paths or --all)")
+    for p in paths:
+        out = convert_csv(p, index=args.index)
+        print(f"OK — {p} -> {out} ({len(SeriesStore(out)):,} rows)")
+
+
+if __name__ == "__main__":
+    main()
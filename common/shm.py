@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# Arrays NumPy en memoria compartida para process pools (p04, p09): el proceso
+# padre crea el bloque y pasa a los workers sólo un SharedSpec (nombre, shape,
+# dtype); cada worker se adjunta una vez y trabaja sobre una vista sin copia.
+
+
+class SharedSpec(NamedTuple):
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class SharedArray:
+    """Dueño del bloque (proceso padre): crea, expone `.array` y libera al salir."""
+
+    def __init__(self, shape: Tuple[int, ...], dtype=np.float64, data: Optional[np.ndarray] = None):
+        dtype = np.dtype(dtype)
+        nbytes = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        self.shm = SharedMemory(create=True, size=nbytes)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+        if data is not None:
+            self.array[...] = data
+        self.spec = SharedSpec(self.shm.name, tuple(shape), dtype.str)
+
+    @classmethod
+    def from_array(cls, data: np.ndarray) -> "SharedArray":
+        return cls(data.shape, data.dtype, data)
+
+    def close(self) -> None:
+        if self.shm is None:
+            return
+        self.array = None  # soltar la vista antes de cerrar el buffer
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+    def __enter__(self) -> "SharedArray":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def attach(spec: SharedSpec) -> Tuple[SharedMemory, np.ndarray]:
+    # lado worker: mantener viva la referencia a SharedMemory mientras se use
+    # el array, y cerrarla (no unlink: el dueño es el padre) al terminar.
+    # Los workers de un pool comparten el resource_tracker del padre, así que
+    # el bloque queda registrado una sola vez.
+    shm = SharedMemory(name=spec.name)
+    return shm, np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=shm.buf)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import argparse
+import shutil
+import warnings
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# Capa de salida común para los runners (p01 / p02 / p06 / p14): escribe cada
+# tabla en un formato columnar que conserva dtypes (timestamps, categóricas) en
+# vez de to_csv, y la relee con read_table.
+#
+#   parquet   <stem>.parquet, o <stem>/<YYYY-MM-DD>.parquet si se particiona por fecha
+#   arrow     <stem>.arrow (Arrow IPC file; se lee con memory map, sin copia)
+#   csv       <stem>.csv (export opcional, p. ej. para abrir en Excel)
+#
+# parquet/arrow requieren pyarrow (requirements.txt); si no está instalado se
+# cae a CSV con un warning para no romper la demo.
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # dependencia opcional
+    pa = pq = None
+
+FORMATS = ("parquet", "arrow", "csv")
+DEFAULT_FORMAT = "parquet"
+SUFFIX = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+
+
+class OutputSpec(NamedTuple):
+    fmt: str = DEFAULT_FORMAT
+    csv: bool = False  # además del formato principal, exportar <stem>.csv
+
+
+def have_arrow() -> bool:
+    return pa is not None
+
+
+def resolve_format(fmt: str) -> str:
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown output format {fmt!r}; expected one of {FORMATS}")
+    if fmt != "csv" and not have_arrow():
+        warnings.warn(f"pyarrow is not installed; writing CSV instead of {fmt}", stacklevel=2)
+        return "csv"
+    return fmt
+
+
+def add_output_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--format", choices=FORMATS, default=DEFAULT_FORMAT,
+                    help="formato de las tablas en outputs/ (parquet/arrow conservan dtypes)")
+    ap.add_argument("--csv", action="store_true", help="exportar además cada tabla como CSV")
+
+
+def output_spec(args: argparse.Namespace) -> OutputSpec:
+    return OutputSpec(resolve_format(args.format), args.csv)
+
+
+def _partition_keys(s: pd.Series) -> np.ndarray:
+    # clave diaria (YYYY-MM-DD) de una columna fecha/timestamp
+    return pd.to_datetime(s).dt.strftime("%Y-%m-%d").to_numpy()
+
+
+def _clear(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def write_table(df: pd.DataFrame, stem: Path, fmt: str = DEFAULT_FORMAT,
+                partition_by: Optional[str] = None) -> Path:
+    # stem: ruta sin extensión (OUT / "scores_timeseries"); partition_by sólo
+    # aplica a parquet: un archivo por día de esa columna, todas las columnas
+    # (incluida la de fecha) se guardan dentro de cada archivo
+    fmt = resolve_format(fmt)
+    stem = Path(stem)
+    if fmt == "csv":
+        path = stem.with_suffix(".csv")
+        df.to_csv(path, index=False)
+        return path
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if fmt == "arrow":
+        path = stem.with_suffix(".arrow")
+        with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        return path
+
+    if partition_by is None:
+        path = stem.with_suffix(".parquet")
+        _clear(path)
+        pq.write_table(table, path)
+        return path
+
+    # particionado: orden estable por día y un slice (sin copia) por partición;
+    # las slices comparten diccionario, así las categóricas quedan consistentes
+    path = stem
+    _clear(path)
+    path.mkdir(parents=True)
+    keys = _partition_keys(df[partition_by])
+    order = np.argsort(keys, kind="stable")
+    if not np.all(order[1:] > order[:-1]):
+        table = table.take(pa.array(order))
+        keys = keys[order]
+    bounds = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(keys)]))
+    for a, b in zip(starts, ends):
+        pq.write_table(table.slice(a, b - a), path / f"{keys[a]}.parquet")
+    return path
+
+
+def save_table(df: pd.DataFrame, stem: Path, spec: OutputSpec = OutputSpec(),
+               partition_by: Optional[str] = None) -> List[Path]:
+    # formato principal + CSV opcional; devuelve las rutas escritas. Las salidas
+    # del mismo stem en otros formatos (de corridas anteriores) se borran, así
+    # find_table / read_table no releen una tabla vieja
+    stem = Path(stem)
+    paths = [write_table(df, stem, spec.fmt, partition_by)]
+    if spec.csv and spec.fmt != "csv":
+        paths.append(write_table(df, stem, "csv"))
+    for old in [stem, *(stem.with_suffix(sfx) for sfx in SUFFIX.values())]:
+        if old not in paths:
+            _clear(old)
+    return paths
+
+
+def read_table(path: Union[str, Path], parse_dates: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    # formato según la ruta: directorio de particiones, .parquet, .arrow o .csv;
+    # parse_dates sólo se usa para CSV (parquet/arrow ya guardan el tipo)
+    path = Path(path)
+    if path.suffix == ".csv":
+        return pd.read_csv(path, parse_dates=list(parse_dates) if parse_dates else None)
+    if pa is None:
+        raise ImportError(f"reading {path} requires pyarrow (pip install pyarrow)")
+    if path.is_dir():
+        files = sorted(path.glob("*.parquet"))
+        if not files:
+            raise FileNotFoundError(f"{path}: no parquet partitions")
+        table = pq.ParquetDataset(files).read(use_pandas_metadata=True)
+    elif path.suffix == ".parquet":
+        table = pq.read_table(path)
+    elif path.suffix == ".arrow":
+        with pa.memory_map(str(path), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+    else:
+        raise ValueError(f"{path}: unknown table format (expected a partition dir, {list(SUFFIX.values())})")
+    return table.to_pandas()
+
+
+def find_table(stem: Path) -> Path:
+    # la salida existente para un stem, en el orden de preferencia de FORMATS
+    stem = Path(stem)
+    if stem.is_dir():
+        return stem
+    for fmt in FORMATS:
+        path = stem.with_suffix(SUFFIX[fmt])
+        if path.exists():
+            return path
+    raise FileNotFoundError(f"no table found for {stem} ({', '.join(SUFFIX.values())})")
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+# Benchmark: cargar una señal (t,value) desde CSV con pd.read_csv vs desde el
+# store binario de common.series (np.memmap), en frío y en caliente.
+#
+#   python src/bench_series.py --rows 5000000
+#
+# "frío" = páginas del archivo fuera del page cache (posix_fadvise DONTNEED
+# antes de cada carga); "caliente" = segunda carga con el archivo ya cacheado.
+# Se mide: carga completa (+ una reducción sobre value, para tocar los datos),
+# abrir el store sin leer datos, y un rango de t de 1% del largo.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+HERE = Path(__file__).resolve().parent
+PROJECT = HERE.parent
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.series import SeriesStore, convert_csv  # noqa: E402
+
+
+def make_csv(path: Path, n: int, seed: int = 42) -> None:
+    # misma forma que generate_data.py (t, value), más larga
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    y = 50 + 0.02 * (t % 10_000) + np.sin(t / 18) * 2 + rng.normal(0, 0.8, size=n)
+    pd.DataFrame({"t": t, "value": y}).to_csv(path, index=False)
+
+
+def csv_range(csv: Path, lo: int, hi: int) -> pd.DataFrame:
+    # con CSV no hay índice: parsear todo y filtrar
+    df = pd.read_csv(csv)
+    return df[(df["t"] >= lo) & (df["t"] < hi)]
+
+
+def evict(path: Path) -> None:
+    # saca el archivo del page cache (sin privilegios; sólo páginas limpias)
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def timed(fn, path: Path, cold: bool):
+    if cold:
+        evict(path)
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=5_000_000)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = Path(tmp) / "signal_data.csv"
+        make_csv(csv, args.rows)
+        t0 = time.perf_counter()
+        store_path = convert_csv(csv)
+        t_conv = time.perf_counter() - t0
+        print(f"{args.rows:,} rows: CSV {csv.stat().st_size / 1e6:.0f} MB, "
+              f".pxts {store_path.stat().st_size / 1e6:.0f} MB (convert {t_conv:.2f} s)\n")
+
+        # parity: mismos valores que el CSV (parser round_trip) y mismo rango de t
+        ref = pd.read_csv(csv, float_precision="round_trip")
+        store = SeriesStore(store_path)
+        pd.testing.assert_frame_equal(store.to_frame(), ref)
+        lo, hi = args.rows // 2, args.rows // 2 + args.rows // 100
+        part = store.slice(lo, hi)
+        sel = ref[(ref["t"] >= lo) & (ref["t"] < hi)]
+        assert np.array_equal(part["value"], sel["value"].to_numpy()), "t-range slice mismatch"
+        del store, part
+
+        cases = [
+            ("csv full", csv, lambda: float(pd.read_csv(csv)["value"].sum())),
+            ("pxts open", store_path, lambda: len(SeriesStore(store_path))),
+            ("pxts full", store_path, lambda: float(SeriesStore(store_path)["value"].sum())),
+            ("csv t-range 1%", csv, lambda: float(csv_range(csv, lo, hi)["value"].sum())),
+            ("pxts t-range 1%", store_path, lambda: float(SeriesStore(store_path).slice(lo, hi)["value"].sum())),
+        ]
+        print(f"{'load':<18} {'cold_ms':>10} {'warm_ms':>10}")
+        results = {}
+        for name, path, fn in cases:
+            t_cold, _ = timed(fn, path, cold=True)
+            t_warm, _ = timed(fn, path, cold=False)
+            results[name] = (t_cold, t_warm)
+            print(f"{name:<18} {t_cold * 1e3:>10.2f} {t_warm * 1e3:>10.2f}")
+        for what in ("full", "t-range 1%"):
+            c, p = results[f"csv {what}"], results[f"pxts {what}"]
+            print(f"speedup {what:<10} cold {c[0] / p[0]:>7.1f}x   warm {c[1] / p[1]:>7.1f}x")
+    print("\nparity OK (pxts == read_csv round_trip; t-range slice == boolean filter)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+# Benchmark: z-score rolling batch (pandas, run.detect_anomalies) vs motor
+# incremental (streaming.StreamingZScoreEngine).
+#
+#   python src/bench_streaming.py --events 200000 --assets 1000 --batch 5000
+#
+# 1) parity: ambos caminos deben dar el mismo zscore / is_anomaly.
+# 2) full pass: eventos/seg procesando todo el historial de una vez.
+# 3) incremental: llegan micro-batches; pandas re-escanea todo el historial
+#    en cada batch (como hoy), el motor sólo procesa los eventos nuevos.
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from run import detect_anomalies, generate_synthetic_events
+from streaming import StreamingZScoreEngine
+
+
+def make_events(n: int, n_assets: int, seed: int = 42) -> pd.DataFrame:
+    df = generate_synthetic_events(n=n, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    df["asset_id"] = np.array([f"TRUCK-{i:05d}" for i in range(n_assets)])[rng.integers(0, n_assets, size=n)]
+    return df.reset_index(drop=True)
+
+
+def check_parity(df: pd.DataFrame, z: float = 3.0) -> float:
+    batch = detect_anomalies(df, z=z)
+    stream = StreamingZScoreEngine(z=z).process(df)
+    max_err = float(np.max(np.abs(batch["zscore"].to_numpy() - stream["zscore"].to_numpy())))
+    flips = int((batch["is_anomaly"].to_numpy() != stream["is_anomaly"].to_numpy()).sum())
+    assert max_err < 1e-9, f"zscore mismatch: {max_err}"
+    assert flips == 0, f"is_anomaly mismatch on {flips} rows"
+    return max_err
+
+
+def bench_full(df: pd.DataFrame) -> dict:
+    t0 = time.perf_counter()
+    detect_anomalies(df)
+    t_pandas = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    StreamingZScoreEngine().update_many(df["asset_id"].tolist(), df["value"].to_numpy())
+    t_stream = time.perf_counter() - t0
+    return {"pandas_s": t_pandas, "stream_s": t_stream,
+            "pandas_ev_s": len(df) / t_pandas, "stream_ev_s": len(df) / t_stream}
+
+
+def bench_incremental(df: pd.DataFrame, batch: int, n_batches: int) -> dict:
+    # historial precargado = todo menos los últimos n_batches micro-batches
+    n_new = batch * n_batches
+    hist, new = df.iloc[:-n_new], df.iloc[-n_new:]
+
+    eng = StreamingZScoreEngine()
+    eng.update_many(hist["asset_id"].tolist(), hist["value"].to_numpy())
+
+    t_pandas = 0.0
+    t_stream = 0.0
+    seen = hist
+    for k in range(n_batches):
+        mb = new.iloc[k * batch:(k + 1) * batch]
+
+        t0 = time.perf_counter()
+        seen = pd.concat([seen, mb], ignore_index=True)
+        detect_anomalies(seen)
+        t_pandas += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        eng.update_many(mb["asset_id"].tolist(), mb["value"].to_numpy())
+        t_stream += time.perf_counter() - t0
+
+    return {"pandas_s": t_pandas, "stream_s": t_stream,
+            "pandas_ev_s": n_new / t_pandas, "stream_ev_s": n_new / t_stream}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=200_000)
+    ap.add_argument("--assets", type=int, default=1_000)
+    ap.add_argument("--batch", type=int, default=5_000)
+    ap.add_argument("--n-batches", type=int, default=5)
+    args = ap.parse_args()
+
+    df = make_events(args.events, args.assets)
+    err = check_parity(df)
+    print(f"parity OK — {len(df):,} events, {args.assets:,} assets, max |dz| = {err:.2e}")
+    holes = df.copy()
+    holes.loc[holes.sample(frac=0.01, random_state=0).index, "value"] = np.nan
+    err = check_parity(holes)
+    print(f"parity OK with 1% NaN values — max |dz| = {err:.2e}")
+
+    r = bench_full(df)
+    print(f"full pass    pandas: {r['pandas_s']:.3f}s ({r['pandas_ev_s']:,.0f} ev/s)   "
+          f"stream: {r['stream_s']:.3f}s ({r['stream_ev_s']:,.0f} ev/s)")
+
+    r = bench_incremental(df, args.batch, args.n_batches)
+    print(f"incremental  pandas: {r['pandas_s']:.3f}s ({r['pandas_ev_s']:,.0f} new ev/s)   "
+          f"stream: {r['stream_s']:.3f}s ({r['stream_ev_s']:,.0f} new ev/s)   "
+          f"x{r['pandas_s'] / r['stream_s']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
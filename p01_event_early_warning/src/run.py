@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import argparse
+import sys
 from pathlib import Path
+from typing import List
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -11,6 +14,9 @@ DATA = PROJECT / "data"
 OUT = PROJECT / "outputs"
 IMG = PROJECT / "img"
 
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.tables import OutputSpec, add_output_args, output_spec, save_table  # noqa: E402
+
 def ensure_dirs():
     DATA.mkdir(parents=True, exist_ok=True)
     OUT.mkdir(parents=True, exist_ok=True)
@@ -36,21 +42,24 @@ def generate_synthetic_events(n: int = 2000, seed: int = 42) -> pd.DataFrame:
     return df
 
 def detect_anomalies(df: pd.DataFrame, z: float = 3.0) -> pd.DataFrame:
-    # método simple y explicable: z-score por ventana rolling
+    # método simple y explicable: z-score por ventana rolling, una ventana por asset
+    # (misma semántica que streaming.StreamingZScoreEngine, que lo hace incremental)
     s = df["value"].astype(float)
-    roll_mean = s.rolling(48, min_periods=24).mean()
-    roll_std = s.rolling(48, min_periods=24).std().replace(0, np.nan)
+    g = s.groupby(df["asset_id"], sort=False)
+    roll_mean = g.transform(lambda x: x.rolling(48, min_periods=24).mean())
+    roll_std = g.transform(lambda x: x.rolling(48, min_periods=24).std()).replace(0, np.nan)
     zscore = (s - roll_mean) / roll_std
     df = df.copy()
     df["zscore"] = zscore.fillna(0.0)
     df["is_anomaly"] = (df["zscore"].abs() >= z).astype(int)
     return df
 
-def save_outputs(df: pd.DataFrame):
+def save_outputs(df: pd.DataFrame, spec: OutputSpec = OutputSpec()) -> List[Path]:
     alerts = df.loc[df["is_anomaly"] == 1, ["timestamp", "asset_id", "value", "zscore"]].copy()
     alerts = alerts.sort_values("timestamp")
-    df.to_csv(OUT / "events_scored.csv", index=False)
-    alerts.to_csv(OUT / "alerts.csv", index=False)
+    # tablas: parquet (eventos particionados por día) / arrow / csv según spec
+    paths = save_table(df, OUT / "events_scored", spec, partition_by="timestamp")
+    paths += save_table(alerts, OUT / "alerts", spec)
 
     # plot ejemplo
     plt.figure()
@@ -75,16 +84,21 @@ def save_outputs(df: pd.DataFrame):
         report.append(alerts.tail(5).to_markdown(index=False))
         report.append("\n")
     (OUT / "report.md").write_text("\n".join(report), encoding="utf-8")
+    return paths
 
 def main():
+    ap = argparse.ArgumentParser()
+    add_output_args(ap)
+    args = ap.parse_args()
+
     ensure_dirs()
     # siempre regeneramos por ser demo V1; si quieres lo hacemos incremental después.
     df = generate_synthetic_events()
     scored = detect_anomalies(df)
-    save_outputs(scored)
+    paths = save_outputs(scored, output_spec(args))
     print("OK — Generated outputs:")
-    print(f"- {OUT / 'events_scored.csv'}")
-    print(f"- {OUT / 'alerts.csv'}")
+    for path in paths:
+        print(f"- {path}")
     print(f"- {OUT / 'report.md'}")
     print(f"- {IMG / 'p01_event_early_warning_plot.png'}")
 
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Motor incremental del z-score rolling de run.py::detect_anomalies.
+# Cada asset mantiene un ring buffer de tamaño `window` con media y M2
+# (Welford); agregar un evento y sacar el más antiguo cuesta O(1), sin
+# volver a recorrer el historial. Como pandas rolling, un valor no finito
+# ocupa su lugar en la ventana (cuenta filas) pero no entra en media / M2 ni
+# en min_periods (`valid`).
+
+WINDOW = 48
+MIN_PERIODS = 24
+Z_THRESHOLD = 3.0
+
+# cada cuántas salidas del buffer recalculamos mean/M2 desde cero,
+# para que el error numérico del "Welford inverso" no se acumule
+RESYNC_EVERY = 4096
+
+
+class AssetWindow:
+    __slots__ = ("window", "buf", "pos", "count", "valid", "mean", "m2", "evictions")
+
+    def __init__(self, window: int = WINDOW):
+        self.window = window
+        self.buf: List[float] = [0.0] * window
+        self.pos = 0
+        self.count = 0
+        self.valid = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.evictions = 0
+
+    def push(self, x: float) -> None:
+        if self.count == self.window:
+            old = self.buf[self.pos]
+            self.count -= 1
+            if math.isfinite(old):
+                # Welford inverso: sacar `old` de la ventana
+                n = self.valid - 1
+                if n == 0:
+                    self.mean = 0.0
+                    self.m2 = 0.0
+                else:
+                    mean_old = self.mean
+                    self.mean = (self.valid * mean_old - old) / n
+                    self.m2 -= (old - mean_old) * (old - self.mean)
+                self.valid = n
+                self.evictions += 1
+        self.buf[self.pos] = x
+        self.pos = (self.pos + 1) % self.window
+        self.count += 1
+        if math.isfinite(x):
+            self.valid += 1
+            delta = x - self.mean
+            self.mean += delta / self.valid
+            self.m2 += delta * (x - self.mean)
+        if self.evictions >= RESYNC_EVERY:
+            self.resync()
+
+    def resync(self) -> None:
+        vals = [v for v in self.values() if math.isfinite(v)]
+        if not vals:
+            self.mean = self.m2 = 0.0
+            self.evictions = 0
+            return
+        self.mean = math.fsum(vals) / len(vals)
+        self.m2 = math.fsum((v - self.mean) ** 2 for v in vals)
+        self.evictions = 0
+
+    def values(self) -> List[float]:
+        if self.count < self.window:
+            return self.buf[:self.count]
+        return self.buf[self.pos:] + self.buf[:self.pos]
+
+    def std(self) -> float:
+        # misma convención que pandas rolling().std(): ddof=1
+        if self.valid < 2:
+            return float("nan")
+        var = self.m2 / (self.valid - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+    def zscore(self, x: float, min_periods: int = MIN_PERIODS) -> float:
+        if self.valid < min_periods or not math.isfinite(x):
+            return 0.0
+        sd = self.std()
+        if not sd > 0:  # std 0 / nan -> z = 0 (igual que el batch)
+            return 0.0
+        return (x - self.mean) / sd
+
+
+class StreamingZScoreEngine:
+    """Z-score rolling por asset, alimentado evento a evento o en micro-batches."""
+
+    def __init__(self, window: int = WINDOW, min_periods: int = MIN_PERIODS, z: float = Z_THRESHOLD):
+        self.window = window
+        self.min_periods = min_periods
+        self.z = z
+        self.assets: Dict[str, AssetWindow] = {}
+
+    def _state(self, asset_id: str) -> AssetWindow:
+        st = self.assets.get(asset_id)
+        if st is None:
+            st = self.assets[asset_id] = AssetWindow(self.window)
+        return st
+
+    def update(self, asset_id: str, value: float) -> Tuple[float, int]:
+        st = self._state(asset_id)
+        x = float(value)
+        st.push(x)
+        zs = st.zscore(x, self.min_periods)
+        return zs, int(abs(zs) >= self.z)
+
+    def update_many(self, asset_ids: Iterable[str], values: Iterable[float]) -> Tuple[np.ndarray, np.ndarray]:
+        asset_ids = list(asset_ids)
+        values = np.asarray(values, dtype=float)
+        z_out = np.empty(len(values), dtype=float)
+        # loop caliente: bindings locales para no pagar lookups por evento
+        state = self._state
+        min_p = self.min_periods
+        for i, (a, x) in enumerate(zip(asset_ids, values.tolist())):
+            st = state(a)
+            st.push(x)
+            z_out[i] = st.zscore(x, min_p)
+        return z_out, (np.abs(z_out) >= self.z).astype(int)
+
+    def process(self, df: pd.DataFrame) -> pd.DataFrame:
+        # micro-batch en el mismo formato que detect_anomalies (timestamp, value, asset_id)
+        df = df.copy()
+        zs, flags = self.update_many(df["asset_id"].astype(str), df["value"].astype(float))
+        df["zscore"] = zs
+        df["is_anomaly"] = flags
+        return df
+
+    def snapshot(self, asset_id: str) -> Optional[dict]:
+        st = self.assets.get(asset_id)
+        if st is None:
+            return None
+        return {"asset_id": asset_id, "count": st.valid, "mean": st.mean, "std": st.std()}
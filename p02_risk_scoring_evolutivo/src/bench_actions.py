@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+# Benchmark + parity: derive_actions (tabla de reglas vectorizada) vs la
+# versión anterior con iterrows + if/elif.
+#
+#   python src/bench_actions.py --rows 10000 100000 500000
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from run import derive_actions
+
+
+def derive_actions_reference(latest_scores: pd.DataFrame) -> pd.DataFrame:
+    # implementación previa, sólo para comparar
+    actions = []
+    for _, r in latest_scores.iterrows():
+        seg = str(r["segment"])
+        if seg == "HIGH":
+            action, reason = "CALL + REVIEW", "High risk_score"
+        elif seg == "MEDIUM":
+            action, reason = "MONITOR + NUDGE", "Medium risk_score"
+        else:
+            action, reason = "NO ACTION", "Low risk_score"
+        actions.append({"date": r["date"], "entity_id": r["entity_id"], "risk_score": float(r["risk_score"]),
+                        "segment": seg, "action": action, "reason": reason})
+    return pd.DataFrame(actions)
+
+
+def make_latest(n: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    score = rng.random(n)
+    return pd.DataFrame({
+        "date": pd.Timestamp("2025-03-31"),
+        "entity_id": [f"ENT-{i:06d}" for i in range(n)],
+        "risk_score": score,
+        "segment": pd.cut(score, bins=[-0.001, 0.35, 0.65, 1.001], labels=["LOW", "MEDIUM", "HIGH"]),
+    })
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    args = ap.parse_args()
+
+    sample = make_latest(5_000)
+    new, ref = derive_actions(sample), derive_actions_reference(sample)
+    pd.testing.assert_frame_equal(new[ref.columns], ref, check_dtype=False)
+    print("parity OK (rule table vs iterrows)")
+
+    print(f"{'rows':>9} {'rules_s':>9} {'iterrows_s':>11} {'speedup':>8}")
+    for n in args.rows:
+        df = make_latest(n)
+        t0 = time.perf_counter()
+        derive_actions(df)
+        t_new = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        derive_actions_reference(df)
+        t_ref = time.perf_counter() - t0
+        print(f"{n:>9,} {t_new:>9.3f} {t_ref:>11.3f} {t_ref / t_new:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
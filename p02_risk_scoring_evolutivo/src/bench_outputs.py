@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+# Benchmark + round-trip: escribir/leer scores_timeseries con common.tables
+# en csv, parquet (un archivo), parquet particionado por día y arrow IPC.
+#
+#   python src/bench_outputs.py --entities 20000 --days 90
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from run import PROJECT, score_by_window, simulate_history
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.tables import read_table, write_table  # noqa: E402
+
+CASES = [("csv", None), ("parquet", None), ("parquet", "date"), ("arrow", None)]
+
+
+def size_mb(path: Path) -> float:
+    files = path.rglob("*") if path.is_dir() else [path]
+    return sum(f.stat().st_size for f in files if f.is_file()) / 1e6
+
+
+def lost_dtypes(ref: pd.DataFrame, got: pd.DataFrame) -> list:
+    return [c for c in ref.columns if ref[c].dtype != got[c].dtype]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--entities", type=int, default=20_000)
+    ap.add_argument("--days", type=int, default=90)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    df = score_by_window(simulate_history(n_entities=args.entities, n_days=args.days))
+    print(f"scores_timeseries: {len(df):,} rows x {df.shape[1]} cols "
+          f"({df.memory_usage(deep=True).sum() / 1e6:.0f} MB in memory)\n")
+    print(f"{'format':<18} {'write_s':>8} {'read_s':>8} {'MB':>8} {'Mrows/s w':>10} {'Mrows/s r':>10}  round-trip")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, part in CASES:
+            stem = Path(tmp) / f"scores_{fmt}_{part or 'single'}"
+            t_w, t_r = [], []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                path = write_table(df, stem, fmt, partition_by=part)
+                t_w.append(time.perf_counter() - t0)
+                t0 = time.perf_counter()
+                got = read_table(path, parse_dates=["date"])
+                t_r.append(time.perf_counter() - t0)
+
+            # particionado: filas vuelven ordenadas por día (estable dentro del día)
+            ref = df.sort_values(part, kind="stable").reset_index(drop=True) if part else df
+            lost = lost_dtypes(ref, got)
+            if fmt == "csv":
+                note = f"dtypes lost: {', '.join(lost)}" if lost else "exact"
+            else:
+                pd.testing.assert_frame_equal(got, ref)
+                note = "exact"
+            w, r = min(t_w), min(t_r)
+            label = f"{fmt}/{part}" if part else fmt
+            print(f"{label:<18} {w:>8.3f} {r:>8.3f} {size_mb(path):>8.1f} "
+                  f"{len(df) / w / 1e6:>10.2f} {len(df) / r / 1e6:>10.2f}  {note}")
+    print("\nround-trip OK (parquet / arrow: values + dtypes identical)")
+
+
+if __name__ == "__main__":
+    main()
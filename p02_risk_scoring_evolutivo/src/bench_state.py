@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+# Benchmark + parity: scoring incremental (state.SnapshotStore.ingest) de un
+# día nuevo vs re-scorear todo el historial con score_by_window.
+#
+#   python src/bench_state.py --entities 20000 --days 90 365 730
+
+import argparse
+import time
+
+import numpy as np
+
+from run import build_state, risk_scores, score_by_window, simulate_history
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--entities", type=int, default=20_000)
+    ap.add_argument("--days", type=int, nargs="+", default=[90, 365, 730])
+    args = ap.parse_args()
+
+    print(f"{'days':>5} {'hist_rows':>12} {'rescore_s':>10} {'ingest_s':>9} {'speedup':>8}")
+    for n_days in args.days:
+        full = simulate_history(n_entities=args.entities, n_days=n_days)
+        last = full["date"].max()
+        hist, day = full[full["date"] < last], full[full["date"] == last]
+        store = build_state(score_by_window(hist))
+
+        t0 = time.perf_counter()
+        ref = score_by_window(full)
+        t_full = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        new = store.ingest(day, risk_scores)
+        t_inc = time.perf_counter() - t0
+
+        ref = ref.loc[new.index]
+        err = float(np.max(np.abs(new["risk_score"].to_numpy() - ref["risk_score"].to_numpy())))
+        assert err < 1e-9, f"risk_score mismatch: {err}"
+        assert (new["segment"].astype(str) == ref["segment"].astype(str)).all(), "segment mismatch"
+        print(f"{n_days:>5} {len(full):>12,} {t_full:>10.3f} {t_inc:>9.3f} {t_full / t_inc:>7.1f}x")
+    print("parity OK (ingest vs full rescore on the last day)")
+
+    # NaN en el historial y en el día nuevo: ambos caminos los saltan igual
+    full = simulate_history(n_entities=2_000, n_days=60)
+    rng = np.random.default_rng(0)
+    full.loc[rng.choice(full.index, len(full) // 100, replace=False), "behavior_index"] = np.nan
+    last = full["date"].max()
+    hist, day = full[full["date"] < last], full[full["date"] == last]
+    new = build_state(score_by_window(hist)).ingest(day, risk_scores)
+    ref = score_by_window(full).loc[new.index]
+    for col in ["beh_rolling", "risk_score"]:
+        a, b = new[col].to_numpy(), ref[col].to_numpy()
+        assert np.array_equal(np.isnan(a), np.isnan(b)) and np.nanmax(np.abs(a - b)) < 1e-9, f"{col} mismatch with NaN"
+    print("parity OK with 1% NaN behavior_index")
+
+
+if __name__ == "__main__":
+    main()
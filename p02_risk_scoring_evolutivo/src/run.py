@@ -1,118 +1,146 @@
 from __future__ import annotations
 
+import argparse
+import sys
 from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from state import SnapshotStore
+from windows import rolling_features
+
 HERE = Path(__file__).resolve().parent
 PROJECT = HERE.parent
 DATA = PROJECT / "data"
 OUT = PROJECT / "outputs"
 IMG = PROJECT / "img"
+ACTION_RULES = DATA / "action_rules.json"
+STATE = OUT / "state.npz"  # snapshot incremental (ver state.py)
+WINDOW_DAYS = 14
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.rules import apply_rules, load_rules  # noqa: E402
+from common.tables import OutputSpec, add_output_args, output_spec, read_table, save_table  # noqa: E402
+
+# features rolling por entidad: {columna_salida: columna_entrada}
+ROLLING_FEATURES = {
+    "inc_rolling": "incidents",
+    "beh_rolling": "behavior_index",
+}
 
 def ensure_dirs():
     DATA.mkdir(parents=True, exist_ok=True)
     OUT.mkdir(parents=True, exist_ok=True)
     IMG.mkdir(parents=True, exist_ok=True)
 
-def simulate_history(n_entities: int = 120, n_days: int = 90, seed: int = 7) -> pd.DataFrame:
-    rng = np.random.default_rng(seed)
-    dates = pd.date_range("2025-01-01", periods=n_days, freq="D")
-    entities = [f"ENT-{i:03d}" for i in range(1, n_entities + 1)]
-
-    rows = []
+def _simulate_block(rng: np.random.Generator, first: int, n_entities: int, n_days: int,
+                    dates: np.ndarray) -> pd.DataFrame:
+    # matrices (entidades x días) en una sola pasada; ravel() en orden C ya
+    # deja las filas ordenadas por (entity_id, date)
     base_risk = rng.uniform(0.05, 0.35, size=n_entities)  # riesgo base por entidad
+    trend = rng.normal(0.0, 0.002, size=n_entities)       # drift suave
+    shape = (n_entities, n_days)
+
+    noise = rng.normal(0, 1, size=shape)
+    activity = rng.normal(50, 15, size=shape)
+    np.maximum(activity, 5, out=activity)
+
+    # P(incidente) = base_risk + rampa lineal 0 -> trend*n_days (como np.linspace por entidad)
+    p_inc = np.multiply.outer(trend * n_days, np.linspace(0, 1, n_days))
+    p_inc += base_risk[:, None]
+    incidents = rng.random(shape) < p_inc
+    del p_inc
+
+    # variable de comportamiento (ej: retraso / quejas / señales)
+    behavior = rng.normal(0, 0.3, size=shape)
+    behavior += 0.4 * noise
+    behavior += 0.6 * incidents
+    np.clip(behavior, -2, 3, out=behavior)
+    del noise
+
+    labels = [f"ENT-{i:03d}" for i in range(first + 1, first + n_entities + 1)]
+    entity_id = pd.Categorical.from_codes(np.repeat(np.arange(n_entities), n_days), categories=labels)
+    return pd.DataFrame({
+        "date": np.tile(dates, n_entities),
+        "entity_id": entity_id,
+        "activity": activity.ravel(),
+        "incidents": incidents.ravel().astype(np.int64),
+        "behavior_index": behavior.ravel(),
+    })
 
-    for i, ent in enumerate(entities):
-        trend = rng.normal(0.0, 0.002)  # drift suave
-        noise = rng.normal(0, 1, size=n_days)
-        activity = np.clip(rng.normal(50, 15, size=n_days), 5, None)
-        incidents = (rng.random(n_days) < (base_risk[i] + np.linspace(0, trend*n_days, n_days))).astype(int)
-
-        # variable de comportamiento (ej: retraso / quejas / señales)
-        behavior = np.clip(0.4*noise + 0.6*incidents + rng.normal(0, 0.3, size=n_days), -2, 3)
-
-        for d, a, inc, beh in zip(dates, activity, incidents, behavior):
-            rows.append({
-                "date": d,
-                "entity_id": ent,
-                "activity": float(a),
-                "incidents": int(inc),
-                "behavior_index": float(beh),
-            })
-
-    df = pd.DataFrame(rows).sort_values(["entity_id", "date"])
-    return df
+def simulate_history(n_entities: int = 120, n_days: int = 90, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2025-01-01", periods=n_days, freq="D").to_numpy()
+    return _simulate_block(rng, 0, n_entities, n_days, dates)
+
+def iter_history_chunks(n_entities: int = 120, n_days: int = 90, seed: int = 7,
+                        chunk_entities: int = 10_000) -> Iterator[pd.DataFrame]:
+    # mismo modelo que simulate_history, por bloques de entidades (memoria acotada);
+    # cada bloque usa su propio stream hijo de `seed`: reproducible para un
+    # (seed, chunk_entities) dado
+    dates = pd.date_range("2025-01-01", periods=n_days, freq="D").to_numpy()
+    n_chunks = -(-n_entities // chunk_entities)
+    for k, ss in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        first = k * chunk_entities
+        n = min(chunk_entities, n_entities - first)
+        yield _simulate_block(np.random.default_rng(ss), first, n, n_days, dates)
 
 def score_by_window(df: pd.DataFrame, window_days: int = 14) -> pd.DataFrame:
-    df = df.copy()
+    df = df.copy(deep=False)
     df["date"] = pd.to_datetime(df["date"])
 
-    # features rolling por entidad
-    df["inc_rolling"] = (
-        df.groupby("entity_id")["incidents"]
-          .rolling(window_days, min_periods=max(3, window_days//3))
-          .mean()
-          .reset_index(level=0, drop=True)
-    )
-    df["beh_rolling"] = (
-        df.groupby("entity_id")["behavior_index"]
-          .rolling(window_days, min_periods=max(3, window_days//3))
-          .mean()
-          .reset_index(level=0, drop=True)
+    # features rolling por entidad: un sort + un cumsum para todas las features
+    rolled = rolling_features(
+        df, ROLLING_FEATURES,
+        window=window_days, min_periods=max(3, window_days//3),
     )
+    for j, col in enumerate(ROLLING_FEATURES):
+        df[col] = rolled[:, j]
 
-    # score simple y explicable (logit-ish)
-    x = 2.2*df["inc_rolling"].fillna(0) + 0.9*df["beh_rolling"].fillna(0)
-    score = 1 / (1 + np.exp(-x))
-    df["risk_score"] = np.clip(score, 0, 1)
+    df["risk_score"], df["segment"] = risk_scores({c: df[c].to_numpy() for c in ROLLING_FEATURES})
+    return df
+
+def risk_scores(features: Dict[str, np.ndarray]) -> Tuple[np.ndarray, pd.Categorical]:
+    # score simple y explicable (logit-ish) sobre las features rolling
+    x = 2.2*np.nan_to_num(features["inc_rolling"]) + 0.9*np.nan_to_num(features["beh_rolling"])
+    score = np.clip(1 / (1 + np.exp(-x)), 0, 1)
 
     # segmentos
-    df["segment"] = pd.cut(
-        df["risk_score"],
+    segment = pd.cut(
+        score,
         bins=[-0.001, 0.35, 0.65, 1.001],
         labels=["LOW", "MEDIUM", "HIGH"]
     )
-
-    return df
-
-def derive_actions(latest_scores: pd.DataFrame) -> pd.DataFrame:
-    # reglas simples: suficiente para demo y entrevistas
-    actions = []
-    for _, r in latest_scores.iterrows():
-        seg = str(r["segment"])
-        if seg == "HIGH":
-            action = "CALL + REVIEW"
-            reason = "High risk_score"
-        elif seg == "MEDIUM":
-            action = "MONITOR + NUDGE"
-            reason = "Medium risk_score"
-        else:
-            action = "NO ACTION"
-            reason = "Low risk_score"
-        actions.append({
-            "date": r["date"],
-            "entity_id": r["entity_id"],
-            "risk_score": float(r["risk_score"]),
-            "segment": seg,
-            "action": action,
-            "reason": reason
-        })
-    return pd.DataFrame(actions)
-
-def save_outputs(df_scored: pd.DataFrame):
-    # dataset scoreado completo (para que se vea evolución)
-    df_scored.to_csv(OUT / "scores_timeseries.csv", index=False)
+    return score, segment
+
+def derive_actions(latest_scores: pd.DataFrame, rules_path: Path = ACTION_RULES) -> pd.DataFrame:
+    # reglas declarativas (data/action_rules.json): segment -> action/reason/priority
+    table = load_rules(rules_path)
+    acts = apply_rules(latest_scores, table)
+    return pd.DataFrame({
+        "date": latest_scores["date"].to_numpy(),
+        "entity_id": latest_scores["entity_id"].to_numpy(),
+        "risk_score": latest_scores["risk_score"].to_numpy(dtype=float),
+        "segment": latest_scores["segment"].astype(str).to_numpy(),
+        "action": acts["action"].to_numpy(),
+        "reason": acts["reason"].to_numpy(),
+        "priority": acts["priority"].to_numpy(),
+    })
+
+def save_outputs(df_scored: pd.DataFrame, spec: OutputSpec = OutputSpec()) -> List[Path]:
+    # dataset scoreado completo (para que se vea evolución), particionado por día
+    paths = save_table(df_scored, OUT / "scores_timeseries", spec, partition_by="date")
 
     # última fecha por entidad (lo que usarías operacionalmente)
     last_date = df_scored["date"].max()
     latest = df_scored[df_scored["date"] == last_date][["date","entity_id","risk_score","segment"]].copy()
     latest = latest.sort_values("risk_score", ascending=False)
-    latest.to_csv(OUT / "scores.csv", index=False)
+    paths += save_table(latest, OUT / "scores", spec)
 
     actions = derive_actions(latest)
-    actions.to_csv(OUT / "actions.csv", index=False)
+    paths += save_table(actions, OUT / "actions", spec)
 
     # plot ejemplo: top 1 entidad (serie temporal)
     top_ent = latest.iloc[0]["entity_id"] if len(latest) else None
@@ -146,19 +174,58 @@ def save_outputs(df_scored: pd.DataFrame):
     report.append("\n")
 
     (OUT / "report.md").write_text("\n".join(report), encoding="utf-8")
+    return paths
+
+def build_state(df_scored: pd.DataFrame, window_days: int = WINDOW_DAYS) -> SnapshotStore:
+    # bootstrap del snapshot desde el historial (una vez); después basta --ingest
+    return SnapshotStore.from_history(
+        df_scored, ROLLING_FEATURES,
+        window=window_days, min_periods=max(3, window_days//3), score_fn=risk_scores,
+    )
+
+def ingest_day(rows_path: Path, state_path: Path = STATE,
+               spec: OutputSpec = OutputSpec()) -> Tuple[pd.DataFrame, List[Path]]:
+    # scoring incremental: sólo las filas nuevas, contra el snapshot persistido
+    store = SnapshotStore.load(state_path)
+    new = store.ingest(read_table(rows_path, parse_dates=["date"]), risk_scores)
+    store.save(state_path)
+
+    latest = (new.sort_values("date", kind="stable")
+                 .drop_duplicates("entity_id", keep="last")[["date","entity_id","risk_score","segment"]]
+                 .sort_values("risk_score", ascending=False))
+    paths = save_table(latest, OUT / "scores", spec)
+    paths += save_table(derive_actions(latest), OUT / "actions", spec)
+    return latest, paths
 
 def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ingest", type=Path, default=None,
+                    help="filas nuevas (date, entity_id, incidents, behavior_index) en CSV/parquet/arrow; "
+                         "actualiza state.npz")
+    add_output_args(ap)
+    args = ap.parse_args()
+    spec = output_spec(args)
+
     ensure_dirs()
+    if args.ingest is not None:
+        latest, paths = ingest_day(args.ingest, spec=spec)
+        print(f"OK — Ingested {len(latest)} entities:")
+        for path in paths:
+            print(f"- {path}")
+        print(f"- {STATE}")
+        return
+
     df = simulate_history()
-    scored = score_by_window(df, window_days=14)
-    save_outputs(scored)
+    scored = score_by_window(df, window_days=WINDOW_DAYS)
+    paths = save_outputs(scored, spec)
+    build_state(scored).save(STATE)
 
     print("OK — Generated outputs:")
-    print(f"- {OUT / 'scores_timeseries.csv'}")
-    print(f"- {OUT / 'scores.csv'}")
-    print(f"- {OUT / 'actions.csv'}")
+    for path in paths:
+        print(f"- {path}")
     print(f"- {OUT / 'report.md'}")
     print(f"- {IMG / 'p02_risk_scoring_evolutivo_plot.png'}")
+    print(f"- {STATE}")
 
 if __name__ == "__main__":
     main()
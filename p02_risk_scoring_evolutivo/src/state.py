@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Snapshot persistente del "último estado" por entidad, para scoring diario
+# incremental: cada entidad guarda un ring buffer con sus últimos `window`
+# valores por feature, su última fecha y su último score. Ingerir un día
+# toca sólo las entidades presentes en esas filas: O(filas nuevas), no
+# O(historial).
+
+# score_fn(features) -> (risk_score, segment); features: {columna_salida: array}
+ScoreFn = Callable[[Dict[str, np.ndarray]], Tuple[np.ndarray, np.ndarray]]
+
+
+class SnapshotStore:
+    def __init__(self, features: Dict[str, str], window: int, min_periods: int):
+        self.features = dict(features)  # {columna_salida: columna_entrada}
+        self.window = window
+        self.min_periods = min_periods
+        self.entity_ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        k = len(self.features)
+        self.buf = np.zeros((0, window, k), dtype=float)
+        self.pos = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros(0, dtype=np.int64)
+        self.last_date = np.zeros(0, dtype="datetime64[ns]")
+        self.last_score = np.zeros(0, dtype=float)
+
+    def __len__(self) -> int:
+        return len(self.entity_ids)
+
+    # --- filas / capacidad -------------------------------------------------
+
+    def _grow(self, n: int) -> None:
+        cap = len(self.pos)
+        if n <= cap:
+            return
+        new_cap = max(n, 2 * cap, 1024)  # crecimiento geométrico: copias amortizadas O(1)
+        extra = new_cap - cap
+        self.buf = np.concatenate([self.buf, np.zeros((extra, *self.buf.shape[1:]))])
+        self.pos = np.concatenate([self.pos, np.zeros(extra, dtype=np.int64)])
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.last_date = np.concatenate([self.last_date, np.full(extra, np.datetime64("NaT"), dtype="datetime64[ns]")])
+        self.last_score = np.concatenate([self.last_score, np.full(extra, np.nan)])
+
+    def _rows(self, entity_ids) -> np.ndarray:
+        rows = np.empty(len(entity_ids), dtype=np.int64)
+        for i, ent in enumerate(entity_ids):
+            r = self.index.get(ent)
+            if r is None:
+                r = self.index[ent] = len(self.entity_ids)
+                self.entity_ids.append(ent)
+            rows[i] = r
+        self._grow(len(self.entity_ids))
+        return rows
+
+    # --- ingesta -------------------------------------------------------------
+
+    def _rolling(self, rows: np.ndarray) -> np.ndarray:
+        # media de los valores válidos de la ventana (como windows.grouped_rolling_mean):
+        # un slot vale si ya fue escrito y no es NaN; min_periods sobre los válidos
+        filled = np.arange(self.window) < np.minimum(self.count[rows], self.window)[:, None]
+        b = self.buf[rows]
+        valid = filled[:, :, None] & ~np.isnan(b)
+        n = valid.sum(axis=1)
+        out = np.where(valid, b, 0.0).sum(axis=1) / np.maximum(n, 1)
+        out[n < max(self.min_periods, 1)] = np.nan
+        return out
+
+    def ingest(self, df: pd.DataFrame, score_fn: ScoreFn) -> pd.DataFrame:
+        # df: filas nuevas (date, entity_id, <columnas de entrada>); devuelve,
+        # en el orden de df, las features rolling + risk_score + segment
+        perm = np.argsort(pd.to_datetime(df["date"]).to_numpy(dtype="datetime64[ns]"), kind="stable")
+        df = df.iloc[perm]
+        rows = self._rows(df["entity_id"].astype(str).tolist())
+        dates = pd.to_datetime(df["date"]).to_numpy(dtype="datetime64[ns]")
+        x = np.column_stack([df[c].to_numpy(dtype=float) for c in self.features.values()])
+        feats = np.empty_like(x)
+
+        # validar antes de tocar el estado: fechas estrictamente posteriores
+        # a lo ya ingerido y sin (entity, date) repetidos dentro del batch
+        rank = pd.Series(rows).groupby(rows).cumcount().to_numpy()
+        first = rank == 0
+        stale = np.flatnonzero(first)[self.last_date[rows[first]] >= dates[first]]
+        dup = np.flatnonzero(pd.DataFrame({"r": rows, "d": dates}).duplicated().to_numpy())
+        if len(stale):
+            i = stale[0]
+            raise ValueError(f"{self.entity_ids[rows[i]]}: date {dates[i]} is not after last ingested date")
+        if len(dup):
+            i = dup[0]
+            raise ValueError(f"{self.entity_ids[rows[i]]}: date {dates[i]} appears more than once in the batch")
+
+        # una entidad puede traer varias filas: se procesan por "rondas"
+        # (1ª fila de cada entidad, 2ª, ...) y cada ronda es vectorizada
+        for r in range(int(rank.max()) + 1 if len(rank) else 0):
+            sel = np.flatnonzero(rank == r)
+            e = rows[sel]
+            self.buf[e, self.pos[e]] = x[sel]
+            self.pos[e] = (self.pos[e] + 1) % self.window
+            self.count[e] += 1
+            self.last_date[e] = dates[sel]
+            feats[sel] = self._rolling(e)
+
+        score, segment = score_fn({c: feats[:, j] for j, c in enumerate(self.features)})
+        self.last_score[rows] = score  # filas en orden de fecha: queda el último
+        out = pd.DataFrame({
+            "date": dates,
+            "entity_id": [self.entity_ids[r] for r in rows],
+            **{c: feats[:, j] for j, c in enumerate(self.features)},
+            "risk_score": score,
+            "segment": segment,
+        }, index=df.index)
+        return out.iloc[np.argsort(perm)]  # de vuelta al orden de entrada
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, features: Dict[str, str], window: int, min_periods: int,
+                     score_fn: ScoreFn) -> "SnapshotStore":
+        # bootstrap (una vez) desde el historial completo: sólo las últimas
+        # `window` filas de cada entidad terminan en el buffer
+        store = cls(features, window, min_periods)
+        df = df.sort_values(["entity_id", "date"], kind="stable")
+        codes, uniques = pd.factorize(df["entity_id"].astype(str), sort=False)
+        store.entity_ids = list(uniques)
+        store.index = {e: i for i, e in enumerate(store.entity_ids)}
+        store._grow(len(uniques))
+
+        n_ent = len(uniques)
+        j = pd.Series(codes).groupby(codes).cumcount().to_numpy()  # índice de la fila dentro de su entidad
+        total = np.bincount(codes, minlength=n_ent)
+        keep = j >= total[codes] - window
+        x = np.column_stack([df[c].to_numpy(dtype=float) for c in features.values()])
+        store.buf[codes[keep], j[keep] % window] = x[keep]
+        store.count[:n_ent] = total
+        store.pos[:n_ent] = total % window
+
+        last = np.flatnonzero(j == total[codes] - 1)
+        store.last_date[codes[last]] = pd.to_datetime(df["date"]).to_numpy(dtype="datetime64[ns]")[last]
+        rows = np.arange(n_ent)
+        feats = store._rolling(rows)
+        score, _ = score_fn({c: feats[:, k] for k, c in enumerate(features)})
+        store.last_score[rows] = score
+        return store
+
+    # --- persistencia ------------------------------------------------------
+
+    def save(self, path: Union[str, Path]) -> None:
+        n = len(self)
+        meta = {"features": self.features, "window": self.window, "min_periods": self.min_periods}
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                meta=np.array(json.dumps(meta)),
+                entity_ids=np.asarray(self.entity_ids, dtype=str),
+                buf=self.buf[:n], pos=self.pos[:n], count=self.count[:n],
+                last_date=self.last_date[:n], last_score=self.last_score[:n],
+            )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "SnapshotStore":
+        with np.load(path, allow_pickle=False) as z:
+            meta = json.loads(str(z["meta"]))
+            store = cls(meta["features"], meta["window"], meta["min_periods"])
+            store.entity_ids = z["entity_ids"].tolist()
+            store.index = {e: i for i, e in enumerate(store.entity_ids)}
+            store.buf, store.pos, store.count = z["buf"], z["pos"], z["count"]
+            store.last_date, store.last_score = z["last_date"], z["last_score"]
+        return store
+
+    def snapshot(self) -> pd.DataFrame:
+        n = len(self)
+        return pd.DataFrame({
+            "date": self.last_date[:n],
+            "entity_id": self.entity_ids,
+            "risk_score": self.last_score[:n],
+        })
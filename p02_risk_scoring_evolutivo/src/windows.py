@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Kernel de ventanas rolling agrupadas (por entidad) en NumPy.
+# Un solo sort por (entity, date) y un solo cumsum sobre la matriz de
+# features: cada media rolling sale de cumsum[i] - cumsum[i - w] dentro del
+# bloque contiguo de la entidad, sin groupby ni reset_index por feature.
+
+
+def group_starts(keys: np.ndarray) -> np.ndarray:
+    # keys ya ordenadas -> índice (por fila) del inicio de su bloque
+    n = len(keys)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    boundary = np.empty(n, dtype=bool)
+    boundary[0] = True
+    boundary[1:] = keys[1:] != keys[:-1]
+    first = np.flatnonzero(boundary)
+    return np.repeat(first, np.diff(np.append(first, n)))
+
+
+def grouped_rolling_mean(
+    values: np.ndarray,
+    starts: np.ndarray,
+    window: int,
+    min_periods: int,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    # values: (n, k) ya ordenado por (grupo, tiempo); starts: group_starts()
+    # `out` puede ser el mismo arreglo que `values` (se consume antes de escribir)
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    n, k = values.shape
+    if out is None:
+        out = np.empty((n, k), dtype=float)
+    if n == 0:
+        return out
+
+    # centrar por columna antes del cumsum: la suma acumulada crece como un
+    # random walk en vez de linealmente, y la resta pierde menos precisión.
+    # Los NaN no suman ni cuentan (como pandas): un cumsum de valores válidos
+    # (0 en los NaN) y otro del número de válidos; min_periods sobre los válidos
+    valid = ~np.isnan(values)
+    nvalid = valid.sum(axis=0)
+    center = np.where(valid, values, 0.0).sum(axis=0) / np.maximum(nvalid, 1)
+    cs = np.zeros((n + 1, k), dtype=float)
+    np.subtract(values, center, out=cs[1:])
+    cs[1:][~valid] = 0.0
+    np.cumsum(cs[1:], axis=0, out=cs[1:])
+    cn = np.zeros((n + 1, k), dtype=np.int64)
+    np.cumsum(valid, axis=0, out=cn[1:])
+
+    # fila i: ventana [lo, i] dentro de su bloque -> cs[i+1] - cs[lo]
+    end = np.arange(1, n + 1)
+    lo = np.maximum(end - window, starts)
+    count = (cn[1:] - cn[lo]).astype(float)
+    np.take(cs, lo, axis=0, out=out)
+    np.subtract(cs[1:], out, out=out)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out /= count
+    out += center
+    out[count < max(min_periods, 1)] = np.nan
+    return out
+
+
+def rolling_features(
+    df: pd.DataFrame,
+    features: Dict[str, str],
+    window: int,
+    min_periods: int,
+    by: str = "entity_id",
+    order: str = "date",
+) -> np.ndarray:
+    # features: {columna_salida: columna_entrada}
+    # devuelve (n, len(features)) en el orden original de las filas de df
+    codes = pd.factorize(df[by], sort=True)[0]
+    t = df[order].to_numpy()
+
+    same = codes[1:] == codes[:-1]
+    already_sorted = bool(np.all(codes[1:] >= codes[:-1]) and np.all(t[1:][same] >= t[:-1][same]))
+    perm = None if already_sorted else np.lexsort([t, codes])  # llave primaria: entity
+
+    n = len(df)
+    src = np.empty((n, len(features)), dtype=float)
+    for j, col in enumerate(features.values()):
+        x = df[col].to_numpy(dtype=float)
+        src[:, j] = x if perm is None else x[perm]
+
+    keys = codes if perm is None else codes[perm]
+    res = grouped_rolling_mean(src, group_starts(keys), window, min_periods, out=src)
+    if perm is None:
+        return res
+    out = np.empty_like(res)
+    out[perm] = res
+    return out
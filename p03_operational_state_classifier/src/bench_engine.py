@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+# Benchmark + parity del motor streaming (engine.StateEngine).
+#
+#   python src/bench_engine.py --samples 20000000 --chunk 1000000
+#
+# 1) parity: features por chunks == una sola pasada == referencia pandas
+#    (groupby por bucket + rolling(window).shift(1)).
+# 2) throughput: muestras/seg (y por minuto) de push() con el modelo ya
+#    entrenado, y de partial_fit.
+# 3) memoria: pico (tracemalloc) con el mismo chunk para N y 4N muestras;
+#    debe quedar acotado por el chunk, no por el largo del stream.
+
+import argparse
+import time
+import tracemalloc
+from typing import Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+from engine import MIN_PERIODS, STEP, WINDOW, StateEngine
+
+
+def sensor_chunks(n: int, chunk: int, seed: int = 3, rate: float = 10.0) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    # muestreo irregular (~`rate` muestras por unidad de t), deriva lenta,
+    # ruido y episodios anómalos
+    rng = np.random.default_rng(seed)
+    t0 = 0.0
+    for a in range(0, n, chunk):
+        m = min(chunk, n - a)
+        t = t0 + np.cumsum(rng.exponential(1 / rate, size=m))
+        t0 = t[-1]
+        value = 50 + 2 * np.sin(t / 180) + rng.normal(0, 0.8, size=m)
+        spikes = rng.random(m) < 2e-4
+        value[spikes] += rng.choice([-8, -6, 6, 9], size=int(spikes.sum()))
+        yield t, value
+
+
+def reference_features(t: np.ndarray, value: np.ndarray) -> pd.DataFrame:
+    b = np.floor(t / STEP).astype(np.int64)
+    g = pd.Series(value).groupby(b)
+    r = pd.DataFrame({"t": g.size().index * float(STEP), "mean": g.mean().to_numpy(), "count": g.size().to_numpy()})
+    roll = r["mean"].rolling(WINDOW, min_periods=1)
+    r["roll_mean"] = roll.mean().shift(1)
+    r["roll_std"] = roll.std().shift(1)
+    cnt = r["mean"].rolling(WINDOW, min_periods=1).count().shift(1).fillna(0)
+    warm = (cnt >= MIN_PERIODS) & (r["roll_std"] > 0)
+    r["z"] = np.where(warm, ((r["mean"] - r["roll_mean"]) / r["roll_std"]).clip(-10, 10), 0.0)
+    return r
+
+
+def run_stream(n: int, chunk: int, train: int = 0) -> Tuple[StateEngine, int]:
+    # los primeros `train` chunks también alimentan partial_fit
+    engine = StateEngine()
+    rows = 0
+    for k, (t, v) in enumerate(sensor_chunks(n, chunk)):
+        frame = engine.push(t, v)
+        if k < train:
+            engine.partial_fit(frame)
+        rows += len(frame)
+    return engine, rows + len(engine.flush())
+
+
+def check_parity(n: int, chunk: int) -> float:
+    t, v = next(sensor_chunks(n, n))
+    eng = StateEngine()
+    parts = [eng.push(t[a:a + chunk], v[a:a + chunk]) for a in range(0, n, chunk)]
+    chunked = pd.concat(parts + [eng.flush()], ignore_index=True)
+    one = StateEngine()
+    single = pd.concat([one.push(t, v), one.flush()], ignore_index=True)
+    ref = reference_features(t, v)
+    assert len(chunked) == len(single) == len(ref), (len(chunked), len(single), len(ref))
+    err = 0.0
+    for col in ("t", "mean", "count", "roll_mean", "roll_std", "z"):
+        a, b, c = (x[col].to_numpy(dtype=float) for x in (chunked, single, ref))
+        assert np.allclose(a, b, rtol=0, atol=1e-9, equal_nan=True), f"{col}: chunked != single pass"
+        assert np.allclose(a, c, rtol=0, atol=1e-7, equal_nan=True), f"{col}: engine != pandas reference"
+        err = max(err, float(np.nanmax(np.abs(a - c))))
+    return err
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--samples", type=int, default=20_000_000)
+    ap.add_argument("--chunk", type=int, default=1_000_000)
+    ap.add_argument("--parity-samples", type=int, default=500_000)
+    args = ap.parse_args()
+
+    err = check_parity(args.parity_samples, 37_111)  # chunks que cortan buckets a la mitad
+    print(f"parity OK (chunked == single pass == pandas; max abs err {err:.1e})\n")
+
+    # modelo entrenado con el primer chunk; luego push() puro
+    engine, _ = run_stream(args.chunk, args.chunk, train=1)
+    clf = engine.classifier
+
+    t0 = time.perf_counter()
+    stream = StateEngine(classifier=clf)
+    buckets = 0
+    for t, v in sensor_chunks(args.samples, args.chunk):
+        buckets += len(stream.push(t, v))
+    t_gen_push = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in sensor_chunks(args.samples, args.chunk):
+        pass
+    t_gen = time.perf_counter() - t0
+    t_push = t_gen_push - t_gen
+
+    t0 = time.perf_counter()
+    run_stream(args.samples // 4, args.chunk, train=10**9)
+    t_fit = time.perf_counter() - t0 - t_gen / 4
+
+    rate = args.samples / t_push
+    print(f"{'stage':<22} {'samples':>12} {'seconds':>8} {'samples/s':>12} {'samples/min':>14}")
+    print(f"{'push (classify)':<22} {args.samples:>12,} {t_push:>8.2f} {rate:>12,.0f} {rate * 60:>14,.0f}")
+    fit_rate = (args.samples // 4) / t_fit
+    print(f"{'push + partial_fit':<22} {args.samples // 4:>12,} {t_fit:>8.2f} {fit_rate:>12,.0f} {fit_rate * 60:>14,.0f}")
+    print(f"buckets emitted: {buckets:,} (~{args.samples / max(buckets, 1):.1f} samples/bucket)\n")
+
+    for n in (args.samples // 8, args.samples // 2):
+        tracemalloc.start()
+        run_stream(n, args.chunk)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"peak memory {n:>12,} samples: {peak / 1e6:7.1f} MB (chunk={args.chunk:,})")
+
+
+if __name__ == "__main__":
+    main()
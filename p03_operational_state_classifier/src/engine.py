@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+# Motor streaming de estados operacionales:
+#   muestras (t, value) -> Resampler (buckets de `step` unidades de t)
+#   -> WindowFeatures (baseline rolling sobre los `window` buckets anteriores)
+#   -> StateClassifier (modelo lineal compacto, actualizable con partial_fit).
+# Todo se procesa por chunks con NumPy; entre chunks sólo se arrastra el
+# bucket abierto y los últimos `window` buckets (memoria acotada).
+
+STEP = 1
+WINDOW = 24
+MIN_PERIODS = 12
+
+STATES = ["Normal", "Alerta", "Crítico"]
+# definición de estado (etiquetas de entrenamiento): |z| del bucket vs baseline
+ALERT_Z = 2.0
+CRITICAL_Z = 3.0
+Z_CLIP = 10.0
+
+FEATURES = ("abs_z", "z2", "slope_z", "spread_z")
+
+
+class Resampler:
+    """Agrega muestras ordenadas por t en buckets fijos; emite sólo buckets cerrados."""
+
+    def __init__(self, step: float = STEP, origin: float = 0.0):
+        self.step = step
+        self.origin = origin
+        # bucket abierto: (id, sum, min, max, count)
+        self.open: Optional[Tuple[int, float, float, float, int]] = None
+        self.last_t = -np.inf
+
+    def push(self, t: np.ndarray, value: np.ndarray) -> Dict[str, np.ndarray]:
+        t = np.asarray(t, dtype=float)
+        value = np.asarray(value, dtype=float)
+        ok = np.isfinite(t) & np.isfinite(value)  # limpieza: fuera nulos / inf
+        if not ok.all():
+            t, value = t[ok], value[ok]
+        if len(t) and (t[0] < self.last_t or np.any(t[1:] < t[:-1])):
+            raise ValueError("samples must arrive ordered by t")
+        if len(t):
+            self.last_t = t[-1]
+
+        bucket = np.floor((t - self.origin) / self.step).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]]) if len(t) else np.empty(0, np.int64)
+        ids = bucket[starts]
+        s = np.add.reduceat(value, starts) if len(t) else np.empty(0)
+        lo = np.minimum.reduceat(value, starts) if len(t) else np.empty(0)
+        hi = np.maximum.reduceat(value, starts) if len(t) else np.empty(0)
+        n = np.diff(np.r_[starts, len(t)]).astype(np.int64)
+
+        # fusionar el bucket abierto del chunk anterior
+        if self.open is not None:
+            oid, osum, omin, omax, ocnt = self.open
+            if len(ids) and ids[0] == oid:
+                s[0] += osum
+                lo[0] = min(lo[0], omin)
+                hi[0] = max(hi[0], omax)
+                n[0] += ocnt
+            else:
+                ids = np.r_[oid, ids]
+                s, lo, hi, n = np.r_[osum, s], np.r_[omin, lo], np.r_[omax, hi], np.r_[ocnt, n]
+
+        # el último bucket queda abierto (pueden llegar más muestras)
+        if len(ids):
+            self.open = (int(ids[-1]), float(s[-1]), float(lo[-1]), float(hi[-1]), int(n[-1]))
+            ids, s, lo, hi, n = ids[:-1], s[:-1], lo[:-1], hi[:-1], n[:-1]
+        return self._emit(ids, s, lo, hi, n)
+
+    def flush(self) -> Dict[str, np.ndarray]:
+        if self.open is None:
+            return self._emit(*(np.empty(0),) * 5)
+        oid, osum, omin, omax, ocnt = self.open
+        self.open = None
+        return self._emit(np.array([oid]), np.array([osum]), np.array([omin]), np.array([omax]), np.array([ocnt]))
+
+    def _emit(self, ids, s, lo, hi, n) -> Dict[str, np.ndarray]:
+        n = np.asarray(n, dtype=np.int64)
+        return {
+            "t": self.origin + np.asarray(ids, dtype=float) * self.step,
+            "mean": np.asarray(s, dtype=float) / np.maximum(n, 1),
+            "min": np.asarray(lo, dtype=float),
+            "max": np.asarray(hi, dtype=float),
+            "count": n,
+        }
+
+
+class WindowFeatures:
+    """Baseline rolling (media / std ddof=1) de los `window` buckets anteriores, incremental."""
+
+    def __init__(self, window: int = WINDOW, min_periods: int = MIN_PERIODS):
+        self.window = window
+        self.min_periods = min_periods
+        self.tail = np.empty(0)  # últimos `window` means (cola del chunk anterior)
+
+    def push(self, buckets: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        m = buckets["mean"]
+        k, w, c = len(m), self.window, len(self.tail)
+        ext = np.concatenate((self.tail, m))
+        # sumas acumuladas desplazadas por una referencia (evita cancelación en var)
+        ref = ext[0] if len(ext) else 0.0
+        d = ext - ref
+        cs = np.concatenate(([0.0], np.cumsum(d)))
+        cs2 = np.concatenate(([0.0], np.cumsum(d * d)))
+
+        # bucket j (posición c + j en ext) usa la ventana [c + j - w, c + j)
+        end = c + np.arange(k)
+        start = np.maximum(end - w, 0)
+        cnt = (end - start).astype(float)
+        s1 = cs[end] - cs[start]
+        s2 = cs2[end] - cs2[start]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_d = s1 / cnt
+            var = (s2 - s1 * mean_d) / (cnt - 1)
+        roll_std = np.sqrt(np.maximum(var, 0.0))
+        roll_mean = mean_d + ref
+
+        warm = (cnt >= self.min_periods) & (roll_std > 0)
+        z = np.zeros(k)
+        np.divide(m - roll_mean, roll_std, out=z, where=warm)
+        np.clip(z, -Z_CLIP, Z_CLIP, out=z)
+        slope = np.diff(ext, prepend=ext[:1])[c:]  # m[j] - bucket anterior (0 en el primero)
+        slope_z = np.zeros(k)
+        np.divide(slope, roll_std, out=slope_z, where=warm)
+        spread_z = np.zeros(k)
+        np.divide(buckets["max"] - buckets["min"], roll_std, out=spread_z, where=warm)
+
+        self.tail = ext[-w:].copy()
+        return {
+            "roll_mean": np.where(cnt > 0, roll_mean, np.nan),
+            "roll_std": np.where(cnt > 1, roll_std, np.nan),
+            "z": z,
+            "warm": warm,
+            "slope_z": np.clip(slope_z, -Z_CLIP, Z_CLIP),
+            "spread_z": np.clip(spread_z, 0, Z_CLIP),
+        }
+
+
+def feature_matrix(feats: Dict[str, np.ndarray]) -> np.ndarray:
+    z = feats["z"]
+    X = np.empty((len(z), len(FEATURES)))
+    np.abs(z, out=X[:, 0])
+    np.multiply(z, z, out=X[:, 1])
+    X[:, 2] = feats["slope_z"]
+    X[:, 3] = feats["spread_z"]
+    return X
+
+
+def label_states(z: np.ndarray) -> np.ndarray:
+    # etiqueta operacional explicable (índice en STATES)
+    a = np.abs(z)
+    return (a >= ALERT_Z).astype(np.int64) + (a >= CRITICAL_Z)
+
+
+class StateClassifier:
+    """StandardScaler + SGD (log-loss) con partial_fit; predict en NumPy puro."""
+
+    def __init__(self, seed: int = 0, alpha: float = 1e-4):
+        self.scaler = StandardScaler()
+        self.model = SGDClassifier(loss="log_loss", alpha=alpha, random_state=seed)
+        self.classes = np.arange(len(STATES))
+        self._W: Optional[np.ndarray] = None  # pesos efectivos sobre X sin escalar
+        self._b: Optional[np.ndarray] = None
+
+    @property
+    def fitted(self) -> bool:
+        return self._W is not None
+
+    def partial_fit(self, X: np.ndarray, y: np.ndarray) -> "StateClassifier":
+        if len(X) == 0:
+            return self
+        self.scaler.partial_fit(X)
+        self.model.partial_fit(self.scaler.transform(X), y, classes=self.classes)
+        # ((X - mu) / sd) @ coef.T + b  ==  X @ (coef / sd).T + (b - coef @ (mu / sd))
+        scale = self.scaler.scale_
+        coef = self.model.coef_
+        self._W = (coef / scale).T.copy()
+        self._b = self.model.intercept_ - coef @ (self.scaler.mean_ / scale)
+        return self
+
+    def decision(self, X: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        if not self.fitted:
+            raise RuntimeError("StateClassifier is not fitted; call partial_fit first")
+        out = np.matmul(X, self._W, out=out)
+        out += self._b
+        return out
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.decision(X).argmax(axis=1)
+
+
+class StateEngine:
+    """Pipeline streaming: push(t, value) -> estados por bucket cerrado."""
+
+    def __init__(self, step: float = STEP, window: int = WINDOW, min_periods: int = MIN_PERIODS,
+                 classifier: Optional[StateClassifier] = None, origin: float = 0.0):
+        self.resampler = Resampler(step, origin)
+        self.features = WindowFeatures(window, min_periods)
+        self.classifier = classifier or StateClassifier()
+        self.samples = 0
+        self.buckets = 0
+
+    def _frame(self, buckets: Dict[str, np.ndarray]) -> pd.DataFrame:
+        feats = self.features.push(buckets)
+        label = label_states(feats["z"])
+        if self.classifier.fitted:
+            pred = self.classifier.predict(feature_matrix(feats))
+        else:  # sin modelo todavía: la regla de umbrales
+            pred = label
+        self.buckets += len(label)
+        return pd.DataFrame({
+            **buckets,
+            "roll_mean": feats["roll_mean"],
+            "roll_std": feats["roll_std"],
+            "z": feats["z"],
+            "slope_z": feats["slope_z"],
+            "spread_z": feats["spread_z"],
+            "warm": feats["warm"],
+            "label": pd.Categorical.from_codes(label, categories=STATES),
+            "state": pd.Categorical.from_codes(pred, categories=STATES),
+        })
+
+    def push(self, t: np.ndarray, value: np.ndarray) -> pd.DataFrame:
+        self.samples += len(t)
+        return self._frame(self.resampler.push(t, value))
+
+    def flush(self) -> pd.DataFrame:
+        # cierra el bucket abierto (fin del stream)
+        return self._frame(self.resampler.flush())
+
+    def partial_fit(self, frame: pd.DataFrame) -> "StateEngine":
+        # actualiza el modelo con buckets etiquetados (label = regla o confirmación manual)
+        frame = frame[frame["warm"].to_numpy()]
+        X = feature_matrix({c: frame[c].to_numpy() for c in ("z", "slope_z", "spread_z")})
+        self.classifier.partial_fit(X, frame["label"].cat.codes.to_numpy())
+        return self
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from sklearn.metrics import classification_report, confusion_matrix
+
+from engine import FEATURES, STATES, StateClassifier, StateEngine
+
+HERE = Path(__file__).resolve().parent
+PROJECT = HERE.parent
+DATA = PROJECT / "data"
+OUT = PROJECT / "outputs"
+IMG = PROJECT / "img"
+INPUT = DATA / "p03_operational_state_classifier_data.csv"
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.series import open_series  # noqa: E402
+from common.tables import OutputSpec, add_output_args, output_spec, save_table  # noqa: E402
+
+TRAIN_FRAC = 0.6   # primeros buckets para entrenar (streaming), resto para evaluar
+CHUNK = 64         # muestras por micro-batch (simula llegada por streaming)
+
+def ensure_dirs():
+    DATA.mkdir(parents=True, exist_ok=True)
+    OUT.mkdir(parents=True, exist_ok=True)
+    IMG.mkdir(parents=True, exist_ok=True)
+
+def load_signal(path: Path = INPUT):
+    # data/*.csv -> store memmap (common.series); t ordenado por construcción
+    s = open_series(path)
+    return s["t"], s["value"]
+
+def classify_stream(t: np.ndarray, value: np.ndarray, chunk: int = CHUNK,
+                    train_frac: float = TRAIN_FRAC) -> Tuple[pd.DataFrame, StateEngine]:
+    # entrenamiento online: cada micro-batch de la fase de train se clasifica
+    # con el modelo actual y luego se usa para partial_fit; en la fase de
+    # evaluación el modelo queda fijo
+    engine = StateEngine()
+    n_train = int(len(t) * train_frac)
+    frames = []
+    for a in range(0, len(t), chunk):
+        frame = engine.push(t[a:a + chunk], value[a:a + chunk])
+        frame["phase"] = "train" if a < n_train else "eval"
+        if a < n_train:
+            engine.partial_fit(frame)
+        frames.append(frame)
+    last = engine.flush()
+    last["phase"] = "eval"
+    frames.append(last)
+    df = pd.concat(frames, ignore_index=True)
+    df["phase"] = pd.Categorical(df["phase"], categories=["train", "eval"])
+    return df, engine
+
+def metrics(df: pd.DataFrame, clf: Optional[StateClassifier] = None) -> dict:
+    ev = df[(df["phase"] == "eval") & df["warm"]]
+    y, p = ev["label"].cat.codes.to_numpy(), ev["state"].cat.codes.to_numpy()
+    labels = list(range(len(STATES)))
+    report = classification_report(y, p, labels=labels, target_names=STATES, output_dict=True, zero_division=0)
+    return {
+        "buckets": int(len(df)),
+        "eval_buckets": int(len(ev)),
+        "accuracy": float((y == p).mean()) if len(ev) else None,
+        "macro_f1": float(report["macro avg"]["f1-score"]),
+        "per_state": {s: {k: round(float(report[s][k]), 4) for k in ("precision", "recall", "f1-score", "support")}
+                      for s in STATES},
+        "confusion": {"labels": STATES, "matrix": confusion_matrix(y, p, labels=labels).tolist()},
+        "state_counts": {s: int(c) for s, c in df["state"].value_counts().reindex(STATES).items()},
+        "features": list(FEATURES),
+        "coef": clf.model.coef_.round(4).tolist() if clf is not None and clf.fitted else None,
+    }
+
+def save_outputs(df: pd.DataFrame, m: dict, spec: OutputSpec = OutputSpec()) -> List[Path]:
+    cols = ["t", "mean", "min", "max", "count", "roll_mean", "roll_std", "z", "label", "state", "phase"]
+    paths = save_table(df[cols], OUT / "states", spec)
+    (OUT / "metrics.json").write_text(json.dumps(m, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    # plot: señal por bucket coloreada por estado predicho
+    colors = {"Normal": "tab:green", "Alerta": "tab:orange", "Crítico": "tab:red"}
+    plt.figure(figsize=(10, 4))
+    plt.plot(df["t"], df["mean"], color="0.6", lw=0.8)
+    for s in STATES[1:]:
+        d = df[df["state"] == s]
+        plt.scatter(d["t"], d["mean"], s=14, color=colors[s], label=s, zorder=3)
+    plt.axvline(df.loc[df["phase"] == "eval", "t"].min(), color="0.3", ls="--", lw=0.8)
+    plt.title("P03 — Operational State Classifier (predicted state)")
+    plt.xlabel("t")
+    plt.ylabel("value")
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(IMG / "p03_operational_state_classifier_plot.png", dpi=160)
+    plt.close()
+
+    report = []
+    report.append("# P03 — Operational State Classifier (V1 report)\n")
+    report.append(f"- Buckets: {m['buckets']} (eval: {m['eval_buckets']})")
+    report.append(f"- Accuracy (eval): {m['accuracy']:.3f}" if m["accuracy"] is not None else "- Accuracy (eval): n/a")
+    report.append(f"- Macro F1 (eval): {m['macro_f1']:.3f}\n")
+    report.append("## States (all buckets)\n")
+    for s, c in m["state_counts"].items():
+        report.append(f"- {s}: {c}")
+    report.append("\n## Confusion (eval; rows = label, cols = predicted)\n")
+    report.append("| label | " + " | ".join(STATES) + " |")
+    report.append("|---" * (len(STATES) + 1) + "|")
+    for s, row in zip(STATES, m["confusion"]["matrix"]):
+        report.append(f"| {s} | " + " | ".join(str(v) for v in row) + " |")
+    report.append("")
+    (OUT / "report.md").write_text("\n".join(report), encoding="utf-8")
+    return paths
+
+def main():
+    ap = argparse.ArgumentParser()
+    add_output_args(ap)
+    args = ap.parse_args()
+
+    ensure_dirs()
+    t, value = load_signal()
+    df, engine = classify_stream(t, value)
+    m = metrics(df, engine.classifier)
+    paths = save_outputs(df, m, output_spec(args))
+
+    print("OK — Generated outputs:")
+    for path in paths:
+        print(f"- {path}")
+    print(f"- {OUT / 'metrics.json'}")
+    print(f"- {OUT / 'report.md'}")
+    print(f"- {IMG / 'p03_operational_state_classifier_plot.png'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# Lógica de activación sobre la matriz de pronóstico completa (series x horizonte),
+# sin loops por serie: stock proyectado = stock - cumsum(forecast); se busca el
+# primer período bajo stock de seguridad / bajo cero y se asigna una banda.
+# La banda se traduce a acción con data/activation_rules.json (common.rules).
+
+ACTIVATION_BANDS = ["STOCKOUT_RISK", "REORDER", "WATCH", "OK"]
+REVIEW_PERIODS = 7
+
+
+def first_true(mask: np.ndarray) -> np.ndarray:
+    # índice del primer True por fila; mask.shape[1] si no hay ninguno
+    idx = mask.argmax(axis=1)
+    return np.where(mask[np.arange(len(mask)), idx], idx, mask.shape[1])
+
+
+def activation_bands(F: np.ndarray, stock: np.ndarray, safety: np.ndarray, lead_time: np.ndarray,
+                     review: int = REVIEW_PERIODS) -> Dict[str, np.ndarray]:
+    F = np.asarray(F, dtype=float)
+    n, h = F.shape
+    cum = np.cumsum(F, axis=1)
+    proj = stock[:, None] - cum
+    to_safety = first_true(proj < safety[:, None])
+    to_stockout = first_true(proj < 0)
+
+    lead_time = np.asarray(lead_time, dtype=np.int64)
+    cover = np.minimum(lead_time + review, h)  # períodos que debe cubrir el pedido
+    need = cum[np.arange(n), cover - 1] + safety - stock
+    order_qty = np.ceil(np.maximum(need, 0.0))
+
+    code = np.full(n, 3, dtype=np.int8)                 # OK
+    code[to_safety < h] = 2                             # WATCH
+    code[to_safety < lead_time + review] = 1            # REORDER
+    code[to_stockout < lead_time] = 0                   # STOCKOUT_RISK
+    return {
+        "periods_to_safety": to_safety,
+        "periods_to_stockout": to_stockout,
+        "order_qty": np.where(code <= 1, order_qty, 0.0),
+        "activation_band": pd.Categorical.from_codes(code, categories=ACTIVATION_BANDS),
+    }
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+# Benchmark del kernel Holt-Winters en lote (smoothing.py) contra el loop por
+# serie: misma grilla alpha/beta/gamma, misma recursión.
+#
+#   python src/bench_smoothing.py --series 10000 --loop-series 1000
+#
+# --loop-series N cronometra el loop sobre las primeras N series y extrapola a
+# todo el panel (0 = loop sobre todas). parity: en esas series el loop elige los
+# mismos parámetros y da el mismo SSE / pronóstico que el kernel en lote.
+
+import argparse
+import time
+
+import numpy as np
+
+from forecast import HORIZON, SEASON
+from run import simulate_panel
+from smoothing import CHUNK, hw_grid_search, hw_grid_search_series, param_grid
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--series", type=int, default=10_000)
+    ap.add_argument("--days", type=int, default=364)
+    ap.add_argument("--loop-series", type=int, default=1000)
+    ap.add_argument("--chunk", type=int, nargs="+", default=[64, CHUNK, 2048, 10_000])
+    args = ap.parse_args()
+
+    Y, _ = simulate_panel(args.series, args.days)
+    grid = param_grid()
+    print(f"{args.series:,} series x {args.days} days, grid {len(grid)} (alpha x beta x gamma), "
+          f"season {SEASON}, horizon {HORIZON}\n")
+
+    print(f"{'batched':<22} {'seconds':>8} {'series/s':>10}")
+    ref = None
+    for c in args.chunk:
+        t0 = time.perf_counter()
+        out = hw_grid_search(Y, SEASON, HORIZON, grid, chunk=c)
+        dt = time.perf_counter() - t0
+        if ref is None:
+            ref, t_batch = out, dt
+        else:
+            assert all(np.array_equal(a, b) for a, b in zip(out, ref)), f"chunk={c}: results differ"
+            t_batch = min(t_batch, dt)
+        print(f"{f'chunk={c}':<22} {dt:>8.2f} {args.series / dt:>10,.0f}")
+
+    m = args.loop_series or args.series
+    t0 = time.perf_counter()
+    loop = [hw_grid_search_series(y, SEASON, HORIZON, grid) for y in Y[:m]]
+    t_loop = (time.perf_counter() - t0) * args.series / m
+    label = "per-series loop" + ("" if m == args.series else f" (x{args.series / m:.0f})")
+    print(f"{label:<22} {t_loop:>8.2f} {args.series / t_loop:>10,.0f}")
+    print(f"\nspeedup vs loop: {t_loop / t_batch:.0f}x")
+
+    F, params, sse = ref
+    assert np.array_equal(params[:m], [r[1] for r in loop])
+    assert np.allclose(sse[:m], [r[2] for r in loop], rtol=1e-12)
+    assert np.allclose(F[:m], [r[0] for r in loop], rtol=1e-12, atol=1e-9)
+    print(f"parity OK (same params / SSE / forecast as the loop on {m:,} series; same result for every chunk)")
+
+
+if __name__ == "__main__":
+    main()
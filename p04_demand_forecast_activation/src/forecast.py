@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import math
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+PROJECT = HERE.parent
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.shm import SharedArray, SharedSpec, attach  # noqa: E402
+from smoothing import hw_grid_search  # noqa: E402
+
+# Forecast por serie (SKU x sitio) con selección de modelo en holdout:
+#   seasonal_naive  repite la última temporada
+#   exp_smoothing   suavizamiento exponencial simple, alpha por grilla (SSE 1-paso)
+#   linear_trend    mínimos cuadrados sobre t
+#   holt_winters    Holt-Winters aditivo, grilla alpha/beta/gamma (SSE 1-paso);
+#                   se ajusta en lote por bloque de series (smoothing.py), no por serie
+# Cada serie elige el modelo de menor MAE en las últimas `horizon` observaciones
+# y se reajusta con toda la historia. El panel (series x tiempo) vive en memoria
+# compartida y un process pool ajusta rangos de series en paralelo.
+
+SEASON = 7
+HORIZON = 28
+ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 0.95)
+MODELS = ("seasonal_naive", "exp_smoothing", "linear_trend", "holt_winters")
+HW = MODELS.index("holt_winters")  # modelos [0, HW) se ajustan serie a serie
+
+
+def seasonal_naive(y: np.ndarray, h: int, season: int = SEASON) -> np.ndarray:
+    return np.resize(y[-season:], h)
+
+
+def exp_smoothing(y: np.ndarray, h: int, alphas: Sequence[float] = ALPHAS) -> np.ndarray:
+    # nivel l_t = l_{t-1} + alpha * (y_t - l_{t-1}); pronóstico plano = último nivel
+    ys = y.tolist()
+    best_sse, best_level = math.inf, ys[0]
+    for a in alphas:
+        level, sse = ys[0], 0.0
+        for x in ys[1:]:
+            e = x - level
+            sse += e * e
+            level += a * e
+        if sse < best_sse:
+            best_sse, best_level = sse, level
+    return np.full(h, best_level)
+
+
+def linear_trend(y: np.ndarray, h: int) -> np.ndarray:
+    n = len(y)
+    t = np.arange(n, dtype=float)
+    tm = (n - 1) / 2
+    denom = float(((t - tm) ** 2).sum())
+    slope = float(((t - tm) * (y - y.mean())).sum()) / denom if denom > 0 else 0.0
+    return y.mean() + slope * (np.arange(n, n + h) - tm)
+
+
+def _predict(code: int, y: np.ndarray, h: int, season: int) -> np.ndarray:
+    if code == 0:
+        return seasonal_naive(y, h, season)
+    if code == 1:
+        return exp_smoothing(y, h)
+    return linear_trend(y, h)
+
+
+def holdout_mae(y: np.ndarray, horizon: int = HORIZON, season: int = SEASON) -> np.ndarray:
+    # MAE en las últimas `horizon` observaciones de los modelos serie a serie [0, HW)
+    train, test = y[:-horizon], y[-horizon:]
+    return np.array([np.abs(_predict(k, train, horizon, season) - test).mean() for k in range(HW)])
+
+
+def fit_block(Y: np.ndarray, F: np.ndarray, mae: np.ndarray,
+              horizon: int = HORIZON, season: int = SEASON) -> None:
+    # ajusta cada fila de Y y escribe en F / mae (in-place; mae con una columna
+    # por modelo, el elegido es mae.argmin(axis=1)). Holt-Winters va en lote
+    # sobre el bloque (holdout y reajuste), así cada worker lo hace para sus filas
+    for i in range(len(Y)):
+        mae[i, :HW] = holdout_mae(Y[i], horizon, season)
+    F_hold = hw_grid_search(Y[:, :-horizon], season, horizon)[0]
+    mae[:, HW] = np.abs(F_hold - Y[:, -horizon:]).mean(axis=1)
+    best = mae.argmin(axis=1)
+    won = best == HW
+    if won.any():
+        F[won] = np.maximum(hw_grid_search(Y[won], season, horizon)[0], 0.0)
+    for i in np.flatnonzero(~won):
+        F[i] = np.maximum(_predict(int(best[i]), Y[i], horizon, season), 0.0)
+
+
+# --- process pool sobre memoria compartida ------------------------------------
+
+_WORKER: Dict[str, object] = {}
+
+
+def _init_worker(specs: Dict[str, SharedSpec], horizon: int, season: int) -> None:
+    # una vez por worker: adjuntar los bloques (se guardan las refs a SharedMemory)
+    for key, spec in specs.items():
+        _WORKER[key] = attach(spec)
+    _WORKER["horizon"], _WORKER["season"] = horizon, season
+
+
+def _fit_range(a: int, b: int) -> int:
+    Y, F, E = (_WORKER[k][1] for k in ("Y", "F", "mae"))
+    fit_block(Y[a:b], F[a:b], E[a:b], _WORKER["horizon"], _WORKER["season"])
+    return b - a
+
+
+def _ranges(n: int, chunk: int) -> Tuple[List[int], List[int]]:
+    starts = list(range(0, n, chunk))
+    return starts, [min(a + chunk, n) for a in starts]
+
+
+def forecast_panel(Y: np.ndarray, horizon: int = HORIZON, season: int = SEASON,
+                   workers: int = 1, chunk: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Y: (n_series, n_periods) -> F (n_series, horizon), model (n_series,), mae (n_series, len(MODELS))
+    Y = np.ascontiguousarray(Y, dtype=float)
+    n = len(Y)
+    if Y.shape[1] < horizon + 2 * season:
+        raise ValueError(f"need at least horizon + 2 seasons = {horizon + 2 * season} periods, got {Y.shape[1]}")
+
+    if workers <= 1:
+        F, mae = np.empty((n, horizon)), np.empty((n, len(MODELS)))
+        fit_block(Y, F, mae, horizon, season)
+        return F, mae.argmin(axis=1).astype(np.int8), mae
+
+    # chunks chicos para balancear carga (~8 tareas por worker)
+    chunk = chunk or max(64, -(-n // (workers * 8)))
+    with SharedArray.from_array(Y) as y_sh, \
+            SharedArray((n, horizon)) as f_sh, \
+            SharedArray((n, len(MODELS))) as e_sh:
+        specs = {"Y": y_sh.spec, "F": f_sh.spec, "mae": e_sh.spec}
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(specs, horizon, season)) as ex:
+            done = sum(ex.map(_fit_range, *_ranges(n, chunk)))
+        assert done == n
+        F, mae = f_sh.array.copy(), e_sh.array.copy()
+    return F, mae.argmin(axis=1).astype(np.int8), mae
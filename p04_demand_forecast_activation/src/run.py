@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from activation import activation_bands
+from forecast import HORIZON, MODELS, SEASON, forecast_panel
+
+HERE = Path(__file__).resolve().parent
+PROJECT = HERE.parent
+DATA = PROJECT / "data"
+OUT = PROJECT / "outputs"
+IMG = PROJECT / "img"
+ACTIVATION_RULES = DATA / "activation_rules.json"
+START = pd.Timestamp("2025-01-01")
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.rules import apply_rules, load_rules  # noqa: E402
+from common.tables import OutputSpec, add_output_args, output_spec, save_table  # noqa: E402
+
+def ensure_dirs():
+    DATA.mkdir(parents=True, exist_ok=True)
+    OUT.mkdir(parents=True, exist_ok=True)
+    IMG.mkdir(parents=True, exist_ok=True)
+
+def simulate_panel(n_series: int = 2000, n_periods: int = 364, n_sites: int = 8,
+                   seed: int = 4) -> Tuple[np.ndarray, pd.DataFrame]:
+    # demanda diaria SKU x sitio: nivel, tendencia suave, patrón semanal, ruido Poisson
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_periods)
+    level = rng.lognormal(3.0, 0.8, size=n_series)
+    trend = rng.normal(0.0, 0.0015, size=n_series)
+    amp = rng.uniform(0.0, 0.5, size=n_series)
+    phase = rng.integers(0, SEASON, size=n_series)
+    mu = level[:, None] * np.maximum(1 + trend[:, None] * t, 0.1)
+    mu *= 1 + amp[:, None] * np.sin(2 * np.pi * (t + phase[:, None]) / SEASON)
+    Y = rng.poisson(mu).astype(float)
+
+    # inventario actual (en días de demanda) para la lógica de activación
+    meta = pd.DataFrame({
+        "series_id": np.arange(n_series),
+        "sku": [f"SKU-{i // n_sites:05d}" for i in range(n_series)],
+        "site": [f"SITE-{i % n_sites:02d}" for i in range(n_series)],
+        "stock_on_hand": np.round(level * rng.uniform(3, 40, size=n_series)),
+        "safety_stock": np.round(level * rng.uniform(2, 6, size=n_series)),
+        "lead_time": rng.integers(3, 15, size=n_series),
+    })
+    return Y, meta
+
+def build_actions(F: np.ndarray, model: np.ndarray, mae: np.ndarray, meta: pd.DataFrame,
+                  rules_path: Path = ACTIVATION_RULES) -> pd.DataFrame:
+    act = activation_bands(F, meta["stock_on_hand"].to_numpy(dtype=float),
+                           meta["safety_stock"].to_numpy(dtype=float), meta["lead_time"].to_numpy())
+    df = meta.copy()
+    df["model"] = pd.Categorical.from_codes(model, categories=list(MODELS))
+    df["holdout_mae"] = mae[np.arange(len(mae)), model].round(3)
+    df["forecast_total"] = F.sum(axis=1).round(1)
+    for k, v in act.items():
+        df[k] = v
+    rules = apply_rules(df, load_rules(rules_path))
+    df = pd.concat([df, rules], axis=1)
+    return df.sort_values(["priority", "periods_to_stockout", "series_id"], kind="stable").reset_index(drop=True)
+
+def forecast_frame(F: np.ndarray, meta: pd.DataFrame, n_periods: int) -> pd.DataFrame:
+    # formato largo: una fila por (serie, paso del horizonte)
+    n, h = F.shape
+    dates = pd.date_range(START + pd.Timedelta(days=n_periods), periods=h, freq="D")
+    return pd.DataFrame({
+        "series_id": np.repeat(meta["series_id"].to_numpy(), h),
+        "sku": pd.Categorical(np.repeat(meta["sku"].to_numpy(), h)),
+        "site": pd.Categorical(np.repeat(meta["site"].to_numpy(), h)),
+        "step": np.tile(np.arange(1, h + 1), n),
+        "date": np.tile(dates.to_numpy(), n),
+        "forecast": F.ravel().round(2),
+    })
+
+def save_outputs(Y: np.ndarray, F: np.ndarray, actions: pd.DataFrame, meta: pd.DataFrame,
+                 spec: OutputSpec = OutputSpec()) -> List[Path]:
+    paths = save_table(forecast_frame(F, meta, Y.shape[1]), OUT / "forecast", spec)
+    paths += save_table(actions, OUT / "actions", spec)
+
+    # plot: la serie más urgente, últimas 8 semanas + horizonte
+    sid = int(actions.iloc[0]["series_id"])
+    hist = Y[sid, -56:]
+    x_hist = np.arange(-len(hist), 0)
+    plt.figure()
+    plt.plot(x_hist, hist, label="demand (history)")
+    plt.plot(np.arange(F.shape[1]), F[sid], label=f"forecast ({actions.iloc[0]['model']})")
+    plt.title(f"P04 — Demand Forecast Activation ({actions.iloc[0]['sku']} @ {actions.iloc[0]['site']})")
+    plt.xlabel("days from today")
+    plt.ylabel("units")
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(IMG / "p04_demand_forecast_activation_plot.png", dpi=160)
+    plt.close()
+
+    report = []
+    report.append("# P04 — Demand Forecast Activation (V1 report)\n")
+    report.append(f"- Series (SKU x site): {len(actions)}")
+    report.append(f"- History: {Y.shape[1]} days; horizon: {F.shape[1]} days\n")
+    report.append("## Model selection (holdout MAE)\n")
+    for m, c in actions["model"].value_counts().reindex(list(MODELS)).items():
+        report.append(f"- {m}: {c}")
+    report.append("\n## Activation\n")
+    for band, c in actions["activation_band"].value_counts(sort=False).items():
+        report.append(f"- {band}: {c}")
+    report.append("\n## Top 10 actions\n")
+    cols = ["sku", "site", "activation_band", "periods_to_stockout", "order_qty", "action"]
+    report.append(actions[cols].head(10).to_csv(index=False))
+    (OUT / "report.md").write_text("\n".join(report), encoding="utf-8")
+    return paths
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--series", type=int, default=2000, help="series SKU x sitio a simular")
+    ap.add_argument("--days", type=int, default=364)
+    ap.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    add_output_args(ap)
+    args = ap.parse_args()
+
+    ensure_dirs()
+    Y, meta = simulate_panel(args.series, args.days)
+    F, model, mae = forecast_panel(Y, HORIZON, SEASON, workers=args.workers)
+    actions = build_actions(F, model, mae, meta)
+    paths = save_outputs(Y, F, actions, meta, output_spec(args))
+
+    print("OK — Generated outputs:")
+    for path in paths:
+        print(f"- {path}")
+    print(f"- {OUT / 'report.md'}")
+    print(f"- {IMG / 'p04_demand_forecast_activation_plot.png'}")
+
+if __name__ == "__main__":
+    main()
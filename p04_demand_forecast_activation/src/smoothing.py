@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import itertools
+import math
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Holt-Winters aditivo en lote: la recursión en t es un solo loop compartido y
+# cada paso opera sobre todas las series (y todas las combinaciones de la
+# grilla alpha/beta/gamma) a la vez. Forma de corrección de error:
+#   e_t = y_t - (l + b + s_t)
+#   l  <- l + b + alpha * e_t
+#   b  <- b + alpha * beta * e_t
+#   s_t <- s_t + gamma * (1 - alpha) * e_t
+# (equivalente a la forma clásica con l_new = alpha*(y - s) + (1 - alpha)*(l + b)).
+# Estados iniciales: nivel = media de la 1ª temporada, tendencia = diferencia de
+# medias entre 1ª y 2ª temporada / m, estacionalidad = 1ª temporada - nivel.
+
+ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.7)
+BETAS = (0.0, 0.01, 0.05, 0.1)
+GAMMAS = (0.05, 0.1, 0.3, 0.5)
+CHUNK = 256  # series por bloque: el tensor (grilla x bloque) queda en cache L2
+
+
+class HWState(NamedTuple):
+    level: np.ndarray     # (..., n)
+    trend: np.ndarray     # (..., n)
+    seasonal: np.ndarray  # (m, ..., n); posición k = fase t % m
+    sse: np.ndarray       # (..., n) suma de errores 1-paso al cuadrado
+
+
+def param_grid(alphas: Sequence[float] = ALPHAS, betas: Sequence[float] = BETAS,
+               gammas: Sequence[float] = GAMMAS) -> np.ndarray:
+    # (G, 3) con columnas alpha, beta, gamma
+    return np.array(list(itertools.product(alphas, betas, gammas)), dtype=float)
+
+
+def init_states(Y: np.ndarray, season: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Y: (n, T) con T >= 2 * season -> l0 (n,), b0 (n,), s0 (season, n)
+    if Y.shape[1] < 2 * season:
+        raise ValueError(f"need at least 2 seasons ({2 * season} periods), got {Y.shape[1]}")
+    first = Y[:, :season].mean(axis=1)
+    second = Y[:, season:2 * season].mean(axis=1)
+    return first, (second - first) / season, (Y[:, :season] - first[:, None]).T.copy()
+
+
+def hw_filter(Y: np.ndarray, alpha, beta, gamma, season: int) -> HWState:
+    # Y: (n, T); alpha/beta/gamma: broadcastable a (G, n) (p. ej. (G, 1) para la
+    # grilla o (1, n) para parámetros por serie). Estados finales tras T pasos.
+    Y = np.asarray(Y, dtype=float)
+    n, T = Y.shape
+    alpha, beta, gamma = (np.asarray(p, dtype=float) for p in (alpha, beta, gamma))
+    shape = np.broadcast_shapes(alpha.shape, beta.shape, gamma.shape, (1, n))
+    a = np.broadcast_to(alpha, shape)
+    ab = np.broadcast_to(alpha * beta, shape)
+    ga = np.broadcast_to(gamma * (1 - alpha), shape)
+
+    l0, b0, s0 = init_states(Y, season)
+    level = np.broadcast_to(l0, shape).copy()
+    trend = np.broadcast_to(b0, shape).copy()
+    seasonal = np.broadcast_to(s0[:, None, :], (season,) + shape).copy()
+    sse = np.zeros(shape)
+    lb, e, tmp = np.empty(shape), np.empty(shape), np.empty(shape)
+
+    Yt = np.ascontiguousarray(Y.T)  # (T, n): y_t contiguo por paso
+    for t in range(T):
+        s = seasonal[t % season]
+        np.add(level, trend, out=lb)
+        np.subtract(Yt[t], lb, out=e)
+        e -= s
+        np.multiply(e, e, out=tmp)
+        sse += tmp
+        np.multiply(a, e, out=tmp)
+        np.add(lb, tmp, out=level)
+        np.multiply(ab, e, out=tmp)
+        trend += tmp
+        np.multiply(ga, e, out=tmp)
+        s += tmp
+    return HWState(level, trend, seasonal, sse)
+
+
+def hw_forecast(state: HWState, horizon: int, n_periods: int) -> np.ndarray:
+    # pronóstico k = 1..horizon tras n_periods observaciones -> (..., n, horizon)
+    m = state.seasonal.shape[0]
+    k = np.arange(1, horizon + 1)
+    phase = (n_periods + k - 1) % m
+    s = np.moveaxis(state.seasonal[phase], 0, -1)
+    return state.level[..., None] + k * state.trend[..., None] + s
+
+
+def hw_grid_search(Y: np.ndarray, season: int, horizon: int, grid: Optional[np.ndarray] = None,
+                   chunk: int = CHUNK) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # grilla completa como tensor (G, n) por bloque de series; por serie se queda
+    # la combinación de menor SSE 1-paso y se pronostica desde sus estados finales
+    # -> F (n, horizon), params (n, 3), sse (n,)
+    grid = param_grid() if grid is None else np.asarray(grid, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    n, T = Y.shape
+    F, params, sse = np.empty((n, horizon)), np.empty((n, 3)), np.empty(n)
+    cols = grid[:, :, None]  # (G, 3, 1)
+    for a in range(0, n, chunk):
+        b = min(a + chunk, n)
+        st = hw_filter(Y[a:b], cols[:, 0], cols[:, 1], cols[:, 2], season)
+        best = st.sse.argmin(axis=0)            # (bloque,)
+        j = np.arange(b - a)
+        chosen = HWState(st.level[best, j], st.trend[best, j], st.seasonal[:, best, j], st.sse[best, j])
+        F[a:b] = hw_forecast(chosen, horizon, T)
+        params[a:b] = grid[best]
+        sse[a:b] = chosen.sse
+    return F, params, sse
+
+
+# --- referencia: una serie a la vez (loop de Python) ---------------------------
+
+def hw_series(y: np.ndarray, alpha: float, beta: float, gamma: float, season: int,
+              horizon: int) -> Tuple[np.ndarray, float]:
+    ys = [float(v) for v in y]
+    level = sum(ys[:season]) / season
+    trend = (sum(ys[season:2 * season]) / season - level) / season
+    seas = [v - level for v in ys[:season]]
+    a, ab, ga = alpha, alpha * beta, gamma * (1 - alpha)
+    sse = 0.0
+    for t, x in enumerate(ys):
+        k = t % season
+        lb = level + trend
+        e = x - lb - seas[k]
+        sse += e * e
+        level = lb + a * e
+        trend += ab * e
+        seas[k] += ga * e
+    n = len(ys)
+    f = [level + k * trend + seas[(n + k - 1) % season] for k in range(1, horizon + 1)]
+    return np.array(f), sse
+
+
+def hw_grid_search_series(y: np.ndarray, season: int, horizon: int,
+                          grid: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, float]:
+    grid = param_grid() if grid is None else grid
+    best = (None, None, math.inf)
+    for p in grid:
+        f, sse = hw_series(y, p[0], p[1], p[2], season, horizon)
+        if sse < best[2]:
+            best = (f, p, sse)
+    return best
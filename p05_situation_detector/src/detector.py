@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from patterns import Node, Plan
+
+# Detector streaming sobre un plan compilado (patterns.py). Cada micro-batch se
+# evalúa junto a la cola de historia que necesita el plan (plan.lookback), así
+# las ventanas móviles cruzan batches sin re-escanear el histórico. Los hits
+# consecutivos de un patrón forman una situación (episodio); al cerrarse se
+# emite con sus factores principales: los operandos del and/or raíz ordenados
+# por margen normalizado sobre su umbral, (lhs - rhs) / |rhs|.
+
+TOP_K = 3
+
+
+@dataclass
+class _Episode:
+    t_start: float
+    t_end: float
+    n: int
+    margin: np.ndarray   # máximo por factor durante el episodio
+    value: np.ndarray    # lhs del factor en ese máximo
+
+
+def _last(x, rows: int) -> np.ndarray:
+    # últimas `rows` filas de un valor del plan (las constantes son escalares)
+    x = np.asarray(x)
+    return np.broadcast_to(x, (rows,)) if x.ndim == 0 else x[-rows:]
+
+
+def factor_margin(nodes: List[Node], f: int, values: list, rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    # -> (margen, valor) del factor f en las últimas `rows` filas; margen > 0 = cumplido
+    node = nodes[f]
+    if node.op in ("gt", "ge", "lt", "le"):
+        lhs = _last(values[node.args[0]], rows).astype(float)
+        rhs = _last(values[node.args[1]], rows).astype(float)
+        diff = lhs - rhs if node.op in ("gt", "ge") else rhs - lhs
+        return diff / np.where(np.abs(rhs) > 0, np.abs(rhs), 1.0), lhs
+    hit = _last(values[f], rows).astype(float)
+    return 2 * hit - 1, hit
+
+
+class SituationDetector:
+    def __init__(self, plan: Plan, top_k: int = TOP_K):
+        self.plan = plan
+        self.top_k = top_k
+        n_pat = len(plan.patterns)
+        self.cost = np.zeros(len(plan.nodes))       # segundos por nodo
+        self.samples = 0
+        self.hits = np.zeros(n_pat, dtype=np.int64)
+        self.episodes = np.zeros(n_pat, dtype=np.int64)
+        self._roots = [p.root for p in plan.patterns]
+        self._tail: Dict[str, np.ndarray] = {c: np.empty(0) for c in plan.inputs}
+        self._open: Dict[int, _Episode] = {}
+        self._threshold: List[List[Optional[float]]] = [
+            [self._const(plan.nodes[f]) for f in p.factors] for p in plan.patterns]
+
+    def _const(self, node: Node) -> Optional[float]:
+        if node.op in ("gt", "ge", "lt", "le", "eq", "ne"):
+            rhs = self.plan.nodes[node.args[1]]
+            if rhs.op == "const":
+                return rhs.param[0]
+        return None
+
+    def push(self, t: np.ndarray, cols: Dict[str, np.ndarray]) -> List[dict]:
+        # -> situaciones cerradas en este batch
+        t = np.asarray(t)
+        rows = len(t)
+        if rows == 0:
+            return []
+        buf = {c: np.concatenate((self._tail[c], np.asarray(cols[c], dtype=float))) for c in self.plan.inputs}
+        values = self.plan.evaluate(buf, self.cost)
+        keep = self.plan.lookback
+        self._tail = {c: x[len(x) - min(keep, len(x)):] for c, x in buf.items()}
+        self.samples += rows
+
+        H = np.stack([_last(values[r], rows) for r in self._roots])
+        self.hits += H.sum(axis=1)
+        closed = []
+        for p in sorted(set(np.flatnonzero(H.any(axis=1)).tolist()) | set(self._open)):
+            closed.extend(self._runs(p, H[p], t, values))
+        return closed
+
+    def flush(self) -> List[dict]:
+        closed = [self._close(p, ep) for p, ep in sorted(self._open.items())]
+        self._open.clear()
+        return closed
+
+    def _runs(self, p: int, h: np.ndarray, t: np.ndarray, values: list) -> List[dict]:
+        pat, rows = self.plan.patterns[p], len(h)
+        cont = p in self._open
+        edges = np.diff(h.astype(np.int8), prepend=np.int8(cont), append=np.int8(0))
+        starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        if cont:
+            starts = np.concatenate(([0], starts))
+        if h.any():
+            fm = [factor_margin(self.plan.nodes, f, values, rows) for f in pat.factors]
+            M = np.nan_to_num(np.stack([m for m, _ in fm]), nan=-np.inf)
+            V = np.stack([v for _, v in fm])
+        out = []
+        for j, (s, e) in enumerate(zip(starts, ends)):
+            if j == 0 and cont:
+                ep = self._open.pop(p)
+            else:
+                ep = _Episode(t[s], t[s], 0, np.full(len(pat.factors), -np.inf), np.full(len(pat.factors), np.nan))
+            if e > s:
+                ep.t_end, ep.n = t[e - 1], ep.n + (e - s)
+                k = M[:, s:e].argmax(axis=1)
+                f = np.arange(len(k))
+                m = M[f, s + k]
+                better = m > ep.margin
+                ep.margin[better], ep.value[better] = m[better], V[f, s + k][better]
+            if e == rows:
+                self._open[p] = ep   # sigue abierto en el próximo batch
+            else:
+                out.append(self._close(p, ep))
+        return out
+
+    def _close(self, p: int, ep: _Episode) -> dict:
+        pat = self.plan.patterns[p]
+        self.episodes[p] += 1
+        order = [i for i in np.argsort(-ep.margin, kind="stable")[:self.top_k] if np.isfinite(ep.margin[i])]
+        return {
+            "pattern": pat.name,
+            "situation": pat.situation,
+            "severity": pat.severity,
+            "t_start": ep.t_start.item(),
+            "t_end": ep.t_end.item(),
+            "n_samples": int(ep.n),
+            "score": round(float(ep.margin[order[0]]), 4) if order else None,
+            "factors": [{
+                "factor": pat.factor_text[i],
+                "margin": round(float(ep.margin[i]), 4),
+                "value": round(float(ep.value[i]), 4),
+                "threshold": self._threshold[p][i],
+            } for i in order],
+        }
+
+    def cost_table(self) -> pd.DataFrame:
+        # costo por patrón: standalone = todos sus nodos; amortized = cada nodo
+        # compartido se reparte entre los patrones que lo usan (suma = costo total)
+        users = self.plan.users()
+        rows = []
+        for k, p in enumerate(self.plan.patterns):
+            idx = np.asarray(p.nodes)
+            amort = float((self.cost[idx] / users[idx]).sum())
+            rows.append({
+                "pattern": p.name,
+                "situation": p.situation,
+                "nodes": len(idx),
+                "shared_nodes": int((users[idx] > 1).sum()),
+                "standalone_ms": round(float(self.cost[idx].sum()) * 1e3, 4),
+                "amortized_ms": round(amort * 1e3, 4),
+                "ns_per_sample": round(amort / max(self.samples, 1) * 1e9, 2),
+                "hit_samples": int(self.hits[k]),
+                "situations": int(self.episodes[k]),
+            })
+        return pd.DataFrame(rows)
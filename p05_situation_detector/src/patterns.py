@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import ast
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+# Librería de patrones -> un solo plan de evaluación compartido.
+#
+# Cada patrón es una expresión estilo Python sobre columnas de entrada:
+#
+#   {"define": {"z48": "zscore(value, 48)"},
+#    "patterns": [
+#      {"name": "spike", "situation": "Spike", "severity": 2, "when": "z48 > 3"},
+#      {"name": "spike_cluster", "situation": "Unstable", "severity": 1,
+#       "when": "count(abs(z48) > 3, 48) >= 2 and std(value, 12) > 1.5"}]}
+#
+# Funciones (w / k son enteros literales, en muestras):
+#   mean/std/sum/min/max(x, w)  ventana móvil que termina en la muestra actual
+#   zscore(x, w)                (x - mean(x, w)[t-1]) / std(x, w)[t-1]
+#   lag(x, k), delta(x, k)      x[t-k], x - x[t-k]
+#   abs(x)
+#   count(c, w), any(c, w), all(c, w)   ocurrencias de la condición c en la ventana
+#   seq(a, b, w)                b ahora y a en alguna de las w muestras previas
+#
+# El compilador normaliza cada subexpresión a un nodo (op, hijos, parámetros) y
+# hace hash-consing: la misma media móvil usada por diez reglas es un solo nodo y
+# se calcula una vez por ventana. Los nodos quedan en orden topológico.
+
+COMPARE = {ast.Gt: "gt", ast.GtE: "ge", ast.Lt: "lt", ast.LtE: "le", ast.Eq: "eq", ast.NotEq: "ne"}
+BINARY = {ast.Add: "add", ast.Sub: "sub", ast.Mult: "mul", ast.Div: "div"}
+COMMUTATIVE = {"add", "mul", "and", "or", "eq", "ne"}
+ROLLING = {"mean", "std", "sum", "min", "max", "count"}
+BOOL_OPS = {"gt", "ge", "lt", "le", "eq", "ne", "and", "or", "not"}
+
+
+@dataclass(frozen=True)
+class Node:
+    op: str
+    args: Tuple[int, ...]   # ids de nodos hijos (siempre < id propio)
+    param: tuple            # ventana / lag / constante / nombre de columna
+    need: int               # muestras previas que necesita (lookback)
+    boolean: bool
+
+
+@dataclass(frozen=True)
+class Pattern:
+    name: str
+    situation: str
+    severity: int
+    when: str
+    root: int
+    factors: Tuple[int, ...]      # operandos de primer nivel del and/or raíz
+    factor_text: Tuple[str, ...]
+    nodes: Tuple[int, ...]        # nodos alcanzables desde root (incluido)
+
+
+@dataclass
+class Plan:
+    nodes: List[Node]
+    inputs: List[str]
+    patterns: List[Pattern]
+
+    @property
+    def lookback(self) -> int:
+        return max((n.need for n in self.nodes), default=0)
+
+    def users(self) -> np.ndarray:
+        # patrones que usan cada nodo (para repartir costo)
+        u = np.zeros(len(self.nodes), dtype=np.int64)
+        for p in self.patterns:
+            u[list(p.nodes)] += 1
+        return u
+
+    def evaluate(self, cols: Dict[str, np.ndarray], cost: Optional[np.ndarray] = None) -> list:
+        # evalúa todos los nodos sobre arrays de igual largo; cost[i] += segundos del nodo i
+        values: list = []
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for i, node in enumerate(self.nodes):
+                t0 = perf_counter()
+                values.append(_EVAL[node.op](node, values, cols))
+                if cost is not None:
+                    cost[i] += perf_counter() - t0
+        return values
+
+
+class _Compiler:
+    def __init__(self, defines: Dict[str, str], share: bool):
+        self.defines = {k: ast.parse(v, mode="eval").body for k, v in defines.items()}
+        self.share = share
+        self.scope = 0
+        self.nodes: List[Node] = []
+        self.index: Dict[tuple, int] = {}
+        self.inputs: List[str] = []
+
+    def node(self, op: str, args: Tuple[int, ...] = (), param: tuple = ()) -> int:
+        if op in COMMUTATIVE:
+            args = tuple(sorted(set(args))) if op in ("and", "or") else tuple(sorted(args))
+        key = (op, args, param) if self.share else (self.scope, op, args, param)
+        if key in self.index:
+            return self.index[key]
+        need = max((self.nodes[a].need for a in args), default=0)
+        if op == "lag":
+            need += param[0]
+        elif op in ROLLING:
+            need += param[0] - 1
+        boolean = op in BOOL_OPS or (op == "lag" and self.nodes[args[0]].boolean)
+        self.nodes.append(Node(op, args, param, need, boolean))
+        self.index[key] = len(self.nodes) - 1
+        return len(self.nodes) - 1
+
+    def compile(self, expr: ast.expr, where: str) -> int:
+        try:
+            return self._visit(expr, ())
+        except ValueError as e:
+            raise ValueError(f"{where}: {e}") from None
+
+    def _visit(self, e: ast.expr, stack: Tuple[str, ...]) -> int:
+        v = self._visit
+        if isinstance(e, ast.Name):
+            if e.id in self.defines:
+                if e.id in stack:
+                    raise ValueError(f"recursive define {e.id!r}")
+                return v(self.defines[e.id], stack + (e.id,))
+            if e.id not in self.inputs:
+                self.inputs.append(e.id)
+            return self.node("input", (), (e.id,))
+        if isinstance(e, ast.Constant) and isinstance(e.value, (int, float)) and not isinstance(e.value, bool):
+            return self.node("const", (), (float(e.value),))
+        if isinstance(e, ast.UnaryOp) and isinstance(e.op, ast.USub):
+            if isinstance(e.operand, ast.Constant) and isinstance(e.operand.value, (int, float)):
+                return self.node("const", (), (-float(e.operand.value),))  # -3 es constante, no neg(3)
+            return self.node("neg", (v(e.operand, stack),))
+        if isinstance(e, ast.UnaryOp) and isinstance(e.op, ast.Not):
+            return self.node("not", (self._bool(e.operand, stack),))
+        if isinstance(e, ast.BinOp) and type(e.op) in BINARY:
+            return self.node(BINARY[type(e.op)], (v(e.left, stack), v(e.right, stack)))
+        if isinstance(e, ast.BoolOp):
+            return self.node("and" if isinstance(e.op, ast.And) else "or",
+                             tuple(self._bool(x, stack) for x in e.values))
+        if isinstance(e, ast.Compare):
+            # a < b < c -> (a < b) and (b < c)
+            ids, left = [], v(e.left, stack)
+            for op, comp in zip(e.ops, e.comparators):
+                if type(op) not in COMPARE:
+                    raise ValueError(f"unsupported comparison {ast.unparse(e)!r}")
+                right = v(comp, stack)
+                ids.append(self.node(COMPARE[type(op)], (left, right)))
+                left = right
+            return ids[0] if len(ids) == 1 else self.node("and", tuple(ids))
+        if isinstance(e, ast.Call) and isinstance(e.func, ast.Name):
+            return self._call(e, stack)
+        raise ValueError(f"unsupported syntax {ast.unparse(e)!r}")
+
+    def _bool(self, e: ast.expr, stack) -> int:
+        i = self._visit(e, stack)
+        if not self.nodes[i].boolean:
+            raise ValueError(f"expected a condition, got {ast.unparse(e)!r}")
+        return i
+
+    def _call(self, e: ast.Call, stack) -> int:
+        name, args = e.func.id, e.args
+
+        def window(a: ast.expr) -> int:
+            if not (isinstance(a, ast.Constant) and isinstance(a.value, int) and a.value >= 1):
+                raise ValueError(f"{name}(): window/lag must be a positive integer literal, got {ast.unparse(a)!r}")
+            return a.value
+
+        def arity(k: int):
+            if len(args) != k or e.keywords:
+                raise ValueError(f"{name}() takes {k} positional arguments")
+
+        if name == "abs":
+            arity(1)
+            return self.node("abs", (self._visit(args[0], stack),))
+        if name in ("mean", "std", "sum", "min", "max"):
+            arity(2)
+            w = window(args[1])
+            if name == "std" and w < 2:
+                raise ValueError("std() needs a window >= 2")
+            return self.node(name, (self._visit(args[0], stack),), (w,))
+        if name == "lag":
+            arity(2)
+            return self.node("lag", (self._visit(args[0], stack),), (window(args[1]),))
+        if name == "delta":
+            arity(2)
+            x = self._visit(args[0], stack)
+            return self.node("sub", (x, self.node("lag", (x,), (window(args[1]),))))
+        if name == "zscore":
+            arity(2)
+            x, w = self._visit(args[0], stack), window(args[1])
+            mu = self.node("lag", (self.node("mean", (x,), (w,)),), (1,))
+            sd = self.node("lag", (self.node("std", (x,), (w,)),), (1,))
+            return self.node("div", (self.node("sub", (x, mu)), sd))
+        if name in ("count", "any", "all"):
+            arity(2)
+            w = window(args[1])
+            c = self.node("count", (self._bool(args[0], stack),), (w,))
+            if name == "count":
+                return c
+            if name == "any":
+                return self.node("gt", (c, self.node("const", (), (0.0,))))
+            return self.node("ge", (c, self.node("const", (), (float(w),))))
+        if name == "seq":
+            arity(3)
+            a, b, w = self._bool(args[0], stack), self._bool(args[1], stack), window(args[2])
+            before = self.node("count", (self.node("lag", (a,), (1,)),), (w,))
+            return self.node("and", (b, self.node("gt", (before, self.node("const", (), (0.0,))))))
+        raise ValueError(f"unknown function {name}()")
+
+
+def _reachable(nodes: List[Node], root: int) -> Tuple[int, ...]:
+    seen, todo = set(), [root]
+    while todo:
+        i = todo.pop()
+        if i not in seen:
+            seen.add(i)
+            todo.extend(nodes[i].args)
+    return tuple(sorted(seen))
+
+
+def _factors(tree: ast.expr) -> List[ast.expr]:
+    # operandos del and/or raíz (aplanado); si la raíz no es and/or, ella misma
+    if isinstance(tree, ast.BoolOp):
+        out = []
+        for x in tree.values:
+            out.extend(_factors(x) if isinstance(x, ast.BoolOp) and type(x.op) is type(tree.op) else [x])
+        return out
+    return [tree]
+
+
+def compile_library(spec: dict, share: bool = True) -> Plan:
+    # share=False: cada patrón con sus propios nodos (línea base sin CSE entre reglas)
+    comp = _Compiler(spec.get("define", {}), share)
+    patterns, names = [], set()
+    for k, p in enumerate(spec["patterns"]):
+        name = str(p["name"])
+        if name in names:
+            raise ValueError(f"duplicated pattern name {name!r}")
+        names.add(name)
+        comp.scope = k
+        tree = ast.parse(p["when"], mode="eval").body
+        root = comp.compile(tree, f"pattern {name!r}")
+        if not comp.nodes[root].boolean:
+            raise ValueError(f"pattern {name!r}: 'when' must be a condition")
+        facs = _factors(tree)
+        patterns.append(Pattern(
+            name=name,
+            situation=str(p.get("situation", name)),
+            severity=int(p.get("severity", 1)),
+            when=p["when"],
+            root=root,
+            factors=tuple(comp.compile(f, f"pattern {name!r}") for f in facs),
+            factor_text=tuple(ast.unparse(f) for f in facs),
+            nodes=_reachable(comp.nodes, root),
+        ))
+    return Plan(comp.nodes, comp.inputs, patterns)
+
+
+def load_library(path: Union[str, Path], share: bool = True) -> Plan:
+    return compile_library(json.loads(Path(path).read_text(encoding="utf-8")), share)
+
+
+# --- kernels ------------------------------------------------------------------
+
+def _rolling_sum(x: np.ndarray, w: int) -> np.ndarray:
+    # suma de la ventana [t-w+1, t]; NaN si falta historia o hay NaN en la ventana
+    out = np.full(len(x), np.nan)
+    if len(x) < w:
+        return out
+    bad = np.isnan(x)
+    c = np.concatenate(([0.0], np.cumsum(np.where(bad, 0.0, x))))
+    out[w - 1:] = c[w:] - c[:-w]
+    if bad.any():
+        nb = np.concatenate(([0], np.cumsum(bad)))
+        out[w - 1:][nb[w:] - nb[:-w] > 0] = np.nan
+    return out
+
+
+def _ref(x: np.ndarray) -> float:
+    # centrado para sumas acumuladas (evita cancelación en var = E[x²] - E[x]²)
+    finite = x[np.isfinite(x)]
+    return float(finite[0]) if len(finite) else 0.0
+
+
+def _mean(x: np.ndarray, w: int) -> np.ndarray:
+    r = _ref(x)
+    return r + _rolling_sum(x - r, w) / w
+
+
+def _std(x: np.ndarray, w: int) -> np.ndarray:
+    d = x - _ref(x)
+    s1, s2 = _rolling_sum(d, w), _rolling_sum(d * d, w)
+    return np.sqrt(np.maximum(s2 - s1 * s1 / w, 0.0) / (w - 1))
+
+
+def _extreme(x: np.ndarray, w: int, acc: np.ufunc, fill: float) -> np.ndarray:
+    # min/max móvil en O(n) (van Herk / Gil-Werman): bloques de w, acumulado
+    # desde el inicio del bloque y desde el final; la ventana [t-w+1, t] cruza a
+    # lo más dos bloques -> acc(sufijo[t-w+1], prefijo[t])
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n < w:
+        return out
+    xp = np.full(-(-n // w) * w, fill)
+    xp[:n] = x
+    blocks = xp.reshape(-1, w)
+    pre = acc.accumulate(blocks, axis=1).ravel()
+    suf = acc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    out[w - 1:] = acc(suf[:n - w + 1], pre[w - 1:n])
+    return out
+
+
+def _count(c: np.ndarray, w: int) -> np.ndarray:
+    out = np.full(len(c), np.nan)
+    if len(c) >= w:
+        k = np.concatenate(([0], np.cumsum(c, dtype=np.int64)))
+        out[w - 1:] = k[w:] - k[:-w]
+    return out
+
+
+def _lag(node: Node, x) -> np.ndarray:
+    k = node.param[0]
+    out = np.zeros(len(x), dtype=bool) if node.boolean else np.full(len(x), np.nan)
+    out[k:] = x[:len(x) - k]
+    return out
+
+
+def _as_float(x):
+    return x.astype(float) if isinstance(x, np.ndarray) and x.dtype == bool else x
+
+
+_EVAL = {
+    "input": lambda n, v, cols: np.asarray(cols[n.param[0]], dtype=float),
+    "const": lambda n, v, cols: n.param[0],
+    "neg": lambda n, v, cols: -_as_float(v[n.args[0]]),
+    "abs": lambda n, v, cols: np.abs(_as_float(v[n.args[0]])),
+    "add": lambda n, v, cols: _as_float(v[n.args[0]]) + _as_float(v[n.args[1]]),
+    "sub": lambda n, v, cols: _as_float(v[n.args[0]]) - _as_float(v[n.args[1]]),
+    "mul": lambda n, v, cols: _as_float(v[n.args[0]]) * _as_float(v[n.args[1]]),
+    "div": lambda n, v, cols: _as_float(v[n.args[0]]) / _as_float(v[n.args[1]]),
+    "gt": lambda n, v, cols: v[n.args[0]] > v[n.args[1]],
+    "ge": lambda n, v, cols: v[n.args[0]] >= v[n.args[1]],
+    "lt": lambda n, v, cols: v[n.args[0]] < v[n.args[1]],
+    "le": lambda n, v, cols: v[n.args[0]] <= v[n.args[1]],
+    "eq": lambda n, v, cols: v[n.args[0]] == v[n.args[1]],
+    "ne": lambda n, v, cols: v[n.args[0]] != v[n.args[1]],
+    "and": lambda n, v, cols: np.logical_and.reduce([v[a] for a in n.args]),
+    "or": lambda n, v, cols: np.logical_or.reduce([v[a] for a in n.args]),
+    "not": lambda n, v, cols: ~v[n.args[0]],
+    "lag": lambda n, v, cols: _lag(n, v[n.args[0]]),
+    "mean": lambda n, v, cols: _mean(_as_float(v[n.args[0]]), n.param[0]),
+    "std": lambda n, v, cols: _std(_as_float(v[n.args[0]]), n.param[0]),
+    "sum": lambda n, v, cols: _rolling_sum(_as_float(v[n.args[0]]), n.param[0]),
+    "min": lambda n, v, cols: _extreme(_as_float(v[n.args[0]]), n.param[0], np.minimum, np.inf),
+    "max": lambda n, v, cols: _extreme(_as_float(v[n.args[0]]), n.param[0], np.maximum, -np.inf),
+    "count": lambda n, v, cols: _count(v[n.args[0]], n.param[0]),
+}
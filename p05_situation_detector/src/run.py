@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from detector import SituationDetector
+from patterns import Plan, load_library
+from sequences import Sequence, SequenceMatcher, load_sequences
+
+HERE = Path(__file__).resolve().parent
+PROJECT = HERE.parent
+DATA = PROJECT / "data"
+OUT = PROJECT / "outputs"
+IMG = PROJECT / "img"
+INPUT = DATA / "p05_situation_detector_data.csv"
+PATTERNS = DATA / "patterns.json"
+SEQUENCES = DATA / "sequences.json"
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.series import open_series  # noqa: E402
+from common.tables import OutputSpec, add_output_args, output_spec, save_table  # noqa: E402
+
+CHUNK = 64  # muestras por micro-batch (simula llegada por streaming)
+
+def ensure_dirs():
+    DATA.mkdir(parents=True, exist_ok=True)
+    OUT.mkdir(parents=True, exist_ok=True)
+    IMG.mkdir(parents=True, exist_ok=True)
+
+def load_signal(path: Path = INPUT):
+    # data/*.csv -> store memmap (common.series); t ordenado por construcción
+    s = open_series(path)
+    return s["t"], s["value"]
+
+def detect_stream(t: np.ndarray, value: np.ndarray, plan: Plan,
+                  chunk: int = CHUNK) -> Tuple[List[dict], SituationDetector]:
+    det = SituationDetector(plan)
+    found = []
+    for a in range(0, len(t), chunk):
+        found.extend(det.push(t[a:a + chunk], {"value": value[a:a + chunk]}))
+    found.extend(det.flush())
+    found.sort(key=lambda s: (s["t_start"], -s["severity"], s["pattern"]))
+    for i, s in enumerate(found):
+        s["situation_id"] = i
+    return found, det
+
+def match_sequences(found: List[dict], sequences: List[Sequence], entity: str = "value") -> pd.DataFrame:
+    # las situaciones detectadas (en orden de t_start) son los eventos de las secuencias
+    m = SequenceMatcher(sequences, n_entities=1)
+    res = m.push([s["t_start"] for s in found], np.zeros(len(found), dtype=np.int64),
+                 m.codes([s["situation"] for s in found]))
+    return m.frame(res, [entity]).sort_values(["t_end", "sequence"], kind="stable").reset_index(drop=True)
+
+def situations_frame(found: List[dict]) -> pd.DataFrame:
+    cols = ["situation_id", "pattern", "situation", "severity", "t_start", "t_end", "n_samples", "score"]
+    df = pd.DataFrame([{k: s[k] for k in cols} for s in found], columns=cols)
+    df["top_factor"] = [s["factors"][0]["factor"] if s["factors"] else None for s in found]
+    return df
+
+def save_outputs(t: np.ndarray, value: np.ndarray, found: List[dict], det: SituationDetector,
+                 seq: pd.DataFrame, spec: OutputSpec = OutputSpec(), chunk: int = CHUNK) -> List[Path]:
+    sit = situations_frame(found)
+    costs = det.cost_table()
+    paths = save_table(sit, OUT / "situations", spec)
+    paths += save_table(seq, OUT / "sequences", spec)
+    paths += save_table(costs, OUT / "pattern_costs", spec)
+    expl = [{k: s[k] for k in ("situation_id", "pattern", "situation", "t_start", "t_end", "factors")} for s in found]
+    (OUT / "explanations.json").write_text(json.dumps(expl, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    # plot: señal + situaciones (color por severidad)
+    colors = {1: "tab:green", 2: "tab:orange", 3: "tab:red"}
+    plt.figure(figsize=(10, 4))
+    plt.plot(t, value, lw=0.8, color="tab:blue", label="value")
+    for s in found:
+        c = colors.get(s["severity"], "tab:gray")
+        if s["n_samples"] > 1:
+            plt.axvspan(s["t_start"], s["t_end"], color=c, alpha=0.15, lw=0)
+        else:
+            plt.axvline(s["t_start"], color=c, alpha=0.5, lw=0.8)
+    for sev, c in colors.items():
+        plt.plot([], [], color=c, lw=6, alpha=0.4, label=f"severity {sev}")
+    plt.title("P05 — Situation Detector")
+    plt.xlabel("t")
+    plt.ylabel("value")
+    plt.legend(loc="upper left", fontsize=8)
+    plt.tight_layout()
+    plt.savefig(IMG / "p05_situation_detector_plot.png", dpi=160)
+    plt.close()
+
+    plan = det.plan
+    unshared = sum(len(p.nodes) for p in plan.patterns)
+    report = []
+    report.append("# P05 — Situation Detector (V1 report)\n")
+    report.append(f"- Samples: {det.samples} (micro-batches of {chunk})")
+    report.append(f"- Patterns: {len(plan.patterns)}; plan nodes: {len(plan.nodes)} "
+                  f"(vs {unshared} evaluated pattern by pattern); lookback: {plan.lookback} samples")
+    report.append(f"- Plan evaluation: {det.cost.sum() * 1e3:.2f} ms total\n")
+    report.append("## Situations\n")
+    counts = sit.groupby(["pattern", "situation"], sort=False).size() if len(sit) else pd.Series(dtype=int)
+    for (p, s), c in counts.items():
+        report.append(f"- {s} (`{p}`): {c}")
+    report.append("\n## Sequences (ordered situations)\n")
+    report.append(seq.to_csv(index=False) if len(seq) else "- none\n")
+    report.append("## Top situations by score\n")
+    report.append(sit.sort_values("score", ascending=False, kind="stable").head(10).to_csv(index=False))
+    report.append("## Pattern evaluation cost (shared nodes split between patterns)\n")
+    report.append(costs.sort_values("amortized_ms", ascending=False, kind="stable").to_csv(index=False))
+    (OUT / "report.md").write_text("\n".join(report), encoding="utf-8")
+    return paths
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--patterns", type=Path, default=PATTERNS)
+    ap.add_argument("--sequences", type=Path, default=SEQUENCES)
+    ap.add_argument("--chunk", type=int, default=CHUNK)
+    add_output_args(ap)
+    args = ap.parse_args()
+
+    ensure_dirs()
+    t, value = load_signal()
+    found, det = detect_stream(t, value, load_library(args.patterns), args.chunk)
+    seq = match_sequences(found, load_sequences(args.sequences))
+    paths = save_outputs(t, value, found, det, seq, output_spec(args), args.chunk)
+
+    print("OK — Generated outputs:")
+    for path in paths:
+        print(f"- {path}")
+    print(f"- {OUT / 'explanations.json'}")
+    print(f"- {OUT / 'report.md'}")
+    print(f"- {IMG / 'p05_situation_detector_plot.png'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Sequence as Seq, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Secuencias de eventos ("Spike, luego Drop dentro de 24, luego Flatline") como
+# autómatas que avanzan de forma incremental por evento y por entidad, sin
+# re-escanear historia.
+#
+# Formato (JSON):
+# {"sequences": [
+#   {"name": "crash_and_stall", "situation": "Crash and stall", "severity": 3,
+#    "steps": ["Spike", {"event": "Drop", "within": 24}, {"event": "Flatline", "within": 24}],
+#    "within": 96}]}
+#
+# steps[k].within = máximo desde el paso anterior; within (opcional) = máximo
+# desde el primer paso. Unidades de t. Eventos que no avanzan se ignoran
+# (skip-till-next-match).
+#
+# Estado: por (entidad, secuencia) un registro por estado del NFA con
+# (t del último paso, t de inicio). Con restricciones de gap la entrada más
+# reciente a un estado domina a las anteriores (tiene más tiempo para el paso
+# siguiente), así que basta un parcial por estado: memoria acotada a
+# entidades x secuencias x (pasos - 1) registros. Al completar la secuencia se
+# emite el match y se reinicia la fila. Un registro vencido (gap o within
+# excedido) nunca vuelve a avanzar; evict() lo libera.
+#
+# push() procesa un batch en rondas: en cada ronda entra a lo más un evento por
+# entidad (en orden de llegada), y la ronda se evalúa por tipo de evento como un
+# bloque (eventos x transiciones del tipo) por broadcasting. Para cada evento se
+# lee el estado previo y luego se escribe: avanza a lo más un paso por parcial.
+
+
+@dataclass(frozen=True)
+class _Transitions:
+    start: np.ndarray    # secuencias que arrancan con este evento (>= 2 pasos)
+    single: np.ndarray   # secuencias de un solo paso: match inmediato
+    p: np.ndarray        # pares (secuencia, paso >= 1) que consumen este evento
+    k: np.ndarray
+    gap: np.ndarray
+    within: np.ndarray
+    final: np.ndarray
+
+
+@dataclass(frozen=True)
+class Sequence:
+    name: str
+    situation: str
+    severity: int
+    steps: Tuple[str, ...]
+    gaps: Tuple[float, ...]   # gaps[k]: máximo desde el paso k-1 (gaps[0] = inf)
+    within: float
+
+
+def parse_sequences(spec: dict) -> List[Sequence]:
+    out, names = [], set()
+    for s in spec["sequences"]:
+        name = str(s["name"])
+        if name in names:
+            raise ValueError(f"duplicated sequence name {name!r}")
+        names.add(name)
+        steps = [st if isinstance(st, dict) else {"event": st} for st in s["steps"]]
+        if not steps:
+            raise ValueError(f"sequence {name!r}: no steps")
+        out.append(Sequence(
+            name=name,
+            situation=str(s.get("situation", name)),
+            severity=int(s.get("severity", 1)),
+            steps=tuple(str(st["event"]) for st in steps),
+            gaps=(math.inf,) + tuple(float(st.get("within", math.inf)) for st in steps[1:]),
+            within=float(s.get("within", math.inf)),
+        ))
+    return out
+
+
+def load_sequences(path: Union[str, Path]) -> List[Sequence]:
+    return parse_sequences(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+def _rounds(entity: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # orden que agrupa por ronda (k-ésimo evento de cada entidad) y límites de cada ronda
+    n = len(entity)
+    order = np.argsort(entity, kind="stable")
+    se = entity[order]
+    new = np.ones(n, dtype=bool)
+    new[1:] = se[1:] != se[:-1]
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n) - np.maximum.accumulate(np.where(new, np.arange(n), 0))
+    by_round = np.argsort(rank, kind="stable")
+    return by_round, np.concatenate(([0], np.cumsum(np.bincount(rank))))
+
+
+class SequenceMatcher:
+    def __init__(self, sequences: Seq[Sequence], n_entities: int = 0):
+        self.sequences = list(sequences)
+        self.events = sorted({e for s in self.sequences for e in s.steps})
+        n_seq = len(self.sequences)
+        width = max(len(s.steps) for s in self.sequences)
+        self._regs = max(width - 1, 1)   # el estado final no se guarda: emite y reinicia
+
+        # transiciones estáticas por tipo de evento: quién arranca (paso 0), quién
+        # termina en un paso, y pares (secuencia, paso >= 1) con su gap / within
+        self._by_type: List[_Transitions] = []
+        for e in self.events:
+            first = [p for p, s in enumerate(self.sequences) if s.steps[0] == e]
+            nxt = [(p, k) for p, s in enumerate(self.sequences) for k in range(1, len(s.steps)) if s.steps[k] == e]
+            seq = self.sequences
+            self._by_type.append(_Transitions(
+                start=np.array([p for p in first if len(seq[p].steps) > 1], dtype=np.int64),
+                single=np.array([p for p in first if len(seq[p].steps) == 1], dtype=np.int64),
+                p=np.array([p for p, _ in nxt], dtype=np.int64),
+                k=np.array([k for _, k in nxt], dtype=np.int64),
+                gap=np.array([seq[p].gaps[k] for p, k in nxt]),
+                within=np.array([seq[p].within for p, _ in nxt]),
+                final=np.array([k == len(seq[p].steps) - 1 for p, k in nxt], dtype=bool),
+            ))
+        self._count = np.array([len(x.start) + len(x.single) + len(x.p) for x in self._by_type], dtype=np.int64)
+        self._gap = np.full((n_seq, width + 1), np.inf)
+        for p, s in enumerate(self.sequences):
+            self._gap[p, :len(s.gaps)] = s.gaps
+        self._within = np.array([s.within for s in self.sequences])
+
+        self._last = np.full((0, n_seq, self._regs), np.nan)
+        self._start = np.full((0, n_seq, self._regs), np.nan)
+        self._grow(n_entities)
+        self.events_seen = 0
+        self.matches = 0
+        self.evicted = 0
+
+    def _grow(self, n: int) -> None:
+        have = self._last.shape[0]
+        if n <= have:
+            return
+        n = max(n, 2 * have)
+        pad = np.full((n - have,) + self._last.shape[1:], np.nan)
+        self._last = np.concatenate((self._last, pad))
+        self._start = np.concatenate((self._start, pad.copy()))
+
+    def codes(self, events) -> np.ndarray:
+        # nombres de evento -> códigos del matcher (-1 = evento que ninguna secuencia usa)
+        return pd.Categorical(np.asarray(events, dtype=object), categories=self.events).codes.astype(np.int64)
+
+    @property
+    def active_partials(self) -> int:
+        return int(np.isfinite(self._last).sum())
+
+    @property
+    def nbytes(self) -> int:
+        return self._last.nbytes + self._start.nbytes
+
+    def push(self, t: np.ndarray, entity: np.ndarray, event: np.ndarray) -> Dict[str, np.ndarray]:
+        # t no decreciente por entidad; entity: enteros >= 0; event: códigos (codes())
+        t = np.asarray(t, dtype=float)
+        entity = np.asarray(entity, dtype=np.int64)
+        event = np.asarray(event, dtype=np.int64)
+        self.events_seen += len(t)
+        keep = event >= 0
+        t, entity, event = t[keep], entity[keep], event[keep]
+        out = {"sequence": [], "entity": [], "t_start": [], "t_end": []}
+        if len(t):
+            self._grow(int(entity.max()) + 1)
+            order, bounds = _rounds(entity)
+            for a, b in zip(bounds[:-1], bounds[1:]):
+                idx = order[a:b]
+                for k, v in zip(out, self._round(t[idx], entity[idx], event[idx])):
+                    out[k].append(v)
+        res = {k: np.concatenate(v) if v else np.empty(0, dtype=np.int64 if k in ("sequence", "entity") else float)
+               for k, v in out.items()}
+        self.matches += len(res["sequence"])
+        return res
+
+    def _round(self, t, entity, event):
+        # una ronda: a lo más un evento por entidad -> filas de estado disjuntas;
+        # por tipo de evento, bloque (eventos x transiciones) por broadcasting
+        n_seq, regs = self._last.shape[1:]
+        last, start = self._last.reshape(-1), self._start.reshape(-1)
+        order = np.argsort(event, kind="stable")
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(event, minlength=len(self.events)))))
+        out_p, out_e, out_s, out_t = [], [], [], []
+        for c in np.flatnonzero(bounds[1:] > bounds[:-1]):
+            idx = order[bounds[c]:bounds[c + 1]]
+            e, tt = entity[idx], t[idx]
+            tr = self._by_type[c]
+            base = e[:, None] * n_seq
+            done = None
+            if len(tr.p):
+                row = (base + tr.p) * regs
+                prev = row + (tr.k - 1)
+                ps = start[prev]
+                with np.errstate(invalid="ignore"):
+                    ok = (tt[:, None] - last[prev] <= tr.gap) & (tt[:, None] - ps <= tr.within)
+                adv = ok & ~tr.final
+                if adv.any():
+                    dst = (row + tr.k)[adv]
+                    last[dst] = np.broadcast_to(tt[:, None], adv.shape)[adv]
+                    start[dst] = ps[adv]
+                fin = ok & tr.final
+                if fin.any():
+                    i, j = np.nonzero(fin)
+                    done = row[i, j]
+                    out_p.append(tr.p[j]), out_e.append(e[i]), out_s.append(ps[i, j]), out_t.append(tt[i])
+            if len(tr.start):
+                dst = ((base + tr.start) * regs).ravel()
+                last[dst] = np.repeat(tt, len(tr.start))
+                start[dst] = last[dst]
+            if len(tr.single):
+                i, j = np.divmod(np.arange(len(e) * len(tr.single)), len(tr.single))
+                out_p.append(tr.single[j]), out_e.append(e[i]), out_s.append(tt[i]), out_t.append(tt[i])
+            if done is not None:
+                reset = (done[:, None] + np.arange(regs)).ravel()
+                last[reset] = np.nan
+                start[reset] = np.nan
+        if not out_p:
+            return (np.empty(0, dtype=np.int64),) * 2 + (np.empty(0),) * 2
+        return np.concatenate(out_p), np.concatenate(out_e), np.concatenate(out_s), np.concatenate(out_t)
+
+    def evict(self, now: float) -> int:
+        # libera parciales vencidos: ya no pueden avanzar para ningún t >= now
+        with np.errstate(invalid="ignore"):
+            stale = (now - self._last > self._gap[None, :, 1:self._regs + 1]) | \
+                    (now - self._start > self._within[None, :, None])
+        n = int(stale.sum())
+        self._last[stale] = np.nan
+        self._start[stale] = np.nan
+        self.evicted += n
+        return n
+
+    def frame(self, res: Dict[str, np.ndarray], entities: Seq[str] = ()) -> pd.DataFrame:
+        # matches -> DataFrame legible
+        seqs = [self.sequences[i] for i in res["sequence"]]
+        return pd.DataFrame({
+            "sequence": [s.name for s in seqs],
+            "situation": [s.situation for s in seqs],
+            "severity": np.array([s.severity for s in seqs], dtype=np.int64),
+            "entity": [entities[i] for i in res["entity"]] if len(entities) else res["entity"],
+            "t_start": res["t_start"],
+            "t_end": res["t_end"],
+        })
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+# Benchmark + parity: actions (tabla de reglas vectorizada) vs la versión
+# anterior con iterrows + if/elif.
+#
+#   python src/bench_actions.py --jobs 10000 100000 300000
+
+import argparse
+import time
+
+import pandas as pd
+
+from run import actions, predict_eta, simulate_pipeline
+
+
+def actions_reference(df_pred: pd.DataFrame) -> pd.DataFrame:
+    # implementación previa, sólo para comparar
+    out = []
+    for _, r in df_pred.iterrows():
+        band = str(r["risk_band"])
+        if band == "SEVERE":
+            action, reason = "ESCALATE + REPLAN", "High predicted delay"
+        elif band == "MODERATE":
+            action, reason = "ALLOCATE RESOURCES", "Moderate predicted delay"
+        elif band == "MINOR":
+            action, reason = "MONITOR", "Minor predicted delay"
+        else:
+            action, reason = "NO ACTION", "On time"
+        out.append({"job_id": r["job_id"], "start_time": r["start_time"], "planned_end": r["planned_end"],
+                    "pred_end": r["pred_end"], "pred_delay_h": float(r["pred_delay_h"]), "risk_band": band,
+                    "confidence": float(r["confidence"]), "action": action, "reason": reason})
+    return pd.DataFrame(out)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--jobs", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    args = ap.parse_args()
+
+    sample = predict_eta(simulate_pipeline(n_jobs=5_000))
+    new, ref = actions(sample), actions_reference(sample)
+    pd.testing.assert_frame_equal(new[ref.columns], ref, check_dtype=False)
+    print("parity OK (rule table vs iterrows)")
+
+    print(f"{'jobs':>9} {'rules_s':>9} {'iterrows_s':>11} {'speedup':>8}")
+    for n in args.jobs:
+        df = predict_eta(simulate_pipeline(n_jobs=n))
+        t0 = time.perf_counter()
+        actions(df)
+        t_new = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        actions_reference(df)
+        t_ref = time.perf_counter() - t0
+        print(f"{n:>9,} {t_new:>9.3f} {t_ref:>11.3f} {t_ref / t_new:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+# Benchmark: TimelineModel.predict_batch (matriz x coeficientes, buffers
+# preasignados) vs el camino pandas de predict_eta, y latencia de
+# predict_one para llamadas online de un job.
+#
+#   python src/bench_model.py --jobs 1000000
+
+import argparse
+import time
+
+import numpy as np
+
+from model import TimelineModel
+from run import predict_eta, simulate_pipeline
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--jobs", type=int, default=1_000_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--online-calls", type=int, default=100_000)
+    args = ap.parse_args()
+
+    df = simulate_pipeline(n_jobs=args.jobs)
+    model = TimelineModel.fit(df)
+    X = TimelineModel.signals(df)
+
+    # parity: batch vs online vs pandas (predict_eta redondea a 2 decimales)
+    out = np.empty(len(X))
+    work = np.empty((len(X), len(model.coef)))
+    model.predict_batch(X, out=out, work=work)
+    sample = np.random.default_rng(0).integers(0, len(X), size=1_000)
+    online = np.array([model.predict_one(*X[i]) for i in sample])
+    assert np.allclose(online, out[sample], atol=1e-12), "predict_one != predict_batch"
+    ref = predict_eta(df.iloc[:10_000], model)["pred_delay_h"].to_numpy()
+    assert np.allclose(ref, out[:10_000].round(2)), "predict_eta != predict_batch"
+    print(f"parity OK — {len(X):,} jobs, coef = {np.round(model.coef, 4).tolist()}")
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        model.predict_batch(X, out=out, work=work)
+        best = min(best, time.perf_counter() - t0)
+    print(f"predict_batch   {best * 1e3:8.1f} ms  ({len(X) / best / 1e6:6.1f} M jobs/s, buffers reused)")
+
+    t0 = time.perf_counter()
+    predict_eta(df, model)
+    t_pd = time.perf_counter() - t0
+    print(f"predict_eta     {t_pd * 1e3:8.1f} ms  (pandas path, full frame incl. bands/confidence)")
+
+    rows = X[: args.online_calls].tolist()
+    lat = np.empty(len(rows))
+    for i, r in enumerate(rows):
+        t0 = time.perf_counter()
+        model.predict_one(*r)
+        lat[i] = time.perf_counter() - t0
+    p50, p99 = np.percentile(lat * 1e6, [50, 99])
+    print(f"predict_one     p50 {p50:6.2f} µs  p99 {p99:6.2f} µs  ({len(rows):,} calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+# Generador de carga para serve.py: N conexiones keep-alive concurrentes,
+# cada una envía jobs (de simulate_pipeline) uno por request; reporta
+# latencia p50/p99 del lado cliente, throughput y las métricas del servidor.
+#
+#   python src/loadgen.py --spawn --requests 50000 --concurrency 256
+#   python src/loadgen.py --port 8606 ...        # contra una instancia ya levantada
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from model import SIGNALS
+from run import simulate_pipeline
+
+HERE = Path(__file__).resolve().parent
+
+
+async def open_conn(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+async def request(reader, writer, method: str, path: str, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: local\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in head.decode("latin-1").split("\r\n")[1:]:
+        if line.lower().startswith("content-length:"):
+            length = int(line.split(":", 1)[1])
+    return json.loads(await reader.readexactly(length))
+
+
+async def client(args, jobs, counter, latencies):
+    reader, writer = await open_conn(args)
+    try:
+        while True:
+            i = counter[0]
+            if i >= len(jobs):
+                break
+            counter[0] += 1
+            t0 = time.perf_counter()
+            res = await request(reader, writer, "POST", "/eta", jobs[i])
+            latencies.append(time.perf_counter() - t0)
+            if "error" in res:
+                raise RuntimeError(res)
+    finally:
+        writer.close()
+
+
+async def wait_ready(args, timeout: float = 15.0):
+    t_end = time.perf_counter() + timeout
+    while True:
+        try:
+            reader, writer = await open_conn(args)
+            await request(reader, writer, "GET", "/health")
+            writer.close()
+            return
+        except (OSError, asyncio.IncompleteReadError):
+            if time.perf_counter() > t_end:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def run(args):
+    df = simulate_pipeline(n_jobs=min(args.requests, 100_000))
+    rows = df[["job_id", *SIGNALS]].to_dict("records")
+    jobs = [rows[i % len(rows)] for i in range(args.requests)]
+
+    await wait_ready(args)
+    latencies = []
+    counter = [0]
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(args, jobs, counter, latencies) for _ in range(args.concurrency)))
+    wall = time.perf_counter() - t0
+
+    lat = np.array(latencies) * 1e3
+    p50, p99 = np.percentile(lat, [50, 99])
+    print(f"client   {len(lat):,} requests in {wall:.2f}s -> {len(lat) / wall:,.0f} req/s   "
+          f"latency p50 {p50:.2f} ms  p99 {p99:.2f} ms  (concurrency={args.concurrency})")
+
+    reader, writer = await open_conn(args)
+    m = await request(reader, writer, "GET", "/metrics")
+    writer.close()
+    print(f"server   avg_batch {m['avg_batch']}  batches {m['batches']:,}  "
+          f"queue->result p50 {m['latency_ms_p50']:.2f} ms  p99 {m['latency_ms_p99']:.2f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8606)
+    ap.add_argument("--unix", default=None)
+    ap.add_argument("--requests", type=int, default=20_000)
+    ap.add_argument("--concurrency", type=int, default=128)
+    ap.add_argument("--spawn", action="store_true", help="levanta serve.py local durante la prueba")
+    ap.add_argument("--max-batch", type=int, default=512)
+    ap.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = ap.parse_args()
+
+    proc = None
+    if args.spawn:
+        cmd = [sys.executable, str(HERE / "serve.py"),
+               "--max-batch", str(args.max_batch), "--max-wait-ms", str(args.max_wait_ms)]
+        cmd += ["--unix", args.unix] if args.unix else ["--host", args.host, "--port", str(args.port)]
+        proc = subprocess.Popen(cmd)
+    try:
+        asyncio.run(run(args))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# Modelo lineal de atraso (delay_h) sobre las señales de simulate_pipeline.
+# Mismas features explicables que la heurística de predict_eta:
+#   [1, queue_wait_h, retries, max(cpu_pressure - 0.65, 0), max(log1p(data_gb) - log1p(60), 0)]
+# `fit` ajusta los coeficientes por mínimos cuadrados; `predict_batch` es un
+# solo producto matriz x coeficientes sobre buffers preasignados.
+
+SIGNALS = ("queue_wait_h", "retries", "cpu_pressure", "data_gb")
+FEATURES = ("intercept", "queue_wait_h", "retries", "cpu_over_065", "log_size_over_60gb")
+CPU_KNEE = 0.65
+LOG_SIZE_KNEE = math.log1p(60)
+MAX_DELAY_H = 18.0
+
+# bandas de riesgo sobre pred_delay_h (intervalos (a, b], como pd.cut)
+RISK_BINS = [-0.01, 1.0, 3.0, 6.0, 99]
+RISK_BANDS = ["ON_TIME", "MINOR", "MODERATE", "SEVERE"]
+
+# heurística original de predict_eta: 0.35 * (0.55*q + 0.75*r + 5.0*cpu + 0.9*size)
+HEURISTIC_COEF = 0.35 * np.array([0.0, 0.55, 0.75, 5.0, 0.9])
+
+
+class TimelineModel:
+    def __init__(self, coef: Optional[Sequence[float]] = None):
+        self.coef = np.array(HEURISTIC_COEF if coef is None else coef, dtype=float)
+        if self.coef.shape != (len(FEATURES),):
+            raise ValueError(f"expected {len(FEATURES)} coefficients, got {self.coef.shape}")
+        self._coef_list = self.coef.tolist()  # para predict_one sin overhead de NumPy
+
+    @staticmethod
+    def design_matrix(X: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        # X: (n, 4) con columnas en el orden de SIGNALS
+        X = np.asarray(X, dtype=float)
+        n = X.shape[0]
+        F = np.empty((n, len(FEATURES)), dtype=float) if out is None else out
+        F[:, 0] = 1.0
+        F[:, 1] = X[:, 0]
+        F[:, 2] = X[:, 1]
+        np.subtract(X[:, 2], CPU_KNEE, out=F[:, 3])
+        np.maximum(F[:, 3], 0, out=F[:, 3])
+        np.log1p(X[:, 3], out=F[:, 4])
+        F[:, 4] -= LOG_SIZE_KNEE
+        np.maximum(F[:, 4], 0, out=F[:, 4])
+        return F
+
+    @staticmethod
+    def signals(df: pd.DataFrame) -> np.ndarray:
+        return df[list(SIGNALS)].to_numpy(dtype=float)
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame, target: str = "delay_h") -> "TimelineModel":
+        F = cls.design_matrix(cls.signals(df))
+        coef, *_ = np.linalg.lstsq(F, df[target].to_numpy(dtype=float), rcond=None)
+        return cls(coef)
+
+    def predict_batch(self, X: np.ndarray, out: Optional[np.ndarray] = None,
+                      work: Optional[np.ndarray] = None) -> np.ndarray:
+        # X: (n, 4) señales crudas; out: (n,) para el atraso predicho;
+        # work: (n, 5) buffer para la matriz de features (reutilizable entre llamadas)
+        F = self.design_matrix(X, out=work)
+        out = np.matmul(F, self.coef, out=out)
+        return np.clip(out, 0, MAX_DELAY_H, out=out)
+
+    def predict_one(self, queue_wait_h: float, retries: float, cpu_pressure: float, data_gb: float) -> float:
+        # camino online (un job): aritmética de Python, sin arrays
+        c = self._coef_list
+        y = (c[0] + c[1] * queue_wait_h + c[2] * retries
+             + c[3] * max(cpu_pressure - CPU_KNEE, 0.0)
+             + c[4] * max(math.log1p(data_gb) - LOG_SIZE_KNEE, 0.0))
+        return min(max(y, 0.0), MAX_DELAY_H)
+
+    def to_dict(self) -> dict:
+        return {"features": list(FEATURES), "coef": self._coef_list}
+
+    def save(self, path: Union[str, Path]) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "TimelineModel":
+        spec = json.loads(Path(path).read_text(encoding="utf-8"))
+        if tuple(spec["features"]) != FEATURES:
+            raise ValueError(f"{path}: feature set {spec['features']} does not match {list(FEATURES)}")
+        return cls(spec["coef"])
+
+
+def confidence_batch(X: np.ndarray) -> np.ndarray:
+    # confidence heuristic (for demo): lower variance signals => higher confidence
+    X = np.asarray(X, dtype=float)
+    spread = 0.12 * X[:, 1] + 0.10 * (X[:, 0] / 6.0) + 0.22 * np.maximum(X[:, 2] - 0.7, 0)
+    return 1.0 - np.clip(spread, 0, 0.7)
+
+
+def risk_band_codes(pred_delay_h: np.ndarray) -> np.ndarray:
+    # índice en RISK_BANDS; equivale a pd.cut(..., RISK_BINS) dentro del rango
+    return np.searchsorted(RISK_BINS[1:-1], pred_delay_h, side="left")
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import argparse
+import sys
 from pathlib import Path
+from typing import List, Optional
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -10,6 +13,13 @@ PROJECT = HERE.parent
 DATA = PROJECT / "data"
 OUT = PROJECT / "outputs"
 IMG = PROJECT / "img"
+MODEL = OUT / "timeline_model.json"
+ACTION_RULES = DATA / "action_rules.json"
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.rules import apply_rules, load_rules  # noqa: E402
+from common.tables import OutputSpec, add_output_args, output_spec, save_table  # noqa: E402
+from model import RISK_BANDS, RISK_BINS, TimelineModel, confidence_batch  # noqa: E402
 
 def ensure_dirs():
     DATA.mkdir(parents=True, exist_ok=True)
@@ -56,69 +66,41 @@ def simulate_pipeline(seed: int = 6, n_jobs: int = 220) -> pd.DataFrame:
     df["delay_h"] = (df["actual_duration_h"] - df["planned_duration_h"]).round(2)
     return df.sort_values("start_time")
 
-def predict_eta(df: pd.DataFrame) -> pd.DataFrame:
-    # lightweight "model": linear-ish scoring -> predicted additional hours
+def predict_eta(df: pd.DataFrame, model: Optional[TimelineModel] = None) -> pd.DataFrame:
+    # modelo lineal sobre las señales -> horas adicionales predichas (acotadas);
+    # sin modelo ajustado se usan los pesos heurísticos de V1
+    model = model or TimelineModel()
     dfx = df.copy()
 
-    # normalize data size a bit (log)
-    size_term = np.log1p(dfx["data_gb"])  # smooth
-    # risk of delay proxy
-    delay_risk = (
-        0.55 * dfx["queue_wait_h"]
-        + 0.75 * dfx["retries"]
-        + 5.0 * np.maximum(dfx["cpu_pressure"] - 0.65, 0)
-        + 0.9 * np.maximum(size_term - np.log1p(60), 0)
-    )
-
-    # map to predicted delay in hours (bounded)
-    pred_delay = np.clip(0.35 * delay_risk, 0, 18.0)
+    X = TimelineModel.signals(dfx)
+    pred_delay = model.predict_batch(X)
     dfx["pred_delay_h"] = pred_delay.round(2)
     dfx["pred_duration_h"] = (dfx["planned_duration_h"] + dfx["pred_delay_h"]).round(2)
     dfx["pred_end"] = dfx["start_time"] + pd.to_timedelta(dfx["pred_duration_h"], unit="h")
 
     # confidence heuristic (for demo): lower variance signals => higher confidence
-    conf = 1.0 - np.clip(
-        0.12 * dfx["retries"] + 0.10 * (dfx["queue_wait_h"] / 6.0) + 0.22 * np.maximum(dfx["cpu_pressure"] - 0.7, 0),
-        0, 0.7
-    )
-    dfx["confidence"] = conf.round(2)
+    dfx["confidence"] = confidence_batch(X).round(2)
 
     # buckets
-    dfx["risk_band"] = pd.cut(
-        dfx["pred_delay_h"],
-        bins=[-0.01, 1.0, 3.0, 6.0, 99],
-        labels=["ON_TIME", "MINOR", "MODERATE", "SEVERE"]
-    )
+    dfx["risk_band"] = pd.cut(dfx["pred_delay_h"], bins=RISK_BINS, labels=RISK_BANDS)
     return dfx
 
-def actions(df_pred: pd.DataFrame) -> pd.DataFrame:
-    actions = []
-    for _, r in df_pred.iterrows():
-        band = str(r["risk_band"])
-        if band == "SEVERE":
-            action = "ESCALATE + REPLAN"
-            reason = "High predicted delay"
-        elif band == "MODERATE":
-            action = "ALLOCATE RESOURCES"
-            reason = "Moderate predicted delay"
-        elif band == "MINOR":
-            action = "MONITOR"
-            reason = "Minor predicted delay"
-        else:
-            action = "NO ACTION"
-            reason = "On time"
-        actions.append({
-            "job_id": r["job_id"],
-            "start_time": r["start_time"],
-            "planned_end": r["planned_end"],
-            "pred_end": r["pred_end"],
-            "pred_delay_h": float(r["pred_delay_h"]),
-            "risk_band": band,
-            "confidence": float(r["confidence"]),
-            "action": action,
-            "reason": reason,
-        })
-    return pd.DataFrame(actions)
+def actions(df_pred: pd.DataFrame, rules_path: Path = ACTION_RULES) -> pd.DataFrame:
+    # reglas declarativas (data/action_rules.json): risk_band -> action/reason/priority
+    table = load_rules(rules_path)
+    acts = apply_rules(df_pred, table)
+    return pd.DataFrame({
+        "job_id": df_pred["job_id"].to_numpy(),
+        "start_time": df_pred["start_time"].to_numpy(),
+        "planned_end": df_pred["planned_end"].to_numpy(),
+        "pred_end": df_pred["pred_end"].to_numpy(),
+        "pred_delay_h": df_pred["pred_delay_h"].to_numpy(dtype=float),
+        "risk_band": df_pred["risk_band"].astype(str).to_numpy(),
+        "confidence": df_pred["confidence"].to_numpy(dtype=float),
+        "action": acts["action"].to_numpy(),
+        "reason": acts["reason"].to_numpy(),
+        "priority": acts["priority"].to_numpy(),
+    })
 
 def plot(df_pred: pd.DataFrame):
     # show planned vs predicted end spread (sample 60 jobs)
@@ -138,11 +120,14 @@ def plot(df_pred: pd.DataFrame):
     plt.savefig(IMG / "p06_timeline_prediction_engine_plot.png", dpi=160)
     plt.close()
 
-def save(df_pred: pd.DataFrame):
-    df_pred.to_csv(OUT / "timeline_predictions.csv", index=False)
+def save(df_pred: pd.DataFrame, model: Optional[TimelineModel] = None,
+         spec: OutputSpec = OutputSpec()) -> List[Path]:
+    paths = save_table(df_pred, OUT / "timeline_predictions", spec, partition_by="start_time")
+    if model is not None:
+        model.save(MODEL)
 
     act = actions(df_pred)
-    act.sort_values(["pred_delay_h"], ascending=False).to_csv(OUT / "actions.csv", index=False)
+    paths += save_table(act.sort_values(["pred_delay_h"], ascending=False), OUT / "actions", spec)
 
     # mini metrics for report
     mae = float(np.mean(np.abs(df_pred["pred_duration_h"] - df_pred["actual_duration_h"])))
@@ -154,22 +139,35 @@ def save(df_pred: pd.DataFrame):
     report.append(f"- Jobs simulated: {len(df_pred)}")
     report.append(f"- MAE (duration hours): {mae:.2f}")
     report.append(f"- Risk bands: SEVERE={severe}, MODERATE={moderate}\n")
+    if model is not None:
+        report.append("## Model coefficients (pred_delay_h)\n")
+        model_spec = model.to_dict()
+        for name, c in zip(model_spec["features"], model_spec["coef"]):
+            report.append(f"- {name}: {c:+.4f}")
+        report.append("")
     report.append("## Top 10 predicted delays\n")
     top = df_pred.sort_values("pred_delay_h", ascending=False)[["job_id","pred_delay_h","risk_band","confidence","retries","queue_wait_h","cpu_pressure","data_gb"]].head(10)
     report.append(top.to_csv(index=False))
     (OUT / "report.md").write_text("\n".join(report), encoding="utf-8")
+    return paths
 
 def main():
+    ap = argparse.ArgumentParser()
+    add_output_args(ap)
+    args = ap.parse_args()
+
     ensure_dirs()
     df = simulate_pipeline()
-    dfp = predict_eta(df)
+    model = TimelineModel.fit(df)  # mínimos cuadrados: señales -> delay_h
+    dfp = predict_eta(df, model)
     plot(dfp)
-    save(dfp)
+    paths = save(dfp, model, output_spec(args))
 
     print("OK — Generated outputs:")
-    print(f"- {OUT / 'timeline_predictions.csv'}")
-    print(f"- {OUT / 'actions.csv'}")
+    for path in paths:
+        print(f"- {path}")
     print(f"- {OUT / 'report.md'}")
+    print(f"- {MODEL}")
     print(f"- {IMG / 'p06_timeline_prediction_engine_plot.png'}")
 
 if __name__ == "__main__":
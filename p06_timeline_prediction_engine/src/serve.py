@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+# Servicio ETA online (long-lived) alrededor de TimelineModel + reglas de acción.
+# Las requests concurrentes se agrupan en micro-batches (asyncio): un batch se
+# despacha al llegar a --max-batch jobs o tras --max-wait-ms desde el primero,
+# y se scorea con un solo predict_batch.
+#
+#   python src/serve.py --port 8606                 # HTTP en 127.0.0.1:8606
+#   python src/serve.py --unix /tmp/p06_eta.sock    # Unix socket
+#
+#   POST /eta      {"job_id": "JOB-1", "queue_wait_h": 1.2, "retries": 0,
+#                   "cpu_pressure": 0.7, "data_gb": 12.0}   (o una lista de jobs)
+#   GET  /metrics  p50/p99 de latencia, throughput y tamaño medio de batch
+#   GET  /health
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, List, Optional, Tuple
+
+import numpy as np
+
+from model import RISK_BANDS, SIGNALS, TimelineModel, confidence_batch, risk_band_codes
+
+HERE = Path(__file__).resolve().parent
+PROJECT = HERE.parent
+OUT = PROJECT / "outputs"
+MODEL = OUT / "timeline_model.json"
+ACTION_RULES = PROJECT / "data" / "action_rules.json"
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.httpserver import BadRequest, json_response, read_request, wants_close  # noqa: E402
+from common.rules import load_rules  # noqa: E402
+
+
+class Metrics:
+    def __init__(self, keep: int = 100_000):
+        self.started = time.perf_counter()
+        self.latencies: Deque[float] = deque(maxlen=keep)  # segundos, enqueue -> resultado
+        self.requests = 0
+        self.jobs = 0
+        self.batches = 0
+
+    def snapshot(self) -> dict:
+        up = time.perf_counter() - self.started
+        lat = np.fromiter(self.latencies, dtype=float) * 1e3
+        p50, p99 = (np.percentile(lat, [50, 99]).tolist() if len(lat) else (None, None))
+        return {
+            "uptime_s": round(up, 3),
+            "requests": self.requests,
+            "jobs": self.jobs,
+            "batches": self.batches,
+            "avg_batch": round(self.jobs / self.batches, 2) if self.batches else None,
+            "jobs_per_s": round(self.jobs / up, 1) if up > 0 else None,
+            "latency_ms_p50": p50,
+            "latency_ms_p99": p99,
+        }
+
+
+class MicroBatcher:
+    def __init__(self, model: TimelineModel, rules_path: Path, max_batch: int, max_wait_ms: float):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1e3
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.metrics = Metrics()
+        # banda -> (action, reason, priority), resuelto una vez por banda
+        table = load_rules(rules_path)
+        idx = [table.bands.index(b) if b in table.bands else len(table.bands) for b in RISK_BANDS]
+        self.band_action = table.action[idx].tolist()
+        self.band_reason = table.reason[idx].tolist()
+        self.band_priority = table.priority[idx].tolist()
+        # buffers preasignados para el batch máximo
+        self.X = np.empty((max_batch, len(SIGNALS)))
+        self.work = np.empty((max_batch, len(model.coef)))
+        self.pred = np.empty(max_batch)
+
+    async def submit(self, job: dict) -> dict:
+        fut = asyncio.get_running_loop().create_future()
+        await self.queue.put((job, fut, time.perf_counter()))
+        return await fut
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(items) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # lo que ya esté encolado entra sin esperar
+            while len(items) < self.max_batch and not self.queue.empty():
+                items.append(self.queue.get_nowait())
+            self._score(items)
+
+    def _score(self, items: List[Tuple[dict, asyncio.Future, float]]):
+        n = len(items)
+        X = self.X[:n]
+        ok = np.ones(n, dtype=bool)
+        for i, (job, _, _) in enumerate(items):
+            try:
+                X[i] = [float(job[s]) for s in SIGNALS]
+            except (KeyError, TypeError, ValueError):
+                X[i] = 0.0
+                ok[i] = False
+        pred = self.model.predict_batch(X, out=self.pred[:n], work=self.work[:n])
+        conf = confidence_batch(X)
+        band = risk_band_codes(pred)
+
+        now = time.perf_counter()
+        m = self.metrics
+        for i, (job, fut, t0) in enumerate(items):
+            if fut.done():  # cliente desconectado
+                continue
+            if not ok[i]:
+                fut.set_result({"job_id": job.get("job_id") if isinstance(job, dict) else None,
+                                "error": f"expected numeric fields {list(SIGNALS)}"})
+                continue
+            b = band[i]
+            fut.set_result({
+                "job_id": job.get("job_id"),
+                "pred_delay_h": round(float(pred[i]), 2),
+                "confidence": round(float(conf[i]), 2),
+                "risk_band": RISK_BANDS[b],
+                "action": self.band_action[b],
+                "reason": self.band_reason[b],
+                "priority": self.band_priority[b],
+            })
+            m.latencies.append(now - t0)
+        m.jobs += n
+        m.batches += 1
+
+
+async def handle(batcher: MicroBatcher, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            try:
+                req = await read_request(reader)
+            except BadRequest as e:
+                writer.write(json_response(e.status, {"error": str(e)}))
+                break
+            if req is None:
+                break
+
+            if req.method == "POST" and req.path == "/eta":
+                batcher.metrics.requests += 1
+                try:
+                    payload = json.loads(req.body)
+                except ValueError:
+                    writer.write(json_response("400 Bad Request", {"error": "invalid JSON"}))
+                else:
+                    if isinstance(payload, list):
+                        res = list(await asyncio.gather(*(batcher.submit(j) for j in payload)))
+                    else:
+                        res = await batcher.submit(payload)
+                    writer.write(json_response("200 OK", res))
+            elif req.method == "GET" and req.path == "/metrics":
+                writer.write(json_response("200 OK", batcher.metrics.snapshot()))
+            elif req.method == "GET" and req.path == "/health":
+                writer.write(json_response("200 OK", {"status": "ok"}))
+            else:
+                writer.write(json_response("404 Not Found", {"error": f"{req.method} {req.path}"}))
+            await writer.drain()
+            if wants_close(req):
+                break
+    finally:
+        writer.close()
+
+
+async def serve(args):
+    model = TimelineModel.load(args.model) if args.model.exists() else TimelineModel()
+    batcher = MicroBatcher(model, args.rules, args.max_batch, args.max_wait_ms)
+    worker = asyncio.create_task(batcher.run())
+
+    def on_conn(r, w):
+        return handle(batcher, r, w)
+
+    if args.unix:
+        server = await asyncio.start_unix_server(on_conn, path=args.unix)
+        where = f"unix:{args.unix}"
+    else:
+        server = await asyncio.start_server(on_conn, host=args.host, port=args.port)
+        where = f"http://{args.host}:{args.port}"
+    src = args.model if args.model.exists() else "heuristic weights"
+    print(f"P06 ETA service on {where} (model: {src}, max_batch={args.max_batch}, "
+          f"max_wait={args.max_wait_ms}ms)", flush=True)
+    async with server:
+        try:
+            await server.serve_forever()
+        finally:
+            worker.cancel()
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8606)
+    ap.add_argument("--unix", default=None, help="ruta de Unix socket (en vez de TCP)")
+    ap.add_argument("--model", type=Path, default=MODEL, help="JSON de TimelineModel (run.py lo genera)")
+    ap.add_argument("--rules", type=Path, default=ACTION_RULES)
+    ap.add_argument("--max-batch", type=int, default=512)
+    ap.add_argument("--max-wait-ms", type=float, default=2.0)
+    return ap.parse_args(argv)
+
+
+def main():
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
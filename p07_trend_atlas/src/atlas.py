@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+
+# Atlas de tendencias: normalizar + alinear -> representación compacta ->
+# clustering -> scoring. Todo por bloques (una fuente / un chunk de series a la
+# vez): de cada bloque solo se guardan el embedding (n x d, d ~ 16) y las
+# features de tendencia, nunca el panel completo ni una matriz n x n.
+#
+#   align      cada fuente trae su propio muestreo (diario, semanal, ...) sobre la
+#              misma ventana; se rellenan huecos (ffill/bfill) y se interpola
+#              linealmente a una grilla común de LENGTH puntos
+#   znorm      por serie: forma, no nivel
+#   paa / sax  medias por segmento; palabra SAX con cortes gaussianos
+#   fft        primeros coeficientes de la rFFT (sin DC)
+#
+# Los embeddings se escalan para que la distancia euclidiana acote por abajo la
+# distancia entre las series z-normalizadas (PAA: sqrt(L/segmentos); FFT:
+# Parseval), así k-means sobre el embedding aproxima k-means sobre las series.
+# MiniBatchKMeans solo calcula distancias (batch x k) a los centroides.
+#
+# Para búsquedas de "series parecidas" (similarity.py) se guarda además una forma
+# más fina: PAA de SHAPE_POINTS puntos de la serie z-normalizada.
+
+LENGTH = 128
+SEGMENTS = 16
+ALPHABET = 6
+FFT_COEFS = 8
+SHAPE_POINTS = 64
+CLUSTERS = 9
+BATCH = 4096
+REPRS = ("paa", "fft")
+
+
+def fill_gaps(X: np.ndarray) -> np.ndarray:
+    # NaN -> último valor válido de la fila (o el primero válido si el hueco es inicial)
+    X = np.asarray(X, dtype=float)
+    nan = np.isnan(X)
+    if not nan.any():
+        return X
+    n, T = X.shape
+    rows = np.arange(n)[:, None]
+    pos = np.where(nan, 0, np.arange(T))
+    X = X[rows, np.maximum.accumulate(pos, axis=1)]
+    nan = np.isnan(X)
+    if nan.any():
+        pos = np.where(nan, T - 1, np.arange(T))
+        X = X[rows, np.minimum.accumulate(pos[:, ::-1], axis=1)[:, ::-1]]
+    return np.nan_to_num(X)   # filas completamente vacías -> 0
+
+
+def align(X: np.ndarray, length: int = LENGTH) -> np.ndarray:
+    # (n, T) muestreadas uniformemente sobre la ventana -> (n, length), interpolación lineal
+    X = fill_gaps(X)
+    T = X.shape[1]
+    if T == length:
+        return X
+    pos = np.linspace(0, T - 1, length)
+    i0 = np.minimum(pos.astype(np.int64), T - 2)
+    w = pos - i0
+    return X[:, i0] * (1 - w) + X[:, i0 + 1] * w
+
+
+def znorm(X: np.ndarray) -> np.ndarray:
+    mu = X.mean(axis=1, keepdims=True)
+    sd = X.std(axis=1, keepdims=True)
+    return (X - mu) / np.where(sd > 0, sd, 1.0)
+
+
+def paa(Z: np.ndarray, segments: int = SEGMENTS) -> np.ndarray:
+    n, L = Z.shape
+    if L % segments:
+        raise ValueError(f"length {L} is not a multiple of {segments} segments")
+    return Z.reshape(n, segments, L // segments).mean(axis=2)
+
+
+def sax_words(P: np.ndarray, alphabet: int = ALPHABET) -> np.ndarray:
+    # PAA de series z-normalizadas -> palabras ('a' = tramo más bajo)
+    cuts = np.array([NormalDist().inv_cdf(q) for q in np.arange(1, alphabet) / alphabet])
+    codes = np.searchsorted(cuts, P).astype(np.uint8) + ord("a")
+    return np.ascontiguousarray(codes).view(f"S{P.shape[1]}").ravel().astype(str)
+
+
+def fft_embed(Z: np.ndarray, k: int = FFT_COEFS) -> np.ndarray:
+    # coeficientes 1..k (re, im); con escala sqrt(2 / L) la norma acota la de Z
+    F = np.fft.rfft(Z, axis=1)[:, 1:k + 1] * np.sqrt(2.0 / Z.shape[1])
+    return np.concatenate((F.real, F.imag), axis=1)
+
+
+def trend_features(Xa: np.ndarray, Z: np.ndarray) -> Dict[str, np.ndarray]:
+    # Xa: serie alineada (nivel original), Z: z-normalizada
+    n, L = Z.shape
+    u = np.linspace(0.0, 1.0, L)
+    uc = u - u.mean()
+    denom = float(uc @ uc)
+    level = np.abs(Xa.mean(axis=1))
+    level = np.where(level > 0, level, 1.0)
+    slope_z = (Z @ uc) / denom                       # cambio en desvíos a lo largo de la ventana
+    q = L // 4
+    detrended = Z - slope_z[:, None] * uc
+    power = np.abs(np.fft.rfft(detrended, axis=1)[:, 2:]) ** 2   # sin DC ni 1 ciclo/ventana
+    total = power.sum(axis=1)
+    return {
+        "slope_pct": (Xa @ uc) / denom / level * 100,
+        "momentum_pct": (Xa[:, -q:].mean(axis=1) - Xa[:, -2 * q:-q].mean(axis=1)) / level * 100,
+        "trend_score": slope_z,
+        "volatility": np.diff(Z, axis=1).std(axis=1) / np.sqrt(2),   # ~1 = ruido blanco
+        "seasonality": np.divide(power.max(axis=1), total, out=np.zeros(n), where=total > 0),
+        "peak_z": np.abs(Z).max(axis=1),
+    }
+
+
+def label_cluster(f: Dict[str, float]) -> str:
+    # etiqueta ejecutiva a partir de las medianas de features del cluster
+    if f["volatility"] > 0.9:
+        return "No clear trend"
+    if f["peak_z"] > 4.0:
+        return "Transient spike"
+    if f["trend_score"] > 1.0:
+        return "Rising"
+    if f["trend_score"] < -1.0:
+        return "Falling"
+    if f["seasonality"] > 0.4:
+        return "Seasonal"
+    return "Stable / hump"
+
+
+class TrendAtlas:
+    def __init__(self, n_clusters: int = CLUSTERS, repr: str = "paa", length: int = LENGTH,
+                 segments: int = SEGMENTS, fft_coefs: int = FFT_COEFS, batch_size: int = BATCH, seed: int = 7):
+        if repr not in REPRS:
+            raise ValueError(f"repr must be one of {REPRS}, got {repr!r}")
+        self.n_clusters, self.repr = n_clusters, repr
+        self.length, self.segments, self.fft_coefs = length, segments, fft_coefs
+        self.batch_size, self.seed = batch_size, seed
+        self._emb: List[np.ndarray] = []
+        self._paa: List[np.ndarray] = []
+        self._shape: List[np.ndarray] = []
+        self._feat: List[Dict[str, np.ndarray]] = []
+        self._meta: List[pd.DataFrame] = []
+        self.model: Optional[MiniBatchKMeans] = None
+
+    def add(self, X: np.ndarray, meta: pd.DataFrame) -> None:
+        # un bloque de series con el mismo muestreo; meta: una fila por serie
+        if len(X) != len(meta):
+            raise ValueError(f"block has {len(X)} series but {len(meta)} meta rows")
+        Xa = align(X, self.length)
+        Z = znorm(Xa)
+        P = paa(Z, self.segments)
+        if self.repr == "paa":
+            E = P * np.sqrt(self.length / self.segments)
+        else:
+            E = fft_embed(Z, self.fft_coefs)
+        self._emb.append(E.astype(np.float32))
+        self._paa.append(P.astype(np.float32))
+        self._shape.append(paa(Z, SHAPE_POINTS).astype(np.float32))
+        self._feat.append(trend_features(Xa, Z))
+        self._meta.append(meta.reset_index(drop=True))
+
+    @property
+    def n_series(self) -> int:
+        return sum(len(e) for e in self._emb)
+
+    def embedding(self) -> np.ndarray:
+        return np.concatenate(self._emb)
+
+    def shapes(self) -> np.ndarray:
+        # (n, SHAPE_POINTS) float32, mismo orden que frame(); vectores para el índice
+        return np.concatenate(self._shape)
+
+    def series_ids(self) -> np.ndarray:
+        return np.concatenate([m["series_id"].to_numpy() for m in self._meta])
+
+    def fit(self) -> Tuple[np.ndarray, np.ndarray]:
+        # -> (cluster por serie, distancia al centroide)
+        E = self.embedding()
+        self.model = MiniBatchKMeans(self.n_clusters, batch_size=self.batch_size, n_init=3,
+                                     random_state=self.seed).fit(E)
+        self.labels_ = self.model.labels_.astype(np.int64)
+        C = self.model.cluster_centers_
+        self.distance_ = np.sqrt(((E - C[self.labels_]) ** 2).sum(axis=1))
+        return self.labels_, self.distance_
+
+    def frame(self, summary: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        # una fila por serie: cluster, palabra SAX y features de tendencia
+        if self.model is None:
+            self.fit()
+        df = pd.concat(self._meta, ignore_index=True)
+        feats = {k: np.concatenate([f[k] for f in self._feat]) for k in self._feat[0]}
+        summary = self.clusters() if summary is None else summary
+        labels = summary.set_index("cluster")["label"].reindex(range(self.n_clusters))
+        df["cluster"] = self.labels_
+        df["cluster_label"] = pd.Categorical(labels.to_numpy()[self.labels_])
+        df["distance"] = self.distance_.round(4)
+        df["sax"] = np.concatenate([sax_words(P) for P in self._paa])
+        for k, v in feats.items():
+            df[k] = v.round(4)
+        return df
+
+    def clusters(self) -> pd.DataFrame:
+        # resumen por cluster: tamaño, medianas de features, etiqueta, fuente dominante,
+        # serie representativa (la más cercana al centroide) y forma media (PAA)
+        if self.model is None:
+            self.fit()
+        lab = self.labels_
+        feats = pd.DataFrame({k: np.concatenate([f[k] for f in self._feat]) for k in self._feat[0]})
+        meta = pd.concat(self._meta, ignore_index=True)
+        P = np.concatenate(self._paa)
+        med = feats.groupby(lab).median()
+        size = np.bincount(lab, minlength=self.n_clusters)
+        rep = pd.Series(self.distance_).groupby(lab).idxmin()
+        src = pd.crosstab(lab, meta["source"].to_numpy(), normalize="index")
+        rows = []
+        for c in range(self.n_clusters):
+            if size[c] == 0:
+                continue
+            f = med.loc[c].to_dict()
+            rows.append({
+                "cluster": c,
+                "size": int(size[c]),
+                "share": round(size[c] / len(lab), 4),
+                "label": label_cluster(f),
+                **{k: round(float(v), 4) for k, v in f.items()},
+                "top_source": src.loc[c].idxmax(),
+                "top_source_share": round(float(src.loc[c].max()), 4),
+                "representative": meta.loc[rep.loc[c], "series_id"],
+                "shape": P[lab == c].mean(axis=0).round(3).tolist(),
+            })
+        return pd.DataFrame(rows)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+# Benchmark del atlas (atlas.py) vs número de series: embedding por bloques +
+# MiniBatchKMeans. Las series se generan por chunks (run.simulate_sources) y se
+# descartan tras el embedding: la memoria pico es la del chunk + embeddings.
+#
+#   python src/bench_clustering.py --counts 10000 25000 50000 100000
+#
+# Para comparar se muestra lo que ocuparía la matriz de distancias n x n
+# (float64) que requerirían el clustering jerárquico o k-medoids.
+
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+from sklearn.metrics import adjusted_rand_score
+
+from atlas import CLUSTERS, REPRS, TrendAtlas
+from run import simulate_sources
+
+
+def run_once(n: int, chunk: int, repr: str, clusters: int):
+    atlas = TrendAtlas(clusters, repr=repr)
+    truth = []
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    for a in range(0, n, chunk):
+        for X, meta in simulate_sources(min(chunk, n - a), seed=a, start_id=a):
+            atlas.add(X, meta)
+            truth.append(meta["archetype"])
+    t1 = time.perf_counter()
+    atlas.fit()
+    t2 = time.perf_counter()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    ari = adjusted_rand_score(pd.concat(truth, ignore_index=True), atlas.labels_)
+    return t1 - t0, t2 - t1, peak, atlas.embedding().nbytes, ari
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--counts", type=int, nargs="+", default=[10_000, 25_000, 50_000, 100_000])
+    ap.add_argument("--chunk", type=int, default=10_000)
+    ap.add_argument("--clusters", type=int, default=CLUSTERS)
+    ap.add_argument("--repr", choices=REPRS, default="paa")
+    args = ap.parse_args()
+
+    print(f"repr={args.repr}, k={args.clusters}, chunks of {args.chunk:,} series "
+          "(generation + align + embed timed together)\n")
+    print(f"{'series':>9} {'embed s':>8} {'fit s':>7} {'fit us/series':>14} {'peak MB':>8} "
+          f"{'emb MB':>7} {'n x n MB':>10} {'ARI':>6}")
+    for n in args.counts:
+        embed, fit, peak, emb, ari = run_once(n, args.chunk, args.repr, args.clusters)
+        print(f"{n:>9,} {embed:>8.2f} {fit:>7.2f} {fit / n * 1e6:>14.1f} {peak / 1e6:>8.0f} "
+              f"{emb / 1e6:>7.1f} {n * n * 8 / 1e6:>10,.0f} {ari:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+# Benchmark del índice de series parecidas (similarity.py) vs búsqueda exacta.
+# Las formas se generan por chunks (run.simulate_sources -> align -> znorm ->
+# PAA de SHAPE_POINTS) y se insertan de forma incremental; las consultas son
+# series nuevas (no indexadas) del mismo generador.
+#
+#   python src/bench_similarity.py --counts 100000 1000000 --queries 500 -k 10
+#
+# recall@k = |top-k del índice ∩ top-k exacto| / k, promedio sobre consultas.
+# La latencia es por consulta individual (como la pide un analista), no en batch.
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from atlas import SHAPE_POINTS, align, paa, znorm
+from run import simulate_sources
+from similarity import TOP_K, TrendIndex, exact_search
+
+
+def shapes(n: int, seed: int, start_id: int = 0, chunk: int = 50_000):
+    # -> (formas (n, SHAPE_POINTS) float32, series_id), generadas por chunks
+    V, ids = [], []
+    for a in range(0, n, chunk):
+        for X, meta in simulate_sources(min(chunk, n - a), seed=seed + a, start_id=start_id + a):
+            V.append(paa(znorm(align(X)), SHAPE_POINTS).astype(np.float32))
+            ids.append(meta["series_id"].to_numpy())
+    return np.concatenate(V), np.concatenate(ids)
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--counts", type=int, nargs="+", default=[100_000, 1_000_000])
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("-k", type=int, default=TOP_K)
+    ap.add_argument("--batch", type=int, default=10_000, help="series por inserción incremental")
+    ap.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16])
+    args = ap.parse_args()
+
+    Q, _ = shapes(args.queries, seed=10 ** 6, start_id=10 ** 9)
+    for n in args.counts:
+        V, ids = shapes(n, seed=0)
+        index = TrendIndex(V.shape[1])
+        _, t_train = timed(index.train, V[:min(n, 50_000)])
+        t0 = time.perf_counter()
+        for a in range(0, n, args.batch):
+            index.add(V[a:a + args.batch], ids[a:a + args.batch])
+        t_add = time.perf_counter() - t0
+        sizes = index.list_sizes()
+        print(f"\n{n:,} series x {V.shape[1]} points: train {t_train:.1f} s ({index.lists} lists), "
+              f"insert {t_add:.1f} s ({n / t_add:,.0f} series/s, batches of {args.batch:,}); "
+              f"index {index.nbytes / 1e6:.0f} MB; list size min/median/max "
+              f"{sizes.min()}/{np.median(sizes):.0f}/{sizes.max()}")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            _, t_save = timed(index.save, Path(tmp) / "index.npz")
+            index, t_load = timed(TrendIndex.load, Path(tmp) / "index.npz")
+        print(f"save {t_save:.2f} s, load {t_load:.2f} s")
+
+        truth, _ = exact_search(V, Q, args.k)
+        truth = ids[truth]
+        lat = []
+        for q in Q[:50]:
+            _, dt = timed(exact_search, V, q[None, :], args.k)
+            lat.append(dt)
+        print(f"{'exact':>10}: p50 {np.median(lat) * 1e3:6.2f} ms, p99 {np.percentile(lat, 99) * 1e3:6.2f} ms "
+              f"(brute force, one query at a time)")
+        for nprobe in args.nprobe:
+            lat, hits, cand = [], 0, 0
+            for i, q in enumerate(Q):
+                (r, _, c), dt = timed(index.search, q, args.k, nprobe)
+                lat.append(dt)
+                hits += len(np.intersect1d(r, truth[i]))
+                cand += c
+            print(f"nprobe={nprobe:>3}: p50 {np.median(lat) * 1e3:6.2f} ms, p99 {np.percentile(lat, 99) * 1e3:6.2f} ms, "
+                  f"recall@{args.k} {hits / (args.k * len(Q)):.3f}, candidates/query {cand / len(Q):,.0f} "
+                  f"({cand / len(Q) / n:.1%} of the index)")
+        del V, ids, index
+
+
+if __name__ == "__main__":
+    main()
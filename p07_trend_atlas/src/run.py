@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from sklearn.metrics import adjusted_rand_score
+
+from atlas import CLUSTERS, REPRS, TrendAtlas
+from similarity import TrendIndex
+
+HERE = Path(__file__).resolve().parent
+PROJECT = HERE.parent
+DATA = PROJECT / "data"
+OUT = PROJECT / "outputs"
+IMG = PROJECT / "img"
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.tables import OutputSpec, add_output_args, output_spec, save_table  # noqa: E402
+
+# fuentes con distinto muestreo sobre la misma ventana de un año
+SOURCES = {"sales_daily": 364, "web_12h": 728, "ops_weekly": 52}
+ARCHETYPES = ["rising", "falling", "seasonal", "step_up", "step_down", "hump", "exp_growth", "spike", "flat"]
+
+def ensure_dirs():
+    DATA.mkdir(parents=True, exist_ok=True)
+    OUT.mkdir(parents=True, exist_ok=True)
+    IMG.mkdir(parents=True, exist_ok=True)
+
+def _shape(k: int, U: np.ndarray, c: np.ndarray, w: np.ndarray) -> np.ndarray:
+    # forma del arquetipo k sobre el tiempo normalizado U in [0, 1], magnitud ~1;
+    # c in [0.3, 0.7] (posición del evento) y w in [0, 1] (curvatura, período, ...)
+    name = ARCHETYPES[k]
+    if name == "rising":
+        return 2 * U ** (0.5 + 1.5 * w) - 1
+    if name == "falling":
+        return 1 - 2 * U ** (0.5 + 1.5 * w)
+    if name == "seasonal":
+        return np.sin(2 * np.pi * (4 + 9 * w) * U + 2 * np.pi * c)
+    if name == "step_up":
+        return np.where(U > c, 1.0, -1.0)
+    if name == "step_down":
+        return np.where(U > c, -1.0, 1.0)
+    if name == "hump":
+        return 2 * np.exp(-((U - c) / (0.1 + 0.2 * w)) ** 2) - 1
+    if name == "exp_growth":
+        r = 2 + 4 * w
+        return 2 * np.expm1(r * U) / np.expm1(r) - 1
+    if name == "spike":
+        return 3 * np.exp(-((U - c) / 0.02) ** 2)
+    return np.zeros_like(U * c)
+
+def simulate_sources(n_series: int = 6000, seed: int = 7, start_id: int = 0) -> List[Tuple[np.ndarray, pd.DataFrame]]:
+    # un bloque (series x períodos de la fuente) por fuente; ~2% de huecos (NaN).
+    # "flat" no es constante: deriva lenta (paseo aleatorio suave) sin tendencia neta
+    rng = np.random.default_rng(seed)
+    names = list(SOURCES)
+    src = rng.integers(0, len(names), size=n_series)
+    arch = rng.integers(0, len(ARCHETYPES), size=n_series)
+    blocks = []
+    for s, name in enumerate(names):
+        idx = np.flatnonzero(src == s)
+        m, T = len(idx), SOURCES[name]
+        U = np.linspace(0.0, 1.0, T)[None, :]
+        a = arch[idx]
+        c = rng.uniform(0.3, 0.7, size=(m, 1))
+        w = rng.uniform(0.0, 1.0, size=(m, 1))
+        shape = np.zeros((m, T))
+        for k in np.unique(a):
+            r = a == k
+            shape[r] = _shape(k, U, c[r], w[r])
+        flat = a == ARCHETYPES.index("flat")
+        walk = np.cumsum(rng.normal(0, 1, size=(int(flat.sum()), 8)), axis=1)
+        shape[flat] = 0.15 * (walk - walk.mean(axis=1, keepdims=True))[:, np.minimum((U[0] * 8).astype(int), 7)]
+        amp = rng.uniform(0.2, 0.6, size=(m, 1))
+        noise = rng.normal(0, 1, size=(m, T)) * rng.uniform(0.02, 0.08, size=(m, 1))
+        X = rng.lognormal(4, 1, size=(m, 1)) * (1 + amp * shape + noise)
+        X[rng.random((m, T)) < 0.02] = np.nan
+        meta = pd.DataFrame({
+            "series_id": start_id + idx,
+            "source": name,
+            "archetype": np.array(ARCHETYPES, dtype=object)[a],
+        })
+        blocks.append((X, meta))
+    return blocks
+
+def build_atlas(blocks, n_clusters: int = CLUSTERS, repr: str = "paa") -> TrendAtlas:
+    atlas = TrendAtlas(n_clusters, repr=repr)
+    for X, meta in blocks:
+        atlas.add(X, meta)
+    atlas.fit()
+    return atlas
+
+def build_index(atlas: TrendAtlas) -> TrendIndex:
+    # índice de series parecidas sobre las formas z-normalizadas del atlas
+    index = TrendIndex(atlas.shapes().shape[1])
+    index.add(atlas.shapes(), atlas.series_ids())
+    return index
+
+def save_outputs(trends: pd.DataFrame, summary: pd.DataFrame, atlas: TrendAtlas, index: TrendIndex,
+                 spec: OutputSpec = OutputSpec()) -> List[Path]:
+    paths = save_table(trends.drop(columns=["archetype"]), OUT / "trends", spec)
+    paths.append(index.save(OUT / "trend_index.npz"))
+    summary = summary.sort_values("size", ascending=False, kind="stable")
+
+    # plot: forma media (PAA z-normalizada) de cada cluster
+    k = len(summary)
+    cols = 3
+    rows = -(-k // cols)
+    fig, axes = plt.subplots(rows, cols, figsize=(10, 2.4 * rows), sharex=True, sharey=True, squeeze=False)
+    for ax, (_, c) in zip(axes.ravel(), summary.iterrows()):
+        ax.plot(c["shape"], marker=".", lw=1.2)
+        ax.axhline(0, color="gray", lw=0.5)
+        ax.set_title(f"C{c['cluster']} {c['label']} (n={c['size']:,})", fontsize=9)
+    for ax in axes.ravel()[k:]:
+        ax.axis("off")
+    fig.suptitle("P07 — Trend Atlas (cluster shapes, z-normalized PAA)")
+    fig.tight_layout()
+    fig.savefig(IMG / "p07_trend_atlas_plot.png", dpi=160)
+    plt.close(fig)
+
+    ari = adjusted_rand_score(trends["archetype"], trends["cluster"])
+    report = []
+    report.append("# P07 — Trend Atlas (V1 report)\n")
+    counts = trends["source"].value_counts()
+    report.append(f"- Series: {len(trends):,} from {len(counts)} sources "
+                  f"({', '.join(f'{s}: {c:,}' for s, c in counts.items())})")
+    report.append(f"- Aligned to {atlas.length} points; representation: {atlas.repr} "
+                  f"({atlas.embedding().shape[1]} dims); clusters: {atlas.n_clusters} (mini-batch k-means)")
+    report.append(f"- Agreement with simulated archetypes (ARI, demo only): {ari:.3f}")
+    report.append(f"- Similarity index: {index.n:,} shapes of {index.dim} points in {index.lists} lists "
+                  f"(k-means IVF, {index.nprobe} lists probed per query); `python src/similar.py --series-id ID`\n")
+    report.append("## Atlas\n")
+    for _, c in summary.iterrows():
+        report.append(f"### C{c['cluster']} — {c['label']}\n")
+        report.append(f"{c['size']:,} series ({c['share']:.0%}); median change {c['slope_pct']:+.1f}% over the window, "
+                      f"{c['momentum_pct']:+.1f}% in the last quarter; seasonality {c['seasonality']:.2f}, "
+                      f"volatility {c['volatility']:.2f}. Mostly `{c['top_source']}` ({c['top_source_share']:.0%}); "
+                      f"representative series: {c['representative']}.")
+        ids, dist = index.similar_to(c["representative"], k=5)
+        report.append("Most similar to the representative: "
+                      + ", ".join(f"{i} (d={d:.2f})" for i, d in zip(ids, dist)) + ".\n")
+    cols = ["series_id", "source", "cluster_label", "slope_pct", "momentum_pct", "sax"]
+    report.append("## Top rising series\n")
+    report.append(trends.nlargest(10, "trend_score")[cols].to_csv(index=False))
+    report.append("## Top falling series\n")
+    report.append(trends.nsmallest(10, "trend_score")[cols].to_csv(index=False))
+    (OUT / "atlas_report.md").write_text("\n".join(report), encoding="utf-8")
+    return paths
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--series", type=int, default=6000)
+    ap.add_argument("--clusters", type=int, default=CLUSTERS)
+    ap.add_argument("--repr", choices=REPRS, default="paa")
+    add_output_args(ap)
+    args = ap.parse_args()
+
+    ensure_dirs()
+    atlas = build_atlas(simulate_sources(args.series), args.clusters, args.repr)
+    summary = atlas.clusters()
+    trends = atlas.frame(summary)
+    paths = save_outputs(trends, summary, atlas, build_index(atlas), output_spec(args))
+
+    print("OK — Generated outputs:")
+    for path in paths:
+        print(f"- {path}")
+    print(f"- {OUT / 'atlas_report.md'}")
+    print(f"- {IMG / 'p07_trend_atlas_plot.png'}")
+
+if __name__ == "__main__":
+    main()
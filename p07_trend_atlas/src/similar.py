@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+# "¿Qué otras series se parecen a esta?": consulta el índice persistido por run.py
+# (outputs/trend_index.npz) y, si existe, cruza con outputs/trends.* para mostrar
+# fuente y cluster de cada vecina.
+#
+#   python src/similar.py --series-id 1641 -k 10
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from similarity import TOP_K, TrendIndex
+
+HERE = Path(__file__).resolve().parent
+PROJECT = HERE.parent
+OUT = PROJECT / "outputs"
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.tables import find_table, read_table  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--series-id", type=int, required=True)
+    ap.add_argument("-k", type=int, default=TOP_K)
+    ap.add_argument("--index", type=Path, default=OUT / "trend_index.npz")
+    args = ap.parse_args()
+
+    index = TrendIndex.load(args.index)
+    t0 = time.perf_counter()
+    try:
+        ids, dist = index.similar_to(args.series_id, args.k)
+    except KeyError as e:
+        raise SystemExit(f"error: {e.args[0]}")
+    dt = time.perf_counter() - t0
+    res = pd.DataFrame({"series_id": ids, "distance": dist.round(3)})
+    try:
+        trends = read_table(find_table(OUT / "trends"))
+        cols = ["series_id", "source", "cluster_label", "slope_pct", "sax"]
+        res = res.merge(trends[cols], on="series_id", how="left")
+    except FileNotFoundError:
+        pass
+    print(f"{len(res)} series most similar to {args.series_id} ({dt * 1e3:.2f} ms, {index.n:,} indexed)")
+    print(res.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+# Índice de "series parecidas": listas invertidas sobre un cuantizador k-means
+# (IVF) y re-ranking exacto de los candidatos.
+#
+# Los vectores indexados son formas z-normalizadas (atlas.shapes()). Buena parte
+# del catálogo se concentra en pocas formas (crecimiento, caída, ...): con LSH por
+# hiperplanos esos buckets crecen con n y una consulta en zona densa re-rankea
+# cientos de miles de candidatos. El cuantizador k-means pone más listas donde hay
+# más series, así que el tamaño de lista (y el costo de consulta) queda acotado
+# también en zonas densas.
+#
+#   train      MiniBatchKMeans con LISTS centroides sobre una muestra (TRAIN
+#              vectores) del primer bloque insertado
+#   inserción  cada vector va a la lista de su centroide más cercano; los nuevos
+#              quedan en un delta sin ordenar que se recorre linealmente y al
+#              superar MERGE items se intercala (ordenado) con np.insert: O(n), sin
+#              re-ordenar todo
+#   consulta   las NPROBE listas más cercanas -> distancia exacta
+#              (|v|^2 - 2 v.q + |q|^2) -> argpartition top-k
+#
+# Los centroides no se re-entrenan al insertar: si la mezcla de formas cambia
+# mucho, las listas se desbalancean y conviene reconstruir el índice.
+# save() / load(): un .npz con centroides, vectores, ids y las listas ya
+# ordenadas (cargar no re-asigna).
+
+LISTS = 1024
+NPROBE = 8
+TRAIN = 65536
+MERGE = 4096
+TOP_K = 10
+
+
+def exact_search(V: np.ndarray, Q: np.ndarray, k: int = TOP_K, cells: int = 1 << 24) -> Tuple[np.ndarray, np.ndarray]:
+    # referencia por fuerza bruta -> (filas (m, k), distancias (m, k)); bloques de
+    # consultas con a lo más `cells` distancias (m x n) en memoria
+    V = np.asarray(V, dtype=np.float32)
+    Q = np.asarray(Q, dtype=np.float32)
+    vn = np.einsum("ij,ij->i", V, V)
+    k = min(k, len(V))
+    block = max(1, cells // max(len(V), 1))
+    rows = np.empty((len(Q), k), dtype=np.int64)
+    dist = np.empty((len(Q), k), dtype=np.float32)
+    for a in range(0, len(Q), block):
+        q = Q[a:a + block]
+        d2 = vn[None, :] - 2 * (q @ V.T) + np.einsum("ij,ij->i", q, q)[:, None]
+        part = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        dp = np.take_along_axis(d2, part, axis=1)
+        o = np.argsort(dp, axis=1, kind="stable")
+        rows[a:a + block] = np.take_along_axis(part, o, axis=1)
+        dist[a:a + block] = np.sqrt(np.maximum(np.take_along_axis(dp, o, axis=1), 0))
+    return rows, dist
+
+
+class TrendIndex:
+    def __init__(self, dim: int, lists: int = LISTS, nprobe: int = NPROBE, seed: int = 7):
+        self.dim, self.lists, self.nprobe, self.seed = dim, lists, nprobe, seed
+        self.centroids: Optional[np.ndarray] = None
+        self._cnorm = np.empty(0, dtype=np.float32)
+        self._vec = np.empty((0, dim), dtype=np.float32)
+        self._norm = np.empty(0, dtype=np.float32)    # |v|^2
+        self._ids = np.empty(0, dtype=np.int64)
+        self._list = np.empty(0, dtype=np.int64)
+        self._keys = np.empty(0, dtype=np.int64)      # listas ordenadas de [0, _merged)
+        self._rows = np.empty(0, dtype=np.int64)
+        self._merged = 0
+        self.n = 0
+
+    def train(self, V: np.ndarray) -> None:
+        # al menos ~32 vectores por lista; muestra de a lo más TRAIN vectores
+        V = np.asarray(V, dtype=np.float32)
+        rng = np.random.default_rng(self.seed)
+        if len(V) > TRAIN:
+            V = V[rng.choice(len(V), TRAIN, replace=False)]
+        self.lists = max(1, min(self.lists, len(V) // 32))
+        km = MiniBatchKMeans(self.lists, batch_size=4096, n_init=1, random_state=self.seed).fit(V)
+        self.centroids = km.cluster_centers_.astype(np.float32)
+        self._cnorm = np.einsum("ij,ij->i", self.centroids, self.centroids)
+
+    def _nearest_lists(self, V: np.ndarray, n: int = 1) -> np.ndarray:
+        # -> (m, n) listas más cercanas (sin orden interno)
+        if n >= self.lists:
+            return np.broadcast_to(np.arange(self.lists), (len(V), self.lists))
+        d2 = self._cnorm[None, :] - 2 * (V @ self.centroids.T)
+        if n == 1:
+            return d2.argmin(axis=1)[:, None]
+        return np.argpartition(d2, n - 1, axis=1)[:, :n]
+
+    def _grow(self, n: int) -> None:
+        have = len(self._vec)
+        if n <= have:
+            return
+        n = max(n, 2 * have)
+        self._vec = np.concatenate((self._vec, np.empty((n - have, self.dim), dtype=np.float32)))
+        self._norm = np.concatenate((self._norm, np.empty(n - have, dtype=np.float32)))
+        self._ids = np.concatenate((self._ids, np.empty(n - have, dtype=np.int64)))
+        self._list = np.concatenate((self._list, np.empty(n - have, dtype=np.int64)))
+
+    def add(self, V: np.ndarray, ids: np.ndarray) -> None:
+        V = np.ascontiguousarray(V, dtype=np.float32)
+        ids = np.asarray(ids, dtype=np.int64)
+        if V.ndim != 2 or V.shape[1] != self.dim:
+            raise ValueError(f"expected vectors of shape (m, {self.dim}), got {V.shape}")
+        if len(V) != len(ids):
+            raise ValueError(f"{len(V)} vectors but {len(ids)} ids")
+        if self.centroids is None:
+            self.train(V)
+        a, b = self.n, self.n + len(V)
+        self._grow(b)
+        self._vec[a:b] = V
+        self._norm[a:b] = np.einsum("ij,ij->i", V, V)
+        self._ids[a:b] = ids
+        for s in range(0, len(V), 8192):
+            self._list[a + s:min(a + s + 8192, b)] = self._nearest_lists(V[s:s + 8192])[:, 0]
+        self.n = b
+        if self.n - self._merged >= MERGE:
+            self._merge()
+
+    def _merge(self) -> None:
+        # intercala el delta (ordenado por lista) en las listas ordenadas
+        a, b = self._merged, self.n
+        if a == b:
+            return
+        o = np.argsort(self._list[a:b], kind="stable")
+        keys, rows = self._list[a:b][o], a + o
+        pos = np.searchsorted(self._keys, keys, side="right")
+        self._keys = np.insert(self._keys, pos, keys)
+        self._rows = np.insert(self._rows, pos, rows)
+        self._merged = b
+
+    @property
+    def nbytes(self) -> int:
+        n = self.n
+        return (self._vec[:n].nbytes + self._norm[:n].nbytes + self._ids[:n].nbytes + self._list[:n].nbytes
+                + self._keys.nbytes + self._rows.nbytes + (0 if self.centroids is None else self.centroids.nbytes))
+
+    def list_sizes(self) -> np.ndarray:
+        return np.bincount(self._list[:self.n], minlength=self.lists)
+
+    def candidates(self, q: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        # filas de las nprobe listas más cercanas a q
+        probe = self._nearest_lists(q[None, :], nprobe or self.nprobe)[0]
+        lo = np.searchsorted(self._keys, probe, side="left")
+        hi = np.searchsorted(self._keys, probe, side="right")
+        size = hi - lo
+        # rangos [lo, hi) -> posiciones sin bucle Python
+        start = np.repeat(lo - np.concatenate(([0], np.cumsum(size)[:-1])), size)
+        found = self._rows[start + np.arange(size.sum())]
+        a = self._merged
+        if a < self.n:
+            found = np.concatenate((found, a + np.flatnonzero(np.isin(self._list[a:self.n], probe))))
+        return found
+
+    def search(self, q: np.ndarray, k: int = TOP_K, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, int]:
+        # -> (ids, distancias, n candidatos); menos de k si las listas visitadas tienen menos
+        if self.centroids is None:
+            raise RuntimeError("empty index: add() vectors first")
+        q = np.asarray(q, dtype=np.float32)
+        rows = self.candidates(q, nprobe)
+        d2 = np.maximum(self._norm[rows] - 2 * (self._vec[rows] @ q) + q @ q, 0)
+        n_cand = len(rows)
+        if n_cand > k:
+            part = np.argpartition(d2, k - 1)[:k]
+            rows, d2 = rows[part], d2[part]
+        o = np.argsort(d2, kind="stable")
+        return self._ids[rows[o]], np.sqrt(d2[o]), n_cand
+
+    def search_many(self, Q: np.ndarray, k: int = TOP_K, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        # -> (ids (m, k), distancias (m, k)); huecos con id -1 y distancia inf
+        ids = np.full((len(Q), k), -1, dtype=np.int64)
+        dist = np.full((len(Q), k), np.inf)
+        for i, q in enumerate(Q):
+            r, d, _ = self.search(q, k, nprobe)
+            ids[i, :len(r)], dist[i, :len(d)] = r, d
+        return ids, dist
+
+    def similar_to(self, series_id: int, k: int = TOP_K) -> Tuple[np.ndarray, np.ndarray]:
+        # vecinos de una serie ya indexada (sin ella misma)
+        row = np.flatnonzero(self._ids[:self.n] == series_id)
+        if not len(row):
+            raise KeyError(f"series_id {series_id} is not in the index")
+        ids, dist, _ = self.search(self._vec[row[0]], k + 1)
+        keep = ids != series_id
+        return ids[keep][:k], dist[keep][:k]
+
+    def save(self, path: Union[str, Path]) -> Path:
+        if self.centroids is None:
+            raise RuntimeError("empty index: nothing to save")
+        self._merge()
+        path = Path(path)
+        with open(path, "wb") as f:
+            np.savez(f, centroids=self.centroids, vectors=self._vec[:self.n], ids=self._ids[:self.n],
+                     lists=self._list[:self.n], keys=self._keys, rows=self._rows,
+                     params=np.array([self.nprobe, self.seed]))
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "TrendIndex":
+        with np.load(path) as z:
+            nprobe, seed = (int(x) for x in z["params"])
+            idx = cls(z["vectors"].shape[1], len(z["centroids"]), nprobe, seed)
+            idx.centroids = z["centroids"]
+            idx._vec, idx._ids, idx._list = z["vectors"], z["ids"], z["lists"]
+            idx._keys, idx._rows = z["keys"], z["rows"]
+        idx._cnorm = np.einsum("ij,ij->i", idx.centroids, idx.centroids)
+        idx._norm = np.einsum("ij,ij->i", idx._vec, idx._vec)
+        idx.n = idx._merged = len(idx._ids)
+        return idx
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+# Benchmark de la evaluación de reglas (dq_rules.py) sobre pedidos simulados
+# (run.simulate_orders, escritos a CSV y releídos como en producción).
+#
+#   python src/bench_dq_rules.py --rows 1000000 --rules 300
+#
+# Reglas: las de data/dq_rules.json más reglas sintéticas (range / in_set /
+# regex / ref / not_null / expr con parámetros aleatorios, severity warn) hasta --rules.
+# Compara el plan fusionado (columna leída una vez, range por broadcasting,
+# strings sobre distintos) contra una regla por pasada; paridad: mismos conteos
+# de violaciones por regla (y unique igual a duplicated() sobre toda la carga,
+# aunque los duplicados caigan en bloques distintos). Fail-fast: una carga con `status` corrupto se
+# rechaza en el primer bloque chico en vez de después de leer todo el archivo.
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dq_rules import RulePlan, check_csv, check_frames, load_rules, parse_rules
+from profiler import infer_schema
+from run import COUNTRIES, RULES, STATUSES, write_orders
+
+
+def synthetic_rules(n: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    specs = []
+    for i in range(n):
+        kind = rng.choice(["range", "range", "range", "in_set", "regex", "ref", "not_null", "expr"])
+        r = {"id": f"r{i:04d}_{kind}", "type": str(kind), "severity": "warn", "threshold": 0.05}
+        if kind == "range":
+            col, lo, hi = [("amount", 0, 2000), ("quantity", 0, 12), ("discount", 0, 1.2),
+                           ("customer_id", 0, 60_000), ("order_id", 0, 3e6)][rng.integers(5)]
+            r.update(column=col, min=float(rng.uniform(lo, lo + (hi - lo) * 0.1)),
+                     max=float(rng.uniform(hi * 0.5, hi)))
+        elif kind == "in_set":
+            col, pool = [("country", COUNTRIES), ("status", STATUSES)][rng.integers(2)]
+            r.update(column=col, values=list(rng.choice(pool, rng.integers(2, len(pool) + 1), replace=False)))
+        elif kind == "regex":
+            r.update(column="email", pattern=f"user\\d{{1,{rng.integers(3, 7)}}}@[a-z]+\\.(com|org)")
+        elif kind == "ref":
+            r.update(column="country", table="p08_countries.csv", ref_column="code")
+        elif kind == "not_null":
+            r.update(column=str(rng.choice(["amount", "country", "shipped_at", "email"])))
+        else:
+            r.update(expr=f"amount * (1 - discount) <= {float(rng.uniform(500, 5000)):.0f}")
+        specs.append(r)
+    return specs
+
+
+def timed(fn, *args, **kw):
+    t0 = time.perf_counter()
+    out = fn(*args, **kw)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--rules", type=int, default=300, help="total de reglas (archivo + sintéticas)")
+    ap.add_argument("--chunksize", type=int, default=200_000)
+    args = ap.parse_args()
+
+    base = load_rules(RULES)
+    rules = base + parse_rules({"rules": synthetic_rules(max(0, args.rules - len(base)))}, RULES.parent)
+    with tempfile.TemporaryDirectory() as tmp:
+        good = write_orders(Path(tmp) / "orders.csv", args.rows)
+        frames = list(pd.read_csv(good, chunksize=args.chunksize, low_memory=False))
+        schema = infer_schema(frames[0].head(10_000))
+        print(f"{args.rows:,} rows in {len(frames)} batches, {len(rules)} rules "
+              f"({pd.Series([r.type for r in rules]).value_counts().to_dict()})")
+
+        fused, unfused = RulePlan(rules, schema), RulePlan(rules, schema, fuse=False)
+        print(f"groups: fused {len(fused.groups)}, unfused {len(unfused.groups)}")
+        res_f, t_f = timed(check_frames, frames, fused)
+        res_u, t_u = timed(check_frames, frames, unfused)
+        vf = {s.rule.id: s.violations for s in res_f.stats}
+        vu = {s.rule.id: s.violations for s in res_u.stats}
+        assert vf == vu, "fused and unfused plans disagree"
+        print(f"parity OK: {sum(vf.values()):,} violations over {len(vf)} rules")
+        # unique cuenta duplicados de toda la carga, no solo dentro de cada bloque
+        ids = pd.concat([df["order_id"] for df in frames])
+        assert vf["order_id_unique"] == int((ids.duplicated() & ids.notna()).sum()), "unique misses cross-batch dups"
+        uniq = RulePlan([r for r in base if r.type == "unique"], schema)
+        once = check_frames(frames[:1], uniq).stats[0].violations
+        twice = check_frames(frames[:1] * 2, uniq).stats[0].violations
+        assert twice == once + frames[0]["order_id"].notna().sum(), "a replayed batch must be all duplicates"
+        print(f"{'unfused':>8}: {t_u:6.2f} s ({args.rows / t_u:,.0f} rows/s, "
+              f"{args.rows * len(rules) / t_u / 1e6:,.0f} M rule-rows/s)")
+        print(f"{'fused':>8}: {t_f:6.2f} s ({args.rows / t_f:,.0f} rows/s, "
+              f"{args.rows * len(rules) / t_f / 1e6:,.0f} M rule-rows/s), speedup {t_u / t_f:.1f}x")
+        top = res_f.frame().nlargest(5, "amortized_ms")[["rule_id", "columns", "amortized_ms"]]
+        print("slowest rules (amortized):\n" + top.to_string(index=False))
+
+        # carga mala: status en mayúsculas desde la primera fila (status_valid es block)
+        bad = Path(tmp) / "orders_bad.csv"
+        with open(bad, "w", newline="") as f:
+            for i, df in enumerate(pd.read_csv(good, chunksize=args.chunksize, low_memory=False)):
+                df["status"] = df["status"].str.upper()
+                df.to_csv(f, index=False, header=i == 0)
+        full, t_full = timed(check_csv, bad, fused, args.chunksize)
+        fast, t_fast = timed(check_csv, bad, fused, args.chunksize, fail_fast=True)
+        assert not full.passed and not fast.passed and fast.stopped_early
+        print(f"\nbad load: full scan {t_full:.2f} s ({full.rows:,} rows) -> BLOCK; "
+              f"fail-fast {t_fast * 1e3:.0f} ms ({fast.rows:,} rows, {fast.batches} batch) -> BLOCK by {fast.blocked_by}")
+        clean, t_clean = timed(check_csv, good, fused, args.chunksize, fail_fast=True)
+        print(f"good load with fail-fast: {t_clean:.2f} s ({clean.rows:,} rows, no early stop: {not clean.stopped_early})")
+
+
+if __name__ == "__main__":
+    main()
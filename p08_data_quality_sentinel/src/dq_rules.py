@@ -0,0 +1,495 @@
+from __future__ import annotations
+
+import ast
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from profiler import as_float, csv_options
+from sketches import hash_values
+
+# Reglas de calidad declarativas (JSON, o YAML si PyYAML está instalado)
+# compiladas a máscaras vectorizadas, evaluadas por bloque.
+#
+# Formato:
+# {"rules": [
+#   {"id": "amount_range", "type": "range", "column": "amount", "min": 0, "max": 10000,
+#    "severity": "block", "threshold": 0.001},
+#   {"id": "ship_after_order", "type": "expr", "expr": "shipped_at >= ts"}, ...]}
+#
+#   not_null    column sin nulos
+#   parseable   los no nulos se leen con el tipo del schema (numeric / datetime)
+#   range       min <= x <= max (numeric o datetime; fechas como texto ISO)
+#   in_set      values: lista permitida
+#   regex       pattern: fullmatch sobre el texto
+#   ref         referencial: table (CSV, ruta relativa al archivo de reglas) + ref_column
+#   unique      sin duplicados en toda la carga: cada bloque se cruza con los
+#               hashes (64 bits) de los valores ya vistos, ~8 bytes por valor
+#   expr        expresión entre columnas: comparaciones, + - * /, abs(), and / or / not
+#
+# Una regla falla si violaciones / filas de toda la carga > threshold (default 0):
+# la decisión no depende del tamaño de bloque. Con max_batch_rate (opcional)
+# también falla si un solo bloque supera esa tasa. severity "block" rechaza la
+# carga, "warn" solo se reporta. Los nulos no violan reglas de valor (eso es
+# not_null) y en expr una fila con nulos en sus columnas no se evalúa.
+#
+# Fusión: las reglas se agrupan por columna y cada columna se lee una sola vez
+# por bloque (cache de nulos / valores / diccionario). Los range de una columna se
+# evalúan juntos por broadcasting (filas x reglas); regex / in_set / ref se
+# evalúan sobre los valores distintos del bloque (pd.factorize) y los conteos
+# salen de bincount(codes) @ (distintos x reglas): el costo va con la
+# cardinalidad, no con las filas. El costo compartido (leer / factorizar la
+# columna) se reparte entre las reglas del grupo en amortized_ms.
+#
+# fail_fast: grupos con reglas "block" primero (de más barato a más caro) y se
+# corta en cuanto una regla block ya no puede pasar: violaciones acumuladas >
+# threshold x filas totales (total_rows; check_csv lo cuenta por saltos de línea,
+# una cota por arriba, y sin total solo cuenta threshold 0) o un bloque sobre su
+# max_batch_rate. Con check_csv el primer bloque es chico (FIRST filas) para
+# rechazar en milisegundos.
+
+try:
+    import yaml
+except ImportError:  # dependencia opcional
+    yaml = None
+
+TYPES = ("not_null", "parseable", "range", "in_set", "regex", "ref", "unique", "expr")
+SEVERITIES = ("block", "warn")
+COST = {"not_null": 0, "parseable": 1, "range": 1, "in_set": 2, "ref": 2, "regex": 3, "unique": 4, "expr": 5}
+FIRST = 4096
+EXAMPLES = 3
+
+
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    type: str
+    columns: Tuple[str, ...]
+    severity: str = "warn"
+    threshold: float = 0.0
+    max_batch_rate: Optional[float] = None
+    params: dict = field(default_factory=dict, compare=False)
+    description: str = ""
+
+
+def parse_rules(spec: dict, base: Optional[Path] = None) -> List[Rule]:
+    out, ids = [], set()
+    for r in spec["rules"]:
+        rid, typ = str(r["id"]), str(r["type"])
+        if rid in ids:
+            raise ValueError(f"duplicated rule id {rid!r}")
+        ids.add(rid)
+        if typ not in TYPES:
+            raise ValueError(f"rule {rid!r}: unknown type {typ!r}; expected one of {TYPES}")
+        sev = str(r.get("severity", "warn"))
+        if sev not in SEVERITIES:
+            raise ValueError(f"rule {rid!r}: severity must be one of {SEVERITIES}")
+        params = {k: v for k, v in r.items()
+                  if k not in ("id", "type", "column", "severity", "threshold", "max_batch_rate", "description")}
+        if typ == "expr":
+            cols = tuple(_expr_columns(str(r["expr"])))
+        else:
+            cols = (str(r["column"]),)
+        if typ == "ref":
+            table = Path(r["table"])
+            table = table if table.is_absolute() or base is None else base / table
+            ref = pd.read_csv(table, usecols=[r["ref_column"]], dtype=str)[r["ref_column"]]
+            params["values"] = ref.dropna().unique().tolist()
+        if typ == "regex":
+            re.compile(r["pattern"])
+        mbr = r.get("max_batch_rate")
+        out.append(Rule(rid, typ, cols, sev, float(r.get("threshold", 0.0)), None if mbr is None else float(mbr),
+                        params, str(r.get("description", ""))))
+    return out
+
+
+def load_rules(path: Union[str, Path]) -> List[Rule]:
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in (".yaml", ".yml"):
+        if yaml is None:
+            raise ImportError(f"reading {path} requires PyYAML (pip install pyyaml)")
+        spec = yaml.safe_load(text)
+    else:
+        spec = json.loads(text)
+    return parse_rules(spec, path.parent)
+
+
+# --- expresiones entre columnas (ast restringido) -----------------------------
+
+_CMP = {ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater, ast.GtE: np.greater_equal,
+        ast.Eq: np.equal, ast.NotEq: np.not_equal}
+_BIN = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide}
+
+
+def _expr_columns(expr: str) -> List[str]:
+    tree = ast.parse(expr, mode="eval")
+    cols = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            if not (isinstance(node.func, ast.Name) and node.func.id == "abs" and len(node.args) == 1):
+                raise ValueError(f"{expr!r}: only abs(x) calls are allowed")
+        elif isinstance(node, ast.Name) and node.id != "abs" and node.id not in cols:
+            cols.append(node.id)
+        elif not isinstance(node, (ast.Expression, ast.Compare, ast.BoolOp, ast.BinOp, ast.UnaryOp, ast.Name,
+                                   ast.Constant, ast.Load, ast.And, ast.Or, ast.Not, ast.USub,
+                                   *_CMP, *_BIN)):
+            raise ValueError(f"{expr!r}: unsupported syntax {type(node).__name__}")
+    return cols
+
+
+def _eval(node: ast.AST, cols: Dict[str, np.ndarray]):
+    if isinstance(node, ast.Expression):
+        return _eval(node.body, cols)
+    if isinstance(node, ast.Name):
+        return cols[node.id]
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Call):
+        return np.abs(_eval(node.args[0], cols))
+    if isinstance(node, ast.UnaryOp):
+        v = _eval(node.operand, cols)
+        return ~v if isinstance(node.op, ast.Not) else -v
+    if isinstance(node, ast.BinOp):
+        return _BIN[type(node.op)](_eval(node.left, cols), _eval(node.right, cols))
+    if isinstance(node, ast.BoolOp):
+        vals = [_eval(v, cols) for v in node.values]
+        f = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        return f.reduce(vals)
+    if isinstance(node, ast.Compare):
+        out, left = None, _eval(node.left, cols)
+        for op, right in zip(node.ops, node.comparators):
+            right = _eval(right, cols)
+            m = _CMP[type(op)](left, right)
+            out = m if out is None else out & m
+            left = right
+        return out
+    raise ValueError(f"unsupported node {type(node).__name__}")
+
+
+# --- plan y evaluación ----------------------------------------------------------
+
+def _bound(v, kind: str) -> float:
+    if v is None:
+        return np.nan
+    if kind == "datetime":
+        return pd.Timestamp(v).timestamp()
+    return float(v)
+
+
+class _Batch:
+    # vistas de columnas de un bloque, calculadas una vez y compartidas entre reglas
+    def __init__(self, df: pd.DataFrame, schema: Dict[str, str]):
+        self.df, self.schema = df, schema
+        self._cache: Dict[Tuple[str, str], object] = {}
+
+    def _get(self, key: Tuple[str, str], fn: Callable):
+        if key not in self._cache:
+            self._cache[key] = fn()
+        return self._cache[key]
+
+    def null(self, c: str) -> np.ndarray:
+        return self._get((c, "null"), lambda: self.df[c].isna().to_numpy())
+
+    def values(self, c: str) -> np.ndarray:
+        if c not in self.df.columns:
+            return np.full(len(self.df), np.nan)
+        kind = self.schema.get(c, "string")
+        return self._get((c, "values"), lambda: as_float(self.df[c], "numeric" if kind == "string" else kind))
+
+    def keys(self, c: str) -> np.ndarray:
+        # hash por fila de la clave (numérica como float64, como en sketches)
+        kind = self.schema.get(c, "string")
+        return self._get((c, "keys"), lambda: hash_values(
+            self.values(c) if kind != "string" else self.df[c].astype(str).to_numpy(dtype=object)))
+
+    def factorized(self, c: str) -> Tuple[np.ndarray, np.ndarray]:
+        # (codes, distintos como texto); nulos -> código -1
+        def f():
+            codes, uniq = pd.factorize(self.df[c])
+            return codes, pd.Index(uniq).astype(str).to_numpy(dtype=object)
+        return self._get((c, "dict"), f)
+
+
+@dataclass
+class RuleStats:
+    rule: Rule
+    rows: int = 0
+    violations: int = 0
+    seconds: float = 0.0
+    failed_batches: int = 0                              # bloques sobre max_batch_rate
+    examples: List[int] = field(default_factory=list)   # filas (0-based, globales) con violación
+
+    @property
+    def violation_rate(self) -> float:
+        return self.violations / self.rows if self.rows else 0.0
+
+    @property
+    def failed(self) -> bool:
+        return bool(self.rows) and (self.violation_rate > self.rule.threshold or self.failed_batches > 0)
+
+    def settled(self, total_rows: Optional[int]) -> bool:
+        # la regla ya no puede pasar aunque el resto de la carga venga limpio
+        if total_rows is None:
+            return self.rule.threshold == 0 and self.violations > 0
+        return self.violations > self.rule.threshold * total_rows
+
+
+class _Group:
+    # reglas que comparten una columna (o una regla de varias columnas: expr)
+    def __init__(self, key: str, rules: List[Rule], schema: Dict[str, str]):
+        self.key, self.rules, self.schema = key, rules, schema
+        self.blocking = any(r.severity == "block" for r in rules)
+        self.cost = max(COST[r.type] for r in rules)
+        kind = schema.get(key, "string")
+        self.range = [i for i, r in enumerate(rules) if r.type == "range"]
+        if self.range:
+            self.lo = np.array([_bound(rules[i].params.get("min"), kind) for i in self.range])
+            self.hi = np.array([_bound(rules[i].params.get("max"), kind) for i in self.range])
+            self.lo[np.isnan(self.lo)], self.hi[np.isnan(self.hi)] = -np.inf, np.inf
+        self.numeric_set = kind != "string"
+        self.dict = [i for i, r in enumerate(rules) if r.type in ("regex", "ref") or (r.type == "in_set" and not self.numeric_set)]
+        self.sets = {i: np.array([str(v) for v in r.params["values"]], dtype=object) for i, r in enumerate(rules)
+                     if r.type == "ref" or (r.type == "in_set" and not self.numeric_set)}
+        self.regex = {i: re.compile(r.params["pattern"]) for i, r in enumerate(rules) if r.type == "regex"}
+        self.exprs = {i: ast.parse(r.params["expr"], mode="eval") for i, r in enumerate(rules) if r.type == "expr"}
+
+    def evaluate(self, b: _Batch, seen: Dict[str, np.ndarray]) -> Tuple[np.ndarray, List[Optional[np.ndarray]],
+                                                                         np.ndarray, float]:
+        # -> (violaciones por regla, máscara por regla (o None si 0), segundos propios por regla, segundos compartidos);
+        # seen: hashes ordenados de las claves ya vistas por regla unique (se actualiza)
+        n = len(b.df)
+        k = len(self.rules)
+        counts = np.zeros(k, dtype=np.int64)
+        masks: List[Optional[np.ndarray]] = [None] * k
+        own = np.zeros(k)
+        t0 = time.perf_counter()
+        c = self.key
+        if c not in b.df.columns and not self.exprs:
+            # columna ausente: todas las filas son nulas
+            for i, r in enumerate(self.rules):
+                if r.type == "not_null" and n:
+                    counts[i], masks[i] = n, np.ones(n, dtype=bool)
+            return counts, masks, own, time.perf_counter() - t0
+        shared = 0.0
+        if not self.exprs:
+            null = b.null(c)
+            if self.range or any(r.type in ("parseable", "in_set") and self.numeric_set for r in self.rules):
+                x = b.values(c)
+            if self.dict:
+                codes, uniq = b.factorized(c)
+                per_code = np.bincount(codes[codes >= 0], minlength=len(uniq))
+            shared = time.perf_counter() - t0
+        if self.range:
+            t = time.perf_counter()
+            with np.errstate(invalid="ignore"):
+                bad = (x[:, None] < self.lo) | (x[:, None] > self.hi)
+            got = bad.sum(axis=0)
+            for j, i in enumerate(self.range):
+                counts[i] = got[j]
+                if got[j]:
+                    masks[i] = bad[:, j]
+            own[self.range] += (time.perf_counter() - t) / len(self.range)
+        if self.dict:
+            t = time.perf_counter()
+            bad_u = np.zeros((len(uniq), len(self.dict)), dtype=bool)
+            for j, i in enumerate(self.dict):
+                ti = time.perf_counter()
+                if i in self.regex:
+                    pat = self.regex[i]
+                    bad_u[:, j] = [pat.fullmatch(s) is None for s in uniq]
+                else:
+                    bad_u[:, j] = ~pd.Index(uniq).isin(self.sets[i])
+                own[i] += time.perf_counter() - ti
+            got = per_code @ bad_u
+            t1 = time.perf_counter()
+            for j, i in enumerate(self.dict):
+                counts[i] = got[j]
+                if got[j]:
+                    masks[i] = np.append(bad_u[:, j], False)[codes]
+            shared += time.perf_counter() - t1
+        for i, r in enumerate(self.rules):
+            t = time.perf_counter()
+            if r.type == "not_null":
+                m = null
+            elif r.type == "parseable":
+                m = np.isnan(x) & ~null
+            elif r.type == "in_set" and self.numeric_set:
+                m = ~np.isin(x, np.asarray(r.params["values"], dtype=float)) & ~null
+            elif r.type == "unique":
+                # hashes del bloque ordenados (estable: la primera aparición va
+                # primero) y cruzados con los ya vistos por búsqueda binaria
+                h = b.keys(c)[~null]
+                order = np.argsort(h, kind="stable")
+                hs = h[order]
+                prev = seen.get(r.id, np.empty(0, dtype=np.uint64))
+                pos = np.searchsorted(prev, hs)
+                dup = np.r_[False, hs[1:] == hs[:-1]]
+                if len(prev):
+                    dup |= prev[np.minimum(pos, len(prev) - 1)] == hs
+                m = np.zeros(n, dtype=bool)
+                m[np.flatnonzero(~null)[order]] = dup
+                seen[r.id] = np.insert(prev, pos[~dup], hs[~dup])
+            elif r.type == "expr":
+                cols = {col: b.values(col) for col in r.columns}
+                with np.errstate(invalid="ignore"):
+                    ok = np.asarray(_eval(self.exprs[i], cols), dtype=bool)
+                m = ~ok & ~np.logical_or.reduce([np.isnan(v) for v in cols.values()])
+            else:
+                continue
+            counts[i] = int(m.sum())
+            if counts[i]:
+                masks[i] = m
+            own[i] += time.perf_counter() - t
+        return counts, masks, own, shared
+
+
+@dataclass
+class CheckResult:
+    stats: List[RuleStats]
+    rows: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    blocked_by: Optional[str] = None
+    stopped_early: bool = False
+    seen: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)  # claves de reglas unique
+
+    @property
+    def passed(self) -> bool:
+        return not any(s.rule.severity == "block" and s.failed for s in self.stats)
+
+    def score(self) -> float:
+        # 0-100: tasa de filas sin violación, ponderada (block x3, warn x1), sobre reglas evaluadas
+        w = np.array([3.0 if s.rule.severity == "block" else 1.0 for s in self.stats if s.rows])
+        ok = np.array([1 - s.violation_rate for s in self.stats if s.rows])
+        return float(100 * (w * ok).sum() / w.sum()) if len(w) else float("nan")
+
+    def frame(self) -> pd.DataFrame:
+        rows = []
+        for s in self.stats:
+            r = s.rule
+            if not s.rows:
+                status = "skipped"
+            elif s.failed:
+                status = "fail"
+            else:
+                status = "pass"
+            rows.append({
+                "rule_id": r.id,
+                "type": r.type,
+                "columns": ",".join(r.columns),
+                "severity": r.severity,
+                "threshold": r.threshold,
+                "max_batch_rate": np.nan if r.max_batch_rate is None else r.max_batch_rate,
+                "rows_checked": s.rows,
+                "violations": s.violations,
+                "violation_rate": round(s.violation_rate, 6),
+                "status": status,
+                "failed_batches": s.failed_batches,
+                "amortized_ms": round(s.seconds * 1e3, 3),
+                "examples": ",".join(map(str, s.examples)),
+            })
+        return pd.DataFrame(rows)
+
+
+class RulePlan:
+    def __init__(self, rules: List[Rule], schema: Dict[str, str], fuse: bool = True):
+        # fuse=False: un grupo y una lectura de columna por regla (línea base del bench)
+        self.rules, self.schema, self.fuse = list(rules), dict(schema), fuse
+        groups: Dict[Tuple[str, str], List[Rule]] = {}
+        for r in self.rules:
+            key = ("col", r.columns[0]) if fuse and r.type != "expr" else ("rule", r.id)
+            groups.setdefault(key, []).append(r)
+        self.groups = [_Group(rs[0].columns[0] if rs[0].type != "expr" else rs[0].id, rs, self.schema)
+                       for rs in groups.values()]
+        # reglas block primero, de más baratas a más caras (orden estable)
+        self.groups.sort(key=lambda g: (not g.blocking, g.cost))
+
+    def new_result(self) -> CheckResult:
+        return CheckResult([RuleStats(r) for r in self.rules])
+
+    def evaluate(self, df: pd.DataFrame, result: CheckResult, fail_fast: bool = False, offset: int = 0,
+                 total_rows: Optional[int] = None) -> bool:
+        # acumula un bloque en result; devuelve False si fail_fast cortó por una regla
+        # block que ya no puede pasar (RuleStats.settled o bloque sobre max_batch_rate)
+        stats = {s.rule.id: s for s in result.stats}
+        b = _Batch(df, self.schema)
+        n = len(df)
+        t0 = time.perf_counter()
+        result.batches += 1
+        result.rows += n
+        for g in self.groups:
+            counts, masks, own, shared = g.evaluate(b if self.fuse else _Batch(df, self.schema), result.seen)
+            blocked = None
+            for i, r in enumerate(g.rules):
+                s = stats[r.id]
+                s.rows += n
+                s.violations += int(counts[i])
+                s.seconds += own[i] + shared / len(g.rules)
+                over = r.max_batch_rate is not None and n and counts[i] / n > r.max_batch_rate
+                if over:
+                    s.failed_batches += 1
+                if r.severity == "block" and blocked is None and (over or s.settled(total_rows)):
+                    blocked = r.id
+                if counts[i] and len(s.examples) < EXAMPLES:
+                    s.examples += (offset + np.flatnonzero(masks[i])[:EXAMPLES - len(s.examples)]).tolist()
+            if fail_fast and blocked is not None:
+                result.blocked_by = result.blocked_by or blocked
+                result.stopped_early = True
+                result.seconds += time.perf_counter() - t0
+                return False
+        result.seconds += time.perf_counter() - t0
+        return True
+
+    def finish(self, result: CheckResult) -> CheckResult:
+        # decisión sobre las tasas acumuladas, una vez terminada la pasada
+        if result.blocked_by is None:
+            result.blocked_by = next((s.rule.id for s in result.stats if s.rule.severity == "block" and s.failed),
+                                     None)
+        return result
+
+
+def check_frames(frames: Iterable[pd.DataFrame], plan: RulePlan, fail_fast: bool = False,
+                 total_rows: Optional[int] = None) -> CheckResult:
+    result = plan.new_result()
+    offset = 0
+    for df in frames:
+        if not plan.evaluate(df, result, fail_fast, offset, total_rows):
+            break
+        offset += len(df)
+    return plan.finish(result)
+
+
+def count_rows(path: Union[str, Path]) -> int:
+    # filas de datos por saltos de línea (sin header): cota por arriba si hay
+    # líneas vacías o saltos dentro de comillas, que read_csv no cuenta como filas
+    n, last = 0, b"\n"
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            n += block.count(b"\n")
+            last = block[-1:]
+    return max(n + (last != b"\n") - 1, 0)
+
+
+def read_blocks(path: Union[str, Path], chunksize: int, first: int = 0,
+                schema: Optional[Dict[str, str]] = None) -> Iterable[pd.DataFrame]:
+    # read_csv por bloques con las opciones del profiler (columnas string como
+    # texto); el primero de `first` filas (si > 0) para decidir rápido
+    with pd.read_csv(path, chunksize=chunksize, **csv_options(schema or {})) as reader:
+        if first:
+            try:
+                yield reader.get_chunk(first)
+            except StopIteration:
+                return
+        yield from reader
+
+
+def check_csv(path: Union[str, Path], plan: RulePlan, chunksize: int, fail_fast: bool = False) -> CheckResult:
+    total = count_rows(path) if fail_fast else None
+    return check_frames(read_blocks(path, chunksize, FIRST if fail_fast else 0, plan.schema), plan, fail_fast, total)
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import reduce
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from sketches import HyperLogLog, Moments, TDigest, hash_values
+
+# Profiler de una pasada: el CSV se lee por bloques de CHUNK filas y cada columna
+# acumula sketches de tamaño fijo (sketches.py), así la memoria no depende del
+# tamaño del archivo.
+#
+#   schema     tipo por columna (numeric / datetime / string), inferido de las
+#              primeras SAMPLE filas y fijo para toda la pasada: un valor no nulo
+#              que no se puede leer con ese tipo cuenta como `invalid`
+#   columna    filas, nulos, inválidos, distintos (HyperLogLog); numéricas y
+#              fechas (en segundos epoch): min/max, momentos, cuantiles (t-digest);
+#              strings: largo mínimo/máximo
+#   paralelo   el archivo se parte en rangos de bytes alineados a fin de línea
+#              (supone que no hay saltos de línea dentro de campos entre comillas);
+#              cada worker perfila sus rangos y devuelve un Profile (KB), que se
+#              combinan en orden con merge(). Conteos, nulos, min/max y registros
+#              HLL quedan idénticos a la pasada serial; momentos salvo redondeo;
+#              el t-digest combinado mantiene su cota de error
+#
+# read_csv va con low_memory=False: el chunk ya acota la memoria y así una
+# columna no cambia de tipo a mitad de bloque. Las columnas string se leen como
+# str (csv_options): si no, un bloque donde todas parecen números vuelve como
+# int / float ("5" -> 5 o 5.0) y distintos / largos dependerían de los cortes.
+
+KINDS = ("numeric", "datetime", "string")
+CHUNK = 200_000
+SAMPLE = 10_000
+PARTS_PER_WORKER = 4
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+def infer_schema(df: pd.DataFrame, min_share: float = 0.95) -> Dict[str, str]:
+    # columnas de texto que son numéricas / fechas en >= min_share de los no nulos
+    schema = {}
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_bool_dtype(s):
+            schema[col] = "string"
+        elif pd.api.types.is_numeric_dtype(s):
+            schema[col] = "numeric"
+        elif pd.api.types.is_datetime64_any_dtype(s):
+            schema[col] = "datetime"
+        else:
+            v = s.dropna().astype(str)
+            if len(v) and pd.to_numeric(v, errors="coerce").notna().mean() >= min_share:
+                schema[col] = "numeric"
+            elif len(v) and pd.to_datetime(v, errors="coerce", format="ISO8601").notna().mean() >= min_share:
+                schema[col] = "datetime"
+            else:
+                schema[col] = "string"
+    return schema
+
+
+def as_float(s: pd.Series, kind: str) -> np.ndarray:
+    # numeric -> float64; datetime -> segundos epoch; no parseable / nulo -> NaN
+    if kind == "datetime":
+        d = pd.to_datetime(s, errors="coerce", format="ISO8601")
+        if getattr(d.dt, "tz", None) is not None:
+            d = d.dt.tz_convert(None)
+        ns = d.to_numpy("datetime64[ns]").view(np.int64)
+        return np.where(d.isna().to_numpy(), np.nan, ns / 1e9)
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        return s.to_numpy(dtype=np.float64, na_value=np.nan)
+    return pd.to_numeric(s, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+@dataclass
+class ColumnSketch:
+    name: str
+    kind: str
+    rows: int = 0
+    nulls: int = 0
+    invalid: int = 0
+    moments: Moments = field(default_factory=Moments)
+    hll: HyperLogLog = field(default_factory=HyperLogLog)
+    digest: TDigest = field(default_factory=TDigest)
+    min_len: float = np.inf
+    max_len: float = -np.inf
+
+    def update(self, s: pd.Series) -> None:
+        null = s.isna().to_numpy()
+        self.rows += len(s)
+        self.nulls += int(null.sum())
+        if self.kind == "string":
+            v = s[~null].astype(str)
+            self.hll.add_hashes(hash_values(v.to_numpy(dtype=object)))
+            if len(v):
+                n = v.str.len()
+                self.min_len = min(self.min_len, float(n.min()))
+                self.max_len = max(self.max_len, float(n.max()))
+            return
+        x = as_float(s, self.kind)
+        ok = np.isfinite(x)
+        self.invalid += int((~ok & ~null).sum())
+        x = x[ok]
+        self.moments = self.moments.merge(Moments.of(x))
+        self.hll.add_hashes(hash_values(x))
+        self.digest.add(x)
+
+    def add_missing(self, n: int) -> None:
+        # la columna no vino en el bloque: n filas nulas
+        self.rows += n
+        self.nulls += n
+
+    def merge(self, o: "ColumnSketch") -> "ColumnSketch":
+        if (o.name, o.kind) != (self.name, self.kind):
+            raise ValueError(f"cannot merge column {self.name}:{self.kind} with {o.name}:{o.kind}")
+        return ColumnSketch(self.name, self.kind, self.rows + o.rows, self.nulls + o.nulls,
+                            self.invalid + o.invalid, self.moments.merge(o.moments), self.hll.merge(o.hll),
+                            self.digest.merge(o.digest), min(self.min_len, o.min_len), max(self.max_len, o.max_len))
+
+    def summary(self) -> dict:
+        numeric = self.kind != "string" and self.moments.n > 0
+        q = self.digest.quantile(QUANTILES) if numeric else np.full(len(QUANTILES), np.nan)
+        nan = float("nan")
+        return {
+            "column": self.name,
+            "kind": self.kind,
+            "rows": self.rows,
+            "nulls": self.nulls,
+            "null_rate": round(self.nulls / self.rows, 6) if self.rows else nan,
+            "invalid": self.invalid,
+            "distinct_approx": int(round(self.hll.estimate())),
+            "min": self.digest.min if numeric else nan,
+            "max": self.digest.max if numeric else nan,
+            "mean": self.moments.mean if numeric else nan,
+            "std": self.moments.std if numeric else nan,
+            "skew": self.moments.skew if numeric else nan,
+            "kurtosis": self.moments.kurtosis if numeric else nan,
+            **{f"p{round(p * 100):02d}": v for p, v in zip(QUANTILES, q)},
+            "min_len": self.min_len if np.isfinite(self.min_len) else nan,
+            "max_len": self.max_len if np.isfinite(self.max_len) else nan,
+        }
+
+
+class Profile:
+    def __init__(self, schema: Dict[str, str]):
+        bad = {k for k in schema.values() if k not in KINDS}
+        if bad:
+            raise ValueError(f"unknown column kinds {sorted(bad)}; expected {KINDS}")
+        self.schema = dict(schema)
+        self.columns = {c: ColumnSketch(c, k) for c, k in schema.items()}
+        self.rows = 0
+        self.chunks = 0
+        self.unexpected: Dict[str, int] = {}   # columna fuera del schema -> filas
+
+    def update(self, df: pd.DataFrame) -> None:
+        n = len(df)
+        for c, sk in self.columns.items():
+            if c in df.columns:
+                sk.update(df[c])
+            else:
+                sk.add_missing(n)
+        for c in df.columns:
+            if c not in self.columns:
+                self.unexpected[c] = self.unexpected.get(c, 0) + n
+        self.rows += n
+        self.chunks += 1
+
+    def merge(self, o: "Profile") -> "Profile":
+        if o.schema != self.schema:
+            raise ValueError("cannot merge profiles with different schemas")
+        p = Profile(self.schema)
+        p.columns = {c: sk.merge(o.columns[c]) for c, sk in self.columns.items()}
+        p.rows, p.chunks = self.rows + o.rows, self.chunks + o.chunks
+        p.unexpected = {c: self.unexpected.get(c, 0) + o.unexpected.get(c, 0)
+                        for c in {*self.unexpected, *o.unexpected}}
+        return p
+
+    @property
+    def nbytes(self) -> int:
+        return sum(sk.hll.registers.nbytes + sk.digest.means.nbytes + sk.digest.weights.nbytes
+                   for sk in self.columns.values())
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame([sk.summary() for sk in self.columns.values()])
+
+
+def profile_frames(frames: Iterable[pd.DataFrame], schema: Optional[Dict[str, str]] = None) -> Profile:
+    # perfil de un iterable de bloques (p. ej. read_csv(chunksize=...)); schema del primero si no se da
+    prof = None
+    for df in frames:
+        if prof is None:
+            prof = Profile(schema or infer_schema(df.head(SAMPLE)))
+        prof.update(df)
+    if prof is None:
+        raise ValueError("no data to profile")
+    return prof
+
+
+class _ByteRange(io.RawIOBase):
+    # vista de solo lectura de los bytes [start, end) de un archivo
+    def __init__(self, path: Union[str, Path], start: int, end: int):
+        self._f = open(path, "rb")
+        self._f.seek(start)
+        self._left = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = min(len(b), self._left)
+        if n <= 0:
+            return 0
+        got = self._f.readinto(memoryview(b)[:n])
+        self._left -= got
+        return got
+
+    def close(self) -> None:
+        self._f.close()
+        super().close()
+
+
+def split_ranges(path: Union[str, Path], parts: int) -> List[Tuple[int, int]]:
+    # rangos de bytes de las filas de datos (sin header), cortados en fin de línea
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()
+        start = f.tell()
+        cuts = [start]
+        for i in range(1, parts):
+            f.seek(max(start + (size - start) * i // parts, cuts[-1]))
+            f.readline()
+            cuts.append(min(f.tell(), size))
+    cuts.append(size)
+    return [(a, b) for a, b in zip(cuts[:-1], cuts[1:]) if b > a]
+
+
+def csv_options(schema: Dict[str, str]) -> dict:
+    # mismas opciones de read_csv en la pasada serial y en cada rango paralelo
+    return {"dtype": {c: str for c, k in schema.items() if k == "string"}, "keep_default_na": True,
+            "low_memory": False}
+
+
+def _profile_range(path: str, start: int, end: int, columns: List[str], schema: Dict[str, str],
+                   chunksize: int) -> Profile:
+    prof = Profile(schema)
+    with io.BufferedReader(_ByteRange(path, start, end), 1 << 20) as f:
+        for df in pd.read_csv(f, header=None, names=columns, chunksize=chunksize, **csv_options(schema)):
+            prof.update(df)
+    return prof
+
+
+def profile_csv(path: Union[str, Path], chunksize: int = CHUNK, workers: int = 1,
+                schema: Optional[Dict[str, str]] = None) -> Profile:
+    path = str(path)
+    head = pd.read_csv(path, nrows=SAMPLE, low_memory=False)
+    schema = schema or infer_schema(head)
+    if workers <= 1:
+        return profile_frames(pd.read_csv(path, chunksize=chunksize, **csv_options(schema)), schema)
+    ranges = split_ranges(path, workers * PARTS_PER_WORKER)
+    args = [(path, a, b, list(head.columns), schema, chunksize) for a, b in ranges]
+    with ProcessPoolExecutor(workers) as ex:
+        parts = list(ex.map(_profile_range, *zip(*args)))
+    return reduce(Profile.merge, parts)
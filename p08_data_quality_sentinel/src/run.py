@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from dq_rules import CheckResult, RulePlan, check_csv, load_rules
+from profiler import CHUNK, SAMPLE, Profile, infer_schema, profile_csv
+
+HERE = Path(__file__).resolve().parent
+PROJECT = HERE.parent
+DATA = PROJECT / "data"
+OUT = PROJECT / "outputs"
+IMG = PROJECT / "img"
+ORDERS = DATA / "p08_orders.csv"
+RULES = DATA / "dq_rules.json"
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.tables import OutputSpec, add_output_args, output_spec, save_table  # noqa: E402
+
+COUNTRIES = ["CL", "AR", "PE", "CO", "MX", "BR", "UY", "EC", "US", "ES"]
+STATUSES = ["paid", "shipped", "delivered", "cancelled", "refunded"]
+
+def ensure_dirs():
+    DATA.mkdir(parents=True, exist_ok=True)
+    OUT.mkdir(parents=True, exist_ok=True)
+    IMG.mkdir(parents=True, exist_ok=True)
+
+def simulate_orders(n_rows: int, seed: int = 8, chunk: int = CHUNK) -> Iterator[pd.DataFrame]:
+    # pedidos simulados por bloques, con problemas de calidad inyectados: nulos,
+    # montos negativos / extremos / "unknown", ids duplicados, emails mal formados,
+    # países inválidos, descuentos > 1 y despachos anteriores al pedido
+    rng = np.random.default_rng(seed)
+    t0 = np.datetime64("2024-01-01T00:00:00")
+    for a in range(0, n_rows, chunk):
+        m = min(chunk, n_rows - a)
+        u = lambda p: rng.random(m) < p  # noqa: E731
+        order_id = np.arange(a, a + m, dtype=np.int64) + 1_000_000
+        order_id[u(0.0005)] -= 1
+        customer = (rng.zipf(1.4, m) % 50_000) + 1
+        ts = t0 + (np.arange(a, a + m) * 30 + rng.integers(0, 30, m)).astype("timedelta64[s]")
+        amount = np.round(rng.lognormal(3.5, 0.9, m), 2)
+        amount[u(0.001)] *= -1
+        amount[u(0.0005)] *= 1000
+        amount = amount.astype(object)
+        amount[u(0.01)] = None
+        amount[u(0.0005)] = "unknown"
+        discount = np.round(rng.beta(1, 8, m), 3)
+        discount[u(0.001)] += 1
+        country = np.array(COUNTRIES, dtype=object)[rng.integers(0, len(COUNTRIES), m)]
+        country[u(0.001)] = "xx"
+        country[u(0.005)] = None
+        status = np.array(STATUSES, dtype=object)[rng.choice(len(STATUSES), m, p=[.35, .25, .3, .07, .03])]
+        email = pd.Series(customer).map("user{}@example.com".format).to_numpy(dtype=object)
+        bad = u(0.003)
+        email[bad] = pd.Series(customer[bad]).map("user{}.example.com".format).to_numpy(dtype=object)
+        delay = rng.integers(2, 96, m).astype("timedelta64[h]")
+        delay[u(0.001)] *= -1
+        shipped = pd.Series(ts + delay).dt.strftime("%Y-%m-%dT%H:%M:%S")
+        shipped[~np.isin(status, ["shipped", "delivered"])] = None
+        yield pd.DataFrame({
+            "order_id": order_id,
+            "customer_id": customer,
+            "ts": pd.Series(ts).dt.strftime("%Y-%m-%dT%H:%M:%S"),
+            "amount": amount,
+            "quantity": rng.integers(1, 11, m) * ~u(0.002),
+            "discount": discount,
+            "country": country,
+            "status": status,
+            "email": email,
+            "shipped_at": shipped,
+        })
+
+def write_orders(path: Path, n_rows: int, seed: int = 8, chunk: int = CHUNK) -> Path:
+    with open(path, "w", newline="") as f:
+        for i, df in enumerate(simulate_orders(n_rows, seed, chunk)):
+            df.to_csv(f, index=False, header=i == 0)
+    return path
+
+def _fmt(v: float, kind: str) -> str:
+    if not np.isfinite(v):
+        return "-"
+    if kind == "datetime":
+        return str(pd.Timestamp(v, unit="s").floor("s"))
+    if float(v).is_integer() or abs(v) >= 1e4:
+        return f"{v:,.0f}"
+    return f"{v:,.4g}"
+
+def save_outputs(prof: Optional[Profile], check: CheckResult, path: Path, elapsed: float, workers: int,
+                 spec: OutputSpec = OutputSpec()) -> List[Path]:
+    metrics = check.frame()
+    paths = save_table(metrics, OUT / "dq_metrics", spec)
+    size = path.stat().st_size
+    report = []
+    report.append("# P08 — Data Quality Sentinel (V1 report)\n")
+    decision = "APPROVE" if check.passed else "BLOCK"
+    report.append(f"- Input: `{path.name}` ({size / 1e6:,.1f} MB)")
+    report.append(f"- Rules: {len(check.stats)} in {check.seconds * 1e3:,.0f} ms over {check.rows:,} rows / {check.batches} batch(es)"
+                  + (f", stopped early (fail-fast) at `{check.blocked_by}`" if check.stopped_early else ""))
+    report.append(f"- Quality score: {check.score():.2f} / 100 (violation-free rows, block rules x3)")
+    report.append(f"- Decision: **{decision}**")
+    failed = metrics[metrics["status"] == "fail"]
+    blocking = failed[failed["severity"] == "block"]
+    if len(blocking):
+        report.append("\n## Ticket\n")
+        report.append(f"Load of `{path.name}` blocked by {len(blocking)} rule(s):\n")
+        for _, r in blocking.iterrows():
+            over = (f", {r['failed_batches']} batch(es) over max batch rate {r['max_batch_rate']:.3%}"
+                    if r["failed_batches"] else "")
+            report.append(f"- `{r['rule_id']}` ({r['type']} on {r['columns']}): {r['violations']:,} violations "
+                          f"({r['violation_rate']:.3%}, threshold {r['threshold']:.3%}){over}; "
+                          f"example rows {r['examples'] or '-'}")
+    report.append("\n## Rules\n")
+    report.append("| rule | type | columns | severity | violations | rate | threshold | status | ms |")
+    report.append("|---|---|---|---|---:|---:|---:|---|---:|")
+    for _, r in metrics.iterrows():
+        report.append(f"| {r['rule_id']} | {r['type']} | {r['columns']} | {r['severity']} | {r['violations']:,} | "
+                      f"{r['violation_rate']:.3%} | {r['threshold']:.3%} | {r['status']} | {r['amortized_ms']:.1f} |")
+    if prof is None:
+        (OUT / "dq_report.md").write_text("\n".join(report) + "\n", encoding="utf-8")
+        return paths
+
+    table = prof.frame()
+    paths += save_table(table, OUT / "profile", spec)
+
+    # plot: tasa de nulos e inválidos por columna
+    t = table.set_index("column")
+    fig, ax = plt.subplots(figsize=(10, 4))
+    x = np.arange(len(t))
+    ax.bar(x - 0.2, t["null_rate"] * 100, width=0.4, label="null %")
+    ax.bar(x + 0.2, t["invalid"] / t["rows"] * 100, width=0.4, label="invalid %")
+    ax.set_xticks(x, t.index, rotation=30, ha="right")
+    ax.set_ylabel("% of rows")
+    ax.set_title("P08 — Data Quality Sentinel (profile)")
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(IMG / "p08_data_quality_sentinel_plot.png", dpi=160)
+    plt.close(fig)
+
+    report.append("\n## Profile\n")
+    report.append(f"- {prof.rows:,} rows, {len(prof.schema)} columns")
+    report.append(f"- Single pass in {elapsed:.2f} s ({prof.rows / elapsed:,.0f} rows/s, {size / 1e6 / elapsed:,.1f} MB/s), "
+                  f"{workers} worker(s); sketch state {prof.nbytes / 1e3:,.0f} KB")
+    if prof.unexpected:
+        report.append(f"- Columns outside the schema: {', '.join(sorted(prof.unexpected))}")
+    report.append("")
+    report.append("| column | kind | null % | invalid | distinct ~ | min | p50 | max | mean | std |")
+    report.append("|---|---|---:|---:|---:|---:|---:|---:|---:|---:|")
+    for _, r in table.iterrows():
+        k = r["kind"]
+        mean = _fmt(r["mean"], "numeric") if k == "numeric" else "-"
+        std = _fmt(r["std"], "numeric") if k == "numeric" else "-"
+        report.append(f"| {r['column']} | {k} | {r['null_rate']:.2%} | {r['invalid']:,} | {r['distinct_approx']:,} | "
+                      f"{_fmt(r['min'], k)} | {_fmt(r['p50'], k)} | {_fmt(r['max'], k)} | {mean} | {std} |")
+    (OUT / "dq_report.md").write_text("\n".join(report) + "\n", encoding="utf-8")
+    return paths
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--input", type=Path, default=ORDERS, help="CSV a perfilar (si falta, se simulan pedidos)")
+    ap.add_argument("--rows", type=int, default=500_000, help="filas a simular si --input no existe")
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--chunksize", type=int, default=CHUNK)
+    ap.add_argument("--rules", type=Path, default=RULES, help="reglas de calidad (JSON, o YAML con PyYAML)")
+    ap.add_argument("--fail-fast", action="store_true",
+                    help="cortar en la primera regla block que falle (sin perfil si corta)")
+    add_output_args(ap)
+    args = ap.parse_args()
+
+    ensure_dirs()
+    if not args.input.exists():
+        write_orders(args.input, args.rows)
+    schema = infer_schema(pd.read_csv(args.input, nrows=SAMPLE, low_memory=False))
+    check = check_csv(args.input, RulePlan(load_rules(args.rules), schema), args.chunksize, args.fail_fast)
+    prof, elapsed = None, 0.0
+    if not check.stopped_early:
+        t0 = time.perf_counter()
+        prof = profile_csv(args.input, args.chunksize, args.workers, schema)
+        elapsed = time.perf_counter() - t0
+    paths = save_outputs(prof, check, args.input, elapsed, args.workers, output_spec(args))
+
+    print("OK — Generated outputs:")
+    for path in paths:
+        print(f"- {path}")
+    print(f"- {OUT / 'dq_report.md'}")
+    if prof is not None:
+        print(f"- {IMG / 'p08_data_quality_sentinel_plot.png'}")
+    print(f"Decision: {'APPROVE' if check.passed else 'BLOCK'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+# Benchmark del motor de drift (drift.py): throughput y memoria por feature al
+# pasar decenas de millones de filas por los histogramas del baseline, y
+# precisión de KS / PSI calculados desde los histogramas vs sobre los datos crudos.
+#
+#   python src/bench_drift.py --rows 20000000 --chunk 1000000
+#
+# Throughput: solo update() (los bloques se generan antes y se reciclan), por
+# tipo de feature. Memoria: bytes del estado persistido por feature y pico de
+# tracemalloc de un update (memoria de trabajo por bloque, no depende del total).
+# Paridad: el merge de histogramas por partes es igual (conteo a conteo) a una
+# sola pasada, y save() / load() conserva bins y conteos.
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.stats import ks_2samp
+
+from drift import BINS, PSI_BINS, DriftSketch, FeatureHistogram, compare, psi
+
+
+def feature_chunk(kind: str, n: int, rng: np.random.Generator, shift: float = 0.0) -> pd.Series:
+    if kind == "float":
+        return pd.Series(rng.lognormal(3 + shift, 0.8, n))
+    if kind == "float_nulls":
+        x = rng.normal(shift, 1, n)
+        x[rng.random(n) < 0.05] = np.nan
+        return pd.Series(x)
+    if kind == "int":
+        return pd.Series(rng.poisson(3 + shift, n))
+    if kind == "category_20":
+        return pd.Series(np.array([f"c{i}" for i in range(20)], dtype=object)[rng.zipf(1.5 + shift, n) % 20])
+    if kind == "category_5000":
+        return pd.Series(np.array([f"c{i}" for i in range(5000)], dtype=object)[rng.zipf(1.2 + shift, n) % 5000])
+    raise ValueError(kind)
+
+
+KINDS = ("float", "float_nulls", "int", "category_20", "category_5000")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=20_000_000, help="filas por feature")
+    ap.add_argument("--chunk", type=int, default=1_000_000)
+    ap.add_argument("--accuracy-rows", type=int, default=1_000_000)
+    args = ap.parse_args()
+    rng = np.random.default_rng(0)
+
+    print(f"throughput: {args.rows:,} rows per feature, chunks of {args.chunk:,}, {BINS} bins")
+    for kind in KINDS:
+        h = FeatureHistogram.fit(kind, feature_chunk(kind, 100_000, rng))
+        chunks = [feature_chunk(kind, args.chunk, rng, shift=0.1 * i) for i in range(4)]
+        tracemalloc.start()
+        h.update(chunks[0])
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        done, t0 = args.chunk, time.perf_counter()
+        while done < args.rows:
+            h.update(chunks[(done // args.chunk) % len(chunks)])
+            done += args.chunk
+        dt = time.perf_counter() - t0
+        assert h.rows == done
+        print(f"{kind:>14}: {(done - args.chunk) / dt / 1e6:6.1f} M rows/s, state {h.nbytes / 1e3:5.1f} KB "
+              f"({len(h.counts)} bins), working memory {peak / 1e6:5.1f} MB per chunk ({peak / args.chunk:.1f} B/row)")
+
+    n = args.accuracy_rows
+    print(f"\naccuracy vs raw data ({n:,} baseline rows vs {n:,} batch rows):")
+    for shift in (0.0, 0.05, 0.2, 0.5):
+        a, b = rng.lognormal(3, 0.8, n), rng.lognormal(3 + shift, 0.8 + shift / 2, n)
+        base = FeatureHistogram.fit("x", pd.Series(a[:100_000]))
+        base.update(pd.Series(a))
+        new = base.empty()
+        new.update(pd.Series(b))
+        m = compare(base, new)
+        ks_exact = ks_2samp(a, b).statistic
+        dec = np.quantile(a, np.linspace(0, 1, PSI_BINS + 1)[1:-1])
+        p = np.bincount(np.searchsorted(dec, a, side="right"), minlength=PSI_BINS) / n
+        q = np.bincount(np.searchsorted(dec, b, side="right"), minlength=PSI_BINS) / n
+        psi_exact = psi(p, q)
+        assert m["ks"] <= ks_exact + 1e-12 and ks_exact - m["ks"] <= 2 / BINS
+        print(f"shift {shift:4.2f}: KS sketch {m['ks']:.4f} vs exact {ks_exact:.4f}; PSI sketch {m['psi']:.4f} vs "
+              f"raw deciles {psi_exact:.4f}; JS {m['js']:.4f}")
+
+    # paridad: merge por partes == una pasada; save / load
+    df = pd.DataFrame({k: feature_chunk(k, 400_000, rng) for k in KINDS})
+    one = DriftSketch.fit(df.head(100_000))
+    parts = [one.empty() for _ in range(4)]
+    for sk, part in zip(parts, np.array_split(np.arange(len(df)), 4)):
+        sk.update(df.iloc[part])
+    one.update(df)
+    merged = parts[0].merge(parts[1]).merge(parts[2]).merge(parts[3])
+    for c in one.hists:
+        assert np.array_equal(one.hists[c].counts, merged.hists[c].counts)
+        assert one.hists[c].nulls == merged.hists[c].nulls
+    with tempfile.TemporaryDirectory() as tmp:
+        back = DriftSketch.load(one.save(Path(tmp) / "sketch.npz"))
+        size = (Path(tmp) / "sketch.npz").stat().st_size
+    for c, h in one.hists.items():
+        assert np.array_equal(h.edges, back.hists[c].edges) and np.array_equal(h.counts, back.hists[c].counts)
+    assert one.compare(merged)["psi"].max() < 1e-12
+    print(f"\nparity OK: merge of 4 parts == single pass; save/load round trip ({size / 1e3:.0f} KB on disk, "
+          f"{len(one.hists)} features)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+# Benchmark del drift de flota (fleet.py): curva de speedup por número de
+# workers y efecto del scheduler sobre ~200 modelos x ~150 features.
+#
+#   python src/bench_fleet.py --models 200 --features 150 --rows 5000 --workers 1 2 4 8
+#
+# Por workers: segundos de pared (incluye la copia a memoria compartida y el
+# arranque del pool), jobs/s y speedup vs 1 worker. Como la curva medida depende
+# de los núcleos de la máquina (cpu_count), también se proyecta el makespan de
+# cada reparto (cardinality vs none) con los tiempos medidos de cada job: los
+# paquetes se asignan en orden al primer worker libre, como en el pool.
+# IPC: bytes pickleados por los jobs vs pickleando los DataFrames de los batches.
+# Paridad: mismas métricas con cualquier número de workers y reparto, e iguales a
+# DriftSketch.update + compare por modelo (drift.py).
+
+import argparse
+import heapq
+import os
+import pickle
+import time
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from drift import DriftSketch, sketch_frames
+from fleet import TASKS_PER_WORKER, _encode, fleet_drift, schedule
+from run import PREDICTIONS, simulate_fleet
+
+METRICS = ["model", "feature", "role", "kind", "rows_base", "rows_batch", "null_rate_base", "null_rate_batch",
+           "psi", "js", "ks", "status"]
+
+
+def makespan(durations: np.ndarray, bundles: List[np.ndarray], workers: int) -> float:
+    # pool dinámico: cada paquete (en orden de envío) va al primer worker libre
+    free = [0.0] * workers
+    for b in bundles:
+        heapq.heappush(free, heapq.heappop(free) + float(durations[b].sum()))
+    return max(free)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--models", type=int, default=200)
+    ap.add_argument("--features", type=int, default=150)
+    ap.add_argument("--rows", type=int, default=5000, help="filas por modelo (baseline y media del batch)")
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--parity-models", type=int, default=20, help="modelos comparados contra DriftSketch")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    bases = {}
+    for m, df in simulate_fleet(args.models, args.features, args.rows, batch=False).items():
+        bases[m] = DriftSketch.fit(df, PREDICTIONS)
+        bases[m].update(df)
+    batches = simulate_fleet(args.models, args.features, args.rows)
+    values = sum(b.size for b in batches.values())
+    print(f"{args.models} models x {args.features} features + score = {args.models * (args.features + 1):,} jobs, "
+          f"{values:,} batch values; baselines + batches simulated in {time.perf_counter() - t0:.1f} s; "
+          f"cpu_count={os.cpu_count()}")
+
+    # paridad: fleet (1 worker) == DriftSketch por modelo
+    ref = fleet_drift(bases, batches, 1)
+    some = list(bases)[:args.parity_models]
+    direct = pd.concat([bases[m].compare(sketch_frames([batches[m]], bases[m])).assign(model=m) for m in some],
+                       ignore_index=True)
+    mine = ref[ref["model"].isin(some)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(mine[METRICS], direct[METRICS])
+    print(f"parity OK: fleet metrics == DriftSketch.update + compare on {len(some)} models")
+
+    # IPC: lo que viaja por los jobs vs pickles de los DataFrames
+    job_bytes = 0
+    for m, sk in bases.items():
+        for g, (c, h) in enumerate(sk.hists.items()):
+            job_bytes += len(pickle.dumps((g, 0, len(batches[m]), _encode(h, batches[m][c].head(1))[1])))
+    frame_bytes = sum(len(pickle.dumps(df)) for df in batches.values())
+    print(f"IPC: {job_bytes / 1e6:.2f} MB pickled in jobs vs {frame_bytes / 1e6:.0f} MB pickling the batch DataFrames")
+
+    print(f"\n{'workers':>7} | {'balance':>11} | {'seconds':>7} | {'jobs/s':>8} | {'speedup':>7}")
+    base_t = None
+    for w in args.workers:
+        for balance in ("cardinality", "none"):
+            t0 = time.perf_counter()
+            out = fleet_drift(bases, batches, w, balance)
+            dt = time.perf_counter() - t0
+            pd.testing.assert_frame_equal(out[METRICS], ref[METRICS])
+            base_t = base_t or dt
+            print(f"{w:>7} | {balance:>11} | {dt:7.2f} | {len(out) / dt:8,.0f} | {base_t / dt:6.2f}x")
+    print("parity OK: identical metrics for every worker count and balance")
+
+    # makespan proyectado con los tiempos medidos por job (independiente de cpu_count)
+    durations = ref["job_ms"].to_numpy() / 1e3
+    costs = ref["cost"].to_numpy()
+    total = durations.sum()
+    corr = np.corrcoef(costs, durations)[0, 1]
+    print(f"\nprojected makespan from measured job times ({total:.2f} s of work; cost model vs job time r={corr:.2f})")
+    print(f"{'workers':>7} | {'cardinality':>20} | {'none':>20}")
+    for w in args.workers:
+        cells = []
+        for balance in ("cardinality", "none"):
+            span = makespan(durations, schedule(costs, w * TASKS_PER_WORKER, balance), w)
+            cells.append(f"{span:6.2f} s ({total / span:4.2f}x)")
+        print(f"{w:>7} | {cells[0]:>20} | {cells[1]:>20}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# Motor de drift sobre histogramas de bins fijos: el baseline se resume una vez
+# en un histograma por feature (se persiste en .npz) y cada batch nuevo se pasa
+# en streaming por los mismos bins. PSI / KS / Jensen-Shannon salen solo de los
+# conteos; nunca se relee el baseline crudo.
+#
+#   numéricas    BINS bins finos con bordes = cuantiles de una muestra del
+#                baseline (las primeras SAMPLE filas), más dos bins abiertos
+#                (-inf, e0) / [eK, +inf); np.searchsorted + bincount por bloque
+#   categóricas  las MAX_CATEGORIES categorías más frecuentes de la muestra + un
+#                bin "otras" (categorías nuevas en el batch caen ahí)
+#   nulos        contador aparte; entran a PSI / JS como un bin más
+#
+#   KS    máx |F_base - F_batch| sobre los bordes de los bins finos (solo no
+#         nulos). Es exacto en los bordes y una cota inferior del KS sobre los
+#         datos crudos; la diferencia está acotada por la masa de un bin (~1/BINS)
+#   PSI   Σ (q - p) ln(q / p) sobre PSI_BINS grupos de igual masa en el baseline
+#         (bins finos consecutivos), con p, q >= EPS
+#   JS    divergencia de Jensen-Shannon en base 2 (0 = igual, 1 = disjunto) sobre
+#         los mismos grupos
+#
+# Los histogramas con los mismos bins se suman (merge): el baseline o un batch
+# diario se puede resumir por partes (archivos, workers) y combinar después.
+
+BINS = 256
+PSI_BINS = 10
+MAX_CATEGORIES = 64
+SAMPLE = 100_000
+EPS = 1e-4
+KINDS = ("numeric", "categorical")
+ROLES = ("feature", "prediction")
+PSI_MODERATE = 0.1
+PSI_DRIFT = 0.25
+
+
+@dataclass
+class FeatureHistogram:
+    name: str
+    kind: str
+    edges: np.ndarray          # numeric: bordes interiores (K); categorical: categorías (K, str)
+    counts: np.ndarray         # int64, K + 1 bins (numeric: abiertos en los extremos; categorical: último = otras)
+    nulls: int = 0
+    role: str = "feature"
+
+    @classmethod
+    def fit(cls, name: str, sample: pd.Series, kind: Optional[str] = None, role: str = "feature",
+            bins: int = BINS, max_categories: int = MAX_CATEGORIES) -> "FeatureHistogram":
+        # bins del feature a partir de una muestra; los conteos empiezan en 0
+        if kind is None:
+            numeric = pd.api.types.is_numeric_dtype(sample) and not pd.api.types.is_bool_dtype(sample)
+            kind = "numeric" if numeric else "categorical"
+        if kind not in KINDS:
+            raise ValueError(f"unknown kind {kind!r}; expected one of {KINDS}")
+        if role not in ROLES:
+            raise ValueError(f"unknown role {role!r}; expected one of {ROLES}")
+        v = sample.dropna()
+        if kind == "numeric":
+            x = v.to_numpy(dtype=np.float64)
+            edges = np.unique(np.quantile(x, np.linspace(0, 1, bins + 1)[1:-1])) if len(x) else np.empty(0)
+        else:
+            edges = v.astype(str).value_counts().index[:max_categories].to_numpy(dtype=str)
+        return cls(name, kind, edges, np.zeros(len(edges) + 1, dtype=np.int64), 0, role)
+
+    def bin_index(self, s: pd.Series) -> np.ndarray:
+        # bin de cada valor; -1 = nulo
+        if self.kind == "numeric":
+            x = s.to_numpy(dtype=np.float64, na_value=np.nan)
+            return np.where(np.isnan(x), -1, np.searchsorted(self.edges, x, side="right"))
+        # categorías: se factoriza el bloque y se ubican sus distintos (pocos) en el vocabulario
+        codes, uniq = pd.factorize(s)
+        pos = pd.Index(self.edges).get_indexer(pd.Index(uniq).astype(str))
+        pos[pos < 0] = len(self.edges)
+        return np.append(pos, -1)[codes]
+
+    def update(self, s: pd.Series) -> None:
+        b = self.bin_index(s)
+        ok = b >= 0
+        self.nulls += int(len(b) - ok.sum())
+        self.counts += np.bincount(b[ok], minlength=len(self.counts))
+
+    def add_missing(self, n: int) -> None:
+        self.nulls += n
+
+    def empty(self) -> "FeatureHistogram":
+        return FeatureHistogram(self.name, self.kind, self.edges, np.zeros_like(self.counts), 0, self.role)
+
+    def merge(self, o: "FeatureHistogram") -> "FeatureHistogram":
+        if (o.name, o.kind) != (self.name, self.kind) or not np.array_equal(o.edges, self.edges):
+            raise ValueError(f"cannot merge histograms of {self.name!r} with different bins")
+        return FeatureHistogram(self.name, self.kind, self.edges, self.counts + o.counts, self.nulls + o.nulls, self.role)
+
+    @property
+    def rows(self) -> int:
+        return int(self.counts.sum()) + self.nulls
+
+    @property
+    def nbytes(self) -> int:
+        return self.counts.nbytes + (self.edges.nbytes if self.kind == "numeric" else sum(len(e) for e in self.edges))
+
+    def groups(self) -> np.ndarray:
+        # grupo PSI de cada bin: numéricas -> PSI_BINS grupos de igual masa en ESTE
+        # histograma (llamar sobre el baseline); categóricas -> un grupo por categoría
+        if self.kind == "categorical":
+            return np.arange(len(self.counts))
+        c = self.counts
+        before = (np.cumsum(c) - c) / max(c.sum(), 1)
+        return np.minimum((before * PSI_BINS).astype(np.int64), PSI_BINS - 1)
+
+
+def _dist(h: FeatureHistogram, groups: np.ndarray) -> np.ndarray:
+    # distribución por grupo + bin de nulos
+    g = np.bincount(groups, h.counts, minlength=groups.max() + 1)
+    p = np.append(g, h.nulls).astype(np.float64)
+    return p / max(p.sum(), 1.0)
+
+
+def psi(p: np.ndarray, q: np.ndarray, eps: float = EPS) -> float:
+    p, q = np.maximum(p, eps), np.maximum(q, eps)
+    return float(((q - p) * np.log(q / p)).sum())
+
+
+def js_divergence(p: np.ndarray, q: np.ndarray) -> float:
+    m = (p + q) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = np.where(p > 0, p * np.log2(p / m), 0.0).sum()
+        b = np.where(q > 0, q * np.log2(q / m), 0.0).sum()
+    return float(max(0.0, (a + b) / 2))
+
+
+def ks_binned(base: np.ndarray, new: np.ndarray) -> float:
+    # conteos por bin (sin nulos) -> KS en los bordes
+    if not base.sum() or not new.sum():
+        return float("nan")
+    return float(np.abs(np.cumsum(base) / base.sum() - np.cumsum(new) / new.sum()).max())
+
+
+def compare(base: FeatureHistogram, new: FeatureHistogram) -> dict:
+    if not np.array_equal(base.edges, new.edges):
+        raise ValueError(f"{base.name!r}: batch histogram does not share the baseline bins")
+    groups = base.groups()
+    p, q = _dist(base, groups), _dist(new, groups)
+    value = psi(p, q)
+    return {
+        "feature": base.name,
+        "role": base.role,
+        "kind": base.kind,
+        "rows_base": base.rows,
+        "rows_batch": new.rows,
+        "null_rate_base": base.nulls / base.rows if base.rows else float("nan"),
+        "null_rate_batch": new.nulls / new.rows if new.rows else float("nan"),
+        "psi": value,
+        "js": js_divergence(p, q),
+        "ks": ks_binned(base.counts, new.counts) if base.kind == "numeric" else float("nan"),
+        "status": "drift" if value >= PSI_DRIFT else "moderate" if value >= PSI_MODERATE else "stable",
+    }
+
+
+class DriftSketch:
+    # histogramas de un conjunto de columnas (features + salidas del modelo)
+    def __init__(self, hists: Sequence[FeatureHistogram]):
+        self.hists: Dict[str, FeatureHistogram] = {h.name: h for h in hists}
+        self.rows = 0
+        self.chunks = 0
+        self.source = ""    # de dónde salió el baseline (lo fija quien lo construye)
+
+    @classmethod
+    def fit(cls, sample: pd.DataFrame, predictions: Iterable[str] = (), kinds: Optional[Dict[str, str]] = None,
+            bins: int = BINS) -> "DriftSketch":
+        predictions, kinds = set(predictions), kinds or {}
+        return cls([FeatureHistogram.fit(c, sample[c], kinds.get(c), "prediction" if c in predictions else "feature", bins)
+                    for c in sample.columns])
+
+    def update(self, df: pd.DataFrame) -> None:
+        n = len(df)
+        for c, h in self.hists.items():
+            if c in df.columns:
+                h.update(df[c])
+            else:
+                h.add_missing(n)
+        self.rows += n
+        self.chunks += 1
+
+    def empty(self) -> "DriftSketch":
+        return DriftSketch([h.empty() for h in self.hists.values()])
+
+    def merge(self, o: "DriftSketch") -> "DriftSketch":
+        if list(o.hists) != list(self.hists):
+            raise ValueError("cannot merge sketches with different columns")
+        s = DriftSketch([h.merge(o.hists[c]) for c, h in self.hists.items()])
+        s.rows, s.chunks = self.rows + o.rows, self.chunks + o.chunks
+        return s
+
+    @property
+    def nbytes(self) -> int:
+        return sum(h.nbytes for h in self.hists.values())
+
+    def compare(self, batch: "DriftSketch") -> pd.DataFrame:
+        # una fila por columna: psi, js, ks, tasas de nulos y status
+        return pd.DataFrame([compare(h, batch.hists[c]) for c, h in self.hists.items()])
+
+    def save(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        arrays = {"names": np.array(list(self.hists), dtype=str),
+                  "kinds": np.array([h.kind for h in self.hists.values()], dtype=str),
+                  "roles": np.array([h.role for h in self.hists.values()], dtype=str),
+                  "nulls": np.array([h.nulls for h in self.hists.values()], dtype=np.int64),
+                  "totals": np.array([self.rows, self.chunks], dtype=np.int64),
+                  "source": np.array(self.source)}
+        for i, h in enumerate(self.hists.values()):
+            arrays[f"edges_{i}"], arrays[f"counts_{i}"] = h.edges, h.counts
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "DriftSketch":
+        with np.load(path) as z:
+            hists = [FeatureHistogram(str(name), str(kind), z[f"edges_{i}"], z[f"counts_{i}"], int(nulls), str(role))
+                     for i, (name, kind, role, nulls) in enumerate(zip(z["names"], z["kinds"], z["roles"], z["nulls"]))]
+            s = cls(hists)
+            s.rows, s.chunks = (int(x) for x in z["totals"])
+            s.source = str(z["source"]) if "source" in z.files else ""
+        return s
+
+
+def sketch_frames(frames: Iterable[pd.DataFrame], base: Optional[DriftSketch] = None,
+                  predictions: Iterable[str] = (), sample: int = SAMPLE) -> DriftSketch:
+    # un pase por bloques: con base -> batch con los bins del baseline; sin base ->
+    # baseline nuevo con bins de las primeras `sample` filas
+    sk: Optional[DriftSketch] = base.empty() if base is not None else None
+    pending: List[pd.DataFrame] = []
+    for df in frames:
+        if sk is None:
+            pending.append(df)
+            if sum(len(d) for d in pending) < sample:
+                continue
+            head = pd.concat(pending, ignore_index=True)
+            sk = DriftSketch.fit(head.head(sample), predictions)
+            sk.update(head)
+            pending = []
+            continue
+        sk.update(df)
+    if sk is None:
+        if not pending:
+            raise ValueError("no data to sketch")
+        head = pd.concat(pending, ignore_index=True)
+        sk = DriftSketch.fit(head, predictions)
+        sk.update(head)
+    return sk
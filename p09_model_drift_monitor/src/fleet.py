@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import heapq
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from drift import DriftSketch, FeatureHistogram, compare
+
+HERE = Path(__file__).resolve().parent
+PROJECT = HERE.parent
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.shm import SharedArray, SharedSpec, attach  # noqa: E402
+
+# Drift de una flota de modelos: un job por (modelo, feature) contra el baseline
+# persistido de cada modelo (drift.DriftSketch), repartidos en un process pool.
+#
+#   memoria compartida  los batches de todos los modelos van a un solo bloque
+#                       float64, columna por columna (cada columna contigua); los
+#                       bordes / conteos / nulos de los baselines y una tabla de
+#                       layout por feature, a otros tres. Los workers se adjuntan
+#                       una vez (initializer) y un job viaja como unos pocos
+#                       enteros: no se picklean DataFrames ni histogramas
+#   categóricas         se pasan como códigos de diccionario (pd.Categorical);
+#                       el job lleva un lookup código -> bin del baseline (tamaño
+#                       del diccionario, no de las filas)
+#   scheduler           costo estimado por job = filas x log2(cardinalidad + 1)
+#                       (searchsorted sobre los bordes / bincount sobre el
+#                       vocabulario); los jobs se empaquetan en workers x
+#                       TASKS_PER_WORKER paquetes de costo parecido (LPT: el job
+#                       más caro al paquete más liviano) y se envían del más caro
+#                       al más barato, así ningún worker queda con la cola larga
+#
+# El resultado no depende del número de workers ni del reparto: cada job hace
+# los mismos conteos que FeatureHistogram.update sobre la misma columna.
+
+TASKS_PER_WORKER = 4
+BALANCES = ("cardinality", "none")
+_KIND = {"numeric": 0, "categorical": 1}
+_ROLE = {"feature": 0, "prediction": 1}
+
+
+def pack_baselines(baselines: Dict[str, DriftSketch]) -> Tuple[pd.DataFrame, Dict[str, np.ndarray]]:
+    # -> (una fila por feature global g: model, feature, kind, role, cardinality;
+    #     arrays planos edges / counts / nulls / layout (g -> kind, role, edge_off, n_edges, count_off, n_counts))
+    rows, edges, counts, layout, nulls = [], [], [], [], []
+    eo = co = 0
+    for model, sk in baselines.items():
+        for name, h in sk.hists.items():
+            ne = len(h.edges) if h.kind == "numeric" else 0
+            layout.append((_KIND[h.kind], _ROLE[h.role], eo, ne, co, len(h.counts)))
+            rows.append({"model": model, "feature": name, "kind": h.kind, "role": h.role, "cardinality": len(h.counts)})
+            if ne:
+                edges.append(h.edges.astype(np.float64))
+            counts.append(h.counts)
+            nulls.append(h.nulls)
+            eo, co = eo + ne, co + len(h.counts)
+    arrays = {"edges": np.concatenate(edges) if edges else np.zeros(1),
+              "counts": np.concatenate(counts).astype(np.int64),
+              "nulls": np.array(nulls, dtype=np.int64),
+              "layout": np.array(layout, dtype=np.int64)}
+    return pd.DataFrame(rows), arrays
+
+
+def job_cost(rows: np.ndarray, cardinality: np.ndarray) -> np.ndarray:
+    return rows * np.log2(cardinality + 1.0)
+
+
+def schedule(costs: np.ndarray, bundles: int, balance: str = "cardinality") -> List[np.ndarray]:
+    # -> paquetes de índices de job, del más caro al más barato
+    if balance not in BALANCES:
+        raise ValueError(f"unknown balance {balance!r}; expected one of {BALANCES}")
+    bundles = max(1, min(bundles, len(costs)))
+    if balance == "none":
+        return [b for b in np.array_split(np.arange(len(costs)), bundles) if len(b)]
+    heap = [(0.0, i) for i in range(bundles)]
+    out: List[List[int]] = [[] for _ in range(bundles)]
+    for j in np.argsort(-costs, kind="stable"):
+        load, i = heapq.heappop(heap)
+        out[i].append(int(j))
+        heapq.heappush(heap, (load + float(costs[j]), i))
+    loads = [sum(costs[b]) for b in out]
+    return [np.array(out[i]) for i in np.argsort(loads)[::-1] if out[i]]
+
+
+# --- jobs -----------------------------------------------------------------------
+
+_WORKER: Dict[str, object] = {}
+
+
+def _init_worker(specs: Dict[str, SharedSpec]) -> None:
+    # una vez por worker: adjuntar los bloques (se guardan las refs a SharedMemory)
+    for key, spec in specs.items():
+        _WORKER[key] = attach(spec)
+
+
+def _arrays() -> Dict[str, np.ndarray]:
+    return {k: v[1] if isinstance(v, tuple) else v for k, v in _WORKER.items()}
+
+
+def _run_bundle(jobs: List[Tuple[int, int, int, Optional[np.ndarray]]]) -> List[Tuple[int, dict, float]]:
+    # jobs: (g, offset de la columna en X, filas, lookup o None) -> [(g, métricas, segundos)]
+    a = _arrays()
+    X, E, C, N, L = a["X"], a["edges"], a["counts"], a["nulls"], a["layout"]
+    out = []
+    for g, off, rows, lookup in jobs:
+        t0 = time.perf_counter()
+        kind, role, eo, ne, co, nc = (int(v) for v in L[g])
+        x = X[off:off + rows]
+        null = np.isnan(x)
+        if kind == _KIND["numeric"]:
+            edges = E[eo:eo + ne]
+            b = np.searchsorted(edges, x[~null], side="right")
+        else:
+            edges = np.arange(nc - 1)
+            b = lookup[x[~null].astype(np.int64)]
+        kname, rname = ("numeric", "categorical")[kind], ("feature", "prediction")[role]
+        base = FeatureHistogram(str(g), kname, edges, C[co:co + nc], int(N[g]), rname)
+        new = FeatureHistogram(str(g), kname, edges, np.bincount(b, minlength=nc), int(null.sum()), rname)
+        out.append((g, compare(base, new), time.perf_counter() - t0))
+    return out
+
+
+def _encode(h: FeatureHistogram, s: pd.Series) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    # columna -> (valores float64 para el bloque compartido, lookup código -> bin)
+    if h.kind == "numeric":
+        return s.to_numpy(dtype=np.float64, na_value=np.nan), None
+    cat = s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype("category")
+    codes = cat.cat.codes.to_numpy()
+    lookup = pd.Index(h.edges).get_indexer(cat.cat.categories.astype(str))
+    lookup[lookup < 0] = len(h.edges)
+    return np.where(codes < 0, np.nan, codes.astype(np.float64)), lookup.astype(np.int64)
+
+
+def fleet_drift(baselines: Dict[str, DriftSketch], batches: Dict[str, pd.DataFrame], workers: int = 1,
+                balance: str = "cardinality", tasks_per_worker: int = TASKS_PER_WORKER) -> pd.DataFrame:
+    # una fila por (modelo, feature): métricas de drift.compare + cardinality, cost y job_ms
+    table, arrays = pack_baselines(baselines)
+    models = list(baselines)
+    rows = np.array([len(batches[table.at[g, "model"]]) for g in range(len(table))], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(rows)[:-1]))
+    costs = job_cost(rows, table["cardinality"].to_numpy())
+    bundles = schedule(costs, max(1, workers) * tasks_per_worker, balance)
+
+    def fill(X: np.ndarray) -> List[Optional[np.ndarray]]:
+        # copia los batches al bloque X (columna por columna) y devuelve los lookups
+        lookups: List[Optional[np.ndarray]] = []
+        g = 0
+        for m in models:
+            df, sk = batches[m], baselines[m]
+            for name, h in sk.hists.items():
+                if name in df.columns:
+                    X[offsets[g]:offsets[g] + rows[g]], lk = _encode(h, df[name])
+                else:   # columna ausente: todo nulo (como DriftSketch.update)
+                    X[offsets[g]:offsets[g] + rows[g]], lk = np.nan, np.zeros(0, dtype=np.int64)
+                lookups.append(lk)
+                g += 1
+        return lookups
+
+    total = int(rows.sum())
+    if workers <= 1:
+        X = np.empty(total)
+        lookups = fill(X)
+        _WORKER.clear()
+        _WORKER.update(arrays, X=X)
+        try:
+            results = [r for b in bundles for r in _run_bundle([(g, offsets[g], rows[g], lookups[g]) for g in b])]
+        finally:
+            _WORKER.clear()
+    else:
+        with SharedArray((max(total, 1),)) as x_sh, \
+                SharedArray.from_array(arrays["edges"]) as e_sh, \
+                SharedArray.from_array(arrays["counts"]) as c_sh, \
+                SharedArray.from_array(arrays["nulls"]) as n_sh, \
+                SharedArray.from_array(arrays["layout"]) as l_sh:
+            lookups = fill(x_sh.array)
+            specs = {"X": x_sh.spec, "edges": e_sh.spec, "counts": c_sh.spec, "nulls": n_sh.spec, "layout": l_sh.spec}
+            tasks = [[(int(g), int(offsets[g]), int(rows[g]), lookups[g]) for g in b] for b in bundles]
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(specs,)) as ex:
+                results = [r for part in ex.map(_run_bundle, tasks) for r in part]
+    results.sort(key=lambda r: r[0])
+    assert len(results) == len(table)
+    out = pd.DataFrame([r[1] for r in results]).drop(columns=["feature"])
+    out.insert(0, "feature", table["feature"].to_numpy())
+    out.insert(0, "model", table["model"].to_numpy())
+    out["cardinality"] = table["cardinality"].to_numpy()
+    out["cost"] = costs
+    out["job_ms"] = np.array([r[2] for r in results]) * 1e3
+    return out
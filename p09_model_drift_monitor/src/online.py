@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Detección de cambios online sobre streams (features y salidas del modelo), con
+# estado de tamaño fijo por stream y costo constante por muestra.
+#
+# Cada detector estandariza con la media / desvío de sus primeras WARMUP
+# muestras (umbrales en unidades de σ, comparables entre features), recorta z a
+# ±CLIP (features sesgadas como montos no disparan por un valor extremo) e
+# ignora NaN. Los datos llegan por bloques (un micro-batch del stream) y cada detector
+# procesa el bloque vectorizado, con el mismo resultado que muestra a muestra:
+#
+#   cusum         CUSUM de dos lados: S_t = max(0, S_{t-1} ± z_t - k), alarma si
+#                 S_t > h. La recursión de Lindley tiene forma cerrada por bloque,
+#                 S_t = C_t - min(0, min_{s<=t} C_s) con C = S_0 + cumsum(±z - k);
+#                 el cambio estimado es el inicio de la excursión (último S = 0)
+#   page_hinkley  m_t = Σ (z_i - media_i ∓ δ) contra su mínimo / máximo
+#                 acumulado (np.minimum.accumulate); alarma si se aleja más de λ;
+#                 el cambio estimado es donde se alcanzó ese extremo
+#   adwin         ventana adaptativa (Bifet & Gavaldà, ADWIN2) como histograma
+#                 exponencial de buckets (n, suma, M2), a lo más MAX_BUCKETS por
+#                 tamaño; corta la parte vieja mientras |μ0 - μ1| > ε_cut (cota
+#                 con varianza). Inserta buckets de CLOCK muestras y revisa cortes
+#                 una vez por bucket (como el "clock" de MOA): O(1) amortizado por
+#                 muestra + O(log W) por bucket, y alarma con resolución de CLOCK
+#
+# CUSUM y Page-Hinkley se reinician tras una alarma (nuevo warm-up con el nivel
+# nuevo); ADWIN sigue con la ventana recortada. Cada alarma es un evento
+# (stream, detector, detected_at, change_at estimado, delay); con cambios
+# conocidos, score_events mide la latencia real y las falsas alarmas.
+
+WARMUP = 200
+CLIP = 3.0
+CUSUM_K = 0.5
+CUSUM_H = 14.0
+PH_DELTA = 0.25
+PH_LAMBDA = 30.0
+PH_MIN = 30
+ADWIN_DELTA = 0.002
+CLOCK = 32
+MAX_BUCKETS = 5
+HORIZON = 5_000
+
+
+class _Detector:
+    name = ""
+    reset_on_alarm = True
+
+    def __init__(self, warmup: int = WARMUP):
+        self.warmup = warmup
+        self.mu: Optional[float] = None
+        self.sd = 1.0
+        self.n = 0                        # muestras recibidas (incluye NaN)
+        self._warm: List[np.ndarray] = []
+
+    def update(self, x: np.ndarray, pos: Optional[np.ndarray] = None) -> List[Tuple[int, int]]:
+        # -> [(detected_at, change_at)] en posiciones del stream (pos, o un contador propio)
+        x = np.asarray(x, dtype=np.float64)
+        if pos is None:
+            pos = np.arange(self.n, self.n + len(x))
+        self.n += len(x)
+        ok = np.isfinite(x)
+        x, pos = x[ok], pos[ok]
+        events = []
+        while len(x):
+            if self.mu is None:
+                need = self.warmup - sum(len(w) for w in self._warm)
+                self._warm.append(x[:need])
+                x, pos = x[need:], pos[need:]
+                if sum(len(w) for w in self._warm) == self.warmup:
+                    w = np.concatenate(self._warm)
+                    self.mu, self._warm = float(w.mean()), []
+                    self.sd = float(w.std()) or 1.0
+                    self._start(int(pos[0]) if len(pos) else self.n)
+                continue
+            hit = self._scan(np.clip((x - self.mu) / self.sd, -CLIP, CLIP), pos)
+            if hit is None:
+                break
+            k, change = hit
+            events.append((int(pos[k]), int(change)))
+            x, pos = x[k + 1:], pos[k + 1:]
+            if self.reset_on_alarm:
+                self.mu = None
+        return events
+
+    def _start(self, first: int) -> None:
+        raise NotImplementedError
+
+    def _scan(self, z: np.ndarray, pos: np.ndarray) -> Optional[Tuple[int, int]]:
+        # consume z; -> (índice en z de la alarma, change_at) o None si no hubo alarma
+        raise NotImplementedError
+
+    @property
+    def nbytes(self) -> int:
+        return 0
+
+
+def _last(mask: np.ndarray, pos: np.ndarray, prev: int) -> int:
+    # posición del último True de mask (o prev si no hay)
+    i = np.flatnonzero(mask)
+    return int(pos[i[-1]]) if len(i) else prev
+
+
+class CUSUM(_Detector):
+    name = "cusum"
+
+    def __init__(self, k: float = CUSUM_K, h: float = CUSUM_H, warmup: int = WARMUP):
+        super().__init__(warmup)
+        self.k, self.h = k, h
+
+    def _start(self, first: int) -> None:
+        self.s = np.zeros(2)                       # (sube, baja)
+        self.begin = np.array([-1, -1])            # inicio de la excursión actual de cada lado
+
+    def _scan(self, z, pos):
+        hits, S, begins = [], [], []
+        for side, d in enumerate((z - self.k, -z - self.k)):
+            c = self.s[side] + np.cumsum(d)
+            s = c - np.minimum(np.minimum.accumulate(c), 0.0)
+            S.append(s)
+            hit = np.flatnonzero(s > self.h)
+            hits.append(hit[0] if len(hit) else len(z))
+        k = min(hits)
+        end = min(k, len(z) - 1)
+        for side, s in enumerate(S):
+            # la excursión empieza en la muestra siguiente al último S = 0 (-1: en el próximo bloque)
+            zero = np.flatnonzero(s[:end + 1] == 0)
+            if len(zero):
+                begins.append(int(pos[zero[-1] + 1]) if zero[-1] < end else -1)
+            else:
+                begins.append(int(self.begin[side]) if self.begin[side] >= 0 else int(pos[0]))
+        if k < len(z):
+            side = int(np.argmin(hits))
+            return k, begins[side]
+        self.s = np.array([S[0][-1], S[1][-1]])
+        self.begin = np.array(begins)
+        return None
+
+    @property
+    def nbytes(self) -> int:
+        return self.s.nbytes + self.begin.nbytes
+
+
+class PageHinkley(_Detector):
+    name = "page_hinkley"
+
+    def __init__(self, delta: float = PH_DELTA, lam: float = PH_LAMBDA, min_samples: int = PH_MIN,
+                 warmup: int = WARMUP):
+        super().__init__(warmup)
+        self.delta, self.lam, self.min_samples = delta, lam, min_samples
+
+    def _start(self, first: int) -> None:
+        self.count, self.total = 0, 0.0
+        self.m = np.zeros(2)                    # (sube, baja)
+        self.ext = np.zeros(2)                  # mínimo de m sube / máximo de m baja
+        self.at = np.array([first, first])      # dónde se alcanzó cada extremo
+
+    def _scan(self, z, pos):
+        cnt = self.count + np.arange(1, len(z) + 1)
+        dev = z - (self.total + np.cumsum(z)) / cnt
+        up = self.m[0] + np.cumsum(dev - self.delta)
+        dn = self.m[1] + np.cumsum(dev + self.delta)
+        lo = np.minimum(np.minimum.accumulate(up), self.ext[0])
+        hi = np.maximum(np.maximum.accumulate(dn), self.ext[1])
+        ready = cnt >= self.min_samples
+        hit = np.flatnonzero((((up - lo) > self.lam) | ((hi - dn) > self.lam)) & ready)
+        if len(hit):
+            k = hit[0]
+            side = 0 if up[k] - lo[k] > self.lam else 1
+            ext, m = (lo, up) if side == 0 else (hi, dn)
+            return k, _last(m[:k + 1] == ext[:k + 1], pos, int(self.at[side]))
+        self.at = np.array([_last(up == lo, pos, int(self.at[0])), _last(dn == hi, pos, int(self.at[1]))])
+        self.count, self.total = int(cnt[-1]), float(self.total + z.sum())
+        self.m = np.array([up[-1], dn[-1]])
+        self.ext = np.array([lo[-1], hi[-1]])
+        return None
+
+    @property
+    def nbytes(self) -> int:
+        return self.m.nbytes + self.ext.nbytes + self.at.nbytes + 16
+
+
+class ADWIN(_Detector):
+    name = "adwin"
+    reset_on_alarm = False
+
+    def __init__(self, delta: float = ADWIN_DELTA, clock: int = CLOCK, max_buckets: int = MAX_BUCKETS,
+                 warmup: int = WARMUP):
+        super().__init__(warmup)
+        self.delta, self.clock, self.max_buckets = delta, clock, max_buckets
+
+    def _start(self, first: int) -> None:
+        self.levels: List[List[list]] = []          # nivel i: buckets de clock·2^i muestras [n, suma, M2, inicio], viejo -> nuevo
+        self._pz, self._pp = np.empty(0), np.empty(0, dtype=np.int64)   # muestras de un bucket incompleto
+
+    def _insert(self, z: np.ndarray, first: int) -> None:
+        mu = float(z.mean())
+        b = [len(z), float(z.sum()), float(((z - mu) ** 2).sum()), first]
+        if not self.levels:
+            self.levels.append([])
+        self.levels[0].append(b)
+        for i in range(len(self.levels)):
+            lv = self.levels[i]
+            if len(lv) <= self.max_buckets:
+                break
+            (na, sa, ma, start), (nb, sb, mb, _) = lv.pop(0), lv.pop(0)
+            d = sb / nb - sa / na
+            merged = [na + nb, sa + sb, ma + mb + d * d * na * nb / (na + nb), start]
+            if i + 1 == len(self.levels):
+                self.levels.append([])
+            self.levels[i + 1].append(merged)
+
+    def _window(self) -> np.ndarray:
+        # buckets del más viejo al más nuevo: (n, suma, M2)
+        return np.array([b[:3] for lv in reversed(self.levels) for b in lv], dtype=np.float64)
+
+    def _has_cut(self) -> bool:
+        w = self._window()
+        if len(w) < 2:
+            return False
+        n, s, m2 = w[:, 0], w[:, 1], w[:, 2]
+        N, S = n.sum(), s.sum()
+        mean = S / N
+        var = (m2.sum() + (n * (s / n - mean) ** 2).sum()) / N
+        n0, s0 = np.cumsum(n)[:-1], np.cumsum(s)[:-1]
+        n1 = N - n0
+        inv = 1 / n0 + 1 / n1
+        dd = np.log(2 * np.log(N) / self.delta)
+        eps = np.sqrt(2 * inv * var * dd) + 2 / 3 * dd * inv
+        return bool((np.abs(s0 / n0 - (S - s0) / n1) > eps).any())
+
+    def _scan(self, z, pos):
+        p = len(self._pz)
+        zz, pp = np.concatenate((self._pz, z)), np.concatenate((self._pp, pos))
+        full = len(zz) // self.clock * self.clock
+        for a in range(0, full, self.clock):
+            self._insert(zz[a:a + self.clock], int(pp[a]))
+            if self._has_cut():
+                while self._has_cut():
+                    top = self.levels[-1]
+                    top.pop(0)
+                    if not top:
+                        self.levels.pop()
+                # p < clock: el bucket que dispara termina dentro de z (índice end - p)
+                self._pz, self._pp = np.empty(0), np.empty(0, dtype=np.int64)
+                return a + self.clock - 1 - p, self.levels[-1][0][3]
+        self._pz, self._pp = zz[full:], pp[full:]
+        return None
+
+    @property
+    def width(self) -> int:
+        return int(sum(b[0] for lv in self.levels for b in lv))
+
+    @property
+    def nbytes(self) -> int:
+        return 32 * sum(len(lv) for lv in self.levels) + self._pz.nbytes + self._pp.nbytes
+
+
+DETECTORS = {"adwin": ADWIN, "page_hinkley": PageHinkley, "cusum": CUSUM}
+
+
+class OnlineMonitor:
+    # un detector por (columna, tipo); update() recibe micro-batches del stream
+    def __init__(self, columns: Sequence[str], detectors: Iterable[str] = tuple(DETECTORS),
+                 predictions: Iterable[str] = (), warmup: int = WARMUP):
+        detectors, predictions = list(detectors), set(predictions)
+        bad = [d for d in detectors if d not in DETECTORS]
+        if bad:
+            raise ValueError(f"unknown detectors {bad}; expected some of {list(DETECTORS)}")
+        self.roles = {c: "prediction" if c in predictions else "feature" for c in columns}
+        self.detectors = {(c, d): DETECTORS[d](warmup=warmup) for c in columns for d in detectors}
+        self.t = 0
+        self.events: List[dict] = []
+
+    def update(self, df: pd.DataFrame) -> List[dict]:
+        n = len(df)
+        pos = np.arange(self.t, self.t + n)
+        new = []
+        cache = {}
+        for (c, d), det in self.detectors.items():
+            if c not in cache:
+                cache[c] = df[c].to_numpy(dtype=np.float64, na_value=np.nan) if c in df.columns else np.full(n, np.nan)
+            for detected, change in det.update(cache[c], pos):
+                new.append({"stream": c, "role": self.roles[c], "detector": d, "detected_at": detected,
+                            "change_at": change, "delay": detected - change})
+        self.t += n
+        self.events += new
+        return new
+
+    @property
+    def nbytes(self) -> int:
+        return sum(det.nbytes for det in self.detectors.values())
+
+    def frame(self) -> pd.DataFrame:
+        cols = ["stream", "role", "detector", "detected_at", "change_at", "delay"]
+        return pd.DataFrame(self.events, columns=cols).sort_values(["detected_at", "stream", "detector"],
+                                                                   ignore_index=True)
+
+
+def score_events(events: pd.DataFrame, changes: Dict[str, Sequence[int]], horizon: int = HORIZON) -> pd.DataFrame:
+    # con cambios conocidos por stream: la primera alarma dentro de `horizon` tras
+    # cada cambio es una detección (latency = detected_at - cambio); las alarmas
+    # fuera de esas ventanas son falsas. -> una fila por (stream, detector) con
+    # cambios, detecciones, latencia media y falsas alarmas
+    rows = []
+    keys = events[["stream", "detector"]].drop_duplicates().itertuples(index=False) if len(events) else []
+    pairs = set(map(tuple, keys)) | {(s, d) for s in changes for d in events["detector"].unique()}
+    by = defaultdict(list)
+    for r in events.itertuples(index=False):
+        by[(r.stream, r.detector)].append(r.detected_at)
+    for s, d in sorted(pairs):
+        alarms = np.sort(np.asarray(by[(s, d)], dtype=np.int64))
+        used = np.zeros(len(alarms), dtype=bool)
+        lat = []
+        for c in changes.get(s, ()):
+            i = np.searchsorted(alarms, c)
+            if i < len(alarms) and alarms[i] - c <= horizon:
+                lat.append(alarms[i] - c)
+            used |= (alarms >= c) & (alarms - c <= horizon)
+        rows.append({"stream": s, "detector": d, "changes": len(changes.get(s, ())), "detected": len(lat),
+                     "mean_latency": float(np.mean(lat)) if lat else float("nan"),
+                     "false_alarms": int((~used).sum())})
+    return pd.DataFrame(rows)
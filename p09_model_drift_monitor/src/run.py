@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from drift import PSI_DRIFT, PSI_MODERATE, DriftSketch, sketch_frames
+from fleet import BALANCES, fleet_drift
+
+HERE = Path(__file__).resolve().parent
+PROJECT = HERE.parent
+DATA = PROJECT / "data"
+OUT = PROJECT / "outputs"
+IMG = PROJECT / "img"
+BASELINE = OUT / "baseline_sketch.npz"
+FLEET_BASELINES = OUT / "fleet_baselines"
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.tables import OutputSpec, add_output_args, output_spec, save_table  # noqa: E402
+
+CHUNK = 500_000
+CHANNELS = ["web", "app", "branch", "partner"]
+REGIONS = ["north", "center", "south"]
+PREDICTIONS = ["score"]
+RETRAIN_SHARE = 0.3   # share de features en drift que dispara reentrenamiento
+FLEET_DRIFTED = 0.25  # share de modelos de la flota simulada con drift en el batch
+FLEET_SEED = 0
+
+def ensure_dirs():
+    DATA.mkdir(parents=True, exist_ok=True)
+    OUT.mkdir(parents=True, exist_ok=True)
+    IMG.mkdir(parents=True, exist_ok=True)
+
+def simulate_scoring(n_rows: int, seed: int = 9, shift: float = 0.0, chunk: int = CHUNK) -> Iterator[pd.DataFrame]:
+    # filas puntuadas por un modelo de riesgo simulado; shift (0-1) mueve ingreso,
+    # utilización, la mezcla de canales y los nulos de ingreso, y con shift > 0.5
+    # aparece un canal nuevo ("marketplace")
+    rng = np.random.default_rng(seed)
+    mix = np.array([0.45, 0.30, 0.15, 0.10, 0.0]) * (1 - shift) + np.array([0.25, 0.45, 0.05, 0.10, 0.15]) * shift
+    if shift <= 0.5:
+        mix[:4] += mix[4] / 4
+        mix[4] = 0
+    channels = np.array(CHANNELS + ["marketplace"], dtype=object)
+    for a in range(0, n_rows, chunk):
+        m = min(chunk, n_rows - a)
+        age = np.clip(rng.normal(41, 12, m), 18, 90).round()
+        income = rng.lognormal(10.4 - 0.25 * shift, 0.55 + 0.1 * shift, m).round(-1)
+        income[rng.random(m) < 0.02 + 0.08 * shift] = np.nan
+        tenure = rng.exponential(30, m).round()
+        util = np.clip(rng.beta(2, 5, m) + 0.15 * shift, 0, 1).round(4)
+        products = rng.poisson(2, m)
+        channel = channels[rng.choice(len(channels), m, p=mix / mix.sum())]
+        region = np.array(REGIONS, dtype=object)[rng.integers(0, len(REGIONS), m)]
+        z = -1.2 + 2.5 * util - 0.3 * (np.nan_to_num(np.log(income), nan=10.4) - 10.4) - 0.01 * tenure + 0.1 * products
+        yield pd.DataFrame({
+            "age": age,
+            "income": income,
+            "tenure_months": tenure,
+            "utilization": util,
+            "n_products": products,
+            "channel": channel,
+            "region": region,
+            "score": (1 / (1 + np.exp(-z))).round(5),
+        })
+
+def simulate_fleet(n_models: int, n_features: int, rows: int, seed: int = 0, batch: bool = True) -> Dict[str, pd.DataFrame]:
+    # flota simulada: cada modelo tiene sus propias features (70% numéricas de 4
+    # formas, 30% categóricas de 3 a 5000 valores, pd.Categorical) y un score. El
+    # baseline tiene `rows` filas por modelo; el batch, un volumen propio por modelo
+    # (lognormal alrededor de `rows`) y drift en ~30% de las features de un
+    # FLEET_DRIFTED de los modelos. Los parámetros salen de rng([seed, modelo]), así
+    # baseline y batch describen las mismas features
+    out = {}
+    for m in range(n_models):
+        spec = np.random.default_rng([seed, m])
+        rng = np.random.default_rng([seed, m, int(batch)])
+        n = max(100, int(rows * spec.lognormal(0, 0.6)))
+        n = n if batch else rows
+        drifted = spec.random() < FLEET_DRIFTED
+        cols, z = {}, rng.normal(0, 1, n)
+        for j in range(n_features):
+            categorical, form = spec.random() < 0.3, spec.integers(0, 4)
+            hit, amount = spec.random() < 0.3, spec.uniform(0.3, 1.0)
+            amount = amount if batch and drifted and hit else 0.0
+            if categorical:
+                card, a = int(np.exp(spec.uniform(np.log(3), np.log(5000)))), spec.uniform(0.8, 1.5)
+                p = (np.arange(card) + 1.0) ** -(a * (1 - 0.5 * amount))
+                codes = rng.choice(card, n, p=p / p.sum())
+                cols[f"f{j:03d}"] = pd.Categorical.from_codes(codes, [f"v{i}" for i in range(card)])
+            elif form == 0:
+                mu, sigma = spec.normal(0, 10), spec.uniform(0.5, 5)
+                x = rng.normal(mu + amount * sigma, sigma, n)
+                z += (x - mu) / sigma / 3
+                cols[f"f{j:03d}"] = x
+            elif form == 1:
+                mean, sd = spec.uniform(0, 5), spec.uniform(0.2, 1)
+                cols[f"f{j:03d}"] = rng.lognormal(mean + amount * sd, sd, n).round(2)
+            elif form == 2:
+                cols[f"f{j:03d}"] = rng.poisson(spec.uniform(0.5, 20) * (1 + amount), n).astype(np.float64)
+            else:
+                x = rng.random(n) ** (1 + amount)
+                x[rng.random(n) < 0.05 + 0.2 * amount] = np.nan
+                cols[f"f{j:03d}"] = x
+        cols["score"] = (1 / (1 + np.exp(-z))).round(5)
+        out[f"model_{m:03d}"] = pd.DataFrame(cols)
+    return out
+
+def day_shift(day: int, days: int) -> float:
+    # estable la primera mitad, luego rampa lineal hasta 1
+    start = days // 2
+    return 0.0 if day < start else (day - start + 1) / (days - start)
+
+def read_frames(path: Path, chunksize: int) -> Iterator[pd.DataFrame]:
+    with pd.read_csv(path, chunksize=chunksize, low_memory=False) as reader:
+        yield from reader
+
+def baseline_source(args) -> str:
+    # identifica el baseline persistido: CSV (o simulado) + columnas de predicción
+    data = str(args.baseline.resolve()) if args.baseline else f"simulated:{args.baseline_rows}"
+    return f"{data}|predictions={','.join(args.predictions)}"
+
+def load_or_build_baseline(args) -> Tuple[DriftSketch, Optional[float]]:
+    # el baseline se resume una vez y se persiste; las corridas siguientes solo leen
+    # el .npz, salvo --refit o si fue construido desde otra fuente / predicciones
+    source = baseline_source(args)
+    if args.baseline_sketch.exists() and not args.refit:
+        base = DriftSketch.load(args.baseline_sketch)
+        if base.source == source:
+            return base, None
+        print(f"{args.baseline_sketch.name} was built from {base.source or 'an unknown source'!r}; "
+              f"refitting from {source!r}")
+    frames = read_frames(args.baseline, args.chunksize) if args.baseline else simulate_scoring(args.baseline_rows, seed=9)
+    t0 = time.perf_counter()
+    base = sketch_frames(frames, predictions=args.predictions)
+    elapsed = time.perf_counter() - t0
+    base.source = source
+    base.save(args.baseline_sketch)
+    return base, elapsed
+
+def fleet_source(args, model: str) -> str:
+    # identifica el baseline persistido de un modelo de la flota simulada
+    return (f"simulated fleet:{model}|models={args.models}|features={args.features}"
+            f"|rows={args.fleet_rows}|seed={FLEET_SEED}")
+
+def load_or_build_fleet(args) -> Tuple[Dict[str, DriftSketch], Optional[float]]:
+    # un baseline por modelo en fleet_baselines/<modelo>.npz; se recalcula toda la
+    # flota si falta alguno, si alguno viene de otra simulación o con --refit
+    paths = {f"model_{m:03d}": FLEET_BASELINES / f"model_{m:03d}.npz" for m in range(args.models)}
+    if not args.refit and all(p.exists() for p in paths.values()):
+        bases = {m: DriftSketch.load(p) for m, p in paths.items()}
+        stale = [m for m, b in bases.items() if b.source != fleet_source(args, m)]
+        if not stale:
+            return bases, None
+        print(f"{len(stale)} fleet baseline(s) built from another simulation "
+              f"(e.g. {bases[stale[0]].source or 'an unknown source'!r}); refitting the fleet")
+    FLEET_BASELINES.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    bases = {}
+    for m, df in simulate_fleet(args.models, args.features, args.fleet_rows, FLEET_SEED, batch=False).items():
+        bases[m] = DriftSketch.fit(df, PREDICTIONS)
+        bases[m].update(df)
+        bases[m].source = fleet_source(args, m)
+        bases[m].save(paths[m])
+    return bases, time.perf_counter() - t0
+
+def drift_summary(metrics: pd.DataFrame, by: str = "batch") -> pd.DataFrame:
+    # por batch (o por modelo): share de features en drift, PSI de la predicción y recomendación
+    rows = []
+    for batch, g in metrics.groupby(by, sort=False):
+        feats, preds = g[g["role"] == "feature"], g[g["role"] == "prediction"]
+        share = float((feats["status"] == "drift").mean()) if len(feats) else 0.0
+        pred_psi = float(preds["psi"].max()) if len(preds) else float("nan")
+        if share >= RETRAIN_SHARE or pred_psi >= PSI_DRIFT:
+            action = "retrain"
+        elif (g["status"] != "stable").any():
+            action = "watch"
+        else:
+            action = "continue"
+        rows.append({by: batch, "rows": int(g["rows_batch"].max()), "drift_score": share,
+                     "prediction_psi": pred_psi, "max_psi": float(g["psi"].max()),
+                     "drifting": ", ".join(g.loc[g["status"] == "drift", "feature"]) or "-", "action": action})
+    return pd.DataFrame(rows)
+
+def save_outputs(base: DriftSketch, metrics: pd.DataFrame, t_base: Optional[float], t_batches: float,
+                 args, spec: OutputSpec = OutputSpec()) -> List[Path]:
+    paths = save_table(metrics, OUT / "drift_metrics", spec)
+    summary = drift_summary(metrics)
+
+    # plot: PSI por feature a lo largo de los batches
+    pv = metrics.pivot(index="batch", columns="feature", values="psi").loc[summary["batch"]]
+    fig, ax = plt.subplots(figsize=(10, 4))
+    for c in pv.columns:
+        ax.plot(np.arange(len(pv)), pv[c], marker="o", lw=2.5 if c in args.predictions else 1.2, label=c)
+    ax.axhline(PSI_MODERATE, color="orange", ls="--", lw=1)
+    ax.axhline(PSI_DRIFT, color="red", ls="--", lw=1)
+    ax.set_xticks(np.arange(len(pv)), pv.index, rotation=30, ha="right")
+    ax.set_ylabel("PSI vs baseline")
+    ax.set_title("P09 — Model Drift Monitor (PSI by feature)")
+    ax.legend(fontsize=8, ncol=2)
+    fig.tight_layout()
+    fig.savefig(IMG / "p09_model_drift_monitor_plot.png", dpi=160)
+    plt.close(fig)
+
+    rows = int(metrics["rows_batch"].groupby(metrics["batch"]).max().sum())
+    report = []
+    report.append("# P09 — Model Drift Monitor (V1 report)\n")
+    report.append(f"- Baseline: `{args.baseline_sketch.name}` ({base.rows:,} rows, {len(base.hists)} columns, "
+                  f"{base.nbytes / 1e3:,.0f} KB of histograms)"
+                  + (f", summarized in {t_base:.2f} s ({base.rows / t_base:,.0f} rows/s, including read / simulation)" if t_base else
+                     ", loaded from disk (raw baseline not read)"))
+    report.append(f"- Batches: {len(summary)} ({rows:,} rows) read and binned with the baseline bins in "
+                  f"{t_batches:.2f} s ({rows / t_batches:,.0f} rows/s, including read / simulation)")
+    report.append(f"- Thresholds: PSI >= {PSI_MODERATE} moderate, >= {PSI_DRIFT} drift; retrain if prediction PSI >= "
+                  f"{PSI_DRIFT} or >= {RETRAIN_SHARE:.0%} of features drift")
+    report.append("\n## Batches\n")
+    report.append("| batch | rows | drift score | prediction PSI | max PSI | drifting | action |")
+    report.append("|---|---:|---:|---:|---:|---|---|")
+    for _, r in summary.iterrows():
+        report.append(f"| {r['batch']} | {r['rows']:,} | {r['drift_score']:.0%} | {r['prediction_psi']:.3f} | "
+                      f"{r['max_psi']:.3f} | {r['drifting']} | {r['action']} |")
+    last = summary["batch"].iloc[-1]
+    report.append(f"\n## Features ({last})\n")
+    report.append("| feature | role | kind | PSI | JS | KS | null % base | null % batch | status |")
+    report.append("|---|---|---|---:|---:|---:|---:|---:|---|")
+    for _, r in metrics[metrics["batch"] == last].sort_values("psi", ascending=False).iterrows():
+        ks = f"{r['ks']:.3f}" if np.isfinite(r["ks"]) else "-"
+        report.append(f"| {r['feature']} | {r['role']} | {r['kind']} | {r['psi']:.3f} | {r['js']:.3f} | {ks} | "
+                      f"{r['null_rate_base']:.2%} | {r['null_rate_batch']:.2%} | {r['status']} |")
+    (OUT / "drift_report.md").write_text("\n".join(report) + "\n", encoding="utf-8")
+    return paths
+
+def save_fleet_outputs(metrics: pd.DataFrame, t_base: Optional[float], t_fleet: float, args,
+                       spec: OutputSpec = OutputSpec()) -> List[Path]:
+    paths = save_table(metrics, OUT / "drift_metrics", spec)
+    summary = drift_summary(metrics, "model").sort_values(["drift_score", "prediction_psi"], ascending=False)
+
+    # plot: drift score por modelo, coloreado por acción
+    colors = {"retrain": "C3", "watch": "C1", "continue": "C2"}
+    s = summary.sort_values("model")
+    fig, ax = plt.subplots(figsize=(10, 4))
+    ax.bar(np.arange(len(s)), s["drift_score"], color=[colors[a] for a in s["action"]], width=1.0)
+    ax.axhline(RETRAIN_SHARE, color="red", ls="--", lw=1)
+    ax.set_xlabel("model")
+    ax.set_ylabel("share of features in drift")
+    ax.set_title(f"P09 — Model Drift Monitor (fleet of {len(s)} models)")
+    fig.tight_layout()
+    fig.savefig(IMG / "p09_model_drift_monitor_plot.png", dpi=160)
+    plt.close(fig)
+
+    jobs, rows = len(metrics), int(metrics["rows_batch"].sum())
+    busy = metrics["job_ms"].sum() / 1e3
+    report = []
+    report.append("# P09 — Model Drift Monitor (fleet report)\n")
+    report.append(f"- Fleet: {len(summary)} models x {args.features} features + score = {jobs:,} (model, feature) jobs, "
+                  f"{rows:,} values in the batches")
+    report.append(f"- Baselines: `{FLEET_BASELINES.name}/` (one sketch per model)"
+                  + (f", summarized in {t_base:.2f} s" if t_base else ", loaded from disk"))
+    report.append(f"- Drift: {t_fleet:.2f} s with {args.max_workers} worker(s), balance `{args.balance}` "
+                  f"({rows / t_fleet:,.0f} values/s including the copy to shared memory; {busy:.2f} s inside jobs)")
+    report.append(f"- Thresholds: PSI >= {PSI_MODERATE} moderate, >= {PSI_DRIFT} drift; retrain if prediction PSI >= "
+                  f"{PSI_DRIFT} or >= {RETRAIN_SHARE:.0%} of features drift")
+    counts = summary["action"].value_counts()
+    report.append(f"- Actions: " + ", ".join(f"{a} {int(counts.get(a, 0))}" for a in ("retrain", "watch", "continue")))
+    report.append("\n## Models\n")
+    report.append("| model | rows | drift score | prediction PSI | max PSI | drifting | action |")
+    report.append("|---|---:|---:|---:|---:|---|---|")
+    for _, r in summary.iterrows():
+        drifting = r["drifting"].split(", ")
+        shown = ", ".join(drifting[:5]) + (f" (+{len(drifting) - 5})" if len(drifting) > 5 else "")
+        report.append(f"| {r['model']} | {r['rows']:,} | {r['drift_score']:.0%} | {r['prediction_psi']:.3f} | "
+                      f"{r['max_psi']:.3f} | {shown} | {r['action']} |")
+    report.append("\n## Top drifting features\n")
+    report.append("| model | feature | role | kind | cardinality | PSI | JS | KS | null % base | null % batch | status |")
+    report.append("|---|---|---|---|---:|---:|---:|---:|---:|---:|---|")
+    for _, r in metrics.nlargest(30, "psi").iterrows():
+        ks = f"{r['ks']:.3f}" if np.isfinite(r["ks"]) else "-"
+        report.append(f"| {r['model']} | {r['feature']} | {r['role']} | {r['kind']} | {r['cardinality']:,} | "
+                      f"{r['psi']:.3f} | {r['js']:.3f} | {ks} | {r['null_rate_base']:.2%} | {r['null_rate_batch']:.2%} | "
+                      f"{r['status']} |")
+    (OUT / "drift_report.md").write_text("\n".join(report) + "\n", encoding="utf-8")
+    return paths
+
+def run_fleet(args) -> List[Path]:
+    bases, t_base = load_or_build_fleet(args)
+    batches = simulate_fleet(args.models, args.features, args.fleet_rows, FLEET_SEED)
+    t0 = time.perf_counter()
+    metrics = fleet_drift(bases, batches, args.max_workers, args.balance)
+    t_fleet = time.perf_counter() - t0
+    return save_fleet_outputs(metrics, t_base, t_fleet, args, output_spec(args))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--baseline", type=Path, default=None, help="CSV del baseline (si falta, se simula)")
+    ap.add_argument("--baseline-rows", type=int, default=2_000_000, help="filas del baseline simulado")
+    ap.add_argument("--baseline-sketch", type=Path, default=BASELINE, help="histogramas persistidos del baseline")
+    ap.add_argument("--refit", action="store_true", help="recalcular el baseline aunque exista el .npz")
+    ap.add_argument("--batch", type=Path, nargs="*", default=[], help="CSVs de batches nuevos (si faltan, días simulados)")
+    ap.add_argument("--days", type=int, default=7)
+    ap.add_argument("--batch-rows", type=int, default=500_000)
+    ap.add_argument("--predictions", nargs="*", default=PREDICTIONS, help="columnas de salida del modelo")
+    ap.add_argument("--chunksize", type=int, default=CHUNK)
+    ap.add_argument("--models", type=int, default=1, help="> 1: flota simulada de modelos (un batch por modelo)")
+    ap.add_argument("--features", type=int, default=150, help="features por modelo de la flota")
+    ap.add_argument("--fleet-rows", type=int, default=10_000, help="filas por modelo de la flota (baseline y media del batch)")
+    ap.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="procesos para los jobs de la flota")
+    ap.add_argument("--balance", default="cardinality", choices=BALANCES, help="reparto de los jobs de la flota")
+    add_output_args(ap)
+    args = ap.parse_args()
+
+    ensure_dirs()
+    if args.models > 1:
+        paths = run_fleet(args)
+        print("OK — Generated outputs:")
+        for path in paths:
+            print(f"- {path}")
+        print(f"- {FLEET_BASELINES}")
+        print(f"- {OUT / 'drift_report.md'}")
+        print(f"- {IMG / 'p09_model_drift_monitor_plot.png'}")
+        return
+    base, t_base = load_or_build_baseline(args)
+    if args.batch:
+        batches = [(p.stem, read_frames(p, args.chunksize)) for p in args.batch]
+    else:
+        batches = [(f"day_{d + 1:02d}", simulate_scoring(args.batch_rows, seed=100 + d, shift=day_shift(d, args.days)))
+                   for d in range(args.days)]
+    metrics, t_batches = [], 0.0
+    for name, frames in batches:
+        t0 = time.perf_counter()
+        sk = sketch_frames(frames, base)
+        t_batches += time.perf_counter() - t0
+        metrics.append(base.compare(sk).assign(batch=name))
+    metrics = pd.concat(metrics, ignore_index=True)
+    metrics = metrics[["batch"] + [c for c in metrics.columns if c != "batch"]]
+    paths = save_outputs(base, metrics, t_base, t_batches, args, output_spec(args))
+
+    print("OK — Generated outputs:")
+    for path in paths:
+        print(f"- {path}")
+    print(f"- {args.baseline_sketch}")
+    print(f"- {OUT / 'drift_report.md'}")
+    print(f"- {IMG / 'p09_model_drift_monitor_plot.png'}")
+
+if __name__ == "__main__":
+    main()
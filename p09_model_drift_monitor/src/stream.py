@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+# Modo online: pasa un stream por micro-batches a los detectores de online.py
+# (ADWIN / Page-Hinkley / CUSUM por feature y por salida del modelo) y emite
+# eventos de drift con su latencia.
+#
+#   python src/stream.py                          # señal demo t,value (data/p09_model_drift_monitor_data.csv)
+#   python src/stream.py --source simulated       # scoring simulado con un cambio conocido en --change-at
+#   python src/stream.py --source otro.csv --columns x y --predictions score
+#
+# En el stream simulado el cambio es conocido: latency = alarma - cambio, y las
+# alarmas en streams que no cambian (o fuera de --horizon) cuentan como falsas.
+# Solo columnas numéricas; las categóricas se vigilan con el motor batch (run.py).
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from online import DETECTORS, HORIZON, WARMUP, OnlineMonitor, score_events
+from run import PREDICTIONS, simulate_scoring
+
+HERE = Path(__file__).resolve().parent
+PROJECT = HERE.parent
+DATA = PROJECT / "data"
+OUT = PROJECT / "outputs"
+IMG = PROJECT / "img"
+DEMO = DATA / "p09_model_drift_monitor_data.csv"
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.tables import add_output_args, output_spec, save_table  # noqa: E402
+
+SHIFTED = ["income", "utilization", "score"]   # columnas que cambian en el stream simulado
+
+
+def load_stream(args) -> Tuple[pd.DataFrame, List[str], Dict[str, List[int]]]:
+    # -> (stream, columnas a vigilar, cambios conocidos por columna)
+    if args.source == "simulated":
+        half = args.change_at
+        df = pd.concat([*simulate_scoring(half, seed=21), *simulate_scoring(args.rows - half, seed=22, shift=1.0)],
+                       ignore_index=True)
+        cols = args.columns or list(df.select_dtypes("number").columns)
+        return df, cols, {c: [half] for c in SHIFTED if c in cols}
+    path = DEMO if args.source == "demo" else Path(args.source)
+    df = pd.read_csv(path, low_memory=False)
+    cols = args.columns or [c for c in df.select_dtypes("number").columns if c != "t"]
+    return df, cols, {}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--source", default="demo", help="demo, simulated o la ruta de un CSV")
+    ap.add_argument("--columns", nargs="*", default=None, help="columnas a vigilar (default: numéricas)")
+    ap.add_argument("--predictions", nargs="*", default=PREDICTIONS, help="columnas de salida del modelo")
+    ap.add_argument("--detectors", nargs="*", default=list(DETECTORS), choices=list(DETECTORS))
+    ap.add_argument("--rows", type=int, default=200_000, help="filas del stream simulado")
+    ap.add_argument("--change-at", type=int, default=100_000, help="fila del cambio en el stream simulado")
+    ap.add_argument("--block", type=int, default=None, help="filas por micro-batch (default: 1000; 20 en demo)")
+    ap.add_argument("--warmup", type=int, default=None, help=f"muestras de warm-up (default: {WARMUP}; 50 en demo)")
+    ap.add_argument("--horizon", type=int, default=HORIZON, help="latencia máxima para contar una detección")
+    add_output_args(ap)
+    args = ap.parse_args()
+    demo = args.source == "demo"
+    block = args.block or (20 if demo else 1000)
+    warmup = args.warmup or (50 if demo else WARMUP)
+
+    OUT.mkdir(parents=True, exist_ok=True)
+    IMG.mkdir(parents=True, exist_ok=True)
+    df, cols, changes = load_stream(args)
+    mon = OnlineMonitor(cols, args.detectors, args.predictions, warmup)
+    t0 = time.perf_counter()
+    for a in range(0, len(df), block):
+        mon.update(df.iloc[a:a + block])
+    dt = time.perf_counter() - t0
+    events = mon.frame()
+    paths = save_table(events, OUT / "drift_events", output_spec(args))
+
+    # plot: el stream principal (salida del modelo si hay) con las alarmas de cada detector
+    main_col = next((c for c in cols if c in args.predictions), cols[0])
+    fig, ax = plt.subplots(figsize=(10, 4))
+    y = df[main_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    step = max(1, len(y) // 5000)
+    ax.plot(np.arange(0, len(y), step), y[::step], lw=0.6, color="0.4", label=main_col)
+    for (d, g), color in zip(events[events["stream"] == main_col].groupby("detector"), ["C0", "C1", "C3"]):
+        ax.vlines(g["detected_at"], np.nanmin(y), np.nanmax(y), colors=color, lw=1, label=f"{d} alarm")
+    for c in changes.get(main_col, []):
+        ax.axvline(c, color="k", ls="--", lw=1, label="true change")
+    ax.set_xlabel("sample")
+    ax.set_title(f"P09 — Model Drift Monitor (online, {args.source})")
+    ax.legend(fontsize=8)
+    fig.tight_layout()
+    fig.savefig(IMG / "p09_model_drift_monitor_stream.png", dpi=160)
+    plt.close(fig)
+
+    n_det = len(mon.detectors)
+    report = []
+    report.append("# P09 — Model Drift Monitor (online report)\n")
+    report.append(f"- Stream: `{args.source}` ({len(df):,} samples x {len(cols)} streams: {', '.join(cols)}), "
+                  f"micro-batches of {block:,}, warm-up {warmup}")
+    report.append(f"- Detectors: {', '.join(args.detectors)} ({n_det} instances, {mon.nbytes / 1e3:,.1f} KB of state)")
+    report.append(f"- {dt * 1e3:,.1f} ms ({len(df) * n_det / dt:,.0f} detector-samples/s, "
+                  f"{dt / (len(df) * n_det) * 1e9:,.0f} ns per sample per detector)")
+    report.append(f"- Events: {len(events)}")
+    if changes:
+        score = score_events(events, changes, args.horizon)
+        report.append(f"\n## Detection vs known change at sample {args.change_at:,}\n")
+        report.append("| stream | detector | changes | detected | latency (samples) | false alarms |")
+        report.append("|---|---|---:|---:|---:|---:|")
+        for _, r in score.iterrows():
+            lat = f"{r['mean_latency']:,.0f}" if np.isfinite(r["mean_latency"]) else "-"
+            report.append(f"| {r['stream']} | {r['detector']} | {r['changes']} | {r['detected']} | {lat} | "
+                          f"{r['false_alarms']} |")
+    report.append("\n## Events\n")
+    report.append("| stream | role | detector | detected at | change at (estimated) | delay |")
+    report.append("|---|---|---|---:|---:|---:|")
+    for _, r in events.head(50).iterrows():
+        report.append(f"| {r['stream']} | {r['role']} | {r['detector']} | {r['detected_at']:,} | {r['change_at']:,} | "
+                      f"{r['delay']:,} |")
+    if len(events) > 50:
+        report.append(f"\n({len(events) - 50} more in `drift_events`)")
+    (OUT / "stream_report.md").write_text("\n".join(report) + "\n", encoding="utf-8")
+
+    print("OK — Generated outputs:")
+    for path in paths:
+        print(f"- {path}")
+    print(f"- {OUT / 'stream_report.md'}")
+    print(f"- {IMG / 'p09_model_drift_monitor_stream.png'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+# Benchmark del join de contexto (signals.py): 100k incidentes x 10k señales
+# (500 servicios x 20 señales, muestreo irregular) contra pandas.
+#
+#   python src/bench_context.py --incidents 100000 --services 500 --per-service 20 --points 1500
+#
+# Store: indexar la tabla larga, ventanas [t - Δ, t + Δ] de cada incidente en
+# las señales de su servicio (join_context) y n / media / std por ventana.
+# pd.merge_asof: último valor de cada (incidente, señal) con tolerancia Δ, lo
+# mismo que SignalStore.asof. Merge + filtro: el join de ventanas "a mano"
+# (incidentes x puntos del servicio, filtrar por tiempo, groupby) sobre una
+# muestra de incidentes, extrapolado al total.
+# Paridad: asof == merge_asof valor a valor; n / media de las ventanas == merge +
+# filtro en la muestra; las ventanas son vistas del store (sin copia).
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from signals import SignalStore, join_context
+
+START = np.datetime64("2026-01-05T00:00", "ns")
+
+
+def make_data(services: int, per_service: int, points: int, incidents: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    n_sig = services * per_service
+    total = n_sig * points
+    gaps = rng.exponential(60e9, total).astype(np.int64) + 1
+    sig = np.repeat(np.arange(n_sig), points)
+    csum = np.cumsum(gaps)
+    t = START + (csum - np.repeat(csum[::points] - gaps[::points], points)).astype("timedelta64[ns]")
+    signals = pd.DataFrame({"service": sig // per_service, "signal": sig, "t": t,
+                            "value": rng.normal(0, 1, total) + np.repeat(rng.normal(0, 10, n_sig), points)})
+    span = int(points * 60e9)
+    inc = pd.DataFrame({"service": rng.integers(0, services, incidents),
+                        "t": START + rng.integers(0, span, incidents).astype("timedelta64[ns]")})
+    return signals, inc
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--incidents", type=int, default=100_000)
+    ap.add_argument("--services", type=int, default=500)
+    ap.add_argument("--per-service", type=int, default=20)
+    ap.add_argument("--points", type=int, default=1500, help="puntos por señal (~1 por minuto)")
+    ap.add_argument("--delta-min", type=int, default=30)
+    ap.add_argument("--sample", type=int, default=200, help="incidentes para el merge + filtro")
+    args = ap.parse_args()
+    delta = np.timedelta64(args.delta_min, "m")
+
+    signals, inc = make_data(args.services, args.per_service, args.points, args.incidents)
+    print(f"{args.incidents:,} incidents x {args.services * args.per_service:,} signals "
+          f"({len(signals):,} points), window +/- {args.delta_min} min")
+
+    t0 = time.perf_counter()
+    store = SignalStore.from_long(signals, group="service")
+    t_index = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ctx = join_context(store, inc["t"].to_numpy(), delta, inc["service"].to_numpy())
+    t_join = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    frame = ctx.frame()
+    t_stats = time.perf_counter() - t0
+    assert np.shares_memory(ctx.window(0)[1], store.values)
+    print(f"store: index {t_index:.2f} s, join {t_join:.2f} s ({len(ctx):,} windows, {ctx.points:,} points), "
+          f"window stats {t_stats:.2f} s; total {t_index + t_join + t_stats:.2f} s; {store.nbytes / 1e6:,.0f} MB")
+
+    # asof: store vs pd.merge_asof sobre todos los pares (incidente, señal)
+    t0 = time.perf_counter()
+    pos = store.asof(ctx.signal, inc["t"].to_numpy()[ctx.incident], delta)
+    mine = np.where(pos >= 0, store.values[np.maximum(pos, 0)], np.nan)
+    t_asof = time.perf_counter() - t0
+    left = pd.DataFrame({"k": np.arange(len(ctx)), "signal": store.names[ctx.signal].astype(np.int64),
+                         "t": inc["t"].to_numpy()[ctx.incident]})
+    t0 = time.perf_counter()
+    m = pd.merge_asof(left.sort_values("t"), signals[["signal", "t", "value"]].sort_values("t"), on="t",
+                      by="signal", tolerance=pd.Timedelta(delta), direction="backward")
+    t_merge = time.perf_counter() - t0
+    ref = m.sort_values("k")["value"].to_numpy()
+    assert np.array_equal(mine, ref, equal_nan=True)
+    print(f"asof ({len(ctx):,} pairs): store {t_asof:.2f} s vs pd.merge_asof {t_merge:.2f} s "
+          f"({t_merge / t_asof:.0f}x); parity OK")
+
+    # ventanas: merge por servicio + filtro por tiempo + groupby, en una muestra
+    k = min(args.sample, len(inc))
+    sub = inc.head(k).assign(incident=np.arange(k))
+    t0 = time.perf_counter()
+    j = sub.merge(signals, on="service", suffixes=("_inc", ""))
+    j = j[(j["t"] >= j["t_inc"] - delta) & (j["t"] <= j["t_inc"] + delta)]
+    naive = j.groupby(["incident", "signal"])["value"].agg(["size", "mean"])
+    t_naive = time.perf_counter() - t0
+    mask = ctx.incident < k
+    n, mean, _ = store.stats(ctx.signal[mask], ctx.lo[mask], ctx.hi[mask])
+    got = pd.DataFrame({"incident": ctx.incident[mask], "signal": store.names[ctx.signal[mask]].astype(np.int64),
+                        "size": n, "mean": mean}).query("size > 0").set_index(["incident", "signal"]).sort_index()
+    assert np.array_equal(got["size"].to_numpy(), naive["size"].to_numpy())
+    assert np.allclose(got["mean"].to_numpy(), naive["mean"].to_numpy(), rtol=1e-9, atol=1e-9)
+    per = t_naive / k
+    print(f"window join, merge + filter on {k} incidents: {t_naive:.2f} s ({len(j):,} rows kept); "
+          f"extrapolated to {len(inc):,}: {per * len(inc):,.0f} s vs store {t_join + t_stats:.2f} s "
+          f"({per * len(inc) / (t_join + t_stats):,.0f}x); parity OK (n and mean per window)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from signals import Context, SignalStore
+
+# Ranking de causas candidatas: por incidente, cada señal de su servicio (menos
+# la KPI) recibe un score de correlación con retardo, alineación del cambio y
+# contribución. Lo caro se calcula una vez por señal y por ventana de tiempo;
+# cada incidente es un lookup en esas tablas + top-k con argpartition, en vez de
+# incidentes x señales x lags correlaciones.
+#
+#   grilla       SignalStore.resample: media por paso regular (sumas prefijas)
+#   rolling      change_scores: salto de nivel en cada paso, (media de los HALF
+#                pasos siguientes - media de los HALF previos) / std de los previos,
+#                con cumsums -> una matriz z señales x pasos. Resume los cambios de
+#                nivel sin el ruido paso a paso de las diferencias
+#   ventanas     window_tables: la grilla se corta en ventanas de WINDOW pasos cada
+#                HOP. Por ventana, correlación cruzada por FFT (rfft por lotes, cero
+#                padding a 2 WINDOW) del z de cada señal (recortado a +/- Z_CLIP)
+#                con el de la KPI de su grupo, lags 0..MAX_LAG (la señal se mueve
+#                ANTES que la KPI)
+#   incidente    rank_causes: lookup de corr / lag en la ventana cuyo centro queda
+#                más cerca del incidente, el mayor |z| de cada candidata cerca del
+#                incidente (gather de ~3 MAX_LAG pasos de la matriz z), score y
+#                top-k
+#
+# score = W_CORR |corr| + W_CHANGE alineación + W_CONTRIB contribución (cada una en 0-1)
+#   alineación    1 si el mayor cambio está 0..MAX_LAG pasos antes del incidente;
+#                 decae si es antes (en MAX_LAG pasos) o después (en AFTER_DECAY
+#                 pasos: un síntoma, no una causa); por min(1, |z| / Z_REF)
+#   contribución  |z| del mayor cambio de la señal en los MAX_LAG pasos previos al
+#                 incidente / suma de esos |z| entre las candidatas del incidente
+
+WINDOW = 128
+HOP = 32
+MAX_LAG = 20
+HALF = 10
+Z_REF = 3.0
+Z_CLIP = 10.0
+AFTER_DECAY = 3.0
+W_CORR = 0.3
+W_CHANGE = 0.3
+W_CONTRIB = 0.4
+TOP_K = 5
+BLOCK = 1024        # señales por lote de FFT (acota la memoria)
+
+
+def kpi_index(store: SignalStore, kpi: str) -> np.ndarray:
+    # por señal, índice de la KPI de su grupo (-1 si el grupo no tiene KPI); la
+    # KPI es la señal `kpi` o `<grupo>/<kpi>`
+    names = pd.Series(store.names).astype(str)
+    is_kpi = (names.str.endswith("/" + kpi) | (names == kpi)).to_numpy()
+    codes, uniq = pd.factorize(store.groups if store.groups is not None else np.zeros(len(store)))
+    per_group = np.full(len(uniq), -1)
+    per_group[codes[is_kpi]] = np.flatnonzero(is_kpi)
+    return per_group[codes]
+
+
+def change_scores(G: np.ndarray, half: int = HALF) -> np.ndarray:
+    # z del salto de nivel en cada paso (0 en los bordes), desde sumas prefijas
+    S, T = G.shape
+    X = G - G.mean(axis=1, keepdims=True)
+    c1 = np.concatenate((np.zeros((S, 1)), np.cumsum(X, axis=1)), axis=1)
+    c2 = np.concatenate((np.zeros((S, 1)), np.cumsum(X * X, axis=1)), axis=1)
+    t = np.arange(half, T - half + 1)
+    mb = (c1[:, t] - c1[:, t - half]) / half
+    ma = (c1[:, t + half] - c1[:, t]) / half
+    sd = np.sqrt(np.maximum((c2[:, t] - c2[:, t - half]) / half - mb * mb, 0.0))
+    floor = 1e-3 * np.maximum(X.std(axis=1, keepdims=True), 1e-12)
+    Z = np.zeros((S, T))
+    Z[:, t] = (ma - mb) / np.maximum(sd, floor)
+    return Z
+
+
+@dataclass
+class WindowTables:
+    # por (señal, ventana): máx |corr| con la KPI del grupo en lags 0..max_lag y su lag
+    starts: np.ndarray      # paso inicial de cada ventana
+    window: int
+    corr: np.ndarray
+    lag: np.ndarray
+
+    def window_of(self, g: np.ndarray) -> np.ndarray:
+        # ventana cuyo centro queda más cerca del paso g
+        centers = self.starts + self.window // 2
+        if len(centers) == 1:
+            return np.zeros(len(g), dtype=np.int64)
+        i = np.clip(np.searchsorted(centers, g), 1, len(centers) - 1)
+        return np.where(np.abs(centers[i - 1] - g) <= np.abs(centers[i] - g), i - 1, i)
+
+
+def _spectra(X: np.ndarray, starts: np.ndarray, window: int) -> np.ndarray:
+    # rfft de cada ventana (centrada y normalizada) de cada fila -> (filas, ventanas, window + 1)
+    seg = sliding_window_view(X, window, axis=1)[:, starts]
+    seg = seg - seg.mean(axis=-1, keepdims=True)
+    norm = np.linalg.norm(seg, axis=-1, keepdims=True)
+    seg = np.divide(seg, norm, out=np.zeros_like(seg), where=norm > 0)
+    return np.fft.rfft(seg, 2 * window, axis=-1)
+
+
+def window_tables(Z: np.ndarray, kpi_of: np.ndarray, window: int = WINDOW, hop: int = HOP,
+                  max_lag: int = MAX_LAG, block: int = BLOCK) -> WindowTables:
+    S, T = Z.shape
+    window = min(window, T)
+    X = np.clip(Z, -Z_CLIP, Z_CLIP)
+    starts = np.arange(0, T - window + 1, hop)
+    kpis = np.unique(kpi_of[kpi_of >= 0])
+    slot = np.full(S, -1)
+    slot[kpis] = np.arange(len(kpis))
+    Fk = _spectra(X[kpis], starts, window)
+    corr = np.zeros((S, len(starts)))
+    lag = np.zeros((S, len(starts)), dtype=np.int64)
+    for a in range(0, S, block):
+        rows = np.arange(a, min(a + block, S))
+        rows = rows[kpi_of[rows] >= 0]
+        if not len(rows):
+            continue
+        # cc[l] = Σ_t kpi[t + l] x[t]: la señal x adelanta a la KPI en l pasos
+        cc = np.fft.irfft(Fk[slot[kpi_of[rows]]] * np.conj(_spectra(X[rows], starts, window)), 2 * window,
+                          axis=-1)[..., :max_lag + 1]
+        best = np.abs(cc).argmax(axis=-1)
+        corr[rows] = np.abs(np.take_along_axis(cc, best[..., None], axis=-1))[..., 0]
+        lag[rows] = best
+    return WindowTables(starts, window, corr, lag)
+
+
+def rank_causes(ctx: Context, steps: np.ndarray, Z: np.ndarray, tables: WindowTables, kpi_of: np.ndarray,
+                max_lag: int = MAX_LAG, top_k: int = TOP_K) -> pd.DataFrame:
+    # ctx: pares (incidente, señal) del join de contexto; steps: paso de la grilla
+    # de cada incidente. -> top-k por incidente
+    keep = (kpi_of[ctx.signal] >= 0) & (kpi_of[ctx.signal] != ctx.signal)
+    inc, sig = ctx.incident[keep], ctx.signal[keep]
+    n = len(steps)
+    w = tables.window_of(steps)[inc]
+    corr, lag = tables.corr[sig, w], tables.lag[sig, w]
+
+    # mayor |z| de cada candidata en [g - 2 max_lag, g + max_lag] (gather de la matriz z)
+    offs = np.arange(-2 * max_lag, max_lag + 1)
+    cols = np.clip(steps[inc][:, None] + offs, 0, Z.shape[1] - 1)
+    A = np.abs(Z[sig[:, None], cols])
+    at = A.argmax(axis=1)
+    d = -offs[at]                                   # pasos del cambio antes del incidente
+    align = np.where(d < 0, np.exp(d / AFTER_DECAY), np.where(d > max_lag, np.exp(-(d - max_lag) / max_lag), 1.0))
+    change = align * np.minimum(1.0, A[np.arange(len(A)), at] / Z_REF)
+    lead = A[:, (offs >= -max_lag) & (offs <= 0)].max(axis=1)
+    total = np.bincount(inc, lead, minlength=n)[inc]
+    contrib = np.divide(lead, total, out=np.zeros_like(lead), where=total > 0)
+    score = W_CORR * corr + W_CHANGE * change + W_CONTRIB * contrib
+
+    # top-k: matriz incidentes x candidatas (relleno -inf) y argpartition por fila
+    cnt = np.bincount(inc, minlength=n)
+    m = int(cnt.max()) if len(cnt) else 0
+    if not m:
+        return pd.DataFrame(columns=["incident", "rank", "signal", "score", "lag_corr", "lag", "change_align",
+                                     "change_at", "contribution"])
+    order = np.argsort(inc, kind="stable")
+    within = np.empty(len(inc), dtype=np.int64)
+    within[order] = np.arange(len(inc)) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+    M = np.full((n, m), -np.inf)
+    P = np.full((n, m), -1)
+    M[inc, within], P[inc, within] = score, np.arange(len(inc))
+    k = min(top_k, m)
+    top = np.argpartition(-M, k - 1, axis=1)[:, :k]
+    top = np.take_along_axis(top, np.argsort(-np.take_along_axis(M, top, axis=1), axis=1, kind="stable"), axis=1)
+    pick = np.take_along_axis(P, top, axis=1)
+    rank = np.broadcast_to(np.arange(1, k + 1), pick.shape)[pick >= 0]
+    pick = pick[pick >= 0]
+    return pd.DataFrame({"incident": inc[pick], "rank": rank, "signal": sig[pick], "score": score[pick],
+                         "lag_corr": corr[pick], "lag": lag[pick], "change_align": change[pick],
+                         "change_at": steps[inc][pick] + offs[at][pick], "contribution": contrib[pick]})
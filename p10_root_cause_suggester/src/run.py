@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from rank import TOP_K, change_scores, kpi_index, rank_causes, window_tables
+from signals import Context, SignalStore, join_context
+
+HERE = Path(__file__).resolve().parent
+PROJECT = HERE.parent
+DATA = PROJECT / "data"
+OUT = PROJECT / "outputs"
+IMG = PROJECT / "img"
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.tables import OutputSpec, add_output_args, output_spec, save_table  # noqa: E402
+
+START = np.datetime64("2026-01-05T00:00", "ns")
+KPI = "error_rate"      # señal que dispara el incidente (la primera de cada servicio)
+METRICS = [KPI, "latency_p95", "cpu", "memory", "queue_depth", "gc_pause", "db_connections", "cache_hit",
+           "disk_io", "net_out", "thread_pool", "retries", "deploys", "config_changes", "upstream_errors",
+           "dns_latency", "lock_wait", "heap_used", "requests", "saturation"]
+
+def ensure_dirs():
+    DATA.mkdir(parents=True, exist_ok=True)
+    OUT.mkdir(parents=True, exist_ok=True)
+    IMG.mkdir(parents=True, exist_ok=True)
+
+def simulate(n_services: int, per_service: int, hours: int, n_incidents: int, seed: int = 10) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    # -> (señales en formato largo: service, signal, t, value; incidentes: incident_id, service, t, cause)
+    # Cada señal: nivel + estacionalidad diaria + deriva lenta + ruido, muestreada
+    # por minuto con ~10% de huecos y jitter de segundos. Cada incidente sube la
+    # KPI de su servicio en t; su causa (otra señal del servicio) se mueve unos
+    # minutos antes y un síntoma se mueve unos minutos después
+    rng = np.random.default_rng(seed)
+    minutes = hours * 60
+    k = min(per_service, len(METRICS))
+    names = [f"svc{s:03d}/{METRICS[j]}" for s in range(n_services) for j in range(k)]
+    level = rng.lognormal(2, 1, (n_services * k, 1))
+    phase = rng.uniform(0, 2 * np.pi, (n_services * k, 1))
+    day = np.sin(2 * np.pi * np.arange(minutes) / 1440 + phase)
+    x = level * (1 + 0.1 * day + 0.05 * np.cumsum(rng.normal(0, 0.05, (n_services * k, minutes)), axis=1))
+    x += level * rng.normal(0, 0.05, x.shape)
+
+    svc = rng.integers(0, n_services, n_incidents)
+    at = rng.integers(120, minutes - 120, n_incidents)
+    cause = rng.integers(1, k, n_incidents)
+    symptom = (cause + rng.integers(1, k - 1, n_incidents)) % k
+    symptom[symptom == 0] = 1
+    for s, a, c, y in zip(svc, at, cause, symptom):
+        lag, dur = rng.integers(2, 16), rng.integers(20, 61)
+        r = s * k
+        x[r + c, a - lag:a - lag + dur] += level[r + c, 0] * rng.uniform(0.4, 1.0) * rng.choice([-1, 1])
+        x[r, a:a + dur // 2] += level[r, 0] * rng.uniform(0.5, 1.5)
+        x[r + y, a + lag:a + lag + dur] += level[r + y, 0] * rng.uniform(0.3, 0.8)
+
+    keep = rng.random(x.shape) > 0.1
+    sig, minute = np.nonzero(keep)
+    t = START + minute * np.timedelta64(60, "s") + rng.integers(0, 60, len(minute)) * np.timedelta64(1, "s")
+    signals = pd.DataFrame({"service": pd.Categorical.from_codes(sig // k, [f"svc{s:03d}" for s in range(n_services)]),
+                            "signal": pd.Categorical.from_codes(sig, names), "t": t, "value": x[keep].round(4)})
+    incidents = pd.DataFrame({"incident_id": [f"INC-{i:06d}" for i in range(n_incidents)],
+                              "service": [f"svc{s:03d}" for s in svc],
+                              "t": START + at * np.timedelta64(60, "s"),
+                              "cause": [names[s * k + c] for s, c in zip(svc, cause)]})
+    return signals, incidents.sort_values("t", ignore_index=True)
+
+def load_inputs(args) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    if args.signals_csv and args.incidents_csv:
+        signals = pd.read_csv(args.signals_csv, parse_dates=["t"])
+        incidents = pd.read_csv(args.incidents_csv, parse_dates=["t"])
+        return signals, incidents
+    return simulate(args.services, args.signals_per_service, args.hours, args.incidents)
+
+def save_outputs(incidents: pd.DataFrame, store: SignalStore, ctx: Context, context: pd.DataFrame,
+                 causes: pd.DataFrame, timings: Dict[str, float], args, spec: OutputSpec = OutputSpec()) -> List[Path]:
+    paths = save_table(context, OUT / "incident_context", spec)
+    paths += save_table(causes, OUT / "root_causes", spec)
+
+    # plot: ventana del primer incidente, señales estandarizadas con la ventana previa
+    first = context[context["incident"] == incidents["incident_id"].iloc[0]]
+    top = first.reindex(first["shift"].abs().sort_values(ascending=False).index).head(4)
+    t_inc = incidents["t"].iloc[0]
+    fig, ax = plt.subplots(figsize=(10, 4))
+    for k in top.index:
+        tw, vw = ctx.window(k)
+        r = context.loc[k]
+        ax.plot((tw - t_inc.to_datetime64()) / np.timedelta64(1, "m"),
+                (vw - r["mean_before"]) / (r["std_before"] or 1), lw=1, label=r["signal"])
+    ax.axvline(0, color="k", ls="--", lw=1)
+    ax.set_xlabel("minutes from incident")
+    ax.set_ylabel("z vs pre-incident window")
+    ax.set_title(f"P10 — Root Cause Suggester ({incidents['incident_id'].iloc[0]} context)")
+    ax.legend(fontsize=8)
+    fig.tight_layout()
+    fig.savefig(IMG / "p10_root_cause_suggester_plot.png", dpi=160)
+    plt.close(fig)
+
+    total = sum(timings.values())
+    notes = []
+    notes.append("# P10 — Root Cause Suggester (notes)\n")
+    notes.append(f"- Signals: {len(store):,} ({store.points:,} points, {store.nbytes / 1e6:,.1f} MB indexed)")
+    notes.append(f"- Incidents: {len(incidents):,}, context window +/- {args.delta_min} min")
+    notes.append(f"- Context join: {len(ctx):,} (incident, signal) windows, {ctx.points:,} points referenced "
+                 f"(views into the store, no copies)")
+    notes.append(f"- Ranking: {len(causes):,} suggestions (top {args.top_k} per incident) from per-window tables "
+                 f"on a {args.step_min}-min grid; KPI `{args.kpi}`")
+    if "cause" in incidents.columns:
+        hit = causes[causes["is_cause"]]
+        for k in (1, 3, args.top_k):
+            notes.append(f"- Simulated cause in top {k}: {(hit['rank'] <= k).sum() / len(incidents):.1%} of incidents")
+    notes.append("\n## Timing\n")
+    notes.append("| stage | seconds | share |")
+    notes.append("|---|---:|---:|")
+    for stage, dt in timings.items():
+        notes.append(f"| {stage} | {dt:.3f} | {dt / total:.0%} |")
+    notes.append(f"| total | {total:.3f} | |")
+    notes.append("\n## Suggestions (first 10 incidents)\n")
+    notes.append("| incident | rank | signal | score | lag corr | lag (min) | change align | contribution |")
+    notes.append("|---|---:|---|---:|---:|---:|---:|---:|")
+    for _, r in causes[causes["incident"].isin(incidents["incident_id"].head(10))].iterrows():
+        notes.append(f"| {r['incident']} | {r['rank']} | {r['signal']} | {r['score']:.3f} | {r['lag_corr']:.3f} | "
+                     f"{r['lag_min']:g} | {r['change_align']:.2f} | {r['contribution']:.2f} |")
+    notes.append("\n## Largest context shifts\n")
+    notes.append("| incident | signal | points before | points after | mean before | mean after | shift (sd) |")
+    notes.append("|---|---|---:|---:|---:|---:|---:|")
+    for _, r in context.reindex(context["shift"].abs().sort_values(ascending=False).index).head(20).iterrows():
+        notes.append(f"| {r['incident']} | {r['signal']} | {r['points_before']} | {r['points_after']} | "
+                     f"{r['mean_before']:.3f} | {r['mean_after']:.3f} | {r['shift']:+.2f} |")
+    (OUT / "notes.md").write_text("\n".join(notes) + "\n", encoding="utf-8")
+    return paths
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--signals-csv", type=Path, default=None, help="señales en formato largo: service, signal, t, value")
+    ap.add_argument("--incidents-csv", type=Path, default=None, help="incidentes: incident_id, service, t")
+    ap.add_argument("--services", type=int, default=50)
+    ap.add_argument("--signals-per-service", type=int, default=20)
+    ap.add_argument("--hours", type=int, default=48)
+    ap.add_argument("--incidents", type=int, default=2000)
+    ap.add_argument("--delta-min", type=int, default=30, help="ventana de contexto: +/- minutos alrededor del incidente")
+    ap.add_argument("--kpi", default=KPI, help="métrica que dispara los incidentes (señal <servicio>/<kpi>)")
+    ap.add_argument("--step-min", type=int, default=1, help="paso de la grilla para correlaciones y cambios")
+    ap.add_argument("--top-k", type=int, default=TOP_K)
+    add_output_args(ap)
+    args = ap.parse_args()
+
+    ensure_dirs()
+    timings: Dict[str, float] = {}
+    t0 = time.perf_counter()
+    signals, incidents = load_inputs(args)
+    timings["load"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    store = SignalStore.from_long(signals, group="service" if "service" in signals.columns else None)
+    timings["index signals"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    groups = incidents["service"].to_numpy() if "service" in incidents.columns else None
+    ctx = join_context(store, incidents["t"].to_numpy(), np.timedelta64(args.delta_min, "m"), groups)
+    context = ctx.frame()
+    context["incident"] = incidents["incident_id"].to_numpy()[context["incident"].to_numpy()]
+    timings["join context"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    step = np.timedelta64(args.step_min, "m")
+    start = store.times.min().astype("datetime64[m]").astype(store.times.dtype)
+    n_steps = int((store.times.max() - start) // step) + 1
+    G = store.resample(start, step, n_steps)
+    timings["grid"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    Z = change_scores(G)
+    timings["rolling stats"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    kpi_of = kpi_index(store, args.kpi)
+    tables = window_tables(Z, kpi_of)
+    timings["cross-correlation (FFT)"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    steps = ((incidents["t"].to_numpy() - start) // step).astype(np.int64)
+    causes = rank_causes(ctx, steps, Z, tables, kpi_of, top_k=args.top_k)
+    timings["rank (lookup + top-k)"] = time.perf_counter() - t0
+    causes = causes.assign(incident=incidents["incident_id"].to_numpy()[causes["incident"].to_numpy()],
+                           signal=store.names[causes["signal"].to_numpy()],
+                           lag_min=causes["lag"] * args.step_min,
+                           change_at=start + causes["change_at"].to_numpy() * step)
+    causes = causes[["incident", "rank", "signal", "score", "lag_corr", "lag_min", "change_align", "change_at",
+                     "contribution"]]
+    if "cause" in incidents.columns:
+        causes["is_cause"] = causes["signal"].to_numpy() == incidents.set_index("incident_id")["cause"].reindex(
+            causes["incident"]).to_numpy()
+    paths = save_outputs(incidents, store, ctx, context, causes, timings, args, output_spec(args))
+
+    print("OK — Generated outputs:")
+    for path in paths:
+        print(f"- {path}")
+    print(f"- {OUT / 'notes.md'}")
+    print(f"- {IMG / 'p10_root_cause_suggester_plot.png'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Store de señales indexado por tiempo para el paso "join context". Todas las
+# señales viven en tres arrays planos (tipo CSR): times / values ordenados por
+# (señal, tiempo) y offsets[i]:offsets[i + 1] = tramo de la señal i. La ventana
+# [t - Δ, t + Δ] de un incidente en una señal son dos np.searchsorted sobre su
+# tramo -> posiciones globales (lo, hi), y sus datos son vistas times[lo:hi] /
+# values[lo:hi]: no se copia ni se arma una tabla incidente x punto.
+#
+#   join_context  cada incidente contra las señales de su grupo (servicio; sin
+#                 grupos, contra todas). Los pares se ordenan por señal y cada
+#                 señal hace UN searchsorted vectorizado con todos sus bordes
+#   ventanas      sumas prefijas de values y values² (centradas por señal, para
+#                 no perder precisión): n / media / std de cualquier ventana en
+#                 O(1), vectorizado sobre millones de pares
+#   asof          último punto <= t (con tolerancia), lo mismo que
+#                 pd.merge_asof(by=señal, direction="backward")
+#
+# Los tiempos conservan su dtype (datetime64 o numérico); los incidentes y Δ se
+# convierten al dtype del store.
+
+
+class SignalStore:
+    def __init__(self, names: Sequence[str], times: np.ndarray, values: np.ndarray, offsets: np.ndarray,
+                 groups: Optional[np.ndarray] = None):
+        self.names = np.asarray(names, dtype=object)
+        self.times = times
+        self.values = np.asarray(values, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.groups = groups
+        self.index = {n: i for i, n in enumerate(self.names)}
+        n = np.diff(self.offsets)
+        seg = np.repeat(np.arange(len(n)), n)
+        self.mu = np.bincount(seg, self.values, minlength=len(n)) / np.maximum(n, 1)
+        d = self.values - self.mu[seg]
+        self._s1 = np.concatenate(([0.0], np.cumsum(d)))
+        self._s2 = np.concatenate(([0.0], np.cumsum(d * d)))
+
+    @classmethod
+    def from_long(cls, df: pd.DataFrame, signal: str = "signal", time: str = "t", value: str = "value",
+                  group: Optional[str] = None) -> "SignalStore":
+        # tabla larga (una fila por punto) -> store; los nulos de value se descartan
+        df = df[df[value].notna()]
+        codes, names = pd.factorize(df[signal], sort=True)
+        t = df[time].to_numpy()
+        # orden estable por señal (timsort: O(n) si ya viene agrupada); lexsort solo
+        # si algún tramo no viene ordenado por tiempo
+        order = np.argsort(codes, kind="stable")
+        c, ts = codes[order], t[order]
+        if ((ts[1:] < ts[:-1]) & (c[1:] == c[:-1])).any():
+            order = np.lexsort((t, codes))
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(names)))))
+        groups = df[group].iloc[order[offsets[:-1]]].to_numpy() if group else None
+        return cls(names.to_numpy(), t[order], df[value].to_numpy(dtype=np.float64)[order], offsets, groups)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def points(self) -> int:
+        return len(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        return self.times.nbytes + self.values.nbytes + self.offsets.nbytes + self._s1.nbytes + self._s2.nbytes
+
+    def series(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        a, b = self.offsets[i], self.offsets[i + 1]
+        return self.times[a:b], self.values[a:b]
+
+    def _search(self, signal: np.ndarray, queries: Sequence[Tuple[np.ndarray, str]]) -> List[np.ndarray]:
+        # posiciones globales de cada (t, side) en el tramo de su señal; un
+        # searchsorted por señal con todas sus consultas
+        signal = np.asarray(signal, dtype=np.int64)
+        qs = [(np.asarray(t).astype(self.times.dtype, copy=False), side) for t, side in queries]
+        out = [np.empty(len(signal), dtype=np.int64) for _ in qs]
+        if not len(signal):
+            return out
+        order = np.argsort(signal, kind="stable")
+        cuts = np.flatnonzero(np.diff(signal[order])) + 1
+        for part in np.split(order, cuts):
+            i = signal[part[0]]
+            a, b = self.offsets[i], self.offsets[i + 1]
+            seg = self.times[a:b]
+            for (t, side), o in zip(qs, out):
+                o[part] = a + np.searchsorted(seg, t[part], side)
+        return out
+
+    def bounds(self, signal: np.ndarray, t0: np.ndarray, t1: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # [t0, t1] cerrado -> (lo, hi) globales; values[lo:hi] es la ventana
+        lo, hi = self._search(signal, [(t0, "left"), (t1, "right")])
+        return lo, hi
+
+    def window(self, i: int, t0, t1) -> Tuple[np.ndarray, np.ndarray]:
+        # vistas (sin copia) de la señal i en [t0, t1]
+        lo, hi = self.bounds(np.array([i]), np.array([t0]), np.array([t1]))
+        return self.times[lo[0]:hi[0]], self.values[lo[0]:hi[0]]
+
+    def asof(self, signal: np.ndarray, t: np.ndarray, tolerance=None) -> np.ndarray:
+        # posición global del último punto <= t de cada señal (-1 si no hay o si
+        # está a más de `tolerance`)
+        signal = np.asarray(signal, dtype=np.int64)
+        t = np.asarray(t).astype(self.times.dtype, copy=False)
+        (pos,) = self._search(signal, [(t, "right")])
+        pos -= 1
+        ok = pos >= self.offsets[signal]
+        if tolerance is not None:
+            ok &= self.times[np.maximum(pos, 0)] >= t - tolerance
+        return np.where(ok, pos, -1)
+
+    def stats(self, signal: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # (n, media, std poblacional) de values[lo:hi] por par, desde las sumas prefijas
+        n = (hi - lo).astype(np.float64)
+        s1, s2 = self._s1[hi] - self._s1[lo], self._s2[hi] - self._s2[lo]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            m = s1 / n
+            var = np.maximum(s2 / n - m * m, 0.0)
+        return n.astype(np.int64), m + self.mu[signal], np.sqrt(var)
+
+    def resample(self, t0, step, n: int) -> np.ndarray:
+        # señales x n pasos: media de cada paso [t0 + i step, t0 + (i + 1) step); los
+        # pasos sin puntos repiten el último valor (al inicio, la media de la señal)
+        S = len(self)
+        edges = (np.asarray(t0).astype(self.times.dtype) + np.arange(n + 1) * step).astype(self.times.dtype)
+        (pos,) = self._search(np.repeat(np.arange(S), n + 1), [(np.tile(edges, S), "left")])
+        pos = pos.reshape(S, n + 1)
+        cnt, m, _ = self.stats(np.repeat(np.arange(S), n), pos[:, :-1].ravel(), pos[:, 1:].ravel())
+        ok = (cnt > 0).reshape(S, n)
+        last = np.maximum.accumulate(np.where(ok, np.arange(n), -1), axis=1)
+        out = m.reshape(S, n)[np.arange(S)[:, None], np.maximum(last, 0)]
+        return np.where(last >= 0, out, self.mu[:, None])
+
+
+def group_pairs(store: SignalStore, groups: Optional[np.ndarray], n: int) -> Tuple[np.ndarray, np.ndarray]:
+    # (incidente, señal) para cada señal del grupo de cada incidente; sin grupos
+    # (o store sin grupos), todas las señales
+    if groups is None or store.groups is None:
+        return np.repeat(np.arange(n), len(store)), np.tile(np.arange(len(store)), n)
+    codes, uniq = pd.factorize(store.groups)
+    members = np.argsort(codes, kind="stable")
+    size = np.bincount(codes, minlength=len(uniq))
+    start = np.cumsum(size) - size
+    g = pd.Index(uniq).get_indexer(groups)
+    cnt = np.where(g >= 0, size[g], 0)
+    inc = np.repeat(np.arange(n), cnt)
+    within = np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+    return inc, members[np.repeat(start[np.maximum(g, 0)], cnt) + within]
+
+
+@dataclass
+class Context:
+    # pares (incidente, señal) con su ventana: [lo, mid) antes del incidente, [mid, hi) desde el incidente
+    store: SignalStore
+    incident: np.ndarray
+    signal: np.ndarray
+    lo: np.ndarray
+    mid: np.ndarray
+    hi: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.incident)
+
+    @property
+    def points(self) -> int:
+        return int((self.hi - self.lo).sum())
+
+    def window(self, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        return self.store.times[self.lo[k]:self.hi[k]], self.store.values[self.lo[k]:self.hi[k]]
+
+    def frame(self) -> pd.DataFrame:
+        # una fila por par: puntos y media antes / después, y shift = salto de la
+        # media en desviaciones estándar de la ventana previa
+        st = self.store
+        nb, mb, sb = st.stats(self.signal, self.lo, self.mid)
+        na, ma, _ = st.stats(self.signal, self.mid, self.hi)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shift = np.where((nb > 1) & (na > 0) & (sb > 0), (ma - mb) / sb, np.nan)
+        return pd.DataFrame({"incident": self.incident, "signal": st.names[self.signal], "points_before": nb,
+                             "points_after": na, "mean_before": mb, "mean_after": ma, "std_before": sb,
+                             "shift": shift})
+
+
+def join_context(store: SignalStore, times: np.ndarray, delta, groups: Optional[np.ndarray] = None) -> Context:
+    # ventanas [t - delta, t + delta] de cada incidente en las señales de su grupo
+    t = np.asarray(times).astype(store.times.dtype, copy=False)
+    inc, sig = group_pairs(store, groups, len(t))
+    ti = t[inc]
+    lo, mid, hi = store._search(sig, [(ti - delta, "left"), (ti, "left"), (ti + delta, "right")])
+    return Context(store, inc, sig, lo, mid, hi)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+# Benchmark del modo serve (SSE) con N cards:
+# 1) core: LiveBoard.update + evento SSE por actualización (updates/s, cards/s)
+#    y tamaño del delta vs regenerar el HTML completo.
+# 2) end-to-end: servidor local + un cliente SSE real; se mide cuántas
+#    actualizaciones/s llegan al cliente.
+#
+#   python src/bench_live.py --kpis 5000 --areas 50 --updates 500 --change 0.01
+
+import argparse
+import asyncio
+import time
+
+from bench_render import make_kpis, refreshes
+from live import LiveBoard
+from render import DashboardRenderer
+from serve import parse_args, start
+
+
+def bench_core(df, frames):
+    board = LiveBoard(df)
+    full = DashboardRenderer().render(df)
+    t0 = time.perf_counter()
+    cards = payload = 0
+    for f in frames:
+        deltas = board.update(f)
+        payload += len(board.event(deltas))
+        cards += len(deltas)
+    dt = time.perf_counter() - t0
+    n = len(frames)
+    print(f"core    {n / dt:8,.0f} updates/s  {cards / dt:10,.0f} cards/s   "
+          f"delta {payload / n / 1e3:7.1f} KB/update vs full page {len(full.encode()) / 1e3:7.1f} KB")
+
+
+async def bench_e2e(df, frames, port: int):
+    server, live = await start(parse_args(["--port", str(port), "--queue", str(len(frames) + 1),
+                                           "--client-queue", str(len(frames) + 1)]), df)
+    async with server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /events HTTP/1.1\r\nHost: local\r\n\r\n")
+        await writer.drain()
+        await reader.readuntil(b"\r\n\r\n")
+        await reader.readuntil(b"\n\n")  # hello
+
+        t0 = time.perf_counter()
+        for f in frames:
+            # sin coalescing: cada frame se procesa antes de encolar el siguiente
+            live.submit(f)
+            await asyncio.sleep(0)
+        got = 0
+        while live.stats["updates"] < len(frames) or got < live.stats["updates"]:
+            await reader.readuntil(b"\n\n")
+            got += 1
+        dt = time.perf_counter() - t0
+        live.close()
+        await reader.read()  # el servidor cierra el stream
+        writer.close()
+    print(f"e2e     {got / dt:8,.0f} updates/s delivered to an SSE client "
+          f"({live.stats['cards_pushed']:,} cards, {live.stats['bytes_pushed'] / 1e6:.1f} MB pushed)")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--kpis", type=int, default=5_000)
+    ap.add_argument("--areas", type=int, default=50)
+    ap.add_argument("--updates", type=int, default=500)
+    ap.add_argument("--change", type=float, default=0.01, help="fracción de KPIs que cambia por update")
+    ap.add_argument("--port", type=int, default=8615)
+    args = ap.parse_args()
+
+    df = make_kpis(args.kpis, args.areas)
+    frames = [f.iloc[f.index.isin(idx)] for f, idx in _changed(df, args.updates, args.change)]
+    print(f"{args.kpis:,} cards, {args.updates} updates x ~{frames[0].shape[0]} changed cards")
+    bench_core(df, frames)
+    asyncio.run(bench_e2e(df, frames, args.port))
+
+
+def _changed(df, n, change):
+    # sólo las filas que cambiaron en cada refresco (lo que enviaría un productor)
+    prev = df
+    for f in refreshes(df, n, change):
+        mask = (f["value"].to_numpy() != prev["value"].to_numpy()) | (f["wow_delta"].to_numpy() != prev["wow_delta"].to_numpy())
+        yield f, f.index[mask]
+        prev = f
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+# Benchmark + parity: DashboardRenderer (templates precompilados + cache por
+# hash de contenido) vs el build_html anterior (apply(axis=1) + iterrows +
+# f-strings en cada refresco), copiado sin cambios como referencia.
+#
+#   python src/bench_render.py --kpis 5000 --areas 50 --refreshes 20 --change 0.01
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from render import DashboardRenderer, format_value
+
+
+def status(row) -> str:
+    # compare value vs target using direction
+    v = float(row["value"])
+    t = float(row["target"])
+    dir_ = row["direction"]
+    if dir_ == "up":
+        return "OK" if v >= t else "WATCH"
+    else:
+        return "OK" if v <= t else "WATCH"
+
+
+def build_html_reference(df: pd.DataFrame, generated: str) -> str:
+    # build_html de la versión anterior, copiado tal cual (salvo `generated`
+    # como parámetro), sólo para comparar
+
+    # Precompute fields
+    dfx = df.copy()
+    dfx["status"] = dfx.apply(status, axis=1)
+    dfx["value_fmt"] = [format_value(v, u) for v, u in zip(dfx["value"], dfx["unit"])]
+    dfx["target_fmt"] = [format_value(v, u) for v, u in zip(dfx["target"], dfx["unit"])]
+    dfx["wow_fmt"] = [f"{x*100:+.1f}%" for x in dfx["wow_delta"]]
+
+    # Simple KPI cards grouped by area
+    sections = []
+    for area, sub in dfx.groupby("area"):
+        cards = []
+        for _, r in sub.iterrows():
+            badge = "ok" if r["status"] == "OK" else "watch"
+            cards.append(f"""
+            <div class="card">
+              <div class="kpi-title">{r["kpi"]}</div>
+              <div class="kpi-value">{r["value_fmt"]}</div>
+              <div class="kpi-meta">
+                <span class="badge {badge}">{r["status"]}</span>
+                <span class="muted">Target: {r["target_fmt"]}</span>
+                <span class="muted">WoW: {r["wow_fmt"]}</span>
+              </div>
+            </div>
+            """)
+        sections.append(f"""
+        <section class="section">
+          <h2>{area}</h2>
+          <div class="grid">
+            {''.join(cards)}
+          </div>
+        </section>
+        """)
+
+    html = f"""<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8"/>
+  <meta name="viewport" content="width=device-width, initial-scale=1"/>
+  <title>P14 — Executive Demo Dashboard</title>
+  <style>
+    body {{ font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Arial; margin: 0; background: #0b1220; color: #e8eefc; }}
+    .wrap {{ max-width: 1100px; margin: 0 auto; padding: 22px; }}
+    .top {{ display:flex; justify-content:space-between; align-items:flex-end; gap: 16px; }}
+    .title {{ font-size: 22px; font-weight: 700; }}
+    .subtitle {{ font-size: 13px; color: #a9b7d4; margin-top: 6px; }}
+    .chip {{ font-size: 12px; color: #a9b7d4; border: 1px solid rgba(169,183,212,0.25); padding: 6px 10px; border-radius: 999px; }}
+    .section {{ margin-top: 18px; }}
+    h2 {{ font-size: 16px; margin: 18px 0 10px; color: #d9e5ff; }}
+    .grid {{ display:grid; grid-template-columns: repeat(3, 1fr); gap: 12px; }}
+    .card {{ background: rgba(255,255,255,0.04); border: 1px solid rgba(255,255,255,0.08); border-radius: 14px; padding: 14px; }}
+    .kpi-title {{ font-size: 12px; color: #a9b7d4; }}
+    .kpi-value {{ font-size: 24px; font-weight: 800; margin-top: 6px; }}
+    .kpi-meta {{ display:flex; gap: 10px; align-items:center; margin-top: 10px; flex-wrap: wrap; }}
+    .badge {{ font-size: 11px; padding: 4px 8px; border-radius: 999px; border: 1px solid rgba(255,255,255,0.14); }}
+    .badge.ok {{ background: rgba(39, 174, 96, 0.18); }}
+    .badge.watch {{ background: rgba(241, 196, 15, 0.18); }}
+    .muted {{ font-size: 12px; color: #a9b7d4; }}
+    .footer {{ margin-top: 18px; font-size: 12px; color: #8fa2c7; }}
+    @media (max-width: 980px) {{ .grid {{ grid-template-columns: repeat(2, 1fr); }} }}
+    @media (max-width: 640px) {{ .grid {{ grid-template-columns: 1fr; }} .top {{ flex-direction: column; align-items:flex-start; }} }}
+  </style>
+</head>
+<body>
+  <div class="wrap">
+    <div class="top">
+      <div>
+        <div class="title">P14 — Executive Demo Dashboard</div>
+        <div class="subtitle">Portable V1 dashboard (simulated KPIs) · TeleObjetivo / Orion Lab</div>
+      </div>
+      <div class="chip">Generated: {generated}</div>
+    </div>
+
+    {''.join(sections)}
+
+    <div class="footer">
+      Tip: open this file locally in your browser. Next V2: wire real outputs from P01–P13.
+    </div>
+  </div>
+</body>
+</html>
+"""
+    return html
+
+
+def make_kpis(n_kpis: int, n_areas: int, seed: int = 21) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    units = rng.choice(["", "%", "CLP"], size=n_kpis)
+    value = np.where(units == "%", rng.uniform(0.4, 0.99, n_kpis),
+                     np.where(units == "CLP", rng.uniform(8000, 60000, n_kpis), rng.integers(5, 140, n_kpis)))
+    return pd.DataFrame({
+        "date": pd.Timestamp("2025-12-01"),
+        "area": [f"Area {i % n_areas:03d}" for i in range(n_kpis)],
+        "kpi": [f"KPI {i:05d}" for i in range(n_kpis)],
+        "value": value,
+        "target": value * rng.uniform(0.8, 1.1, n_kpis),
+        "unit": units,
+        "direction": rng.choice(["up", "down"], size=n_kpis),
+        "wow_delta": rng.normal(0, 0.12, n_kpis),
+    })
+
+
+def refreshes(df: pd.DataFrame, n: int, change: float, seed: int = 1):
+    # cada refresco cambia `change` de las filas (value / wow_delta)
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        df = df.copy()
+        idx = rng.choice(len(df), size=max(1, int(change * len(df))), replace=False)
+        df.loc[df.index[idx], "value"] *= rng.uniform(0.9, 1.1, len(idx))
+        df.loc[df.index[idx], "wow_delta"] = rng.normal(0, 0.12, len(idx))
+        yield df
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--kpis", type=int, default=5_000)
+    ap.add_argument("--areas", type=int, default=50)
+    ap.add_argument("--refreshes", type=int, default=20)
+    ap.add_argument("--change", type=float, default=0.01, help="fracción de KPIs que cambia por refresco")
+    args = ap.parse_args()
+    gen = "2025-12-01 00:00:00"
+
+    df = make_kpis(args.kpis, args.areas)
+    frames = list(refreshes(df, args.refreshes, args.change))
+
+    renderer = DashboardRenderer()
+    t0 = time.perf_counter()
+    renderer.render(df, generated=gen)
+    t_cold = time.perf_counter() - t0
+
+    t_ref = t_new = 0.0
+    for f in frames:
+        t0 = time.perf_counter()
+        ref = build_html_reference(f, gen)
+        t_ref += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        new = renderer.render(f, generated=gen)
+        t_new += time.perf_counter() - t0
+        assert new == ref, "renderer output differs from reference build_html"
+
+    n = len(frames)
+    print(f"parity OK — {args.kpis:,} KPIs, {args.areas} areas, {args.change:.1%} changed per refresh")
+    print(f"reference build_html   {t_ref / n * 1e3:8.1f} ms / refresh")
+    print(f"renderer (cold)        {t_cold * 1e3:8.1f} ms")
+    print(f"renderer (warm)        {t_new / n * 1e3:8.1f} ms / refresh   x{t_ref / t_new:.1f}")
+    print(f"cache stats            {renderer.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import hashlib
+import html as _html
+import json
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from render import CARD_TEMPLATE, PAGE_TEMPLATE, SECTION_TEMPLATE, card_fields, row_hashes
+
+# Estado del dashboard "live": cada card se identifica por (area, kpi) y
+# guarda su hash de contenido + html. update() devuelve sólo los deltas
+# (cards nuevas o cambiadas) para empujarlos al navegador por SSE; el shell
+# completo se arma desde los fragmentos ya renderizados.
+
+LIVE_CARD_TEMPLATE = CARD_TEMPLATE.replace('<div class="card">', '<div class="card" id="{card_id}">', 1)
+LIVE_SECTION_TEMPLATE = SECTION_TEMPLATE.replace('<div class="grid">', '<div class="grid" id="{grid_id}">', 1)
+
+# cliente: reemplaza cards por id; si la sección no existe (área nueva) o el
+# servidor pide resync, recarga el shell
+LIVE_SCRIPT = """
+<script>
+(function () {
+  var version = %(version)d;
+  var es = new EventSource("/events");
+  es.addEventListener("hello", function (e) {
+    if (JSON.parse(e.data).version !== version) location.reload();
+  });
+  es.addEventListener("cards", function (e) {
+    var msg = JSON.parse(e.data);
+    version = msg.version;
+    msg.cards.forEach(function (c) {
+      var el = document.getElementById(c.id);
+      if (el) { el.outerHTML = c.html; return; }
+      var grid = document.getElementById(c.grid);
+      if (!grid) { location.reload(); return; }
+      grid.insertAdjacentHTML("beforeend", c.html);
+    });
+    document.getElementById("live-version").textContent = "v" + version;
+  });
+  es.addEventListener("reload", function () { location.reload(); });
+})();
+</script>
+</body>"""
+
+
+def _short_id(prefix: str, *parts: str) -> str:
+    return prefix + hashlib.blake2b("\x1f".join(parts).encode(), digest_size=6).hexdigest()
+
+
+def card_id(area: str, kpi: str) -> str:
+    return _short_id("k-", area, kpi)
+
+
+def grid_id(area: str) -> str:
+    return _short_id("g-", area)
+
+
+class LiveBoard:
+    def __init__(self, df: Optional[pd.DataFrame] = None):
+        # (area, kpi) -> {"hash", "html"}; orden de inserción = orden en la página
+        self.cards: Dict[Tuple[str, str], dict] = {}
+        self.version = 0
+        self._shell: Optional[str] = None
+        if df is not None:
+            self.update(df)
+
+    def update(self, df: pd.DataFrame) -> List[dict]:
+        if len(df) == 0:
+            return []
+        h = row_hashes(df)
+        keys = list(zip(df["area"].astype(str).tolist(), df["kpi"].astype(str).tolist()))
+        changed = [i for i, k in enumerate(keys) if self.cards.get(k, {}).get("hash") != h[i]]
+        if not changed:
+            return []
+
+        fields = card_fields(df.iloc[changed])
+        deltas = []
+        for i, f in zip(changed, fields):
+            area, kpi = keys[i]
+            cid = card_id(area, kpi)
+            frag = LIVE_CARD_TEMPLATE.format(card_id=cid, **f)
+            self.cards[keys[i]] = {"hash": h[i], "html": frag}
+            deltas.append({"id": cid, "grid": grid_id(area), "html": frag})
+        self.version += 1
+        self._shell = None
+        return deltas
+
+    def event(self, deltas: List[dict]) -> bytes:
+        # evento SSE con los deltas de una actualización
+        payload = json.dumps({"version": self.version, "cards": deltas}, separators=(",", ":"))
+        return f"event: cards\ndata: {payload}\n\n".encode()
+
+    def shell(self) -> str:
+        if self._shell is None:
+            by_area: Dict[str, List[str]] = {}
+            for (area, _), c in self.cards.items():
+                by_area.setdefault(area, []).append(c["html"])
+            sections = "".join(
+                LIVE_SECTION_TEMPLATE.format(grid_id=grid_id(a), area=_html.escape(a), cards="".join(by_area[a]))
+                for a in sorted(by_area)
+            )
+            page = PAGE_TEMPLATE.format(generated=f'live · <span id="live-version">v{self.version}</span>',
+                                        sections=sections)
+            self._shell = page.replace("</body>", LIVE_SCRIPT % {"version": self.version}, 1)
+        return self._shell
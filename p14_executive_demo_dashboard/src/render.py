@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import hashlib
+import html as _html
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Render del dashboard con templates compilados una vez (str.format sobre
+# constantes de módulo) y cache de fragmentos por hash de contenido: entre
+# refrescos sólo se formatean / re-renderizan las cards y secciones cuyo
+# contenido cambió.
+
+CARD_COLUMNS = ["area", "kpi", "value", "target", "unit", "direction", "wow_delta"]
+
+CARD_TEMPLATE = """
+            <div class="card">
+              <div class="kpi-title">{kpi}</div>
+              <div class="kpi-value">{value_fmt}</div>
+              <div class="kpi-meta">
+                <span class="badge {badge}">{status}</span>
+                <span class="muted">Target: {target_fmt}</span>
+                <span class="muted">WoW: {wow_fmt}</span>
+              </div>
+            </div>
+            """
+
+SECTION_TEMPLATE = """
+        <section class="section">
+          <h2>{area}</h2>
+          <div class="grid">
+            {cards}
+          </div>
+        </section>
+        """
+
+PAGE_TEMPLATE = """<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8"/>
+  <meta name="viewport" content="width=device-width, initial-scale=1"/>
+  <title>P14 — Executive Demo Dashboard</title>
+  <style>
+    body {{ font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Arial; margin: 0; background: #0b1220; color: #e8eefc; }}
+    .wrap {{ max-width: 1100px; margin: 0 auto; padding: 22px; }}
+    .top {{ display:flex; justify-content:space-between; align-items:flex-end; gap: 16px; }}
+    .title {{ font-size: 22px; font-weight: 700; }}
+    .subtitle {{ font-size: 13px; color: #a9b7d4; margin-top: 6px; }}
+    .chip {{ font-size: 12px; color: #a9b7d4; border: 1px solid rgba(169,183,212,0.25); padding: 6px 10px; border-radius: 999px; }}
+    .section {{ margin-top: 18px; }}
+    h2 {{ font-size: 16px; margin: 18px 0 10px; color: #d9e5ff; }}
+    .grid {{ display:grid; grid-template-columns: repeat(3, 1fr); gap: 12px; }}
+    .card {{ background: rgba(255,255,255,0.04); border: 1px solid rgba(255,255,255,0.08); border-radius: 14px; padding: 14px; }}
+    .kpi-title {{ font-size: 12px; color: #a9b7d4; }}
+    .kpi-value {{ font-size: 24px; font-weight: 800; margin-top: 6px; }}
+    .kpi-meta {{ display:flex; gap: 10px; align-items:center; margin-top: 10px; flex-wrap: wrap; }}
+    .badge {{ font-size: 11px; padding: 4px 8px; border-radius: 999px; border: 1px solid rgba(255,255,255,0.14); }}
+    .badge.ok {{ background: rgba(39, 174, 96, 0.18); }}
+    .badge.watch {{ background: rgba(241, 196, 15, 0.18); }}
+    .muted {{ font-size: 12px; color: #a9b7d4; }}
+    .footer {{ margin-top: 18px; font-size: 12px; color: #8fa2c7; }}
+    @media (max-width: 980px) {{ .grid {{ grid-template-columns: repeat(2, 1fr); }} }}
+    @media (max-width: 640px) {{ .grid {{ grid-template-columns: 1fr; }} .top {{ flex-direction: column; align-items:flex-start; }} }}
+  </style>
+</head>
+<body>
+  <div class="wrap">
+    <div class="top">
+      <div>
+        <div class="title">P14 — Executive Demo Dashboard</div>
+        <div class="subtitle">Portable V1 dashboard (simulated KPIs) · TeleObjetivo / Orion Lab</div>
+      </div>
+      <div class="chip">Generated: {generated}</div>
+    </div>
+
+    {sections}
+
+    <div class="footer">
+      Tip: open this file locally in your browser. Next V2: wire real outputs from P01–P13.
+    </div>
+  </div>
+</body>
+</html>
+"""
+
+
+def format_value(v: float, unit: str) -> str:
+    if unit == "%":
+        return f"{v*100:,.1f}%"
+    if unit == "CLP":
+        return f"${v:,.0f}"
+    # counts / raw
+    if float(v).is_integer():
+        return f"{int(v):,}"
+    return f"{v:,.2f}"
+
+
+def status_column(df: pd.DataFrame) -> np.ndarray:
+    # compare value vs target using direction ("up": higher is better)
+    v = df["value"].to_numpy(dtype=float)
+    t = df["target"].to_numpy(dtype=float)
+    ok = np.where(df["direction"].to_numpy() == "up", v >= t, v <= t)
+    return np.where(ok, "OK", "WATCH")
+
+
+def card_fields(df: pd.DataFrame) -> List[dict]:
+    # status + formatos, columna a columna (sin apply(axis=1) / iterrows);
+    # devuelve un dict de campos por card, listo para CARD_TEMPLATE
+    status = status_column(df).tolist()
+    units = df["unit"].tolist()
+    cols = {
+        "kpi": [_html.escape(str(k)) for k in df["kpi"].tolist()],
+        "status": status,
+        "badge": ["ok" if s == "OK" else "watch" for s in status],
+        "value_fmt": [format_value(v, u) for v, u in zip(df["value"].tolist(), units)],
+        "target_fmt": [format_value(v, u) for v, u in zip(df["target"].tolist(), units)],
+        "wow_fmt": [f"{x*100:+.1f}%" for x in df["wow_delta"].tolist()],
+    }
+    names = list(cols)
+    return [dict(zip(names, vals)) for vals in zip(*cols.values())]
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    # hash de contenido por card sobre los campos que la definen; vive sólo en
+    # memoria del proceso (cache), así que basta el hash() de Python
+    return np.fromiter((hash(t) for t in zip(*(df[c].tolist() for c in CARD_COLUMNS))),
+                       dtype=np.int64, count=len(df))
+
+
+class DashboardRenderer:
+    def __init__(self):
+        self.cards: Dict[int, str] = {}      # hash de card -> html
+        self.sections: Dict[bytes, str] = {}  # hash de sección -> html
+        self.stats = {"cards_rendered": 0, "cards_cached": 0, "sections_rendered": 0, "sections_cached": 0}
+
+    def render_sections(self, df: pd.DataFrame) -> List[str]:
+        h = row_hashes(df)
+        # misma semántica que groupby("area"): áreas ordenadas, filas en orden de entrada
+        areas = df["area"].to_numpy()
+        order = np.argsort(areas, kind="stable")
+        areas_sorted = areas[order]
+        bounds = np.flatnonzero(np.r_[True, areas_sorted[1:] != areas_sorted[:-1], True])
+
+        new_cards: Dict[int, str] = {}
+        new_sections: Dict[bytes, str] = {}
+        missing = [i for i in order if int(h[i]) not in self.cards]
+        if missing:
+            fields = card_fields(df.iloc[missing])
+            for i, f in zip(missing, fields):
+                self.cards[int(h[i])] = CARD_TEMPLATE.format(**f)
+            self.stats["cards_rendered"] += len(missing)
+        self.stats["cards_cached"] += len(df) - len(missing)
+
+        sections = []
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            rows = order[a:b]
+            area = str(areas_sorted[a])
+            key = hashlib.blake2b(area.encode() + h[rows].tobytes(), digest_size=16).digest()
+            frag = self.sections.get(key)
+            if frag is None:
+                cards = []
+                for i in rows:
+                    c = self.cards[int(h[i])]
+                    new_cards[int(h[i])] = c
+                    cards.append(c)
+                frag = SECTION_TEMPLATE.format(area=_html.escape(area), cards="".join(cards))
+                self.stats["sections_rendered"] += 1
+            else:
+                for i in rows:
+                    new_cards[int(h[i])] = self.cards[int(h[i])]
+                self.stats["sections_cached"] += 1
+            new_sections[key] = frag
+            sections.append(frag)
+
+        # el cache sólo retiene lo vigente: no crece entre refrescos
+        self.cards, self.sections = new_cards, new_sections
+        return sections
+
+    def render(self, df: pd.DataFrame, generated: Optional[str] = None) -> str:
+        generated = generated or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return PAGE_TEMPLATE.format(generated=generated, sections="".join(self.render_sections(df)))
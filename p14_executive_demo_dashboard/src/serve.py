@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+# Modo serve del dashboard: un servidor local que entrega el shell HTML una
+# vez y luego empuja por SSE sólo las cards que cambian.
+#
+#   python src/serve.py --port 8614 --demo      # cambia ~1% de KPIs por segundo
+#
+#   GET  /          shell (render completo desde el cache de fragmentos)
+#   GET  /events    stream SSE: "hello" (versión) y luego "cards" (deltas)
+#   POST /kpis      filas nuevas/actualizadas (JSON: lista de objetos como kpis.csv)
+#   GET  /metrics   actualizaciones, cards empujadas, bytes, clientes
+#
+# Las filas entrantes pasan por una cola acotada (--queue): si está llena,
+# POST /kpis responde 503; filas con value / target / wow_delta no numéricos
+# o direction fuera de up / down responden 400 antes de encolarse. Cada
+# cliente SSE tiene su propia cola acotada; si un navegador lento la llena, se
+# descarta su backlog y se le pide recargar.
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from live import LiveBoard
+from render import CARD_COLUMNS
+from run import simulate_kpis
+
+HERE = Path(__file__).resolve().parent
+PROJECT = HERE.parent
+
+sys.path.insert(0, str(PROJECT.parent))  # common/ (módulos compartidos entre proyectos)
+from common.httpserver import BadRequest, json_response, read_request, response, wants_close  # noqa: E402
+
+RELOAD_EVENT = b"event: reload\ndata: {}\n\n"
+NUMERIC = ["value", "target", "wow_delta"]
+DIRECTIONS = {"up", "down"}
+
+
+def parse_rows(body: bytes) -> pd.DataFrame:
+    # cuerpo de POST /kpis -> filas validadas; ValueError -> 400 (una fila mala
+    # no debe llegar al loop de actualización)
+    rows = pd.DataFrame(json.loads(body))
+    missing = set(CARD_COLUMNS) - set(rows.columns)
+    if missing:
+        raise ValueError(f"missing columns: {sorted(missing)}")
+    for col in NUMERIC:
+        try:
+            rows[col] = pd.to_numeric(rows[col], errors="raise").astype(float)
+        except (TypeError, ValueError):
+            raise ValueError(f"non-numeric values in {col!r}")
+        if rows[col].isna().any():
+            raise ValueError(f"null values in {col!r}")
+    bad = sorted(set(rows["direction"].astype(str)) - DIRECTIONS)
+    if bad:
+        raise ValueError(f"invalid direction {bad}; expected one of {sorted(DIRECTIONS)}")
+    return rows
+
+
+class Client:
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, event: bytes):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # cliente lento: se descarta el backlog y se fuerza un resync
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RELOAD_EVENT)
+
+
+class LiveServer:
+    def __init__(self, board: LiveBoard, queue_size: int, client_queue: int):
+        self.board = board
+        self.inbox: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.clients: Set[Client] = set()
+        self.client_queue = client_queue
+        self.stats = {"updates": 0, "rows_in": 0, "cards_pushed": 0, "bytes_pushed": 0, "rejected": 0,
+                      "failed_batches": 0}
+
+    def submit(self, rows: pd.DataFrame) -> bool:
+        try:
+            self.inbox.put_nowait(rows)
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            return False
+        return True
+
+    async def run(self):
+        while True:
+            batch = [await self.inbox.get()]
+            while not self.inbox.empty():  # coalesce lo acumulado en un solo delta
+                batch.append(self.inbox.get_nowait())
+            rows = pd.concat(batch, ignore_index=True) if len(batch) > 1 else batch[0]
+            rows = rows.drop_duplicates(["area", "kpi"], keep="last")
+            try:
+                deltas = self.board.update(rows)
+                event = self.board.event(deltas) if deltas else None
+            except Exception as e:  # un batch malo no debe matar el loop
+                self.stats["failed_batches"] += 1
+                print(f"dropped update batch ({len(rows)} rows): {type(e).__name__}: {e}", file=sys.stderr)
+                continue
+            self.stats["rows_in"] += len(rows)
+            if event is None:
+                continue
+            self.stats["updates"] += 1
+            self.stats["cards_pushed"] += len(deltas)
+            for c in list(self.clients):
+                c.offer(event)
+                self.stats["bytes_pushed"] += len(event)
+
+    def metrics(self) -> dict:
+        return {**self.stats, "version": self.board.version, "cards": len(self.board.cards),
+                "clients": len(self.clients), "inbox": self.inbox.qsize(),
+                "shell_bytes": len(self.board.shell().encode())}
+
+    async def stream(self, writer: asyncio.StreamWriter):
+        client = Client(self.client_queue)
+        self.clients.add(client)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+        writer.write(f"event: hello\ndata: {json.dumps({'version': self.board.version})}\n\n".encode())
+        try:
+            while True:
+                event = await client.queue.get()
+                if event is None:  # close()
+                    break
+                writer.write(event)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(client)
+
+    def close(self):
+        # termina los streams SSE abiertos (apagado ordenado)
+        for c in list(self.clients):
+            while not c.queue.empty():
+                c.queue.get_nowait()
+            c.queue.put_nowait(None)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    req = await read_request(reader)
+                except BadRequest as e:
+                    writer.write(json_response(e.status, {"error": str(e)}))
+                    break
+                if req is None:
+                    break
+                if req.method == "GET" and req.path == "/events":
+                    await self.stream(writer)
+                    break
+                if req.method == "GET" and req.path == "/":
+                    writer.write(response("200 OK", self.board.shell().encode(), "text/html; charset=utf-8"))
+                elif req.method == "POST" and req.path == "/kpis":
+                    try:
+                        rows = parse_rows(req.body)
+                    except ValueError as e:
+                        writer.write(json_response("400 Bad Request", {"error": str(e)}))
+                    else:
+                        if self.submit(rows):
+                            writer.write(json_response("202 Accepted", {"queued": len(rows)}))
+                        else:
+                            writer.write(json_response("503 Service Unavailable", {"error": "update queue full"}))
+                elif req.method == "GET" and req.path == "/metrics":
+                    writer.write(json_response("200 OK", self.metrics()))
+                else:
+                    writer.write(json_response("404 Not Found", {"error": f"{req.method} {req.path}"}))
+                await writer.drain()
+                if wants_close(req):
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def demo_feed(server: LiveServer, df: pd.DataFrame, interval: float, change: float, seed: int = 0):
+    # simula KPIs que se mueven: ~`change` de las filas por tick
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    while True:
+        await asyncio.sleep(interval)
+        idx = rng.choice(len(df), size=max(1, int(change * len(df))), replace=False)
+        df.loc[df.index[idx], "value"] = df["value"].iloc[idx].to_numpy() * rng.uniform(0.95, 1.05, len(idx))
+        df.loc[df.index[idx], "wow_delta"] = rng.normal(0, 0.12, len(idx))
+        server.submit(df.iloc[idx])
+
+
+async def start(args, df: Optional[pd.DataFrame] = None) -> Tuple[asyncio.AbstractServer, LiveServer]:
+    df = simulate_kpis() if df is None else df
+    live = LiveServer(LiveBoard(df), args.queue, args.client_queue)
+    asyncio.get_running_loop().create_task(live.run())
+    if args.demo:
+        asyncio.get_running_loop().create_task(demo_feed(live, df, args.demo_interval, args.demo_change))
+    server = await asyncio.start_server(live.handle, host=args.host, port=args.port)
+    return server, live
+
+
+async def serve(args):
+    server, live = await start(args)
+    print(f"P14 live dashboard on http://{args.host}:{args.port} "
+          f"({len(live.board.cards)} cards, queue={args.queue})", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8614)
+    ap.add_argument("--queue", type=int, default=256, help="máximo de batches de filas pendientes")
+    ap.add_argument("--client-queue", type=int, default=64, help="máximo de eventos pendientes por cliente SSE")
+    ap.add_argument("--demo", action="store_true", help="simula cambios periódicos de KPIs")
+    ap.add_argument("--demo-interval", type=float, default=1.0)
+    ap.add_argument("--demo-change", type=float, default=0.01)
+    return ap.parse_args(argv)
+
+
+def main():
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()